@@ -0,0 +1,9 @@
+"""
+Benchmarks de rendimiento de TodoApp.
+
+Cada módulo se ejecuta de forma independiente sobre una base de datos de test
+aislada (creada y destruida como hace el test runner de Django), usando la
+base de datos configurada en DATABASE_URL (SQLite por defecto o PostgreSQL):
+
+    python -m benchmarks.indexes --tasks 1000000
+"""
@@ -0,0 +1,246 @@
+"""
+Prueba de carga de la API con los perfiles de despliegue WSGI y ASGI.
+
+Siembra una base de datos de test, arranca gunicorn con cada perfil de
+gunicorn.conf.py (SERVER_PROFILE=wsgi: workers síncronos; SERVER_PROFILE=asgi:
+workers de uvicorn) y lanza clientes HTTP concurrentes contra las vistas de
+la API. Requiere gunicorn y, para el perfil asgi, uvicorn-worker:
+
+    python -m benchmarks.asgi_load --concurrency 32 --duration 15
+
+Con SQLite los escenarios de escritura (toggle) compiten por el bloqueo de la
+base de datos entre procesos; para compararlos usa PostgreSQL (DATABASE_URL).
+"""
+import argparse
+import http.client
+import importlib.util
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from .utils import setup_django, benchmark_database, analyze, summarize, print_table
+
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Escenarios de carga disponibles (mixed intercala los demás)
+SCENARIOS = ('stats', 'list-stats', 'search', 'toggle', 'mixed')
+
+# Token CSRF fijo: la cookie y la cabecera solo tienen que coincidir
+CSRF_TOKEN = 'benchmarkcsrftokenbenchmarkcsrf0'
+
+
+def database_url(settings_dict):
+    """DATABASE_URL de la base de test para los procesos del servidor."""
+    if settings_dict['ENGINE'].endswith('sqlite3'):
+        return f"sqlite:///{settings_dict['NAME']}"
+    credentials = settings_dict['USER'] or ''
+    if settings_dict['PASSWORD']:
+        credentials += f":{settings_dict['PASSWORD']}"
+    host = settings_dict['HOST'] or 'localhost'
+    port = f":{settings_dict['PORT']}" if settings_dict['PORT'] else ''
+    return f"postgres://{credentials}@{host}{port}/{settings_dict['NAME']}"
+
+
+def build_requests(scenario, user):
+    """Peticiones (método, ruta) que repite cada cliente en el escenario."""
+    from django.urls import reverse
+    from tasks.models import Task, TaskList
+    
+    owned_lists = list(TaskList.objects.filter(owner=user).values_list('pk', flat=True))
+    task_ids = list(
+        Task.objects.filter(task_list__in=owned_lists).order_by('pk').values_list('pk', flat=True)[:200]
+    )
+    requests = {
+        'stats': [('GET', reverse('task_stats_api', kwargs={'pk': 'dashboard'}))],
+        'list-stats': [
+            ('GET', reverse('task_stats_api', kwargs={'pk': pk})) for pk in owned_lists[:20]
+        ],
+        'search': [
+            ('GET', reverse('search_users_api') + f'?q={query}') for query in ('be', 'ben', 'bench')
+        ],
+        'toggle': [
+            ('POST', reverse('toggle_task_complete', kwargs={'pk': pk})) for pk in task_ids
+        ],
+    }
+    requests['mixed'] = list(itertools.chain.from_iterable(zip(
+        itertools.cycle(requests['stats']),
+        itertools.cycle(requests['search']),
+        requests['list-stats'],
+        requests['toggle'],
+    )))
+    return requests[scenario]
+
+
+def start_server(profile, port, workers, env):
+    """Arranca gunicorn con el perfil indicado y espera a que acepte conexiones."""
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [shutil.which('gunicorn'), '-c', str(PROJECT_DIR / 'gunicorn.conf.py')],
+        cwd=PROJECT_DIR,
+        # Sin eventos en vivo salvo que se pida: con varios workers el broker en
+        # memoria no los reparte y gunicorn.conf.py no arranca
+        env={
+            'PUSH_ENABLED': 'False',
+            **env,
+            'SERVER_PROFILE': profile,
+            'PORT': str(port),
+            'WEB_CONCURRENCY': str(workers),
+        },
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/login/')
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    log.seek(0)
+    raise RuntimeError(f'gunicorn ({profile}) no arrancó:\n{log.read().decode(errors="replace")[-2000:]}')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_load(port, requests, cookies, concurrency, duration):
+    """Lanza clientes concurrentes durante duration segundos; retorna (latencias ms, errores)."""
+    headers = {'Cookie': cookies, 'X-CSRFToken': CSRF_TOKEN, 'Content-Length': '0'}
+    samples, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local_samples, local_errors = [], 0
+        for method, path in itertools.islice(itertools.cycle(requests), offset, None):
+            if time.monotonic() >= deadline:
+                break
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            local_samples.append((time.perf_counter() - start) * 1000)
+        connection.close()
+        with lock:
+            samples.extend(local_samples)
+            errors.append(local_errors)
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, sum(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', default='wsgi,asgi', help='Perfiles de gunicorn.conf.py a comparar.')
+    parser.add_argument('--scenarios', default='stats,search,mixed', help=f'Escenarios: {", ".join(SCENARIOS)}.')
+    parser.add_argument('--workers', type=int, default=2, help='Workers de gunicorn por perfil.')
+    parser.add_argument('--concurrency', type=int, default=16, help='Clientes concurrentes.')
+    parser.add_argument('--duration', type=float, default=10, help='Segundos de carga por escenario.')
+    parser.add_argument('--tasks', type=int, default=5000, help='Número de tareas a sembrar.')
+    parser.add_argument('--lists', type=int, default=50, help='Número de listas accesibles.')
+    parser.add_argument('--port', type=int, default=8765, help='Puerto del servidor.')
+    args = parser.parse_args(argv)
+    
+    profiles = args.profiles.split(',')
+    scenarios = args.scenarios.split(',')
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f'Escenario desconocido: {scenario}')
+    if shutil.which('gunicorn') is None:
+        parser.error('gunicorn no está instalado (pip install -r requirements.txt)')
+    if 'asgi' in profiles and importlib.util.find_spec('uvicorn_worker') is None:
+        parser.error('El perfil asgi requiere uvicorn-worker (pip install -r requirements.txt)')
+    
+    # Los workers deben compartir la clave con la que se firman las sesiones
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark-secret-key-not-for-production')
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+    from .conditional_get import seed
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        with benchmark_database(test_name=os.path.join(tmp, 'benchmark.sqlite3')) as connection:
+            print(f'Base de datos: {connection.vendor}')
+            user = seed(args.tasks, args.lists)
+            analyze(connection)
+            
+            client = Client()
+            client.force_login(user)
+            cookies = '; '.join([
+                f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}',
+                f'{settings.CSRF_COOKIE_NAME}={CSRF_TOKEN}',
+            ])
+            requests = {scenario: build_requests(scenario, user) for scenario in scenarios}
+            # La base de test tiene que estar confirmada antes de que la abran los servidores
+            connection.close()
+            
+            env = dict(
+                os.environ,
+                DATABASE_URL=database_url(connection.settings_dict),
+                DJANGO_DEBUG='True',  # Sin redirección a HTTPS
+                # Cachés compartidas por los workers, vacías en cada ejecución
+                DASHBOARD_CACHE_DIR=os.path.join(tmp, 'cache', 'dashboard'),
+                SESSION_CACHE_DIR=os.path.join(tmp, 'cache', 'sessions'),
+                PYTHONPATH=os.pathsep.join(filter(None, [str(PROJECT_DIR), os.environ.get('PYTHONPATH')])),
+            )
+            for profile in profiles:
+                process = start_server(profile, args.port, args.workers, env)
+                try:
+                    for scenario in scenarios:
+                        samples, errors = run_load(
+                            args.port, requests[scenario], cookies, args.concurrency, args.duration
+                        )
+                        stats = summarize(samples)
+                        rows.append({
+                            'perfil': profile,
+                            'escenario': scenario,
+                            'req/s': len(samples) / args.duration,
+                            'errores': errors,
+                            'p50 ms': stats['p50_ms'],
+                            'p95 ms': stats['p95_ms'],
+                            'p99 ms': stats['p99_ms'],
+                        })
+                        print(f'  {profile}/{scenario}: {len(samples)} peticiones', file=sys.stderr)
+                finally:
+                    stop_server(process)
+    
+    print_table(
+        f'Carga de la API ({args.workers} workers, {args.concurrency} clientes, {args.duration:g} s)',
+        rows,
+        ['perfil', 'escenario', 'req/s', 'errores', 'p50 ms', 'p95 ms', 'p99 ms'],
+    )
+
+
+if __name__ == '__main__':
+    main()
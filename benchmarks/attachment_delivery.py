@@ -0,0 +1,109 @@
+"""
+Benchmark de la entrega de archivos adjuntos por worker.
+
+Mide peticiones y megabytes por segundo que sirve un único proceso para
+view_attachment en cada modo: Django enviando el archivo completo, rangos de
+bytes (descarga reanudable o salto de página en un PDF), 304 con If-None-Match
+y delegación con X-Accel-Redirect, donde el worker solo autoriza y nginx envía
+los bytes:
+
+    python -m benchmarks.attachment_delivery --size-mb 20 --requests 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from .utils import setup_django, benchmark_database, summarize, print_table
+
+
+# Tamaño de los rangos pedidos (lo habitual en un visor de PDF)
+RANGE_SIZE = 256 * 1024
+
+
+def seed(size):
+    """Crea un usuario con una tarea y un adjunto PDF de size bytes."""
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from tasks.tests.factories import create_user, create_task_list, create_task, create_task_attachment
+    
+    user = create_user(username='bench', email='bench@example.com')
+    task = create_task(task_list=create_task_list(owner=user), created_by=user)
+    attachment = create_task_attachment(
+        task=task,
+        filename='documento.pdf',
+        file=SimpleUploadedFile('documento.pdf', os.urandom(size)),
+        file_size=size,
+    )
+    return user, attachment
+
+
+def run(client, url, requests, headers_for):
+    """Pide la URL requests veces; retorna (latencias en ms, bytes recibidos, estados HTTP)."""
+    samples, received, statuses = [], 0, set()
+    for i in range(requests):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers_for(i))
+        if response.streaming:
+            body_size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            body_size = len(response.content)
+        response.close()
+        samples.append((time.perf_counter() - start) * 1000)
+        received += body_size
+        statuses.add(response.status_code)
+    return samples, received, statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, default=20, help='Tamaño del adjunto en MB.')
+    parser.add_argument('--requests', type=int, default=200, help='Peticiones por escenario.')
+    args = parser.parse_args(argv)
+    
+    setup_django()
+    from django.test import Client, override_settings
+    from django.urls import reverse
+    
+    size = int(args.size_mb * 1024 * 1024)
+    ranges = max(1, size // RANGE_SIZE)
+    rows = []
+    with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+        with benchmark_database() as connection:
+            print(f'Base de datos: {connection.vendor}')
+            user, attachment = seed(size)
+            url = reverse('view_attachment', kwargs={'task_pk': attachment.task_id, 'pk': attachment.pk})
+            client = Client()
+            client.force_login(user)
+            etag = client.get(url)['ETag']
+            
+            scenarios = [
+                ('django completo', 'django', lambda i: {}),
+                ('django rango 256 KB', 'django', lambda i: {
+                    'Range': f'bytes={(i % ranges) * RANGE_SIZE}-{(i % ranges) * RANGE_SIZE + RANGE_SIZE - 1}'
+                }),
+                ('304 If-None-Match', 'django', lambda i: {'If-None-Match': etag}),
+                ('x-accel-redirect', 'x-accel-redirect', lambda i: {}),
+            ]
+            for scenario, mode, headers_for in scenarios:
+                with override_settings(ATTACHMENT_DELIVERY=mode):
+                    samples, received, statuses = run(client, url, args.requests, headers_for)
+                stats = summarize(samples)
+                elapsed = sum(samples) / 1000
+                rows.append({
+                    'escenario': scenario,
+                    'estado': ','.join(str(status) for status in sorted(statuses)),
+                    'req/s': len(samples) / elapsed,
+                    'MB/s': received / elapsed / (1024 * 1024),
+                    'p50 ms': stats['p50_ms'],
+                    'p95 ms': stats['p95_ms'],
+                })
+    
+    print_table(
+        f'Entrega de un adjunto de {args.size_mb:g} MB por worker ({args.requests} peticiones)',
+        rows,
+        ['escenario', 'estado', 'req/s', 'MB/s', 'p50 ms', 'p95 ms'],
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark de consultas del registro y el login.
+
+Cuenta las consultas SQL (lecturas y escrituras por tabla) y mide la latencia
+de POST register/ y POST login/ con el cliente de test. El perfil solo debe
+escribirse al crearse en el registro, nunca en el login:
+    
+    python -m benchmarks.auth_queries --requests 50
+"""
+import argparse
+import re
+import time
+from collections import Counter
+
+from .utils import setup_django, benchmark_database, summarize, print_table
+
+
+PASSWORD = 'Bench-Password-2024'
+
+# Tabla afectada por cada sentencia (SELECT ... FROM, INSERT INTO, UPDATE, DELETE FROM)
+TABLE_RE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)"?')
+
+
+def classify(sql):
+    """Retorna 'OPERACIÓN tabla' de una sentencia SQL (solo la operación si no hay tabla)."""
+    operation = sql.split(' ', 1)[0].upper()
+    match = TABLE_RE.search(sql)
+    return f'{operation} {match.group(1)}' if match else operation
+
+
+def register(client, index):
+    return client.post('/register/', {
+        'username': f'bench{index}',
+        'email': f'bench{index}@example.com',
+        'first_name': 'Bench',
+        'last_name': f'{index}',
+        'password1': PASSWORD,
+        'password2': PASSWORD,
+    })
+
+
+def login(client, index):
+    return client.post('/login/', {'username': f'bench{index}', 'password': PASSWORD})
+
+
+def run(operation, requests):
+    """Ejecuta la operación requests veces y retorna (latencias, consultas, desglose de la última)."""
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    
+    samples, counts, breakdown = [], [], Counter()
+    for index in range(requests):
+        client = Client()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = operation(client, index)
+            samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 302:
+            raise RuntimeError(f'{operation.__name__} respondió {response.status_code}')
+        counts.append(len(queries))
+        breakdown = Counter(classify(query['sql']) for query in queries.captured_queries)
+    return samples, counts, breakdown
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=50, help='Registros y logins a medir.')
+    args = parser.parse_args(argv)
+    
+    setup_django()
+    
+    rows, breakdowns = [], {}
+    with benchmark_database() as connection:
+        print(f'Base de datos: {connection.vendor}')
+        # El registro debe ir primero: el login usa los usuarios creados
+        for operation in (register, login):
+            samples, counts, breakdown = run(operation, args.requests)
+            stats = summarize(samples)
+            breakdowns[operation.__name__] = breakdown
+            rows.append({
+                'operación': operation.__name__,
+                'consultas': max(counts),
+                'escrituras perfil': sum(
+                    total for key, total in breakdown.items()
+                    if key.split(' ')[0] in ('INSERT', 'UPDATE') and key.endswith('_profile')
+                ),
+                'p50 ms': stats['p50_ms'],
+                'p95 ms': stats['p95_ms'],
+            })
+    
+    print_table(
+        f'Registro y login ({args.requests} peticiones)',
+        rows,
+        ['operación', 'consultas', 'escrituras perfil', 'p50 ms', 'p95 ms'],
+    )
+    for name, breakdown in breakdowns.items():
+        print_table(
+            f'Consultas por petición: {name}',
+            [{'sentencia': key, 'veces': total} for key, total in sorted(breakdown.items())],
+            ['sentencia', 'veces'],
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark del sondeo de estadísticas del dashboard sin cambios.
+
+Mide peticiones por segundo de GET api/lists/dashboard/stats/ con el estado
+sin cambios en tres escenarios: sin caché (cálculo completo en cada sondeo),
+con caché versionada (200 desde la caché) y con validadores (304 a
+If-None-Match, como el sondeo del dashboard con ifModified):
+
+    python -m benchmarks.conditional_get --lists 50 --tasks 5000
+"""
+import argparse
+import time
+
+from .utils import setup_django, benchmark_database, analyze, summarize, print_table
+
+
+# Backends de caché del dashboard por escenario
+CACHE_SCENARIOS = {
+    'sin caché': 'django.core.cache.backends.dummy.DummyCache',
+    'caché (200)': 'django.core.cache.backends.locmem.LocMemCache',
+    'If-None-Match (304)': 'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+def seed(tasks_count, lists_count):
+    """Siembra un usuario con listas propias y compartidas, tareas y actividad."""
+    from tasks.models import Task
+    from tasks.tests.factories import (
+        create_user, create_task_list, create_shared_list,
+        create_bulk_tasks, create_bulk_activities,
+    )
+    
+    user = create_user(username='bench', email='bench@example.com')
+    other = create_user(username='bench-other', email='bench-other@example.com')
+    task_lists = [
+        create_task_list(owner=user if i % 2 else other, name=f'Lista {i}')
+        for i in range(lists_count)
+    ]
+    for task_list in task_lists:
+        if task_list.owner_id == other.pk:
+            create_shared_list(task_list=task_list, shared_with=user, shared_by=other)
+    create_bulk_tasks(task_lists, tasks_count)
+    
+    task_ids = list(Task.objects.order_by('pk').values_list('pk', flat=True)[:max(1, tasks_count // 100)])
+    create_bulk_activities(task_ids, user, per_task=5)
+    return user
+
+
+def poll(client, url, requests, conditional):
+    """Sondea la URL y retorna (latencias en ms, estados HTTP)."""
+    headers = {}
+    if conditional:
+        headers['HTTP_IF_NONE_MATCH'] = client.get(url)['ETag']
+    else:
+        client.get(url)  # Calentar la caché
+    
+    samples, statuses = [], set()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url, **headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        statuses.add(response.status_code)
+    return samples, statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=5000, help='Número de tareas a sembrar.')
+    parser.add_argument('--lists', type=int, default=50, help='Número de listas accesibles.')
+    parser.add_argument('--requests', type=int, default=500, help='Peticiones por escenario.')
+    args = parser.parse_args(argv)
+    
+    setup_django()
+    from django.core.cache import caches
+    from django.test import Client, override_settings
+    from django.urls import reverse
+    
+    rows = []
+    with benchmark_database() as connection:
+        print(f'Base de datos: {connection.vendor}')
+        user = seed(args.tasks, args.lists)
+        analyze(connection)
+        url = reverse('task_stats_api', kwargs={'pk': 'dashboard'})
+        
+        for scenario, backend in CACHE_SCENARIOS.items():
+            cache_settings = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'dashboard': {'BACKEND': backend, 'LOCATION': 'benchmark'},
+                'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+            }
+            with override_settings(CACHES=cache_settings):
+                caches['dashboard'].clear()
+                client = Client()
+                client.force_login(user)
+                samples, statuses = poll(client, url, args.requests, conditional='304' in scenario)
+            
+            stats = summarize(samples)
+            rows.append({
+                'escenario': scenario,
+                'estado': ','.join(str(status) for status in sorted(statuses)),
+                'req/s': 1000 * len(samples) / sum(samples),
+                'p50 ms': stats['p50_ms'],
+                'p95 ms': stats['p95_ms'],
+                'p99 ms': stats['p99_ms'],
+            })
+    
+    print_table(
+        f'Sondeo sin cambios ({args.lists} listas, {args.tasks} tareas, {args.requests} peticiones)',
+        rows,
+        ['escenario', 'estado', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms'],
+    )
+
+
+if __name__ == '__main__':
+    main()
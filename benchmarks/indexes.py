@@ -0,0 +1,159 @@
+"""
+Benchmark de los índices de las rutas calientes (migración 0009).
+
+Siembra un volumen grande de tareas con las factories de tests, mide las
+consultas de filtrado y ordenación sin los índices compuestos/parciales y con
+ellos, e imprime los planes EXPLAIN de ambos casos. Funciona sobre SQLite y
+PostgreSQL según DATABASE_URL:
+
+    python -m benchmarks.indexes --tasks 1000000
+    DATABASE_URL=postgres://... python -m benchmarks.indexes --tasks 1000000
+"""
+import argparse
+import time
+
+from .utils import setup_django, benchmark_database, analyze, measure, print_table
+
+
+def hot_path_queries(task_list, task, user, now):
+    """Consultas representativas de las páginas de listas, dashboard y actividad."""
+    from tasks.models import TaskList, Task, TaskActivity, SharedList
+    
+    open_statuses = ['pending', 'in_progress']
+    accessible = TaskList.objects.accessible_to(user).values('pk')
+    return {
+        'list_by_status': lambda: Task.objects.filter(
+            task_list=task_list, status='pending'
+        ).order_by('due_date')[:20],
+        'list_by_priority_status': lambda: Task.objects.filter(
+            task_list=task_list, priority='high', status__in=open_statuses
+        ).order_by('due_date')[:20],
+        'overdue_global': lambda: Task.objects.filter(
+            status__in=open_statuses, due_date__lt=now
+        ).order_by('due_date')[:5],
+        'dashboard_overdue': lambda: Task.objects.filter(
+            task_list__in=accessible, status__in=open_statuses, due_date__lt=now
+        ).order_by('due_date')[:5],
+        'task_activity': lambda: TaskActivity.objects.filter(
+            task=task
+        ).order_by('-timestamp')[:10],
+        'shared_write_lists': lambda: SharedList.objects.filter(
+            shared_with=user, permission='write'
+        ),
+    }
+
+
+def managed_indexes():
+    """Índices declarados en Meta.indexes de los modelos afectados."""
+    from tasks.models import Task, TaskActivity, SharedList
+    return [
+        (model, index)
+        for model in (Task, TaskActivity, SharedList)
+        for index in model._meta.indexes
+    ]
+
+
+def run_queries(queries, repeat):
+    """Mide cada consulta y guarda su plan de ejecución."""
+    results = {}
+    for name, build in queries.items():
+        stats = measure(lambda: list(build()), repeat=repeat)
+        stats['plan'] = build().explain()
+        results[name] = stats
+    return results
+
+
+def seed(tasks_count, lists_count, users_count):
+    """Siembra usuarios, listas compartidas, tareas y actividad."""
+    from tasks.models import Task
+    from tasks.tests.factories import (
+        create_user, create_task_list, create_shared_list,
+        create_bulk_tasks, create_bulk_activities,
+    )
+    
+    users = [
+        create_user(username=f'bench{i}', email=f'bench{i}@example.com')
+        for i in range(users_count)
+    ]
+    task_lists = [
+        create_task_list(owner=users[i % users_count], name=f'Lista {i}')
+        for i in range(lists_count)
+    ]
+    for i, task_list in enumerate(task_lists):
+        other = users[(i + 1) % users_count]
+        if other != task_list.owner:
+            create_shared_list(
+                task_list=task_list, shared_with=other,
+                permission='write' if i % 2 else 'read'
+            )
+    create_bulk_tasks(task_lists, tasks_count)
+    
+    # Actividad concentrada en un subconjunto de tareas
+    task_ids = list(Task.objects.order_by('pk').values_list('pk', flat=True)[:max(1, tasks_count // 100)])
+    create_bulk_activities(task_ids, users[0], per_task=5)
+    return users, task_lists
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1_000_000, help='Número de tareas a sembrar.')
+    parser.add_argument('--lists', type=int, default=200, help='Número de listas.')
+    parser.add_argument('--users', type=int, default=50, help='Número de usuarios.')
+    parser.add_argument('--repeat', type=int, default=20, help='Repeticiones por consulta.')
+    parser.add_argument('--no-plans', action='store_true', help='No imprimir los planes EXPLAIN.')
+    args = parser.parse_args(argv)
+    
+    setup_django()
+    from django.utils import timezone
+    from tasks.models import Task
+    
+    with benchmark_database() as connection:
+        print(f'Base de datos: {connection.vendor}')
+        start = time.perf_counter()
+        users, task_lists = seed(args.tasks, args.lists, args.users)
+        print(f'Sembradas {args.tasks} tareas en {time.perf_counter() - start:.1f}s')
+        
+        task = Task.objects.filter(activities__isnull=False).order_by('pk').first()
+        queries = hot_path_queries(task_lists[len(task_lists) // 2], task, users[1], timezone.now())
+        indexes = managed_indexes()
+        
+        # Sin índices: se eliminan temporalmente los declarados en la migración 0009
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        analyze(connection)
+        before = run_queries(queries, args.repeat)
+        
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        analyze(connection)
+        after = run_queries(queries, args.repeat)
+    
+    rows = []
+    for name in queries:
+        rows.append({
+            'consulta': name,
+            'antes p50': before[name]['p50_ms'],
+            'antes p95': before[name]['p95_ms'],
+            'después p50': after[name]['p50_ms'],
+            'después p95': after[name]['p95_ms'],
+            'mejora': before[name]['p50_ms'] / after[name]['p50_ms'] if after[name]['p50_ms'] else None,
+        })
+    print_table(
+        f'Latencias (ms) con {args.tasks} tareas',
+        rows,
+        ['consulta', 'antes p50', 'antes p95', 'después p50', 'después p95', 'mejora'],
+    )
+    
+    if not args.no_plans:
+        for name in queries:
+            print(f'\n--- {name} ---')
+            print('Antes:')
+            print(before[name]['plan'])
+            print('Después:')
+            print(after[name]['plan'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+"""
+Pruebas de carga con datos sembrados a escala (hasta 10k usuarios y 1M de tareas).
+
+- datasets: formas de los datos y su siembra con bulk_create.
+- scenarios: las peticiones de cada escenario por usuario activo.
+- drivers: cliente de test de Django y carga HTTP contra gunicorn.
+- report: percentiles, consultas por petición, RSS y comparación con la base.
+
+Se ejecuta con python -m benchmarks.load o python run_tests.py bench.
+"""
@@ -0,0 +1,188 @@
+"""
+Pruebas de carga de extremo a extremo sobre una forma de datos sembrada.
+
+Siembra la forma (o reutiliza la base de --database), ejecuta los escenarios
+con el cliente de test de Django y/o con carga HTTP de varios procesos contra
+gunicorn, e informa de p50/p95/p99, consultas por petición y RSS. Con
+--baseline sale con código 1 si algún escenario retrocede:
+
+    python -m benchmarks.load --shape small --driver both --output var/bench.json
+    python -m benchmarks.load --shape full --database var/bench-full.sqlite3 --baseline var/bench.json
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from .datasets import SHAPES, USER_PREFIX, resolve_shape, seed_dataset, load_context
+from .scenarios import SCENARIOS
+from ..utils import setup_django, benchmark_database, analyze
+
+
+DRIVERS = ('client', 'http')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.load', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--shape', choices=sorted(SHAPES), default='small', help='Forma de los datos sembrados.')
+    parser.add_argument(
+        '--scale', type=float, default=1.0, help='Multiplica usuarios, tareas de las listas enormes y adjuntos.',
+    )
+    parser.add_argument('--driver', choices=(*DRIVERS, 'both'), default='client', help='Cómo se lanzan las peticiones.')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f'Escenarios: {", ".join(SCENARIOS)}.')
+    parser.add_argument('--active-users', type=int, default=20, help='Usuarios que ejecutan los escenarios.')
+    parser.add_argument('--iterations', type=int, default=3, help='Repeticiones por usuario con el cliente de test.')
+    parser.add_argument('--duration', type=float, default=10, help='Segundos de carga HTTP por escenario.')
+    parser.add_argument('--processes', type=int, default=2, help='Procesos generadores de carga HTTP.')
+    parser.add_argument('--clients', type=int, default=16, help='Clientes HTTP concurrentes en total.')
+    parser.add_argument('--workers', type=int, default=2, help='Workers de gunicorn.')
+    parser.add_argument('--server-profile', choices=('wsgi', 'asgi'), default='wsgi', help='Perfil de gunicorn.conf.py.')
+    parser.add_argument('--port', type=int, default=8766, help='Puerto del servidor.')
+    parser.add_argument('--attachment-kb', type=int, default=256, help='Tamaño de cada adjunto sembrado.')
+    parser.add_argument(
+        '--database',
+        help='Archivo SQLite que se conserva entre ejecuciones (se siembra la primera vez; '
+             'los escenarios de escritura lo van modificando).',
+    )
+    parser.add_argument('--output', help='Guarda los resultados en este JSON.')
+    parser.add_argument('--baseline', help='JSON de una ejecución anterior con el que comparar.')
+    parser.add_argument('--latency-tolerance', type=float, default=0.2, help='Aumento de p95 tolerado (0.2 = 20%%).')
+    parser.add_argument('--rss-tolerance', type=float, default=0.2, help='Aumento de RSS tolerado.')
+    args = parser.parse_args(argv)
+    
+    args.scenarios = args.scenarios.split(',')
+    for scenario in args.scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f'Escenario desconocido: {scenario}')
+    args.drivers = DRIVERS if args.driver == 'both' else (args.driver,)
+    if 'http' in args.drivers and shutil.which('gunicorn') is None:
+        parser.error('El driver http requiere gunicorn (pip install -r requirements.txt)')
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(f'No existe la línea base {args.baseline}')
+    return args
+
+
+def configure_environment(args, tmp):
+    """
+    Variables que leen los settings de este proceso y de los workers de
+    gunicorn: la misma clave para las sesiones, los ficheros fuera de var/ y
+    sin tareas de fondo.
+    """
+    media = f'{args.database}.media' if args.database else os.path.join(tmp, 'media')
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark-secret-key-not-for-production')
+    os.environ['MEDIA_ROOT'] = os.path.abspath(media)
+    directories = (
+        ('ACTIVITY_SPOOL_DIR', 'activity_spool'),
+        ('METRICS_DIR', 'metrics'),
+        # Las versiones de la caché de otra base no deben valer para esta
+        ('DASHBOARD_CACHE_DIR', 'cache/dashboard'),
+        ('SESSION_CACHE_DIR', 'cache/sessions'),
+    )
+    for name, directory in directories:
+        os.environ[name] = os.path.join(tmp, directory)
+    os.environ['PERF_LOG_FILE'] = os.path.join(tmp, 'perf.jsonl')
+    os.environ['PERF_LOG_SAMPLE_RATE'] = '0'
+    # Las tareas de fondo no deben competir con las peticiones medidas
+    os.environ['MEDIA_PIPELINE_MODE'] = 'external'
+    os.environ['SESSION_CLEANUP_MODE'] = 'external'
+
+
+def dataset_counts():
+    from django.contrib.auth.models import User
+    from tasks.models import Task, TaskAttachment, TaskList
+    
+    return {
+        'users': User.objects.filter(username__startswith=USER_PREFIX).count(),
+        'lists': TaskList.objects.count(),
+        'tasks': Task.objects.count(),
+        'attachments': TaskAttachment.objects.count(),
+    }
+
+
+def run_client(args, contexts):
+    from .drivers import run_client_scenario
+    from .report import summarize_result
+    
+    results = {}
+    for scenario in args.scenarios:
+        result = run_client_scenario(contexts, SCENARIOS[scenario], args.iterations)
+        results[scenario] = summarize_result(result)
+        print(f'  client/{scenario}: {len(result["latencies"])} peticiones', file=sys.stderr)
+    return results
+
+
+def run_http(args, contexts, connection):
+    from .drivers import HttpServer, http_sessions, run_http_load
+    from .report import summarize_result
+    
+    sessions = {
+        scenario: http_sessions(contexts, SCENARIOS[scenario], args.clients) for scenario in args.scenarios
+    }
+    # La base tiene que estar confirmada antes de que la abran los workers
+    connection.close()
+    
+    results = {}
+    with HttpServer(connection, args.server_profile, args.port, args.workers) as server:
+        for scenario in args.scenarios:
+            if not sessions[scenario]:
+                continue
+            result = run_http_load(
+                args.port, sessions[scenario], args.processes, args.duration, server.process.pid,
+            )
+            results[scenario] = summarize_result(result)
+            print(f'  http/{scenario}: {len(result["latencies"])} peticiones', file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(args, tmp)
+        setup_django()
+        from django.contrib.auth.models import User
+        from tasks.services import flush_activity_log
+        from .report import build_report, compare, load_baseline, print_regressions, print_report, save_results
+        
+        shape = resolve_shape(args.shape, args.scale)
+        database = os.path.abspath(args.database) if args.database else os.path.join(tmp, 'benchmark.sqlite3')
+        with benchmark_database(keepdb=bool(args.database), test_name=database) as connection:
+            if User.objects.filter(username__startswith=USER_PREFIX).exists():
+                print(f'Reutilizando el dataset de {database}', file=sys.stderr)
+            else:
+                print(f'Sembrando la forma {args.shape}: {shape}', file=sys.stderr)
+                start = time.perf_counter()
+                seed_dataset(
+                    shape, attachment_size=args.attachment_kb * 1024, log=lambda line: print(line, file=sys.stderr),
+                )
+                print(f'  sembrado en {time.perf_counter() - start:.0f} s', file=sys.stderr)
+                analyze(connection)
+            dataset = dataset_counts()
+            contexts = load_context(args.active_users)
+            
+            drivers = {}
+            if 'client' in args.drivers:
+                drivers['client'] = run_client(args, contexts)
+            if 'http' in args.drivers:
+                drivers['http'] = run_http(args, contexts, connection)
+            # La actividad en cola se escribe antes de borrar la base y la carpeta temporal
+            flush_activity_log()
+    
+    report = build_report(args.shape, args.scale, dataset, drivers)
+    print_report(report)
+    if args.output:
+        save_results(report, args.output)
+        print(f'\nResultados guardados en {args.output}')
+    if args.baseline:
+        regressions = compare(report, load_baseline(args.baseline), args.latency_tolerance, args.rss_tolerance)
+        print_regressions(regressions, args.baseline)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Formas de los datos sembrados para las pruebas de carga.
+
+Cada forma combina tres patrones: muchos usuarios con listas pequeñas propias
+(y alguna compartida con el vecino), unas pocas listas enormes compartidas con
+muchos miembros y un historial de actividad por tarea. --scale multiplica los
+usuarios y las tareas de las listas enormes.
+"""
+import os
+
+from django.contrib.auth.hashers import make_password
+
+
+PASSWORD = 'Bench-Password-2024'
+
+# Prefijos de los nombres sembrados (load_context los usa para reconocer los datos)
+USER_PREFIX = 'load-user-'
+HUGE_LIST_PREFIX = 'Lista compartida '
+
+# Listas por llamada a create_bulk_tasks: pk__in por debajo del límite de variables de SQLite
+LIST_CHUNK = 5000
+
+SHAPES = {
+    # Para probar el arnés o comparar en CI en segundos
+    'small': {
+        'users': 50, 'lists_per_user': 3, 'tasks_per_list': 20,
+        'huge_lists': 1, 'huge_list_tasks': 2000, 'huge_list_members': 20,
+        'activities_per_task': 1, 'attachments': 20,
+    },
+    'many-small-lists': {
+        'users': 2000, 'lists_per_user': 10, 'tasks_per_list': 20,
+        'huge_lists': 1, 'huge_list_tasks': 5000, 'huge_list_members': 50,
+        'activities_per_task': 1, 'attachments': 50,
+    },
+    'huge-shared-lists': {
+        'users': 500, 'lists_per_user': 2, 'tasks_per_list': 10,
+        'huge_lists': 3, 'huge_list_tasks': 100000, 'huge_list_members': 500,
+        'activities_per_task': 1, 'attachments': 100,
+    },
+    'heavy-activity': {
+        'users': 500, 'lists_per_user': 5, 'tasks_per_list': 30,
+        'huge_lists': 1, 'huge_list_tasks': 20000, 'huge_list_members': 100,
+        'activities_per_task': 20, 'attachments': 50,
+    },
+    # Capacidad objetivo: 10k usuarios y 1M de tareas
+    'full': {
+        'users': 10000, 'lists_per_user': 3, 'tasks_per_list': 25,
+        'huge_lists': 5, 'huge_list_tasks': 50000, 'huge_list_members': 2000,
+        'activities_per_task': 2, 'attachments': 200,
+    },
+}
+
+
+def resolve_shape(name, scale=1.0):
+    """Parámetros de la forma con los usuarios y las listas enormes escalados."""
+    shape = dict(SHAPES[name])
+    for key in ('users', 'huge_list_tasks', 'huge_list_members', 'attachments'):
+        shape[key] = max(1, int(shape[key] * scale))
+    shape['huge_list_members'] = min(shape['huge_list_members'], shape['users'])
+    return shape
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def seed_dataset(shape, attachment_size=256 * 1024, log=print):
+    """
+    Siembra la forma indicada con bulk_create. Retorna el número de filas
+    creadas por modelo. Las señales no se emiten: los contadores de las listas
+    y el índice de búsqueda se recalculan al final.
+    """
+    from django.contrib.auth.models import User
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from tasks.models import Profile, SharedList, Task, TaskList
+    from tasks.services import rebuild_search_index
+    from tasks.tests.factories import create_bulk_activities, create_bulk_tasks, create_task_attachment
+    
+    password = make_password(PASSWORD)
+    User.objects.bulk_create([
+        User(
+            username=f'{USER_PREFIX}{i}', email=f'{USER_PREFIX}{i}@example.com',
+            first_name='Usuario', last_name=str(i), password=password,
+        )
+        for i in range(shape['users'])
+    ], batch_size=5000)
+    users = list(User.objects.filter(username__startswith=USER_PREFIX).order_by('pk'))
+    Profile.objects.bulk_create([Profile(user=user) for user in users], batch_size=5000)
+    log(f'  {len(users)} usuarios')
+    
+    TaskList.objects.bulk_create([
+        TaskList(owner=user, name=f'Lista {n} de {user.username}')
+        for user in users for n in range(shape['lists_per_user'])
+    ], batch_size=5000)
+    small_lists = list(TaskList.objects.filter(owner__in=users).order_by('pk'))
+    huge_owner = users[0]
+    TaskList.objects.bulk_create([
+        TaskList(owner=huge_owner, name=f'{HUGE_LIST_PREFIX}{n}', color='#dc3545')
+        for n in range(shape['huge_lists'])
+    ])
+    huge_lists = list(TaskList.objects.filter(owner=huge_owner, name__startswith=HUGE_LIST_PREFIX))
+    
+    # Las listas enormes con sus miembros (escritura) y la primera lista de cada usuario con el siguiente
+    members = users[1:shape['huge_list_members']]
+    shares = [
+        SharedList(task_list=task_list, shared_with=member, shared_by=huge_owner, permission='write')
+        for task_list in huge_lists for member in members
+    ]
+    first_lists = small_lists[::shape['lists_per_user']]
+    shares += [
+        SharedList(task_list=task_list, shared_with=users[(i + 1) % len(users)], shared_by=task_list.owner)
+        for i, task_list in enumerate(first_lists) if len(users) > 1
+    ]
+    SharedList.objects.bulk_create(shares, batch_size=5000)
+    log(f'  {len(small_lists)} listas pequeñas, {len(huge_lists)} enormes, {len(shares)} comparticiones')
+    
+    tasks = 0
+    for chunk in _chunks(small_lists, LIST_CHUNK):
+        tasks += create_bulk_tasks(chunk, len(chunk) * shape['tasks_per_list'], rebuild_index=False)
+    for task_list in huge_lists:
+        tasks += create_bulk_tasks([task_list], shape['huge_list_tasks'], rebuild_index=False)
+    log(f'  {tasks} tareas')
+    rebuild_search_index(['tasks.task'])
+    
+    activities = 0
+    if shape['activities_per_task']:
+        task_ids = list(Task.objects.order_by('pk').values_list('pk', flat=True))
+        activities = create_bulk_activities(task_ids, huge_owner, per_task=shape['activities_per_task'])
+    log(f'  {activities} actividades')
+    
+    # Adjuntos en las primeras tareas de las listas enormes, con contenido distinto (no se deduplican)
+    attachment_tasks = Task.objects.filter(task_list__in=huge_lists).select_related('created_by').order_by('pk')
+    attachments = 0
+    for task in attachment_tasks[:shape['attachments']]:
+        content = os.urandom(attachment_size)
+        create_task_attachment(
+            task=task,
+            filename=f'informe-{task.pk}.pdf',
+            file=SimpleUploadedFile(f'informe-{task.pk}.pdf', content),
+            file_size=len(content),
+        )
+        attachments += 1
+    log(f'  {attachments} adjuntos de {attachment_size // 1024} KB')
+    
+    return {
+        'users': len(users),
+        'lists': len(small_lists) + len(huge_lists),
+        'shares': len(shares),
+        'tasks': tasks,
+        'activities': activities,
+        'attachments': attachments,
+    }
+
+
+def load_context(active_users):
+    """
+    Datos que usan los escenarios, leídos de la base ya sembrada (también de
+    una conservada con --database): los active_users primeros miembros de las
+    listas enormes con sus listas, tareas y adjuntos accesibles.
+    """
+    from django.contrib.auth.models import User
+    from tasks.models import Task, TaskAttachment, TaskList
+    
+    huge_lists = list(
+        TaskList.objects.filter(name__startswith=HUGE_LIST_PREFIX).order_by('pk').values_list('pk', flat=True)
+    )
+    users = list(User.objects.filter(username__startswith=USER_PREFIX).order_by('pk')[:active_users])
+    if not users or not huge_lists:
+        raise RuntimeError('La base de datos no tiene un dataset sembrado por benchmarks.load')
+    
+    contexts = []
+    for user in users:
+        own_lists = list(TaskList.objects.filter(owner=user).exclude(pk__in=huge_lists).values_list('pk', flat=True))
+        accessible = set(TaskList.objects.accessible_to(user).values_list('pk', flat=True))
+        shared_huge = [pk for pk in huge_lists if pk in accessible]
+        contexts.append({
+            'user': user,
+            'own_lists': own_lists,
+            'huge_lists': shared_huge,
+            # Tareas de las listas enormes que arrastra en el tablero (escritura compartida)
+            'board_tasks': list(
+                Task.objects.filter(task_list__in=shared_huge).order_by('pk').values_list('pk', flat=True)[:200]
+            ),
+            'attachments': list(
+                TaskAttachment.objects.filter(task__task_list__in=accessible)
+                .order_by('pk').values_list('task_id', 'pk')[:50]
+            ),
+        })
+    return contexts
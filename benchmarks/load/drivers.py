@@ -0,0 +1,215 @@
+"""
+Ejecutores de los escenarios.
+
+- client: el cliente de test de Django en este proceso; las consultas por
+  petición salen del perfil de PerformanceMiddleware (request.perf).
+- http: gunicorn con la base sembrada y un generador de carga de varios
+  procesos (hilos con su conexión en cada uno); las consultas salen de la
+  cabecera Server-Timing y la memoria es la RSS del maestro y sus workers.
+"""
+import http.client
+import multiprocessing
+import os
+import re
+import threading
+import time
+from urllib.parse import urlencode
+
+from ..asgi_load import CSRF_TOKEN, database_url, start_server, stop_server, PROJECT_DIR
+from ..utils import current_rss_mb
+
+
+SQL_QUERIES_RE = re.compile(r'sql;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def new_result():
+    return {'latencies': [], 'queries': [], 'errors': 0, 'rss_mb': 0.0, 'seconds': 0.0}
+
+
+def _read_response(response):
+    """Consume el cuerpo (también el de las respuestas en streaming) para medir la petición completa."""
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    response.close()
+
+
+def run_client_scenario(contexts, build, iterations):
+    """Repite las peticiones del escenario de cada usuario iterations veces con el cliente de test."""
+    from django.test import Client
+    
+    sessions = []
+    for context in contexts:
+        requests = build(context)
+        if requests:
+            client = Client()
+            client.force_login(context['user'])
+            sessions.append((client, requests))
+    
+    result = new_result()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for client, requests in sessions:
+            for method, path, data in requests:
+                begin = time.perf_counter()
+                response = client.get(path) if method == 'GET' else client.post(path, data or {})
+                _read_response(response)
+                result['latencies'].append((time.perf_counter() - begin) * 1000)
+                profile = getattr(response.wsgi_request, 'perf', None)
+                if profile is not None:
+                    result['queries'].append(profile.queries)
+                if response.status_code >= 400:
+                    result['errors'] += 1
+        result['rss_mb'] = max(result['rss_mb'], current_rss_mb())
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def process_rss_mb(pid):
+    """RSS en MB de un proceso y sus descendientes (Linux, /proc)."""
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+                        break
+            with open(f'/proc/{current}/task/{current}/children') as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total / 1024
+
+
+def _client_loop(port, cookies, requests, deadline, results):
+    """Un cliente: repite sus peticiones por la misma conexión hasta deadline."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    headers = {'Cookie': cookies, 'X-CSRFToken': CSRF_TOKEN}
+    latencies, queries, errors = [], [], 0
+    while time.monotonic() < deadline:
+        for method, path, data in requests:
+            if time.monotonic() >= deadline:
+                break
+            body = urlencode(data) if data else ''
+            request_headers = dict(headers, **{'Content-Length': str(len(body))})
+            if data:
+                request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            begin = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=request_headers)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                continue
+            latencies.append((time.perf_counter() - begin) * 1000)
+            match = SQL_QUERIES_RE.search(response.getheader('Server-Timing') or '')
+            if match:
+                queries.append(int(match.group(1)))
+            if response.status >= 400:
+                errors += 1
+    connection.close()
+    results.put((latencies, queries, errors))
+
+
+def _load_process(port, sessions, deadline, results):
+    """Proceso generador de carga: un hilo por sesión (cookies, peticiones)."""
+    threads = [
+        threading.Thread(target=_client_loop, args=(port, cookies, requests, deadline, results))
+        for cookies, requests in sessions
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_http_load(port, sessions, processes, duration, server_pid):
+    """
+    Reparte las sesiones entre processes procesos y las lanza contra el
+    servidor durante duration segundos, muestreando la RSS del servidor.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    deadline = time.monotonic() + duration
+    groups = [sessions[i::processes] for i in range(processes)]
+    workers = [
+        context.Process(target=_load_process, args=(port, group, deadline, results))
+        for group in groups if group
+    ]
+    
+    result = new_result()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    collected = 0
+    while collected < len(sessions):
+        try:
+            latencies, queries, errors = results.get(timeout=0.5)
+        except Exception:
+            # Sin resultados todavía: muestrear la memoria del servidor mientras tanto
+            result['rss_mb'] = max(result['rss_mb'], process_rss_mb(server_pid))
+            if not any(worker.is_alive() for worker in workers) and results.empty():
+                break
+            continue
+        result['latencies'] += latencies
+        result['queries'] += queries
+        result['errors'] += errors
+        collected += 1
+    for worker in workers:
+        worker.join()
+    result['seconds'] = time.perf_counter() - start
+    result['rss_mb'] = max(result['rss_mb'], process_rss_mb(server_pid))
+    return result
+
+
+def http_sessions(contexts, build, clients):
+    """Sesiones (cookies, peticiones) de clients clientes repartidos entre los usuarios activos."""
+    from django.conf import settings
+    from django.test import Client
+    
+    cookies = {}
+    sessions = []
+    candidates = [(context, build(context)) for context in contexts]
+    candidates = [(context, requests) for context, requests in candidates if requests]
+    for n in range(clients if candidates else 0):
+        context, requests = candidates[n % len(candidates)]
+        user = context['user']
+        if user.pk not in cookies:
+            client = Client()
+            client.force_login(user)
+            cookies[user.pk] = '; '.join([
+                f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}',
+                f'{settings.CSRF_COOKIE_NAME}={CSRF_TOKEN}',
+            ])
+        sessions.append((cookies[user.pk], requests))
+    return sessions
+
+
+class HttpServer:
+    """gunicorn con el perfil de gunicorn.conf.py indicado sobre la base de test sembrada."""
+    
+    def __init__(self, connection, profile, port, workers):
+        self.profile = profile
+        self.port = port
+        self.workers = workers
+        self.env = dict(
+            os.environ,
+            DATABASE_URL=database_url(connection.settings_dict),
+            DJANGO_DEBUG='True',  # Sin redirección a HTTPS
+            PERF_SERVER_TIMING='True',
+            PERF_LOG_SAMPLE_RATE='0',
+            PYTHONPATH=os.pathsep.join(filter(None, [str(PROJECT_DIR), os.environ.get('PYTHONPATH')])),
+        )
+        self.process = None
+    
+    def __enter__(self):
+        self.process = start_server(self.profile, self.port, self.workers, self.env)
+        return self
+    
+    def __exit__(self, *exc_info):
+        stop_server(self.process)
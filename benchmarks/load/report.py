@@ -0,0 +1,110 @@
+"""
+Resumen de los resultados y comparación con una línea base guardada.
+
+El JSON guardado con --output sirve después como --baseline: un escenario
+retrocede si su p95 o su RSS superan la base más la tolerancia, o si hace
+más consultas por petición que la base.
+"""
+import json
+import time
+from pathlib import Path
+
+from ..utils import print_table, summarize
+
+
+# Margen absoluto de p95: en escenarios de pocos ms el ruido supera la tolerancia relativa
+LATENCY_SLACK_MS = 5.0
+
+COLUMNS = ['driver', 'escenario', 'peticiones', 'errores', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'consultas', 'RSS MB']
+
+
+def summarize_result(result):
+    """Métricas de un escenario a partir de las muestras de un driver."""
+    latency = summarize(result['latencies'])
+    queries = result['queries']
+    return {
+        'requests': latency['count'],
+        'errors': result['errors'],
+        'rps': latency['count'] / result['seconds'] if result['seconds'] else 0.0,
+        'p50_ms': latency['p50_ms'],
+        'p95_ms': latency['p95_ms'],
+        'p99_ms': latency['p99_ms'],
+        'queries_per_request': sum(queries) / len(queries) if queries else 0.0,
+        'max_queries': max(queries) if queries else 0,
+        'rss_mb': result['rss_mb'],
+    }
+
+
+def build_report(shape_name, scale, dataset, drivers):
+    return {
+        'shape': shape_name,
+        'scale': scale,
+        'dataset': dataset,
+        'drivers': drivers,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def save_results(report, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+
+def load_baseline(path):
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def compare(report, baseline, latency_tolerance=0.2, rss_tolerance=0.2):
+    """
+    Retorna las regresiones respecto a la base como (driver, escenario, métrica,
+    base, actual). Solo se comparan los escenarios presentes en ambos.
+    """
+    regressions = []
+    for driver, scenarios in report['drivers'].items():
+        for scenario, current in scenarios.items():
+            base = baseline.get('drivers', {}).get(driver, {}).get(scenario)
+            if base is None:
+                continue
+            checks = (
+                ('p95_ms', max(base['p95_ms'] * (1 + latency_tolerance), base['p95_ms'] + LATENCY_SLACK_MS)),
+                # Las consultas son deterministas: cualquier consulta de más es una regresión
+                ('queries_per_request', base['queries_per_request'] + 1e-9),
+                ('rss_mb', base['rss_mb'] * (1 + rss_tolerance)),
+            )
+            for metric, limit in checks:
+                if current[metric] > limit:
+                    regressions.append((driver, scenario, metric, base[metric], current[metric]))
+    return regressions
+
+
+def print_report(report):
+    rows = [
+        {
+            'driver': driver,
+            'escenario': scenario,
+            'peticiones': summary['requests'],
+            'errores': summary['errors'],
+            'req/s': summary['rps'],
+            'p50 ms': summary['p50_ms'],
+            'p95 ms': summary['p95_ms'],
+            'p99 ms': summary['p99_ms'],
+            'consultas': f"{summary['queries_per_request']:.1f} (máx {summary['max_queries']})",
+            'RSS MB': summary['rss_mb'],
+        }
+        for driver, scenarios in report['drivers'].items()
+        for scenario, summary in scenarios.items()
+    ]
+    dataset = ', '.join(f'{count} {name}' for name, count in report['dataset'].items())
+    print_table(f"Carga con la forma {report['shape']} (x{report['scale']:g}): {dataset}", rows, COLUMNS)
+
+
+def print_regressions(regressions, baseline_path):
+    if not regressions:
+        print(f'\nSin regresiones respecto a {baseline_path}')
+        return
+    rows = [
+        {'driver': driver, 'escenario': scenario, 'métrica': metric, 'base': base, 'actual': current}
+        for driver, scenario, metric, base, current in regressions
+    ]
+    print_table(f'Regresiones respecto a {baseline_path}', rows, ['driver', 'escenario', 'métrica', 'base', 'actual'])
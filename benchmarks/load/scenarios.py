@@ -0,0 +1,86 @@
+"""
+Escenarios de carga: la secuencia de peticiones que repite cada usuario activo.
+
+Cada escenario recibe el contexto de un usuario (datasets.load_context) y
+retorna una lista de (método, ruta, datos del formulario o None).
+"""
+import itertools
+from urllib.parse import urlencode
+
+
+STATUS_CYCLE = ('in_progress', 'completed', 'pending')
+
+
+def dashboard_polling(context):
+    """Abre el dashboard y sondea sus estadísticas y las de sus listas (cada 30 s en el navegador)."""
+    from django.urls import reverse
+    
+    stats = reverse('task_stats_api', kwargs={'pk': 'dashboard'})
+    requests = [('GET', reverse('dashboard'), None)]
+    for list_pk in context['own_lists'][:3] + context['huge_lists'][:1]:
+        requests += [('GET', stats, None), ('GET', reverse('task_stats_api', kwargs={'pk': list_pk}), None)]
+    return requests
+
+
+def kanban_drags(context):
+    """Abre el tablero de una lista enorme y mueve tarjetas entre columnas."""
+    from django.urls import reverse
+    
+    if not context['huge_lists'] or not context['board_tasks']:
+        return []
+    requests = [('GET', reverse('tasklist_detail', kwargs={'pk': context['huge_lists'][0]}), None)]
+    statuses = itertools.cycle(STATUS_CYCLE)
+    for task_pk in context['board_tasks'][:20]:
+        requests.append((
+            'POST', reverse('change_task_status', kwargs={'pk': task_pk}), {'status': next(statuses)},
+        ))
+    return requests
+
+
+def quick_add_burst(context):
+    """Ráfaga de altas rápidas en una lista propia, como al pegar una lista de pendientes."""
+    from django.urls import reverse
+    
+    if not context['own_lists']:
+        return []
+    url = reverse('quick_add_task', kwargs={'list_pk': context['own_lists'][0]})
+    priorities = itertools.cycle(('low', 'medium', 'high'))
+    return [
+        ('POST', url, {'title': f'Tarea rápida {n} de {context["user"].username}', 'priority': next(priorities)})
+        for n in range(10)
+    ]
+
+
+def search(context):
+    """Búsqueda de tareas en una lista enorme y autocompletado de usuarios al compartir."""
+    from django.urls import reverse
+    
+    requests = []
+    if context['huge_lists']:
+        detail = reverse('tasklist_detail', kwargs={'pk': context['huge_lists'][0]})
+        requests += [
+            ('GET', f'{detail}?{urlencode({"search": term})}', None) for term in ('Tarea', 'Tarea 12', 'Tarea 1999')
+        ]
+    users = reverse('search_users_api')
+    requests += [('GET', f'{users}?{urlencode({"q": query})}', None) for query in ('lo', 'load', 'load-user-1')]
+    return requests
+
+
+def attachment_downloads(context):
+    """Descargas completas de los adjuntos de las listas compartidas."""
+    from django.urls import reverse
+    
+    requests = []
+    for task_pk, pk in context['attachments'][:5]:
+        url = reverse('view_attachment', kwargs={'task_pk': task_pk, 'pk': pk})
+        requests.append(('GET', url, None))
+    return requests
+
+
+SCENARIOS = {
+    'dashboard-polling': dashboard_polling,
+    'kanban-drags': kanban_drags,
+    'quick-add-burst': quick_add_burst,
+    'search': search,
+    'attachment-downloads': attachment_downloads,
+}
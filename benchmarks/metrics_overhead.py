@@ -0,0 +1,85 @@
+"""
+Benchmark del subsistema de métricas.
+
+Mide el coste por request en el camino caliente (record_request, que solo suma
+en memoria) con varios hilos a la vez, y el coste de un scrape de /metrics al
+agregar los ficheros de --workers workers con todas las vistas de tasks/urls.py:
+
+    python -m benchmarks.metrics_overhead --calls 200000 --threads 4 --workers 16
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from .utils import setup_django, measure, print_table
+
+
+def hot_path(views, calls, threads):
+    """Retorna los microsegundos por llamada a record_request con threads hilos."""
+    from tasks.services import RequestProfile, record_request
+    
+    profile = RequestProfile()
+    profile.queries, profile.cache_hits = 6, 1
+    per_thread = calls // threads
+    
+    def work():
+        rng = random.Random()
+        for _ in range(per_thread):
+            record_request(rng.choice(views), 'GET', 200, rng.random() / 10, profile)
+    
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000, help='Llamadas a record_request.')
+    parser.add_argument('--threads', type=int, default=4, help='Hilos registrando a la vez.')
+    parser.add_argument('--workers', type=int, default=16, help='Ficheros de workers a agregar en el scrape.')
+    parser.add_argument('--repeat', type=int, default=20, help='Scrapes a medir.')
+    args = parser.parse_args(argv)
+    
+    setup_django()
+    from django.test import override_settings
+    from django.urls import get_resolver
+    from tasks.services import get_metrics_registry, render_metrics, reset_metrics
+    
+    views = sorted(name for name in get_resolver().reverse_dict if isinstance(name, str))
+    rows = []
+    with tempfile.TemporaryDirectory() as metrics_dir, override_settings(METRICS_DIR=metrics_dir):
+        for threads in sorted({1, args.threads}):
+            reset_metrics()
+            rows.append({
+                'operación': f'record_request ({threads} hilos)',
+                'coste': f'{hot_path(views, args.calls, threads):.2f} µs/request',
+            })
+        
+        # Los demás workers vuelcan el mismo estado con su pid
+        registry = get_metrics_registry()
+        snapshot_pid = registry.pid
+        for pid in range(os.getpid() + 1, os.getpid() + args.workers):
+            registry.pid = pid
+            registry.flush()
+        registry.pid = snapshot_pid
+        registry.flush()
+        
+        stats = measure(render_metrics, repeat=args.repeat)
+        size_kb = len(render_metrics().encode()) / 1024
+        rows.append({
+            'operación': f'scrape /metrics ({args.workers} workers, {len(views)} vistas)',
+            'coste': f"{stats['p50_ms']:.1f} ms p50, {stats['p95_ms']:.1f} ms p95, {size_kb:.0f} KB",
+        })
+    
+    print_table('Coste de las métricas', rows, ['operación', 'coste'])
+
+
+if __name__ == '__main__':
+    main()
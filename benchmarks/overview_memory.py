@@ -0,0 +1,90 @@
+"""
+Benchmark de memoria de las páginas de resumen de listas.
+
+Siembra un usuario con varias listas y hace crecer el volumen de tareas por
+etapas. En cada etapa pide el listado de listas y el dashboard (sin caché de
+fragmentos) y mide el pico de memoria Python de la petición (tracemalloc), lo
+que crece la memoria residente del proceso con las peticiones y las consultas. Como referencia mide también
+el mismo queryset con el antiguo prefetch_related('tasks'):
+
+    python -m benchmarks.overview_memory --lists 24 --volumes 1000,10000,50000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from .utils import setup_django, benchmark_database, analyze, current_rss_mb, print_table
+
+
+def traced(func):
+    """Ejecuta func y retorna (resultado, pico de memoria en MB)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lists', type=int, default=24, help='Listas del usuario.')
+    parser.add_argument('--volumes', default='1000,10000,50000', help='Totales de tareas por etapa, separados por comas.')
+    args = parser.parse_args(argv)
+    volumes = sorted(int(volume) for volume in args.volumes.split(','))
+    
+    setup_django()
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from tasks.models import TaskList
+    from tasks.tests.factories import create_user, create_task_list, create_bulk_tasks
+    
+    cache_settings = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'dashboard': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+    }
+    pages = {'listado': reverse('tasklist_list'), 'dashboard': reverse('dashboard')}
+    
+    rows = []
+    with benchmark_database() as connection, override_settings(CACHES=cache_settings):
+        print(f'Base de datos: {connection.vendor}')
+        user = create_user(username='bench', email='bench@example.com')
+        task_lists = [create_task_list(owner=user, name=f'Lista {i}') for i in range(args.lists)]
+        client = Client()
+        client.force_login(user)
+        seeded = 0
+        
+        for volume in volumes:
+            create_bulk_tasks(task_lists, volume - seeded)
+            seeded = volume
+            analyze(connection)
+            
+            row = {'tareas': volume}
+            rss = current_rss_mb()
+            for name, url in pages.items():
+                client.get(url)  # Calentar plantillas y conexiones
+                with CaptureQueriesContext(connection) as queries:
+                    response, peak = traced(lambda: client.get(url))
+                assert response.status_code == 200, response.status_code
+                row[f'{name} MB'] = peak
+                row[f'{name} consultas'] = len(queries)
+            row['RSS Δ MB'] = current_rss_mb() - rss
+            
+            legacy = TaskList.objects.accessible_to(user).select_related('owner').prefetch_related('tasks')
+            _, row["prefetch('tasks') MB"] = traced(lambda: list(legacy))
+            rows.append(row)
+    
+    print_table(
+        f'Páginas de resumen ({args.lists} listas)',
+        rows,
+        ['tareas', 'listado MB', 'listado consultas', 'dashboard MB', 'dashboard consultas',
+         "prefetch('tasks') MB", 'RSS Δ MB'],
+    )
+
+
+if __name__ == '__main__':
+    main()
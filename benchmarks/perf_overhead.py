@@ -0,0 +1,89 @@
+"""
+Benchmark del coste de la instrumentación de rendimiento por request.
+
+Pide las páginas más usadas con y sin PerformanceMiddleware y compara la
+latencia; con la instrumentación activa muestra además lo que reporta la
+cabecera Server-Timing de cada vista (consultas, SQL, plantillas y caché):
+
+    python -m benchmarks.perf_overhead --tasks 500 --repeat 50
+"""
+import argparse
+
+from .utils import setup_django, benchmark_database, analyze, measure, print_table
+
+
+PERF_MIDDLEWARE = 'tasks.middleware.PerformanceMiddleware'
+
+
+def parse_server_timing(header):
+    """Retorna {métrica: {parámetro: valor}} de una cabecera Server-Timing."""
+    metrics = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = {key: value.strip('"') for key, value in (param.split('=', 1) for param in params)}
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=500, help='Tareas de la lista.')
+    parser.add_argument('--repeat', type=int, default=50, help='Peticiones por página y configuración.')
+    args = parser.parse_args(argv)
+    
+    setup_django()
+    from django.conf import settings
+    from django.test import Client, override_settings
+    from django.urls import reverse
+    from tasks.tests.factories import create_user, create_task_list, create_bulk_tasks
+    
+    with_perf = [PERF_MIDDLEWARE] + [path for path in settings.MIDDLEWARE if path != PERF_MIDDLEWARE]
+    without_perf = with_perf[1:]
+    
+    rows, breakdown = [], []
+    with benchmark_database() as connection, override_settings(PERF_SERVER_TIMING=True, PERF_LOG_SAMPLE_RATE=0.0):
+        print(f'Base de datos: {connection.vendor}')
+        user = create_user(username='bench', email='bench@example.com')
+        task_list = create_task_list(owner=user, name='Lista')
+        create_bulk_tasks([task_list], args.tasks)
+        analyze(connection)
+        pages = {
+            'dashboard': reverse('dashboard'),
+            'tasklist_detail': reverse('tasklist_detail', kwargs={'pk': task_list.pk}),
+            'task_stats_api': reverse('task_stats_api', kwargs={'pk': 'dashboard'}),
+        }
+        
+        for name, url in pages.items():
+            row = {'vista': name}
+            for label, middleware in (('sin', without_perf), ('con', with_perf)):
+                with override_settings(MIDDLEWARE=middleware):
+                    client = Client()
+                    client.force_login(user)
+                    stats = measure(lambda: client.get(url), repeat=args.repeat)
+                    row[f'{label} p50 ms'] = stats['p50_ms']
+                    if label == 'con':
+                        metrics = parse_server_timing(client.get(url).headers['Server-Timing'])
+                        breakdown.append({
+                            'vista': name,
+                            'consultas': metrics['sql']['desc'].split()[0],
+                            'sql ms': float(metrics['sql']['dur']),
+                            'plantillas ms': float(metrics['tpl']['dur']),
+                            'total ms': float(metrics['app']['dur']),
+                            'caché': metrics['cache']['desc'],
+                        })
+            row['coste ms'] = row['con p50 ms'] - row['sin p50 ms']
+            rows.append(row)
+    
+    print_table(
+        f'Coste de la instrumentación ({args.tasks} tareas, {args.repeat} peticiones)',
+        rows,
+        ['vista', 'sin p50 ms', 'con p50 ms', 'coste ms'],
+    )
+    print_table(
+        'Server-Timing por vista',
+        breakdown,
+        ['vista', 'consultas', 'sql ms', 'plantillas ms', 'total ms', 'caché'],
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark de escrituras de sesión bajo un sondeo intenso.
+
+Varios usuarios con sesión iniciada sondean la API de estadísticas del
+dashboard cada --interval segundos durante --hours horas simuladas (el reloj
+de las sesiones se adelanta en cada sondeo, sin esperar). Compara:
+
+- db: el motor de sesiones de base de datos con SESSION_SAVE_EVERY_REQUEST,
+  que guarda la sesión (UPDATE de django_session) en cada petición.
+- cached_db deslizante: tasks.sessions con SlidingSessionMiddleware, que solo
+  la guarda cuando ha pasado SESSION_REFRESH_FRACTION de su vida.
+
+    python -m benchmarks.session_writes --users 5 --hours 24 --interval 30
+"""
+import argparse
+import time
+from importlib import import_module
+from unittest import mock
+
+from .utils import setup_django, benchmark_database, summarize, print_table
+
+
+CONFIGURATIONS = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'SESSION_SAVE_EVERY_REQUEST': True,
+        'middleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    },
+    'cached_db deslizante': {
+        'SESSION_ENGINE': 'tasks.sessions',
+        'SESSION_SAVE_EVERY_REQUEST': False,
+        'middleware': 'tasks.middleware.SlidingSessionMiddleware',
+    },
+}
+
+
+def run(name, users, polls, interval):
+    """Sondea con cada usuario y retorna (guardados de sesión, latencias en ms)."""
+    from django.conf import settings
+    from django.test import Client, override_settings
+    from django.urls import reverse
+    
+    config = CONFIGURATIONS[name]
+    middleware = [
+        config['middleware'] if 'SessionMiddleware' in path else path
+        for path in settings.MIDDLEWARE
+    ]
+    overrides = override_settings(
+        MIDDLEWARE=middleware,
+        SESSION_ENGINE=config['SESSION_ENGINE'],
+        SESSION_SAVE_EVERY_REQUEST=config['SESSION_SAVE_EVERY_REQUEST'],
+    )
+    store_class = import_module(config['SESSION_ENGINE']).SessionStore
+    save = store_class.save
+    saves = [0]
+    
+    def counting_save(self, must_create=False):
+        saves[0] += 1
+        return save(self, must_create=must_create)
+    
+    url = reverse('task_stats_api', kwargs={'pk': 'dashboard'})
+    samples = []
+    start = time.time()
+    with overrides:
+        clients = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+        
+        with mock.patch.object(store_class, 'save', counting_save):
+            for poll in range(polls):
+                with mock.patch('tasks.sessions.time.time', return_value=start + poll * interval):
+                    for client in clients:
+                        begin = time.perf_counter()
+                        response = client.get(url)
+                        samples.append((time.perf_counter() - begin) * 1000)
+                        assert response.status_code == 200, response.status_code
+    return saves[0], samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5, help='Usuarios sondeando a la vez.')
+    parser.add_argument('--hours', type=float, default=24, help='Horas simuladas de sondeo.')
+    parser.add_argument('--interval', type=int, default=30, help='Segundos entre sondeos de cada usuario.')
+    args = parser.parse_args(argv)
+    polls = int(args.hours * 3600 / args.interval)
+    
+    setup_django()
+    from django.test import override_settings
+    from tasks.tests.factories import create_user, create_task_list, create_bulk_tasks
+    
+    cache_settings = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'dashboard': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'dashboard'},
+        'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+    }
+    
+    rows = []
+    with benchmark_database() as connection, override_settings(CACHES=cache_settings, SESSION_CLEANUP_MODE='external'):
+        print(f'Base de datos: {connection.vendor}')
+        users = [create_user(username=f'bench{i}', email=f'bench{i}@example.com') for i in range(args.users)]
+        for user in users:
+            create_bulk_tasks([create_task_list(owner=user, name='Lista')], 50)
+        
+        for name in CONFIGURATIONS:
+            saves, samples = run(name, users, polls, args.interval)
+            stats = summarize(samples)
+            rows.append({
+                'sesiones': name,
+                'peticiones': len(samples),
+                'escrituras': saves,
+                'escrituras/usuario/hora': saves / (args.users * args.hours),
+                'p50 ms': stats['p50_ms'],
+                'p95 ms': stats['p95_ms'],
+            })
+    
+    print_table(
+        f'Sondeo de estadísticas ({args.users} usuarios, cada {args.interval} s durante {args.hours:g} h)',
+        rows,
+        ['sesiones', 'peticiones', 'escrituras', 'escrituras/usuario/hora', 'p50 ms', 'p95 ms'],
+    )
+
+
+if __name__ == '__main__':
+    main()
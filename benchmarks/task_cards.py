@@ -0,0 +1,149 @@
+"""
+Benchmark de las tarjetas del tablero: instancias de Task frente a la proyección.
+
+Carga todas las tareas de una lista grande por dos caminos y mide el tiempo de
+carga, la memoria retenida (tracemalloc) y el tiempo de renderizar las tarjetas:
+
+- modelo: instancias completas de Task con select_related('created_by') y
+  prefetch de adjuntos y asignados, y una plantilla que llama a
+  get_priority_display, get_status_icon, is_overdue... en cada tarjeta.
+- proyección: task_card_rows (values()) y build_task_cards (TaskCard con
+  __slots__ y los textos ya calculados), con la misma plantilla leyendo atributos.
+
+    python -m benchmarks.task_cards --tasks 10000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from .utils import setup_django, benchmark_database, analyze, summarize, print_table
+
+
+DESCRIPTION = 'Revisar la propuesta con el equipo y preparar los cambios pendientes. ' * 12
+
+# Misma salida en ambos caminos: solo cambia de dónde sale cada valor
+MODEL_TEMPLATE = """{% for task in tasks %}
+<div data-task-id="{{ task.pk }}" data-status="{{ task.status }}">
+<h6>{{ task.title }}</h6><p>{{ task.description|truncatewords:20 }}</p>
+<span class="bg-{{ task.priority }}">{{ task.get_priority_display }}</span>
+<i class="{{ task.get_status_icon }}"></i>{{ task.get_status_display }}
+{% if task.due_date %}<div class="{% if task.is_overdue %}overdue{% endif %}">{{ task.due_date|date:"d/m/Y H:i" }}</div>{% endif %}
+{% for attachment in task.attachments.all %}{{ attachment.filename }}{% endfor %}
+{% for user in task.assigned_users.all|slice:":3" %}{{ user.get_full_name|default:user.username }}{{ user.profile.small_avatar_url|default:"" }}{% endfor %}
+</div>{% endfor %}"""
+
+CARD_TEMPLATE = """{% for card in cards %}
+<div data-task-id="{{ card.id }}" data-status="{{ card.status }}">
+<h6>{{ card.title }}</h6><p>{{ card.description|truncatewords:20 }}</p>
+<span class="bg-{{ card.priority }}">{{ card.priority_display }}</span>
+<i class="{{ card.status_icon }}"></i>{{ card.status_display }}
+{% if card.due_date %}<div class="{% if card.is_overdue %}overdue{% endif %}">{{ card.due_date|date:"d/m/Y H:i" }}</div>{% endif %}
+{% for attachment in card.attachments %}{{ attachment.filename }}{% endfor %}
+{% for user in card.assigned_users %}{{ user.name }}{{ user.avatar_url|default:"" }}{% endfor %}
+</div>{% endfor %}"""
+
+
+def seed(tasks_count):
+    """Siembra una lista con tareas con descripción y usuarios asignados en una de cada tres."""
+    from tasks.models import Task
+    from tasks.tests.factories import create_user, create_task_list, create_bulk_tasks
+    
+    owner = create_user(username='bench', email='bench@example.com')
+    assignees = [
+        create_user(username=f'bench-{i}', email=f'bench-{i}@example.com', first_name=f'Usuario {i}')
+        for i in range(4)
+    ]
+    task_list = create_task_list(owner=owner, name='Lista grande')
+    create_bulk_tasks([task_list], tasks_count)
+    Task.objects.filter(task_list=task_list).update(description=DESCRIPTION)
+    
+    through = Task.assigned_users.through
+    task_ids = Task.objects.filter(task_list=task_list).values_list('pk', flat=True)
+    through.objects.bulk_create([
+        through(task_id=task_id, user_id=user.pk)
+        for index, task_id in enumerate(task_ids) if index % 3 == 0
+        for user in assignees
+    ], batch_size=5000)
+    return task_list
+
+
+def load_models(task_list):
+    from tasks.services import TASK_BOARD_ORDERING
+    tasks = (
+        task_list.tasks.all()
+        .select_related('created_by')
+        .prefetch_related('attachments', 'assigned_users__profile')
+        .order_by(*TASK_BOARD_ORDERING)
+    )
+    return {'tasks': list(tasks)}
+
+
+def load_cards(task_list):
+    from tasks.services import TASK_BOARD_ORDERING, build_task_cards, task_card_rows
+    rows = task_card_rows(task_list.tasks.all()).order_by(*TASK_BOARD_ORDERING)
+    return {'cards': build_task_cards(rows)}
+
+
+def profile_path(load, template, task_list, repeat):
+    """Retorna (ms de carga, MB retenidos, ms de renderizado) de un camino."""
+    load_samples, render_samples = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        context = load(task_list)
+        load_samples.append((time.perf_counter() - start) * 1000)
+        
+        start = time.perf_counter()
+        template.render(context)
+        render_samples.append((time.perf_counter() - start) * 1000)
+        del context
+    
+    gc.collect()
+    tracemalloc.start()
+    context = load(task_list)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del context
+    return summarize(load_samples), retained / (1024 * 1024), summarize(render_samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000, help='Tareas de la lista.')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por camino.')
+    args = parser.parse_args(argv)
+    
+    setup_django()
+    from django.template import engines
+    
+    engine = engines['django']
+    paths = {
+        'modelo': (load_models, engine.from_string(MODEL_TEMPLATE)),
+        'proyección': (load_cards, engine.from_string(CARD_TEMPLATE)),
+    }
+    
+    rows = []
+    with benchmark_database() as connection:
+        print(f'Base de datos: {connection.vendor}')
+        task_list = seed(args.tasks)
+        analyze(connection)
+        
+        for name, (load, template) in paths.items():
+            load_stats, retained_mb, render_stats = profile_path(load, template, task_list, args.repeat)
+            rows.append({
+                'camino': name,
+                'carga p50 ms': load_stats['p50_ms'],
+                'memoria MB': retained_mb,
+                'render p50 ms': render_stats['p50_ms'],
+                'total p50 ms': load_stats['p50_ms'] + render_stats['p50_ms'],
+            })
+    
+    print_table(
+        f'Tarjetas del tablero ({args.tasks} tareas, {args.repeat} repeticiones)',
+        rows,
+        ['camino', 'carga p50 ms', 'memoria MB', 'render p50 ms', 'total p50 ms'],
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Utilidades compartidas por los benchmarks: configuración de Django,
+base de datos aislada, medición de tiempos y formato de resultados.
+"""
+import contextlib
+import os
+import time
+
+
+def setup_django(settings_module='core.settings'):
+    """Configura Django para ejecutar un benchmark fuera de manage.py."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def benchmark_database(keepdb=False, verbosity=0, test_name=None):
+    """
+    Crea una base de datos de test con las migraciones aplicadas y la destruye al salir.
+    test_name fuerza el nombre de la base de test (p. ej. un archivo SQLite que
+    puedan abrir otros procesos en lugar de la base en memoria).
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment, override_settings
+    
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    if test_name:
+        connection.settings_dict['TEST']['NAME'] = test_name
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, keepdb=keepdb)
+    try:
+        # Hasher rápido: sembrar usuarios no debe dominar el tiempo del benchmark
+        with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def analyze(connection):
+    """Actualiza las estadísticas del planificador tras sembrar datos."""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def percentile(samples, pct):
+    """Percentil por rango más cercano de una lista de muestras."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Resume una lista de latencias en milisegundos."""
+    return {
+        'count': len(samples),
+        'mean_ms': sum(samples) / len(samples) if samples else 0.0,
+        'p50_ms': percentile(samples, 50),
+        'p95_ms': percentile(samples, 95),
+        'p99_ms': percentile(samples, 99),
+        'max_ms': max(samples) if samples else 0.0,
+    }
+
+
+def measure(func, repeat=20, warmup=2):
+    """Ejecuta func varias veces y retorna el resumen de latencias."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def current_rss_mb():
+    """Memoria residente actual del proceso en MB (pico de ru_maxrss fuera de Linux)."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def print_table(title, rows, columns):
+    """Imprime una tabla de resultados alineada."""
+    print(f'\n{title}')
+    print('=' * len(title))
+    widths = {
+        column: max(len(column), *(len(_format(row.get(column))) for row in rows))
+        for column in columns
+    }
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print('  '.join(_format(row.get(column)).ljust(widths[column]) for column in columns))
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f'{value:.2f}'
+    return '' if value is None else str(value)
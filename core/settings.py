@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 from django.core.management.utils import get_random_secret_key
 
@@ -45,9 +46,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.middleware.MetricsMiddleware',
+    'tasks.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'tasks.middleware.SlidingSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -129,7 +132,7 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Media files (Uploaded files)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -148,6 +151,26 @@ LOGOUT_REDIRECT_URL = 'login'
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
+# Calculan el SHA-256 de los archivos mientras se reciben (almacenamiento por contenido)
+FILE_UPLOAD_HANDLERS = [
+    'tasks.uploadhandlers.HashingMemoryFileUploadHandler',
+    'tasks.uploadhandlers.HashingTemporaryFileUploadHandler',
+]
+
+# Attachment Delivery Settings
+# django: Django envía los bytes (con rangos); x-accel-redirect (nginx) o x-sendfile
+# (Apache/lighttpd): Django autoriza y el servidor web envía el archivo.
+ATTACHMENT_DELIVERY = os.environ.get('ATTACHMENT_DELIVERY', 'django')
+ATTACHMENT_ACCEL_REDIRECT_PREFIX = os.environ.get('ATTACHMENT_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+ATTACHMENT_CHUNK_SIZE = 64 * 1024  # bytes por bloque en las respuestas parciales
+
+# Chunked Upload Settings
+# Los adjuntos grandes se suben por partes reanudables a ATTACHMENT_UPLOAD_TEMP_DIR
+ATTACHMENT_UPLOAD_TEMP_DIR = os.environ.get('ATTACHMENT_UPLOAD_TEMP_DIR', str(BASE_DIR / 'var' / 'uploads'))
+ATTACHMENT_UPLOAD_MAX_SIZE = int(os.environ.get('ATTACHMENT_UPLOAD_MAX_SIZE', 1024 ** 3))  # 1GB
+ATTACHMENT_UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024  # 5MB, tamaño de parte sugerido al cliente
+ATTACHMENT_UPLOAD_MAX_CHUNK_SIZE = 16 * 1024 * 1024  # 16MB
+ATTACHMENT_UPLOAD_EXPIRY_HOURS = 24  # subidas sin partes nuevas que cleanup_uploads borra
 
 # Security Settings
 if DEBUG:
@@ -171,6 +194,127 @@ else:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
 
+# Activity Log Settings
+# sync: escritura inmediata (tests); request: buffer vaciado al terminar la request;
+# background: buffer vaciado por un hilo con cola local en disco
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+ACTIVITY_LOG_MODE = os.environ.get('ACTIVITY_LOG_MODE', 'sync' if TESTING else 'background')
+ACTIVITY_SPOOL_DIR = os.environ.get('ACTIVITY_SPOOL_DIR', os.path.join(BASE_DIR, 'var', 'activity_spool'))
+ACTIVITY_SPOOL_FSYNC = os.environ.get('ACTIVITY_SPOOL_FSYNC', 'False') == 'True'
+ACTIVITY_FLUSH_INTERVAL = 2.0  # segundos
+ACTIVITY_FLUSH_SIZE = 200  # eventos
+ACTIVITY_RECOVERY_INTERVAL = 60  # segundos entre búsquedas de colas huérfanas
+ACTIVITY_RETENTION_DAYS = int(os.environ.get('ACTIVITY_RETENTION_DAYS', 90))  # ver compact_activity
+
+# Media Pipeline Settings
+# Variantes de avatares y vistas previas de adjuntos. sync: en la request (tests);
+# background: hilo del proceso; external: solo el worker `manage.py process_media --loop`
+MEDIA_PIPELINE_MODE = os.environ.get('MEDIA_PIPELINE_MODE', 'sync' if TESTING else 'background')
+
+# Cache Settings
+# La caché del dashboard guarda fragmentos y estadísticas por usuario, invalidados por
+# versiones de lista. Debe ser compartida por todos los workers (file, o redis con
+# REDIS_URL): con locmem las invalidaciones solo llegan al worker que hizo el cambio
+# y los demás servirían datos y 304 obsoletos. locmem solo vale con un proceso.
+DASHBOARD_CACHE_BACKEND = os.environ.get(
+    'DASHBOARD_CACHE_BACKEND',
+    'dummy' if TESTING else ('redis' if os.environ.get('REDIS_URL') else 'file'),
+)
+DASHBOARD_CACHE_BACKENDS = {
+    'dummy': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dashboard',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DASHBOARD_CACHE_DIR', os.path.join(BASE_DIR, 'var', 'cache', 'dashboard')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+# Caché de lectura de las sesiones (cached_db). Debe ser compartida por todos los
+# workers (file o redis): con locmem un proceso no vería los logout hechos en otro.
+SESSION_CACHE_BACKEND = os.environ.get('SESSION_CACHE_BACKEND', 'locmem' if TESTING else 'file')
+SESSION_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('SESSION_CACHE_DIR', os.path.join(BASE_DIR, 'var', 'cache', 'sessions')),
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        'KEY_PREFIX': 'sessions',
+    },
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'dashboard': DASHBOARD_CACHE_BACKENDS[DASHBOARD_CACHE_BACKEND],
+    'sessions': SESSION_CACHE_BACKENDS[SESSION_CACHE_BACKEND],
+}
+DASHBOARD_CACHE_ALIAS = 'dashboard'
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 300))  # segundos
+
+# Push Settings
+# Eventos en vivo por Server-Sent Events (requieren ASGI: uvicorn core.asgi:application).
+# memory reparte en el propio proceso; redis reparte entre procesos vía PUSH_REDIS_URL.
+PUSH_ENABLED = os.environ.get('PUSH_ENABLED', 'True') == 'True'
+PUSH_BROKER = os.environ.get('PUSH_BROKER', 'memory')
+PUSH_REDIS_URL = os.environ.get('PUSH_REDIS_URL', os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0'))
+PUSH_HEARTBEAT = 15  # segundos entre comentarios keep-alive
+PUSH_STREAM_TIMEOUT = 300  # segundos antes de cerrar el stream y reconectar
+PUSH_QUEUE_SIZE = 100  # eventos pendientes por cliente antes de pedir resync
+PUSH_RETRY_MS = 3000  # espera de reconexión del EventSource
+
 # Session Settings
+# cached_db con caducidad deslizante: la sesión solo se vuelve a guardar (UPDATE de
+# django_session) cuando ha pasado SESSION_REFRESH_FRACTION de su vida, no en cada
+# petición. Las caducadas se borran en segundo plano cada SESSION_CLEANUP_INTERVAL
+# (external: solo con `manage.py clearsessions` desde cron).
+SESSION_ENGINE = 'tasks.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
 SESSION_COOKIE_AGE = 86400  # 24 hours
-SESSION_SAVE_EVERY_REQUEST = True
\ No newline at end of file
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_FRACTION = 0.5
+SESSION_CLEANUP_MODE = os.environ.get('SESSION_CLEANUP_MODE', 'external' if TESTING else 'background')
+SESSION_CLEANUP_INTERVAL = 3600  # segundos
+
+# Performance Instrumentation Settings
+# Consultas SQL, caché y plantillas por request (tasks.middleware.PerformanceMiddleware).
+# Server-Timing expone los tiempos al navegador: activado por defecto solo con DEBUG.
+PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION', 'True') == 'True'
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', str(DEBUG)) == 'True'
+PERF_NPLUSONE_THRESHOLD = 5  # misma forma de consulta más de N veces en una request
+PERF_SLOW_REQUEST_MS = 500  # las requests más lentas se registran siempre
+PERF_LOG_SAMPLE_RATE = float(os.environ.get('PERF_LOG_SAMPLE_RATE', 0.0 if TESTING else 0.05))
+PERF_LOG_FILE = os.environ.get('PERF_LOG_FILE', os.path.join(BASE_DIR, 'var', 'log', 'perf.jsonl'))
+PERF_LOG_MAX_BYTES = 10 * 1024 * 1024
+PERF_LOG_BACKUP_COUNT = 5
+
+# Metrics Settings
+# Cada worker suma sus métricas en memoria y las vuelca cada METRICS_FLUSH_INTERVAL
+# segundos a METRICS_DIR (un fichero por pid, vaciado por gunicorn al arrancar);
+# /metrics las agrega. Sin login de staff solo se sirve a METRICS_ALLOWED_NETWORKS:
+# detrás de un proxy REMOTE_ADDR es la del proxy, así que no se incluyen redes privadas.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(BASE_DIR, 'var', 'metrics'))
+METRICS_FLUSH_INTERVAL = 5  # segundos
+# Vacía (METRICS_ALLOWED_NETWORKS="") deja /metrics solo para staff
+METRICS_ALLOWED_NETWORKS = [
+    network.strip()
+    for network in os.environ.get('METRICS_ALLOWED_NETWORKS', '127.0.0.1/32,::1/128').split(',')
+    if network.strip()
+]
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Configuración de gunicorn (se carga automáticamente desde el directorio actual).
+
+SERVER_PROFILE elige el perfil de despliegue:
+
+- wsgi (por defecto): workers síncronos, un worker ocupado por petición.
+- asgi: workers de uvicorn; las vistas asíncronas de la API y los streams de
+  eventos en vivo no bloquean el worker mientras esperan a la base de datos.
+"""
+import glob
+import os
+
+
+SERVER_PROFILE = os.environ.get('SERVER_PROFILE', 'wsgi')
+
+if SERVER_PROFILE not in ('wsgi', 'asgi'):
+    raise RuntimeError(f'SERVER_PROFILE desconocido: {SERVER_PROFILE}')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# Un worker como sin este fichero; WEB_CONCURRENCY lo cambia (también lo lee gunicorn)
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+errorlog = '-'
+
+# La caché del dashboard en memoria no comparte las invalidaciones entre workers
+if workers > 1 and os.environ.get('DASHBOARD_CACHE_BACKEND') == 'locmem':
+    raise RuntimeError('DASHBOARD_CACHE_BACKEND=locmem requiere WEB_CONCURRENCY=1; usa file o redis')
+
+# El broker en memoria solo reparte los eventos en vivo dentro de su proceso
+if (SERVER_PROFILE == 'asgi' and workers > 1 and os.environ.get('PUSH_ENABLED', 'True') == 'True'
+        and os.environ.get('PUSH_BROKER', 'memory') != 'redis'):
+    raise RuntimeError('SERVER_PROFILE=asgi con más de un worker requiere PUSH_BROKER=redis (o PUSH_ENABLED=False)')
+
+if SERVER_PROFILE == 'asgi':
+    wsgi_app = 'core.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    # Los streams de eventos se mantienen abiertos hasta PUSH_STREAM_TIMEOUT
+    timeout = int(os.environ.get('GUNICORN_TIMEOUT', 360))
+    graceful_timeout = 10
+else:
+    wsgi_app = 'core.wsgi:application'
+
+
+def on_starting(server):
+    # Las métricas por worker de una ejecución anterior no deben sumarse a las
+    # nuevas (mismo valor por defecto que METRICS_DIR en core/settings.py)
+    metrics_dir = os.environ.get('METRICS_DIR', os.path.join(os.path.dirname(__file__), 'var', 'metrics'))
+    for path in glob.glob(os.path.join(metrics_dir, 'metrics-*.json')):
+        os.remove(path)
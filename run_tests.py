@@ -4,6 +4,7 @@ Script para ejecutar tests de la aplicación TodoApp de manera organizada.
 Proporciona comandos para diferentes tipos de tests y reportes de cobertura.
 """
 import os
+import shlex
 import sys
 import subprocess
 
@@ -40,7 +41,9 @@ def main():
         'auth': run_auth_tests,
         'api': run_api_tests,
         'permissions': run_permission_tests,
+        'services': run_service_tests,
         'coverage': run_coverage_tests,
+        'bench': run_benchmarks,
         'quick': run_quick_tests,
         'setup': setup_test_environment,
         'clean': clean_test_data,
@@ -48,7 +51,9 @@ def main():
     }
     
     if command in commands:
-        commands[command]()
+        result = commands[command]()
+        if command == 'bench' and result:
+            sys.exit(result)
     else:
         print(f"❌ Comando no reconocido: {command}")
         print_help()
@@ -67,11 +72,15 @@ EJECUTAR TESTS:
   auth        - Ejecutar solo tests de autenticación
   api         - Ejecutar solo tests de APIs
   permissions - Ejecutar solo tests de permisos
+  services    - Ejecutar solo tests de servicios
   quick       - Ejecutar tests rápidos (sin base de datos)
 
 ANÁLISIS:
   coverage    - Ejecutar tests con reporte de cobertura
 
+BENCHMARKS:
+  bench       - Pruebas de carga sobre datos sembrados (opciones: bench --help)
+
 UTILIDADES:
   setup       - Configurar entorno de tests
   clean       - Limpiar datos de test
@@ -81,6 +90,7 @@ EJEMPLOS:
   python run_tests.py all
   python run_tests.py models
   python run_tests.py coverage
+  python run_tests.py bench --shape small --driver both --baseline var/bench-baseline.json
     """)
 
 
@@ -126,6 +136,12 @@ def run_permission_tests():
     return run_command("python manage.py test tasks.tests.test_permissions --verbosity=2")
 
 
+def run_service_tests():
+    """Ejecutar tests de servicios."""
+    print("⚙️ Ejecutando tests de servicios...")
+    return run_command("python manage.py test tasks.tests.test_services --verbosity=2")
+
+
 def run_coverage_tests():
     """Ejecutar tests con reporte de cobertura."""
     print("📈 Ejecutando tests con cobertura...")
@@ -160,6 +176,12 @@ def run_quick_tests():
     return run_command("python manage.py test tasks.tests.test_forms --verbosity=2")
 
 
+def run_benchmarks():
+    """Ejecutar las pruebas de carga de benchmarks.load con los argumentos restantes."""
+    print("📈 Ejecutando pruebas de carga...")
+    return run_command(shlex.join([sys.executable, "-m", "benchmarks.load", *sys.argv[2:]]))
+
+
 def setup_test_environment():
     """Configurar entorno de tests."""
     print("⚙️ Configurando entorno de tests...")
@@ -5,10 +5,10 @@
  * 
  * This file contains all the JavaScript functionality for the Kanban board
  * view used in the TaskList detail page. It handles:
- * - Drag and drop operations
+ * - Drag and drop operations (batched into the bulk operations API)
  * - Status changes via dropdown buttons
  * - Quick task creation
- * - Real-time UI updates
+ * - Real-time UI updates (live events from other users, polling fallback)
  * - AJAX interactions
  * 
  * Dependencies: jQuery, Bootstrap 5
@@ -23,6 +23,12 @@ $(document).ready(function() {
     let draggedTask = null;
     let originalColumn = null;
     
+    // Cambios de estado por arrastre pendientes de enviar en lote
+    // {taskId: {status, originStatus, $task, $origin}}
+    let pendingMoves = {};
+    let flushTimer = null;
+    const BATCH_DELAY_MS = 400;
+    
     // ========================================================================
     // UTILITY FUNCTIONS
     // ========================================================================
@@ -192,6 +198,63 @@ $(document).ready(function() {
         updateDropdownOptions($task, taskData.status);
     }
     
+    /**
+     * Construye la tarjeta de una tarea (pendiente; ver updateTaskCardContent)
+     * @param {Object} task - Datos de la tarea (id, title, priority, priority_display)
+     * @returns {jQuery} Tarjeta de la tarea
+     */
+    function buildTaskCard(task) {
+        const $card = $(`
+            <div class="card task-item" 
+                 data-task-id="${task.id}" 
+                 data-status="pending"
+                 data-priority="${task.priority}"
+                 draggable="true">
+                <div class="p-3">
+                    <div class="d-flex justify-content-between">
+                        <h6 class="task-title"></h6>
+                        <div class="dropdown">
+                            <button class="dropdown-toggle" type="button" data-bs-toggle="dropdown">
+                                <i class="fas fa-ellipsis-v"></i>
+                            </button>
+                            <ul class="dropdown-menu dropdown-menu-end">
+                                <li><a class="dropdown-item d-flex align-items-center gap-2 change-status-btn" href="#" data-task-id="${task.id}" data-new-status="in_progress">
+                                    <i class="fas fa-spinner me-2"></i>En Proceso
+                                </a></li>
+                                <li><a class="dropdown-item d-flex align-items-center gap-2 change-status-btn" href="#" data-task-id="${task.id}" data-new-status="completed">
+                                    <i class="fas fa-check me-2"></i>Completar
+                                </a></li>
+                                <li><hr class="dropdown-divider"></li>
+                                <li><a class="dropdown-item d-flex align-items-center gap-2" href="/tasks/task/${task.id}/edit/">
+                                    <i class="fas fa-edit me-2"></i>Editar
+                                </a></li>
+                                <li><a class="dropdown-item d-flex align-items-center gap-2" href="/tasks/task/${task.id}/attachment/">
+                                    <i class="fas fa-paperclip me-2"></i>Adjuntar Archivo
+                                </a></li>
+                                <li><hr class="dropdown-divider"></li>
+                                <li><a class="dropdown-item d-flex align-items-center gap-2 text-danger" href="/tasks/task/${task.id}/delete/">
+                                    <i class="fas fa-trash me-2"></i>Eliminar
+                                </a></li>
+                            </ul>
+                        </div>
+                    </div>
+                    <div class="task-meta">
+                        <span class="badge bg-${task.priority}">
+                            ${task.priority_display}
+                        </span>
+                        <span class="badge bg-pending">
+                            <i class="fas fa-clock"></i>
+                            Pendiente
+                        </span>
+                    </div>
+                </div>
+            </div>
+        `);
+        // El título lo escribe cualquiera con acceso a la lista: como texto, nunca como HTML
+        $card.find('.task-title').text(task.title);
+        return $card;
+    }
+    
     /**
      * Actualiza las opciones del menú dropdown de una tarea
      * @param {jQuery} taskElement - Elemento jQuery de la tarea
@@ -380,6 +443,109 @@ $(document).ready(function() {
         });
     }
     
+    // ========================================================================
+    // BATCHED STATUS CHANGES
+    // ========================================================================
+    
+    /**
+     * Mueve la tarjeta de inmediato y programa el envío en lote del cambio
+     * @param {string} taskId - ID de la tarea
+     * @param {string} newStatus - Nuevo estado
+     * @param {jQuery} $taskItem - Elemento jQuery de la tarea
+     * @param {jQuery} $targetColumn - Columna de destino
+     */
+    function queueStatusChange(taskId, newStatus, $taskItem, $targetColumn) {
+        const previous = pendingMoves[taskId];
+        pendingMoves[taskId] = {
+            status: newStatus,
+            originStatus: previous ? previous.originStatus : $taskItem.attr('data-status'),
+            $task: $taskItem,
+            $origin: previous ? previous.$origin : $taskItem.closest('.kanban-column')
+        };
+        
+        // Movimiento optimista: el servidor confirma el lote después
+        $taskItem.attr('data-status', newStatus).addClass('updating').appendTo($targetColumn);
+        updateColumnCounters();
+        
+        clearTimeout(flushTimer);
+        flushTimer = setTimeout(flushStatusChanges, BATCH_DELAY_MS);
+    }
+    
+    /**
+     * Construye las operaciones del lote: una por estado de destino
+     * @param {Object} moves - Cambios pendientes por tarea
+     * @returns {Array} Operaciones para la API de operaciones masivas
+     */
+    function buildStatusOperations(moves) {
+        const idsByStatus = {};
+        Object.keys(moves).forEach(function(taskId) {
+            const move = moves[taskId];
+            if (move.status === move.originStatus) return;
+            (idsByStatus[move.status] = idsByStatus[move.status] || []).push(parseInt(taskId, 10));
+        });
+        return Object.keys(idsByStatus).map(function(status) {
+            return {action: 'status', task_ids: idsByStatus[status], value: status};
+        });
+    }
+    
+    /**
+     * Envía en una sola petición todos los cambios de estado acumulados
+     */
+    function flushStatusChanges() {
+        const moves = pendingMoves;
+        pendingMoves = {};
+        flushTimer = null;
+        
+        const operations = buildStatusOperations(moves);
+        if (!operations.length) {
+            Object.values(moves).forEach(move => move.$task.removeClass('updating'));
+            return;
+        }
+        
+        $.ajax({
+            url: window.kanbanUrls.bulkUpdate,
+            type: 'POST',
+            contentType: 'application/json',
+            headers: {'X-CSRFToken': $('[name=csrfmiddlewaretoken]').val()},
+            data: JSON.stringify({operations: operations}),
+            success: function(response) {
+                response.tasks.forEach(function(taskData) {
+                    const move = moves[taskData.id];
+                    if (move) updateTaskCardContent(move.$task[0], taskData);
+                });
+                showMessage(response.message || 'Estados actualizados correctamente', 'success');
+            },
+            error: function(xhr, status, error) {
+                console.error('Error al cambiar estados:', error);
+                // Deshacer el movimiento optimista
+                Object.values(moves).forEach(function(move) {
+                    move.$task.attr('data-status', move.originStatus).appendTo(move.$origin);
+                });
+                showMessage('Error de conexión al actualizar las tareas', 'error');
+            },
+            complete: function() {
+                Object.values(moves).forEach(move => move.$task.removeClass('updating'));
+                updateColumnCounters();
+            }
+        });
+    }
+    
+    // Enviar el lote pendiente si se abandona la página antes del temporizador
+    window.addEventListener('pagehide', function() {
+        const operations = buildStatusOperations(pendingMoves);
+        if (!operations.length) return;
+        pendingMoves = {};
+        fetch(window.kanbanUrls.bulkUpdate, {
+            method: 'POST',
+            keepalive: true,
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': $('[name=csrfmiddlewaretoken]').val()
+            },
+            body: JSON.stringify({operations: operations})
+        });
+    });
+    
     // ========================================================================
     // DRAG AND DROP FUNCTIONALITY
     // ========================================================================
@@ -430,8 +596,8 @@ $(document).ready(function() {
                 const oldStatus = draggedTask.dataset.status;
                 
                 if (newStatus !== oldStatus) {
-                    // Realizar cambio de estado via AJAX
-                    performStatusChange(taskId, newStatus, $(draggedTask), $column, null);
+                    // Acumular el cambio y enviarlo en lote con los siguientes arrastres
+                    queueStatusChange(taskId, newStatus, $(draggedTask), $column);
                 }
             }
         });
@@ -482,56 +648,13 @@ $(document).ready(function() {
                     
                     // Agregar la nueva tarea a la columna de pendientes
                     const $pendingColumn = $('#pending-tasks');
-                    if (response.task && $pendingColumn.length) {
-                        const taskHtml = `
-                            <div class="card task-item" 
-                                 data-task-id="${response.task.id}" 
-                                 data-status="pending"
-                                 data-priority="${response.task.priority}"
-                                 draggable="true">
-                                <div class="p-3">
-                                    <div class="d-flex justify-content-between">
-                                        <h6 class="task-title">${response.task.title}</h6>
-                                        <div class="dropdown">
-                                            <button class="dropdown-toggle" type="button" data-bs-toggle="dropdown">
-                                                <i class="fas fa-ellipsis-v"></i>
-                                            </button>
-                                            <ul class="dropdown-menu dropdown-menu-end">
-                                                <li><a class="dropdown-item d-flex align-items-center gap-2 change-status-btn" href="#" data-task-id="${response.task.id}" data-new-status="in_progress">
-                                                    <i class="fas fa-spinner me-2"></i>En Proceso
-                                                </a></li>
-                                                <li><a class="dropdown-item d-flex align-items-center gap-2 change-status-btn" href="#" data-task-id="${response.task.id}" data-new-status="completed">
-                                                    <i class="fas fa-check me-2"></i>Completar
-                                                </a></li>
-                                                <li><hr class="dropdown-divider"></li>
-                                                <li><a class="dropdown-item d-flex align-items-center gap-2" href="/tasks/task/${response.task.id}/edit/">
-                                                    <i class="fas fa-edit me-2"></i>Editar
-                                                </a></li>
-                                                <li><a class="dropdown-item d-flex align-items-center gap-2" href="/tasks/task/${response.task.id}/attachment/">
-                                                    <i class="fas fa-paperclip me-2"></i>Adjuntar Archivo
-                                                </a></li>
-                                                <li><hr class="dropdown-divider"></li>
-                                                <li><a class="dropdown-item d-flex align-items-center gap-2 text-danger" href="/tasks/task/${response.task.id}/delete/">
-                                                    <i class="fas fa-trash me-2"></i>Eliminar
-                                                </a></li>
-                                            </ul>
-                                        </div>
-                                    </div>
-                                    <div class="task-meta">
-                                        <span class="badge bg-${response.task.priority}">
-                                            ${response.task.priority_display}
-                                        </span>
-                                        <span class="badge bg-pending">
-                                            <i class="fas fa-clock"></i>
-                                            Pendiente
-                                        </span>
-                                    </div>
-                                </div>
-                            </div>
-                        `;
+                    // La tarjeta puede haber llegado ya por los eventos en vivo
+                    const exists = response.task && $('.task-item[data-task-id="' + response.task.id + '"]').length;
+                    if (response.task && $pendingColumn.length && !exists) {
+                        const $newTask = buildTaskCard(response.task);
                         
                         // Agregar la tarea con animación
-                        const $newTask = $(taskHtml).hide();
+                        $newTask.hide();
                         $pendingColumn.prepend($newTask);
                         $newTask.fadeIn();
                         
@@ -577,6 +700,85 @@ $(document).ready(function() {
         e.stopPropagation();
     });
     
+    // ========================================================================
+    // LIVE UPDATES
+    // ========================================================================
+    
+    /**
+     * Aplica a la tarjeta un cambio de tarea hecho por otro usuario o pestaña
+     * @param {Object} data - Evento 'task' (op, list_id, task)
+     */
+    function applyTaskEvent(data) {
+        const task = data.task;
+        
+        // Los cambios propios aún sin confirmar tienen prioridad
+        if (pendingMoves[task.id]) return;
+        
+        const $task = $('.task-item[data-task-id="' + task.id + '"]');
+        if (data.op === 'deleted' || data.list_id !== window.kanbanData.taskListId) {
+            $task.fadeOut(200, function() {
+                $(this).remove();
+                updateColumnCounters();
+            });
+            return;
+        }
+        
+        const $column = $('#' + task.status.replace('_', '-') + '-tasks');
+        if (!$column.length) return;
+        
+        if (!$task.length) {
+            const $newTask = buildTaskCard(task).hide();
+            $column.prepend($newTask);
+            updateTaskCardContent($newTask[0], task);
+            $newTask.fadeIn();
+        } else {
+            $task.attr('data-priority', task.priority).data('priority', task.priority);
+            $task.find('.task-title').text(task.title);
+            if ($task.attr('data-status') !== task.status) {
+                moveTaskToColumn($task[0], $column[0], task);
+            } else {
+                updateTaskCardContent($task[0], task);
+            }
+        }
+        updateColumnCounters();
+    }
+    
+    /**
+     * Maneja los eventos en vivo de la lista
+     * @param {string} type - Tipo de evento
+     * @param {Object} data - Datos del evento
+     */
+    function handleLiveEvent(type, data) {
+        if (type === 'task') {
+            applyTaskEvent(data);
+        } else if (type === 'list' && data.op === 'deleted') {
+            showMessage('Esta lista ha sido eliminada', 'error');
+        } else if (type === 'resync' || (type === 'access' && data.op === 'revoked' && data.list_id === window.kanbanData.taskListId)) {
+            // Se han perdido eventos o el acceso ha cambiado: recargar el tablero
+            window.location.reload();
+        }
+    }
+    
+    /**
+     * Sondeo de respaldo: avisa si la lista cambió (ETag distinto) sin recargar
+     */
+    let lastStatsEtag = null;
+    function pollListChanges() {
+        if (!window.kanbanUrls.stats) return;
+        $.ajax({
+            url: window.kanbanUrls.stats,
+            method: 'GET',
+            ifModified: true,
+            success: function(data, status, xhr) {
+                const etag = xhr.getResponseHeader('ETag');
+                if (status !== 'notmodified' && lastStatsEtag && etag !== lastStatsEtag) {
+                    showMessage('La lista ha cambiado. Recarga la página para ver los cambios.', 'success');
+                }
+                lastStatsEtag = etag || lastStatsEtag;
+            }
+        });
+    }
+    
     // ========================================================================
     // INITIALIZATION
     // ========================================================================
@@ -596,6 +798,16 @@ $(document).ready(function() {
         // Actualizar contadores iniciales
         updateColumnCounters();
         
+        // Cambios de otros usuarios en vivo, con sondeo como respaldo
+        if (window.TodoLive) {
+            TodoLive.connect({
+                url: window.kanbanUrls.events,
+                onEvent: handleLiveEvent,
+                poll: pollListChanges,
+                pollInterval: 30000
+            });
+        }
+        
         console.log('Kanban Board inicializado correctamente');
     }
     
@@ -611,7 +823,9 @@ $(document).ready(function() {
         showMessage: showMessage,
         updateColumnCounters: updateColumnCounters,
         moveTaskToColumn: moveTaskToColumn,
-        performStatusChange: performStatusChange
+        performStatusChange: performStatusChange,
+        queueStatusChange: queueStatusChange,
+        flushStatusChanges: flushStatusChanges
     };
 });
 
@@ -0,0 +1,77 @@
+/**
+ * ============================================================================
+ * LIVE UPDATES - Server-Sent Events con sondeo como respaldo
+ * ============================================================================
+ *
+ * TodoLive.connect({
+ *     url: URL del stream de eventos (null para usar solo el sondeo),
+ *     onEvent: function(type, data) { ... },
+ *     poll: function() { ... },
+ *     pollInterval: 30000
+ * });
+ *
+ * Mientras el stream no esté abierto (navegador sin EventSource, servidor
+ * WSGI que responde 204, reconexiones) se ejecuta el sondeo periódico.
+ */
+(function(window) {
+    'use strict';
+
+    // Tipos de evento enviados por el servidor
+    const EVENT_TYPES = ['task', 'list', 'access', 'resync'];
+
+    function connect(options) {
+        const pollInterval = options.pollInterval || 30000;
+        let pollTimer = null;
+
+        function startPolling() {
+            if (pollTimer === null && options.poll) {
+                pollTimer = setInterval(options.poll, pollInterval);
+            }
+        }
+
+        function stopPolling() {
+            if (pollTimer !== null) {
+                clearInterval(pollTimer);
+                pollTimer = null;
+            }
+        }
+
+        if (!options.url || typeof window.EventSource === 'undefined') {
+            startPolling();
+            return { close: stopPolling };
+        }
+
+        const source = new EventSource(options.url);
+        startPolling();
+
+        source.onopen = function() {
+            stopPolling();
+            // Recuperar los cambios perdidos mientras no había conexión
+            if (options.poll) {
+                options.poll();
+            }
+        };
+
+        source.onerror = function() {
+            // El navegador reconecta solo salvo tras un 204 o un error HTTP
+            startPolling();
+        };
+
+        EVENT_TYPES.forEach(function(type) {
+            source.addEventListener(type, function(e) {
+                options.onEvent(type, JSON.parse(e.data));
+            });
+        });
+
+        return {
+            close: function() {
+                source.close();
+                stopPolling();
+            }
+        };
+    }
+
+    window.TodoLive = {
+        connect: connect
+    };
+})(window);
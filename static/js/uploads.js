@@ -0,0 +1,149 @@
+/**
+ * ============================================================================
+ * UPLOADS - Subida de adjuntos por partes reanudables
+ * ============================================================================
+ *
+ * TodoUpload.upload(file, {
+ *     startUrl: URL para iniciar la subida de la tarea,
+ *     csrfToken: token CSRF,
+ *     onProgress: function(loaded, total) { ... }
+ * }).then(function(result) { ... });
+ *
+ * Cada parte se envía con PUT y Content-Range; si el navegador tiene
+ * crypto.subtle se adjunta su SHA-256 para que el servidor la verifique.
+ * El id de la subida se guarda en localStorage: al volver a elegir el mismo
+ * archivo (p. ej. tras perder la conexión) se continúa desde el offset que
+ * indica el servidor.
+ */
+(function(window) {
+    'use strict';
+
+    const STORAGE_PREFIX = 'todo-upload:';
+    const MAX_RETRIES = 3;
+
+    function storageKey(startUrl, file) {
+        return STORAGE_PREFIX + startUrl + ':' + file.name + ':' + file.size + ':' + file.lastModified;
+    }
+
+    function request(method, url, options) {
+        return new Promise(function(resolve, reject) {
+            const xhr = new XMLHttpRequest();
+            xhr.open(method, url);
+            xhr.setRequestHeader('X-CSRFToken', options.csrfToken);
+            Object.keys(options.headers || {}).forEach(function(name) {
+                xhr.setRequestHeader(name, options.headers[name]);
+            });
+            if (options.onProgress) {
+                xhr.upload.onprogress = function(e) { options.onProgress(e.loaded); };
+            }
+            xhr.onload = function() {
+                let data = {};
+                try {
+                    data = JSON.parse(xhr.responseText);
+                } catch (e) {
+                    // Respuesta sin JSON (p. ej. error del proxy)
+                }
+                resolve({status: xhr.status, data: data});
+            };
+            xhr.onerror = function() { reject(new Error('Error de red')); };
+            xhr.send(options.body === undefined ? null : options.body);
+        });
+    }
+
+    function sha256(blob) {
+        if (!window.crypto || !window.crypto.subtle) {
+            return Promise.resolve('');
+        }
+        return blob.arrayBuffer().then(function(buffer) {
+            return window.crypto.subtle.digest('SHA-256', buffer);
+        }).then(function(digest) {
+            return Array.from(new Uint8Array(digest)).map(function(b) {
+                return b.toString(16).padStart(2, '0');
+            }).join('');
+        });
+    }
+
+    function fail(response) {
+        throw new Error(response.data.error || ('Error ' + response.status));
+    }
+
+    // Recupera la subida guardada o inicia una nueva
+    function resume(file, options, key) {
+        const url = window.localStorage.getItem(key);
+        const saved = url ? request('GET', url, options) : Promise.resolve({status: 404});
+        return saved.then(function(response) {
+            if (response.status === 200) {
+                return response.data;
+            }
+            window.localStorage.removeItem(key);
+            return request('POST', options.startUrl, {
+                csrfToken: options.csrfToken,
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({filename: file.name, size: file.size})
+            }).then(function(response) {
+                if (response.status !== 201) {
+                    fail(response);
+                }
+                window.localStorage.setItem(key, response.data.url);
+                return response.data;
+            });
+        });
+    }
+
+    function sendChunks(file, upload, options, retries) {
+        if (upload.offset >= upload.size) {
+            return Promise.resolve(upload);
+        }
+        const start = upload.offset;
+        const end = Math.min(start + upload.chunk_size, upload.size);
+        const chunk = file.slice(start, end);
+        return sha256(chunk).then(function(digest) {
+            const headers = {'Content-Range': 'bytes ' + start + '-' + (end - 1) + '/' + upload.size};
+            if (digest) {
+                headers['X-Chunk-SHA256'] = digest;
+            }
+            return request('PUT', upload.url, {
+                csrfToken: options.csrfToken,
+                headers: headers,
+                body: chunk,
+                onProgress: function(loaded) {
+                    if (options.onProgress) {
+                        options.onProgress(start + loaded, upload.size);
+                    }
+                }
+            });
+        }).then(function(response) {
+            if (response.status === 200) {
+                return sendChunks(file, response.data, options, MAX_RETRIES);
+            }
+            // 409: el servidor tiene otro offset; 400 con offset: parte descartada
+            if (response.data.offset !== undefined && retries > 0) {
+                upload.offset = response.data.offset;
+                return sendChunks(file, upload, options, retries - 1);
+            }
+            fail(response);
+        }, function(error) {
+            if (retries > 0) {
+                return sendChunks(file, upload, options, retries - 1);
+            }
+            throw error;
+        });
+    }
+
+    function upload(file, options) {
+        const key = storageKey(options.startUrl, file);
+        return resume(file, options, key).then(function(state) {
+            return sendChunks(file, state, options, MAX_RETRIES);
+        }).then(function(state) {
+            return request('POST', state.finalize_url, {csrfToken: options.csrfToken});
+        }).then(function(response) {
+            window.localStorage.removeItem(key);
+            if (response.status !== 201) {
+                fail(response);
+            }
+            return response.data;
+        });
+    }
+
+    window.TodoUpload = {upload: upload};
+})(window);
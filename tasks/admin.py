@@ -1,21 +1,27 @@
 from django.contrib import admin
-from .models import TaskList, Task, SharedList, TaskAttachment, TaskActivity, Profile
+from .models import TaskList, Task, SharedList, TaskAttachment, AttachmentBlob, AttachmentUpload, TaskActivity, TaskActivitySummary, Profile
 
 @admin.register(TaskList)
 class TaskListAdmin(admin.ModelAdmin):
     list_display = ['name', 'owner', 'get_tasks_count', 'get_completed_tasks_count', 'created_at']
     list_filter = ['created_at', 'owner']
     search_fields = ['name', 'description', 'owner__username']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'tasks_count', 'pending_tasks_count', 'in_progress_tasks_count', 'completed_tasks_count']
     raw_id_fields = ['owner']
     
     def get_tasks_count(self, obj):
         return obj.get_tasks_count()
     get_tasks_count.short_description = 'Total de Tareas'
+    get_tasks_count.admin_order_field = 'tasks_count'
     
     def get_completed_tasks_count(self, obj):
         return obj.get_completed_tasks_count()
     get_completed_tasks_count.short_description = 'Tareas Completadas'
+    get_completed_tasks_count.admin_order_field = 'completed_tasks_count'
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('owner')
 
 
 @admin.register(Task)
@@ -71,6 +77,26 @@ class TaskAttachmentAdmin(admin.ModelAdmin):
         return queryset.select_related('task', 'uploaded_by')
 
 
+@admin.register(AttachmentBlob)
+class AttachmentBlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'size', 'ref_count', 'created_at']
+    search_fields = ['name', 'sha256']
+    readonly_fields = ['name', 'sha256', 'size', 'ref_count', 'created_at']
+
+
+@admin.register(AttachmentUpload)
+class AttachmentUploadAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'task', 'uploaded_by', 'offset', 'size', 'updated_at']
+    list_filter = ['created_at']
+    search_fields = ['filename', 'task__title', 'uploaded_by__username']
+    readonly_fields = ['id', 'offset', 'created_at', 'updated_at']
+    raw_id_fields = ['task', 'uploaded_by']
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('task', 'uploaded_by')
+
+
 @admin.register(TaskActivity)
 class TaskActivityAdmin(admin.ModelAdmin):
     list_display = ['task', 'user', 'action', 'timestamp']
@@ -79,6 +105,8 @@ class TaskActivityAdmin(admin.ModelAdmin):
     readonly_fields = ['timestamp']
     raw_id_fields = ['task', 'user']
     date_hierarchy = 'timestamp'
+    # La tabla activa solo guarda el periodo de retención; el histórico está en los resúmenes
+    show_full_result_count = False
     
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
@@ -89,6 +117,26 @@ class TaskActivityAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(TaskActivitySummary)
+class TaskActivitySummaryAdmin(admin.ModelAdmin):
+    list_display = ['task', 'date', 'action', 'count', 'last_at']
+    list_filter = ['action', 'date']
+    search_fields = ['task__title']
+    raw_id_fields = ['task']
+    date_hierarchy = 'date'
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('task')
+    
+    def has_add_permission(self, request):
+        # Los resúmenes los genera el comando compact_activity
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'phone', 'created_at']
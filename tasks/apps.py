@@ -4,3 +4,33 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+    
+    def ready(self):
+        # Mantener los índices de búsqueda al guardar/eliminar objetos indexados
+        from .services.search_service import connect_search_signals
+        connect_search_signals()
+        
+        # Invalidar la caché del dashboard al cambiar listas, tareas y relacionados
+        from .services.cache_service import connect_dashboard_cache_signals
+        connect_dashboard_cache_signals()
+        
+        # Publicar los cambios de tareas y listas a los clientes suscritos
+        from .services.push_service import connect_push_signals
+        connect_push_signals()
+        
+        # Generar variantes de avatares y vistas previas de adjuntos fuera de la request
+        from .services.media_service import connect_media_signals
+        connect_media_signals()
+        
+        # Vaciar el buffer del registro de actividad al terminar cada request
+        from django.core.signals import request_finished
+        from .services.activity_service import flush_on_request_finished
+        request_finished.connect(flush_on_request_finished, dispatch_uid='activity_log_flush')
+        
+        # Borrar periódicamente las sesiones caducadas en segundo plano
+        from .services.session_service import connect_session_signals
+        connect_session_signals()
+        
+        # Medir el renderizado de plantillas en el perfil de rendimiento de cada request
+        from .services.perf_service import install_template_timing
+        install_template_timing()
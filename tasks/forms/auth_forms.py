@@ -5,7 +5,6 @@ from django.core.exceptions import ValidationError
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Row, Column, HTML
 from crispy_forms.bootstrap import PrependedText
-from ..models import Profile
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -75,9 +74,8 @@ class CustomUserCreationForm(UserCreationForm):
         user.first_name = self.cleaned_data['first_name']
         user.last_name = self.cleaned_data['last_name']
         if commit:
+            # El perfil básico lo crea la señal post_save de User
             user.save()
-            # Crear el perfil básico (sin campos adicionales)
-            Profile.objects.get_or_create(user=user)
         return user
 
 
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.services import cleanup_uploads
+
+
+class Command(BaseCommand):
+    """Borra las subidas por partes abandonadas."""
+    help = (
+        'Borra las subidas por partes sin actividad durante el periodo de caducidad '
+        'y los archivos temporales huérfanos de ATTACHMENT_UPLOAD_TEMP_DIR.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=None,
+            help='Horas sin partes nuevas tras las que una subida caduca (por defecto ATTACHMENT_UPLOAD_EXPIRY_HOURS).',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo mostrar cuántas subidas y temporales se borrarían.',
+        )
+    
+    def handle(self, *args, **options):
+        max_age = timezone.timedelta(hours=options['hours']) if options['hours'] is not None else None
+        stats = cleanup_uploads(max_age=max_age, dry_run=options['dry_run'])
+        
+        if options['dry_run']:
+            self.stdout.write(f"{stats['uploads']} subidas caducadas y {stats['files']} temporales se borrarían.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['uploads']} subidas caducadas y {stats['files']} temporales borrados."
+        ))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import TaskActivity
+from tasks.services import compact_activities, get_activity_retention_cutoff
+
+
+class Command(BaseCommand):
+    """Aplica la política de retención del historial de actividad."""
+    help = (
+        'Compacta las actividades más antiguas que el periodo de retención en resúmenes '
+        'diarios por tarea y las archiva en JSONL comprimido bajo MEDIA_ROOT.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Días de actividad a conservar en la tabla activa (por defecto ACTIVITY_RETENTION_DAYS).',
+        )
+        parser.add_argument(
+            '--no-archive',
+            action='store_true',
+            help='No guardar las actividades compactadas en los archivos mensuales.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Actividades procesadas por transacción.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo mostrar cuántas actividades se compactarían.',
+        )
+    
+    def handle(self, *args, **options):
+        cutoff = get_activity_retention_cutoff(options['days'])
+        
+        if options['dry_run']:
+            pending = TaskActivity.objects.filter(timestamp__lt=cutoff).count()
+            self.stdout.write(f'{pending} actividades anteriores a {cutoff:%Y-%m-%d %H:%M} se compactarían.')
+            return
+        
+        stats = compact_activities(
+            cutoff,
+            archive=not options['no_archive'],
+            batch_size=options['batch_size'],
+        )
+        for path in stats['archives']:
+            self.stdout.write(f'Archivo: {path}')
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['compacted']} actividades compactadas ({stats['summaries']} resúmenes diarios nuevos)."
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from tasks.services import collect_blob_garbage, dedupe_attachments
+
+
+class Command(BaseCommand):
+    """Migra los adjuntos existentes al almacenamiento por contenido."""
+    help = (
+        'Mueve los adjuntos con rutas antiguas a blobs direccionados por SHA-256, '
+        'guardando una sola copia de cada contenido, recalcula las referencias '
+        'y borra los blobs que ya no usa ningún adjunto.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo mostrar cuántos archivos se migrarían y cuánto espacio se liberaría.',
+        )
+        parser.add_argument(
+            '--no-gc',
+            action='store_true',
+            help='No recalcular referencias ni borrar blobs sin referencias.',
+        )
+    
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        stats = dedupe_attachments(dry_run=dry_run)
+        verb = 'se migrarían' if dry_run else 'migrados'
+        self.stdout.write(
+            f"{stats['files']} archivos {verb} ({stats['deduplicated']} duplicados, "
+            f"{stats['bytes_saved'] / (1024 * 1024):.1f} MB liberados)."
+        )
+        if stats['missing']:
+            self.stdout.write(self.style.WARNING(f"{stats['missing']} adjuntos apuntan a archivos inexistentes."))
+        
+        if not options['no_gc']:
+            gc = collect_blob_garbage(dry_run=dry_run)
+            verb = 'se borrarían' if dry_run else 'borrados'
+            self.stdout.write(
+                f"{gc['recounted']} contadores corregidos; {gc['blobs']} blobs sin referencias y "
+                f"{gc['files']} archivos huérfanos {verb}."
+            )
+        if not dry_run:
+            self.stdout.write(self.style.SUCCESS('Almacenamiento por contenido actualizado.'))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.services import pending_media_jobs, process_media_job
+
+
+class Command(BaseCommand):
+    """Worker del pipeline de medios."""
+    help = (
+        'Genera las variantes de avatares y las vistas previas de adjuntos pendientes. '
+        'Con --loop funciona como worker (MEDIA_PIPELINE_MODE=external) y también '
+        'recupera los trabajos perdidos al reiniciar un proceso en modo background.'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir esperando trabajos nuevos en lugar de terminar.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Segundos entre búsquedas de trabajos cuando no hay pendientes.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Trabajos de cada tipo leídos por búsqueda.',
+        )
+    
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            close_old_connections()
+            jobs = pending_media_jobs(limit=options['batch_size'])
+            for job in jobs:
+                process_media_job(*job)
+            processed += len(jobs)
+            
+            if not options['loop'] and len(jobs) < options['batch_size']:
+                break
+            if not jobs:
+                time.sleep(options['interval'])
+        
+        self.stdout.write(self.style.SUCCESS(f'{processed} trabajos de medios procesados.'))
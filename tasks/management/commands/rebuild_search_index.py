@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.services import SEARCH_INDEXES, get_search_backend, rebuild_search_index
+
+
+class Command(BaseCommand):
+    """Reconstruye los índices de búsqueda de texto completo."""
+    help = 'Regenera las tablas de búsqueda a partir de tareas, listas y usuarios (tras cargas masivas o restauraciones).'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--index',
+            dest='labels',
+            choices=sorted(SEARCH_INDEXES),
+            action='append',
+            help='Reconstruir solo el índice indicado (se puede repetir).',
+        )
+        parser.add_argument(
+            '--install',
+            action='store_true',
+            help='Crear antes las tablas de búsqueda si no existen.',
+        )
+    
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['install']:
+                get_search_backend().install()
+            indexed = rebuild_search_index(options['labels'])
+        
+        backend = type(get_search_backend()).__name__
+        for label, rows in indexed.items():
+            self.stdout.write(f'{label}: {rows} filas indexadas')
+        self.stdout.write(self.style.SUCCESS(f'Índices de búsqueda reconstruidos con {backend}.'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.models import TaskList
+
+
+class Command(BaseCommand):
+    """Recalcula los contadores desnormalizados de tareas de las listas."""
+    help = 'Recalcula los contadores de tareas por estado de cada lista a partir de la tabla de tareas.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--list',
+            dest='list_ids',
+            type=int,
+            action='append',
+            help='Recalcular solo la lista indicada (se puede repetir).',
+        )
+    
+    def handle(self, *args, **options):
+        task_lists = TaskList.objects.all()
+        if options['list_ids']:
+            task_lists = task_lists.filter(pk__in=options['list_ids'])
+        
+        counter_fields = ['tasks_count', 'pending_tasks_count', 'in_progress_tasks_count', 'completed_tasks_count']
+        with transaction.atomic():
+            before = dict(
+                (row[0], row[1:])
+                for row in task_lists.select_for_update().values_list('pk', *counter_fields)
+            )
+            task_lists.refresh_task_counters()
+            after = task_lists.values_list('pk', *counter_fields)
+            drifted = sum(1 for row in after if before.get(row[0]) != row[1:])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores recalculados para {len(before)} listas ({drifted} con desviaciones corregidas).'
+        ))
@@ -0,0 +1,112 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+
+from .services.metrics_service import metrics_enabled, record_request
+from .services.perf_service import finish_request_profile, reset_request_profile, start_request_profile
+
+
+class SlidingSessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware con caducidad deslizante de bajo coste: en lugar de guardar
+    la sesión en cada petición (SESSION_SAVE_EVERY_REQUEST) la guarda, y
+    reenvía la cookie, solo cuando el SessionStore indica que ya toca renovarla.
+    Un sondeo cada 30 segundos deja de escribir en django_session.
+    """
+    
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        if (
+            session is not None
+            and session.session_key
+            and not session.modified
+            and response.status_code != 500
+            and hasattr(session, 'needs_refresh')
+            and session.needs_refresh()
+        ):
+            session.modified = True
+        return super().process_response(request, response)
+
+
+class PerformanceMiddleware:
+    """
+    Instrumenta cada request (PERF_INSTRUMENTATION): número y tiempo de las
+    consultas SQL con un execute_wrapper, aciertos de caché y tiempo de
+    plantillas, etiquetados con el nombre de la URL resuelta. Los emite en la
+    cabecera Server-Timing, avisa de los patrones N+1 y escribe una muestra en
+    el log de rendimiento. Debe ir el primero de MIDDLEWARE.
+    """
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_INSTRUMENTATION', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile, token = start_request_profile()
+        try:
+            with profile.instrument():
+                response = self.get_response(request)
+        finally:
+            reset_request_profile(token)
+        return finish_request_profile(request, response, profile)
+    
+    async def __acall__(self, request):
+        profile, token = start_request_profile()
+        try:
+            with profile.instrument():
+                response = await self.get_response(request)
+        finally:
+            reset_request_profile(token)
+        return finish_request_profile(request, response, profile)
+
+
+class MetricsMiddleware:
+    """
+    Alimenta las métricas de /metrics (METRICS_ENABLED): latencia y código de
+    estado por vista y, con el perfil de PerformanceMiddleware (request.perf),
+    consultas SQL y lecturas de caché. Va antes de PerformanceMiddleware en
+    MIDDLEWARE. Solo suma en memoria; el volcado a disco es de otro hilo.
+    """
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not metrics_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+    
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start)
+        return response
+    
+    def record(self, request, response, duration):
+        # Solo el nombre de la URL como etiqueta: las rutas tendrían cardinalidad ilimitada
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match and match.view_name else 'unmatched'
+        record_request(view, request.method, response.status_code, duration, getattr(request, 'perf', None))
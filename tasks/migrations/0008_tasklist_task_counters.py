@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:28
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_task_counters(apps, schema_editor):
+    """Calcula los contadores iniciales a partir de las tareas existentes."""
+    TaskList = apps.get_model('tasks', 'TaskList')
+    Task = apps.get_model('tasks', 'Task')
+    
+    def count_tasks(status=None):
+        tasks = Task.objects.filter(task_list=OuterRef('pk'))
+        if status:
+            tasks = tasks.filter(status=status)
+        return Coalesce(
+            Subquery(tasks.order_by().values('task_list').annotate(total=Count('pk')).values('total')),
+            0,
+        )
+    
+    TaskList.objects.update(
+        tasks_count=count_tasks(),
+        pending_tasks_count=count_tasks('pending'),
+        in_progress_tasks_count=count_tasks('in_progress'),
+        completed_tasks_count=count_tasks('completed'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_assigned_users'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasklist',
+            name='completed_tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Tareas completadas'),
+        ),
+        migrations.AddField(
+            model_name='tasklist',
+            name='in_progress_tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Tareas en proceso'),
+        ),
+        migrations.AddField(
+            model_name='tasklist',
+            name='pending_tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Tareas pendientes'),
+        ),
+        migrations.AddField(
+            model_name='tasklist',
+            name='tasks_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de tareas'),
+        ),
+        migrations.RunPython(populate_task_counters, migrations.RunPython.noop),
+    ]
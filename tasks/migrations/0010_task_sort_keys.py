@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:33
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, F, IntegerField, Value, When
+
+
+def populate_sort_keys(apps, schema_editor):
+    """Calcula las claves de ordenación de las tareas existentes."""
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.update(
+        priority_rank=Case(
+            When(priority='high', then=Value(1)),
+            When(priority='medium', then=Value(2)),
+            When(priority='low', then=Value(3)),
+            default=Value(4),
+            output_field=IntegerField(),
+        ),
+    )
+    Task.objects.filter(due_date__isnull=False).update(effective_due_date=F('due_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='effective_due_date',
+            field=models.DateTimeField(default=datetime.datetime(9999, 12, 31, 0, 0, tzinfo=datetime.timezone.utc), editable=False, verbose_name='Fecha límite efectiva'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=2, editable=False, verbose_name='Orden de prioridad'),
+        ),
+        migrations.RunPython(populate_sort_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['task_list', 'priority_rank', 'effective_due_date', '-created_at', '-id'], name='task_board_order_idx'),
+        ),
+    ]
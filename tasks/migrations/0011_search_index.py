@@ -0,0 +1,80 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:12
+
+from django.db import migrations
+
+
+# Índices de búsqueda tal como eran al crear la migración: tabla origen,
+# tabla auxiliar y campos en orden de relevancia. Las sentencias están
+# congeladas aquí para que la migración no dependa de tasks.services.
+SEARCH_TABLES = (
+    ('tasks_task', 'tasks_task_search', ('title', 'description')),
+    ('tasks_tasklist', 'tasks_tasklist_search', ('name', 'description')),
+    ('auth_user', 'tasks_user_search', ('username', 'first_name', 'last_name')),
+)
+
+
+def sqlite_statements():
+    """Tablas virtuales FTS5 llenadas desde la tabla origen."""
+    for source, table, fields in SEARCH_TABLES:
+        columns = ', '.join(fields)
+        values = ', '.join(f"COALESCE({field}, '')" for field in fields)
+        yield (
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} '
+            f"USING fts5({columns}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        yield f'DELETE FROM {table}'
+        yield f'INSERT INTO {table} (rowid, {columns}) SELECT id, {values} FROM {source}'
+
+
+def postgresql_statements():
+    """Tablas con un tsvector ponderado por campo e índice GIN."""
+    for source, table, fields in SEARCH_TABLES:
+        document = ' || '.join(
+            f"setweight(to_tsvector('simple', COALESCE({field}, '')), '{'ABCD'[min(i, 3)]}')"
+            for i, field in enumerate(fields)
+        )
+        yield f'CREATE TABLE IF NOT EXISTS {table} (id bigint PRIMARY KEY, document tsvector NOT NULL)'
+        yield f'CREATE INDEX IF NOT EXISTS {table}_gin ON {table} USING GIN (document)'
+        yield f'DELETE FROM {table}'
+        yield f'INSERT INTO {table} (id, document) SELECT id, {document} FROM {source}'
+
+
+def _sqlite_has_fts5(cursor):
+    cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+    return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    """Crea las tablas de búsqueda del motor de la base de datos y las llena."""
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            statements = postgresql_statements()
+        elif vendor == 'sqlite' and _sqlite_has_fts5(cursor):
+            statements = sqlite_statements()
+        else:
+            # Sin texto completo la búsqueda usa icontains y no necesita tablas
+            return
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    """Elimina las tablas de búsqueda."""
+    if schema_editor.connection.vendor not in ('postgresql', 'sqlite'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for _, table, _ in SEARCH_TABLES:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('tasks', '0010_task_sort_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
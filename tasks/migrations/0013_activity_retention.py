@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_taskactivity_event_timestamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskActivitySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('action', models.CharField(choices=[('created', 'Creada'), ('updated', 'Actualizada'), ('in_progress', 'En Proceso'), ('completed', 'Completada'), ('reopened', 'Reabierta'), ('commented', 'Comentada'), ('file_added', 'Archivo añadido'), ('file_removed', 'Archivo eliminado')], max_length=20, verbose_name='Acción')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Número de actividades')),
+                ('first_at', models.DateTimeField(verbose_name='Primera actividad')),
+                ('last_at', models.DateTimeField(verbose_name='Última actividad')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Actividad',
+                'verbose_name_plural': 'Resúmenes de Actividad',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='taskactivity',
+            index=models.Index(fields=['-timestamp'], name='activity_ts_idx'),
+        ),
+        migrations.AddField(
+            model_name='taskactivitysummary',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_summaries', to='tasks.task', verbose_name='Tarea'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskactivitysummary',
+            constraint=models.UniqueConstraint(fields=('task', 'date', 'action'), name='activity_summary_unique'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:06
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_activity_retention'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nombre del archivo')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Tamaño total')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Bytes recibidos')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 declarado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Iniciada el')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última parte el')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='tasks.task', verbose_name='Tarea')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Subido por')),
+            ],
+            options={
+                'verbose_name': 'Subida en curso',
+                'verbose_name_plural': 'Subidas en curso',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:10
+
+import django.core.validators
+import tasks.models.attachment_models
+import tasks.models.blob_models
+import tasks.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0014_attachment_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Ruta')),
+                ('sha256', models.CharField(db_index=True, max_length=64, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Tamaño')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Referencias')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creado el')),
+            ],
+            options={
+                'verbose_name': 'Blob de adjunto',
+                'verbose_name_plural': 'Blobs de adjuntos',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='attachment',
+            field=tasks.models.blob_models.ContentAddressedFileField(blank=True, null=True, storage=tasks.storage.get_blob_storage, upload_to='task_attachments/%Y/%m/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png', 'gif'])], verbose_name='Archivo adjunto'),
+        ),
+        migrations.AlterField(
+            model_name='taskattachment',
+            name='file',
+            field=tasks.models.blob_models.ContentAddressedFileField(storage=tasks.storage.get_blob_storage, upload_to=tasks.models.attachment_models.task_attachment_path, validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'jpg', 'jpeg', 'png', 'gif', 'doc', 'docx', 'txt'])], verbose_name='Archivo'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_attachment_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variantes del avatar'),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='preview',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Vista previa'),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('ready', 'Generada'), ('failed', 'Fallida'), ('unsupported', 'No disponible')], default='pending', editable=False, max_length=15, verbose_name='Estado de la vista previa'),
+        ),
+    ]
@@ -8,11 +8,17 @@ from .list_models import (
 from .task_models import (
     Task,
     TaskActivity,
+    TaskActivitySummary,
 )
 
 # Importaciones de modelos de archivos adjuntos
+from .blob_models import (
+    AttachmentBlob,
+    ContentAddressedFileField,
+)
 from .attachment_models import (
     TaskAttachment,
+    AttachmentUpload,
     task_attachment_path,
 )
 
@@ -31,9 +37,13 @@ __all__ = [
     # Modelos de tareas
     'Task',
     'TaskActivity',
+    'TaskActivitySummary',
     
     # Modelos de archivos adjuntos
+    'AttachmentBlob',
+    'ContentAddressedFileField',
     'TaskAttachment',
+    'AttachmentUpload',
     'task_attachment_path',
     
     # Modelos de usuarios
@@ -1,18 +1,35 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
 import os
+import uuid
+
+from .blob_models import ContentAddressedFileField
+
+
+# Extensiones para las que se genera miniatura o vista previa de la primera página
+PREVIEW_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.pdf']
 
 
 def task_attachment_path(instance, filename):
-    """Genera la ruta para archivos adjuntos."""
+    """
+    Genera la ruta propuesta para archivos adjuntos. ContentAddressedStorage solo
+    conserva su extensión: el archivo se guarda en blobs/ con su SHA-256.
+    """
     return f'task_attachments/{instance.task.id}/{filename}'
 
 
 class TaskAttachment(models.Model):
     """Modelo para archivos adjuntos de tareas."""
+    PREVIEW_STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('ready', 'Generada'),
+        ('failed', 'Fallida'),
+        ('unsupported', 'No disponible'),
+    ]
+    
     task = models.ForeignKey('Task', on_delete=models.CASCADE, related_name='attachments', verbose_name="Tarea")
-    file = models.FileField(
+    file = ContentAddressedFileField(
         upload_to=task_attachment_path,
         validators=[
             FileExtensionValidator(
@@ -25,12 +42,21 @@ class TaskAttachment(models.Model):
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Subido por")
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name="Subido el")
     file_size = models.PositiveIntegerField(verbose_name="Tamaño del archivo")
+    # Miniatura generada en segundo plano por media_service
+    preview = models.CharField(max_length=255, blank=True, editable=False, verbose_name="Vista previa")
+    preview_status = models.CharField(
+        max_length=15,
+        choices=PREVIEW_STATUS_CHOICES,
+        default='pending',
+        editable=False,
+        verbose_name="Estado de la vista previa",
+    )
     
     class Meta:
         verbose_name = "Archivo Adjunto"
         verbose_name_plural = "Archivos Adjuntos"
         ordering = ['-uploaded_at']
-        
+    
     def __str__(self):
         return f"{self.task.title} - {self.filename}"
     
@@ -38,9 +64,15 @@ class TaskAttachment(models.Model):
         """Guarda el archivo y actualiza el nombre y tamaño."""
         if not self.filename:
             self.filename = os.path.basename(self.file.name)
-        if self.file:
+        # El tamaño solo cambia con un archivo nuevo (size de un archivo guardado consulta el disco)
+        if self.file and (not self.file._committed or self.file_size is None):
             self.file_size = self.file.size
-        super().save(*args, **kwargs)
+            # La vista previa del archivo anterior ya no sirve
+            self.preview = ''
+            self.preview_status = 'pending' if self.get_file_extension() in PREVIEW_EXTENSIONS else 'unsupported'
+        # El blob y su contador de referencias se guardan junto con la fila
+        with transaction.atomic():
+            super().save(*args, **kwargs)
     
     def get_file_size_display(self):
         """Retorna el tamaño del archivo en formato legible."""
@@ -59,4 +91,31 @@ class TaskAttachment(models.Model):
     def is_image(self):
         """Verifica si el archivo es una imagen."""
         image_extensions = ['.jpg', '.jpeg', '.png', '.gif']
-        return self.get_file_extension() in image_extensions 
\ No newline at end of file
+        return self.get_file_extension() in image_extensions 
+
+class AttachmentUpload(models.Model):
+    """
+    Subida de un adjunto por partes en curso. Las partes se añaden en orden a un
+    archivo temporal (ver upload_service) y al finalizar se crea el TaskAttachment.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey('Task', on_delete=models.CASCADE, related_name='uploads', verbose_name="Tarea")
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Subido por")
+    filename = models.CharField(max_length=255, verbose_name="Nombre del archivo")
+    size = models.PositiveBigIntegerField(verbose_name="Tamaño total")
+    offset = models.PositiveBigIntegerField(default=0, verbose_name="Bytes recibidos")
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name="SHA-256 declarado")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Iniciada el")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última parte el")
+    
+    class Meta:
+        verbose_name = "Subida en curso"
+        verbose_name_plural = "Subidas en curso"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+    
+    @property
+    def is_complete(self):
+        return self.offset == self.size
@@ -0,0 +1,102 @@
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+
+from ..storage import blob_digest, get_blob_storage
+
+
+class AttachmentBlobQuerySet(models.QuerySet):
+    """QuerySet que mantiene el contador de referencias de los blobs."""
+    
+    def acquire(self, name, size):
+        """Suma una referencia al blob, creándolo si es la primera."""
+        blob, created = self.get_or_create(
+            name=name,
+            defaults={'sha256': blob_digest(name) or '', 'size': size, 'ref_count': 1},
+        )
+        if not created:
+            self.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        return blob
+    
+    def release(self, name):
+        """
+        Resta una referencia al blob. Sin referencias se borra la fila y, al
+        confirmar la transacción, el archivo (salvo que otra subida lo haya
+        vuelto a referenciar entretanto).
+        """
+        with transaction.atomic():
+            self.filter(name=name).update(ref_count=F('ref_count') - 1)
+            deleted, _ = self.filter(name=name, ref_count__lte=0).delete()
+        if deleted:
+            transaction.on_commit(lambda: self._delete_unreferenced_file(name))
+        return bool(deleted)
+    
+    def _delete_unreferenced_file(self, name):
+        if not self.model.objects.filter(name=name).exists():
+            get_blob_storage().delete(name)
+
+
+class AttachmentBlob(models.Model):
+    """Archivo almacenado por contenido y número de adjuntos que lo referencian."""
+    name = models.CharField(max_length=255, unique=True, verbose_name="Ruta")
+    sha256 = models.CharField(max_length=64, db_index=True, verbose_name="SHA-256")
+    size = models.PositiveBigIntegerField(verbose_name="Tamaño")
+    ref_count = models.PositiveIntegerField(default=0, verbose_name="Referencias")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado el")
+    
+    objects = AttachmentBlobQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = "Blob de adjunto"
+        verbose_name_plural = "Blobs de adjuntos"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
+class ContentAddressedFileField(models.FileField):
+    """
+    FileField guardado en ContentAddressedStorage que cuenta sus referencias en
+    AttachmentBlob: suma una al guardar un archivo nuevo, resta la del archivo
+    reemplazado y la del eliminado al borrar la fila.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('storage', get_blob_storage)
+        super().__init__(*args, **kwargs)
+    
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        if not cls._meta.abstract:
+            post_delete.connect(
+                self._release_deleted, sender=cls, weak=False,
+                dispatch_uid=f'{cls._meta.label_lower}.{name}.release_blob',
+            )
+    
+    def pre_save(self, model_instance, add):
+        file = getattr(model_instance, self.attname)
+        new_file = bool(file) and not file._committed
+        # Tamaño del contenido subido, antes de que size pase a consultar el almacenamiento
+        size = file.size if new_file else None
+        previous = None
+        if new_file and not add:
+            # Solo al reemplazar el archivo: la ruta guardada para soltar su referencia
+            previous = (
+                type(model_instance)._base_manager
+                .filter(pk=model_instance.pk)
+                .values_list(self.attname, flat=True)
+                .first()
+            )
+        
+        file = super().pre_save(model_instance, add)
+        if file and (new_file or add):
+            AttachmentBlob.objects.acquire(file.name, file.size if size is None else size)
+        if previous and previous != file.name:
+            AttachmentBlob.objects.release(previous)
+        return file
+    
+    def _release_deleted(self, sender, instance, **kwargs):
+        name = getattr(instance, self.attname).name
+        if name:
+            AttachmentBlob.objects.release(name)
@@ -1,7 +1,97 @@
 from django.db import models
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 
 
+# Contadores desnormalizados de tareas por estado
+TASK_COUNTER_FIELDS = {
+    'pending': 'pending_tasks_count',
+    'in_progress': 'in_progress_tasks_count',
+    'completed': 'completed_tasks_count',
+}
+
+# Todos los contadores de TaskList: solo se escriben con incrementos atómicos o recalculándolos
+TASK_LIST_COUNTER_FIELDS = ('tasks_count', *TASK_COUNTER_FIELDS.values())
+
+
+# Niveles de permiso sobre una lista, de menor a mayor
+PERMISSION_LEVELS = {
+    'read': 1,
+    'write': 2,
+    'owner': 3,
+}
+
+
+def task_counter_fields(status):
+    """Retorna los campos contadores afectados por una tarea con ese estado."""
+    fields = ['tasks_count']
+    if status in TASK_COUNTER_FIELDS:
+        fields.append(TASK_COUNTER_FIELDS[status])
+    return fields
+
+
+class TaskListQuerySet(models.QuerySet):
+    """QuerySet con filtros de acceso y operaciones sobre los contadores de tareas."""
+    
+    def accessible_to(self, user, min_permission='read'):
+        """
+        Listas a las que el usuario tiene al menos el permiso indicado.
+        Usa una subconsulta EXISTS en lugar de distinct() sobre el join con SharedList.
+        """
+        if min_permission not in PERMISSION_LEVELS:
+            raise ValueError(f'Permiso desconocido: {min_permission}')
+        if min_permission == 'owner':
+            return self.filter(owner=user)
+        return self.filter(Q(owner=user) | Exists(_shares_for(user, min_permission)))
+    
+    def shared_with_user(self, user, min_permission='read'):
+        """Listas de otros usuarios compartidas con el usuario."""
+        return self.filter(Exists(_shares_for(user, min_permission)))
+    
+    def apply_task_counter_deltas(self, deltas):
+        """
+        Aplica incrementos atómicos (campo -> delta) a los contadores. Los
+        descuentos se quedan en 0: un contador desviado no debe hacer fallar
+        un borrado con IntegrityError (son PositiveIntegerField).
+        """
+        updates = {
+            field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items() if delta
+        }
+        if not updates:
+            return 0
+        return self.update(**updates)
+    
+    def refresh_task_counters(self):
+        """Recalcula los contadores a partir de las tareas en un único UPDATE."""
+        from .task_models import Task
+        
+        def count_tasks(status=None):
+            tasks = Task.objects.filter(task_list=OuterRef('pk'))
+            if status:
+                tasks = tasks.filter(status=status)
+            return Coalesce(
+                Subquery(
+                    tasks.order_by().values('task_list').annotate(total=Count('pk')).values('total')
+                ),
+                0,
+            )
+        
+        updates = {'tasks_count': count_tasks()}
+        for status, field in TASK_COUNTER_FIELDS.items():
+            updates[field] = count_tasks(status)
+        return self.order_by().update(**updates)
+
+
+def _shares_for(user, min_permission='read'):
+    """Subconsulta de comparticiones de la lista externa con el usuario."""
+    shares = SharedList.objects.filter(task_list=OuterRef('pk'), shared_with=user)
+    if min_permission == 'write':
+        shares = shares.filter(permission='write')
+    return shares
+
+
 class TaskList(models.Model):
     """Modelo para listas de tareas."""
     name = models.CharField(max_length=100, verbose_name="Nombre")
@@ -11,6 +101,14 @@ class TaskList(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizado")
     color = models.CharField(max_length=7, default='#007bff', verbose_name="Color")
     
+    # Contadores mantenidos desde Task.save y la eliminación de tareas
+    tasks_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Total de tareas")
+    pending_tasks_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Tareas pendientes")
+    in_progress_tasks_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Tareas en proceso")
+    completed_tasks_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Tareas completadas")
+    
+    objects = TaskListQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Lista de Tareas"
         verbose_name_plural = "Listas de Tareas"
@@ -19,21 +117,44 @@ class TaskList(models.Model):
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        """
+        Guarda la lista sin escribir los contadores al actualizarla: un guardado
+        completo (formulario de edición, admin) pisaría los incrementos aplicados
+        desde que se cargó la instancia.
+        """
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+            kwargs['update_fields'] = [name for name in update_fields if name not in TASK_LIST_COUNTER_FIELDS]
+        super().save(*args, **kwargs)
+    
     def get_tasks_count(self):
         """Retorna el número total de tareas."""
-        return self.tasks.count()
+        return self.tasks_count
     
     def get_completed_tasks_count(self):
         """Retorna el número de tareas completadas."""
-        return self.tasks.filter(status='completed').count()
+        return self.completed_tasks_count
     
     def get_pending_tasks_count(self):
         """Retorna el número de tareas pendientes."""
-        return self.tasks.filter(status='pending').count()
+        return self.pending_tasks_count
     
     def get_in_progress_tasks_count(self):
         """Retorna el número de tareas en proceso."""
-        return self.tasks.filter(status='in_progress').count()
+        return self.in_progress_tasks_count
+    
+    def apply_task_counter_deltas(self, deltas):
+        """Aplica los incrementos en base de datos y en la instancia en memoria."""
+        TaskList.objects.filter(pk=self.pk).apply_task_counter_deltas(deltas)
+        for field, delta in deltas.items():
+            setattr(self, field, max(getattr(self, field) + delta, 0))
     
     def get_shared_with_users(self):
         """Retorna los usuarios con los que se comparte esta lista."""
@@ -58,6 +179,10 @@ class SharedList(models.Model):
         verbose_name_plural = "Listas Compartidas"
         unique_together = ['task_list', 'shared_with']
         ordering = ['-shared_at']
+        indexes = [
+            # Listas compartidas con un usuario según el permiso
+            models.Index(fields=['shared_with', 'permission'], name='sharedlist_user_perm_idx'),
+        ]
         
     def __str__(self):
         return f"{self.task_list.name} - {self.shared_with.username}"
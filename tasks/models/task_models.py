@@ -1,8 +1,77 @@
-from django.db import models
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.validators import FileExtensionValidator
 
+from .blob_models import ContentAddressedFileField
+from .list_models import TaskList, task_counter_fields
+
+
+# Orden almacenado de prioridades (menor = más prioritaria)
+PRIORITY_RANKS = {
+    'high': 1,
+    'medium': 2,
+    'low': 3,
+}
+
+# Fecha usada para ordenar al final las tareas sin fecha límite
+NO_DUE_DATE_SORT_VALUE = datetime(9999, 12, 31, tzinfo=dt_timezone.utc)
+
+# Presentación de prioridades y estados (compartida con las tarjetas de task_card_service)
+PRIORITY_COLORS = {
+    'high': '#dc3545',    # Rojo
+    'medium': '#ffc107',  # Amarillo
+    'low': '#28a745',     # Verde
+}
+STATUS_COLORS = {
+    'pending': '#6c757d',     # Gris
+    'in_progress': '#ffc107', # Amarillo
+    'completed': '#28a745',   # Verde
+}
+STATUS_ICONS = {
+    'pending': 'fas fa-clock',
+    'in_progress': 'fas fa-spinner',
+    'completed': 'fas fa-check-circle',
+}
+
+
+def apply_counter_deltas(deltas):
+    """Aplica cambios de contadores agrupados por lista ({list_id: {campo: delta}})."""
+    for task_list_id, fields in deltas.items():
+        fields = {field: delta for field, delta in fields.items() if delta}
+        if fields:
+            TaskList.objects.filter(pk=task_list_id).apply_task_counter_deltas(fields)
+
+
+class TaskQuerySet(models.QuerySet):
+    """QuerySet de tareas que mantiene los contadores de las listas en bloque."""
+    
+    def delete(self):
+        """
+        Elimina las tareas descontándolas de los contadores con un UPDATE por lista.
+        Los descuentos se calculan sobre las filas bloqueadas dentro de la misma
+        transacción, así que un cambio de estado concurrente no los desvía.
+        """
+        with transaction.atomic():
+            # FOR UPDATE no admite GROUP BY: se agrupa en Python
+            rows = self.select_for_update().order_by().values_list('task_list_id', 'status')
+            deltas = defaultdict(Counter)
+            for (task_list_id, status), total in Counter(rows.iterator()).items():
+                for field in task_counter_fields(status):
+                    deltas[task_list_id][field] -= total
+            
+            result = super().delete()
+            apply_counter_deltas(deltas)
+        return result
+    
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Task(models.Model):
     """Modelo para tareas individuales."""
@@ -24,7 +93,7 @@ class Task(models.Model):
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium', verbose_name="Prioridad")
     due_date = models.DateTimeField(null=True, blank=True, verbose_name="Fecha límite")
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pending', verbose_name="Estado")
-    attachment = models.FileField(
+    attachment = ContentAddressedFileField(
         upload_to='task_attachments/%Y/%m/',
         null=True,
         blank=True,
@@ -42,31 +111,148 @@ class Task(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Actualizado")
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name="Completada el")
     
+    # Claves de ordenación almacenadas (indexables) del tablero
+    priority_rank = models.PositiveSmallIntegerField(default=2, editable=False, verbose_name="Orden de prioridad")
+    effective_due_date = models.DateTimeField(default=NO_DUE_DATE_SORT_VALUE, editable=False, verbose_name="Fecha límite efectiva")
+    
+    objects = TaskQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Tarea"
         verbose_name_plural = "Tareas"
         ordering = ['-priority', 'due_date', '-created_at']
+        indexes = [
+            # Filtros del detalle de lista por estado y prioridad
+            models.Index(fields=['task_list', 'status'], name='task_list_status_idx'),
+            models.Index(fields=['task_list', 'priority', 'status'], name='task_list_prio_status_idx'),
+            # Tareas vencidas y próximas a vencer
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+            models.Index(
+                fields=['task_list', 'due_date'],
+                condition=models.Q(status__in=['pending', 'in_progress']),
+                name='task_open_due_idx',
+            ),
+            # Orden del tablero y paginación por cursor
+            models.Index(
+                fields=['task_list', 'priority_rank', 'effective_due_date', '-created_at', '-id'],
+                name='task_board_order_idx',
+            ),
+        ]
+    
+    # Lista y estado con los que la tarea figura en los contadores de TaskList
+    _counter_state = None
         
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_counter_state()
+        return instance
+    
     def save(self, *args, **kwargs):
-        """Guarda la tarea y actualiza la fecha de completado."""
+        """Guarda la tarea, actualiza la fecha de completado y los contadores de la lista."""
         # Sincronizar los campos durante la migración
         if self.status == 'completed' and not self.completed_at:
             self.completed_at = timezone.now()
         elif self.status != 'completed' and self.completed_at:
             self.completed_at = None
-        super().save(*args, **kwargs)
+        
+        self.sync_sort_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'priority' in update_fields:
+                update_fields.add('priority_rank')
+            if 'due_date' in update_fields:
+                update_fields.add('effective_due_date')
+            kwargs['update_fields'] = update_fields
+        
+        counter_deltas = self._get_counter_deltas(update_fields)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._apply_counter_deltas(counter_deltas)
+        self._remember_counter_state()
+    
+    def delete(self, *args, **kwargs):
+        """Elimina la tarea; el receptor de post_delete descuenta el estado guardado."""
+        # Los receptores de post_delete (contadores, eventos, blobs) leen campos que
+        # después del DELETE ya no se pueden cargar
+        deferred = self.get_deferred_fields()
+        if deferred:
+            self._resolve_counter_state()
+            self.refresh_from_db(fields=deferred)
+        return super().delete(*args, **kwargs)
+    
+    def sync_sort_keys(self):
+        """Actualiza las claves de ordenación almacenadas a partir de prioridad y fecha."""
+        self.priority_rank = PRIORITY_RANKS.get(self.priority, len(PRIORITY_RANKS) + 1)
+        self.effective_due_date = self.due_date or NO_DUE_DATE_SORT_VALUE
+    
+    def _remember_counter_state(self):
+        """Guarda la lista y el estado actuales sin disparar consultas por campos diferidos."""
+        self._counter_state = (self.__dict__.get('task_list_id'), self.__dict__.get('status'))
+    
+    def _resolve_counter_state(self):
+        """
+        Completa el estado recordado si la lista o el estado estaban diferidos al
+        cargar la tarea (.only()/.defer()): los contadores reflejan el valor
+        guardado, no el que se haya asignado después. Retorna el estado.
+        """
+        state = self._counter_state
+        if state is None or None not in state or self.pk is None:
+            return state
+        stored = type(self)._base_manager.filter(pk=self.pk).values_list('task_list_id', 'status').first()
+        if stored is not None:
+            self._counter_state = tuple(
+                value if remembered is None else remembered for remembered, value in zip(state, stored)
+            )
+        return self._counter_state
+    
+    def _get_counter_deltas(self, update_fields=None):
+        """Calcula los cambios de contadores por lista que implica guardar la tarea."""
+        new_state = (self.task_list_id, self.status)
+        deltas = defaultdict(Counter)
+        
+        if self._state.adding:
+            for field in task_counter_fields(new_state[1]):
+                deltas[new_state[0]][field] += 1
+            return deltas
+        
+        old_state = self._resolve_counter_state()
+        if old_state is None or None in old_state:
+            return deltas
+        
+        # Con update_fields solo se persisten los campos indicados
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            new_list = new_state[0] if update_fields & {'task_list', 'task_list_id'} else old_state[0]
+            new_status = new_state[1] if 'status' in update_fields else old_state[1]
+            new_state = (new_list, new_status)
+        
+        if old_state != new_state:
+            for field in task_counter_fields(old_state[1]):
+                deltas[old_state[0]][field] -= 1
+            for field in task_counter_fields(new_state[1]):
+                deltas[new_state[0]][field] += 1
+        return deltas
+    
+    def _apply_counter_deltas(self, deltas):
+        """Aplica los cambios de contadores, actualizando también la lista en memoria."""
+        cached_list = self._meta.get_field('task_list').get_cached_value(self, None)
+        for task_list_id, fields in deltas.items():
+            fields = {field: delta for field, delta in fields.items() if delta}
+            if not fields:
+                continue
+            if cached_list is not None and cached_list.pk == task_list_id:
+                cached_list.apply_task_counter_deltas(fields)
+            else:
+                TaskList.objects.filter(pk=task_list_id).apply_task_counter_deltas(fields)
     
     def get_priority_color(self):
         """Retorna el color asociado a la prioridad."""
-        colors = {
-            'high': '#dc3545',    # Rojo
-            'medium': '#ffc107',  # Amarillo
-            'low': '#28a745',     # Verde
-        }
-        return colors.get(self.priority, '#6c757d')
+        return PRIORITY_COLORS.get(self.priority, '#6c757d')
     
     def get_priority_display_class(self):
         """Retorna la clase CSS para mostrar la prioridad."""
@@ -79,12 +265,7 @@ class Task(models.Model):
     
     def get_status_color(self):
         """Retorna el color asociado al estado."""
-        colors = {
-            'pending': '#6c757d',     # Gris
-            'in_progress': '#ffc107', # Amarillo
-            'completed': '#28a745',   # Verde
-        }
-        return colors.get(self.status, '#6c757d')
+        return STATUS_COLORS.get(self.status, '#6c757d')
     
     def get_status_display_class(self):
         """Retorna la clase CSS para mostrar el estado."""
@@ -97,12 +278,7 @@ class Task(models.Model):
     
     def get_status_icon(self):
         """Retorna el ícono asociado al estado."""
-        icons = {
-            'pending': 'fas fa-clock',
-            'in_progress': 'fas fa-spinner',
-            'completed': 'fas fa-check-circle',
-        }
-        return icons.get(self.status, 'fas fa-question')
+        return STATUS_ICONS.get(self.status, 'fas fa-question')
     
     def is_overdue(self):
         """Verifica si la tarea está vencida."""
@@ -143,6 +319,26 @@ class Task(models.Model):
         return self.assigned_users.filter(id=user.id).exists()
 
 
+@receiver(post_delete, sender=Task)
+def decrement_task_list_counters(sender, instance, origin=None, **kwargs):
+    """Descuenta la tarea eliminada de los contadores de su lista."""
+    task_list_id, status = instance._counter_state or (instance.task_list_id, instance.status)
+    
+    # Si se está eliminando la propia lista no hay contadores que mantener
+    if isinstance(origin, TaskList) and origin.pk == task_list_id:
+        return
+    if isinstance(origin, models.QuerySet) and origin.model is TaskList:
+        return
+    # TaskQuerySet.delete ya descontó las tareas en bloque
+    if isinstance(origin, TaskQuerySet):
+        return
+    
+    deltas = defaultdict(Counter)
+    for field in task_counter_fields(status):
+        deltas[task_list_id][field] -= 1
+    instance._apply_counter_deltas(deltas)
+
+
 class TaskActivity(models.Model):
     """Modelo para registrar actividades en las tareas."""
     ACTION_CHOICES = [
@@ -160,12 +356,40 @@ class TaskActivity(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Usuario")
     action = models.CharField(max_length=20, choices=ACTION_CHOICES, verbose_name="Acción")
     description = models.TextField(blank=True, verbose_name="Descripción")
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Fecha y hora")
+    # Con default (no auto_now_add) para conservar la hora del evento al escribirlo en diferido
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Fecha y hora")
     
     class Meta:
         verbose_name = "Actividad de Tarea"
         verbose_name_plural = "Actividades de Tareas"
         ordering = ['-timestamp']
+        indexes = [
+            # Historial de una tarea, más recientes primero
+            models.Index(fields=['task', '-timestamp'], name='activity_task_ts_idx'),
+            # Actividad reciente global y compactación por rango de fechas
+            models.Index(fields=['-timestamp'], name='activity_ts_idx'),
+        ]
         
     def __str__(self):
-        return f"{self.task.title} - {self.get_action_display()}" 
\ No newline at end of file
+        return f"{self.task.title} - {self.get_action_display()}" 
+
+
+class TaskActivitySummary(models.Model):
+    """Resumen diario por tarea y acción de las actividades ya compactadas."""
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='activity_summaries', verbose_name="Tarea")
+    date = models.DateField(verbose_name="Fecha")
+    action = models.CharField(max_length=20, choices=TaskActivity.ACTION_CHOICES, verbose_name="Acción")
+    count = models.PositiveIntegerField(default=0, verbose_name="Número de actividades")
+    first_at = models.DateTimeField(verbose_name="Primera actividad")
+    last_at = models.DateTimeField(verbose_name="Última actividad")
+    
+    class Meta:
+        verbose_name = "Resumen de Actividad"
+        verbose_name_plural = "Resúmenes de Actividad"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'date', 'action'], name='activity_summary_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.task.title} - {self.date} - {self.get_action_display()} ({self.count})"
@@ -1,20 +1,24 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-
 
 def user_profile_path(instance, filename):
     """Genera la ruta para avatares de usuarios."""
     return f'profile_avatars/{instance.user.id}/{filename}'
 
 
+def avatar_variant_url(avatar, variants, size):
+    """
+    URL de una variante ya generada del avatar a partir de los valores guardados
+    (ruta del avatar y avatar_variants), o None si aún no existe.
+    """
+    variant = (variants or {}).get(size)
+    return default_storage.url(variant) if avatar and variant else None
+
+
 class Profile(models.Model):
     """Modelo para extender el modelo User con información adicional."""
     user = models.OneToOneField(User, on_delete=models.CASCADE, verbose_name="Usuario")
@@ -25,6 +29,8 @@ class Profile(models.Model):
         verbose_name="Avatar",
         help_text="Imagen de perfil del usuario (opcional)"
     )
+    # Variantes del avatar ({tamaño: ruta}) generadas en segundo plano por media_service
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Variantes del avatar")
     bio = models.TextField(blank=True, max_length=500, verbose_name="Biografía")
     phone = models.CharField(max_length=20, blank=True, verbose_name="Teléfono")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado")
@@ -33,48 +39,126 @@ class Profile(models.Model):
     class Meta:
         verbose_name = "Perfil de Usuario"
         verbose_name_plural = "Perfiles de Usuarios"
-        
+    
+    # Campos cuyo cambio se detecta al guardar (updated_at y created_at los gestiona Django)
+    TRACKED_FIELDS = ('user_id', 'avatar', 'avatar_variants', 'bio', 'phone')
+    
+    _loaded_values = None
+    
     def __str__(self):
         return f"Perfil de {self.user.username}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+    
+    def _tracked_values(self):
+        """Valores actuales de TRACKED_FIELDS sin disparar consultas por campos diferidos."""
+        values = {}
+        for name in self.TRACKED_FIELDS:
+            if name not in self.__dict__:
+                continue
+            value = self.__dict__[name]
+            if name == 'avatar':
+                # Un archivo sin confirmar es siempre un cambio, aunque repita el nombre
+                value = (value.name, value._committed) if hasattr(value, '_committed') else (value, True)
+            elif name == 'avatar_variants':
+                value = dict(value or {})
+            values[name] = value
+        return values
+    
+    def _remember_loaded_values(self):
+        self._loaded_values = self._tracked_values()
+    
+    def get_dirty_fields(self):
+        """
+        Nombres de los campos que difieren de los leídos de la base de datos.
+        Sin estado cargado (instancia nueva) se consideran todos modificados.
+        """
+        current = self._tracked_values()
+        if self._state.adding or self._loaded_values is None:
+            return set(current)
+        return {
+            name for name, value in current.items()
+            if name not in self._loaded_values or self._loaded_values[name] != value
+        }
+    
+    def avatar_changed(self):
+        """Indica si el avatar cambió respecto al guardado."""
+        return 'avatar' in self.get_dirty_fields()
+    
     def save(self, *args, **kwargs):
-        """Guarda el perfil y redimensiona el avatar si es necesario."""
-        super().save(*args, **kwargs)
+        """
+        Guarda solo los campos modificados; sin cambios no se consulta la base de
+        datos. Con un avatar nuevo se descartan sus variantes: el redimensionado
+        lo hace media_service fuera de la request.
+        """
+        if self.avatar_changed():
+            self.avatar_variants = {}
         
-        # Redimensionar avatar si existe y PIL está disponible
-        if self.avatar and PIL_AVAILABLE:
-            try:
-                img = Image.open(self.avatar.path)
-                if img.height > 300 or img.width > 300:
-                    output_size = (300, 300)
-                    img.thumbnail(output_size)
-                    img.save(self.avatar.path)
-            except Exception:
-                pass  # Si no se puede redimensionar, continuar
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                return
+            kwargs['update_fields'] = [
+                'user' if name == 'user_id' else name for name in sorted(dirty)
+            ] + ['updated_at']
+        super().save(*args, **kwargs)
+        self._remember_loaded_values()
     
-    def get_avatar_url(self):
-        """Retorna la URL del avatar o una imagen por defecto."""
+    def get_avatar_url(self, size=None):
+        """
+        Retorna la URL del avatar (de la variante indicada de AVATAR_SIZES si ya
+        está generada) o una imagen por defecto.
+        """
         if self.avatar:
+            variant = self.avatar_variants.get(size) if size else None
+            if variant:
+                return default_storage.url(variant)
             return self.avatar.url
         return '/static/img/default-avatar.svg'
+    
+    @property
+    def small_avatar_url(self):
+        """URL de la variante pequeña del avatar, o None si aún no existe."""
+        return avatar_variant_url(self.avatar, self.avatar_variants, 'small')
 
 
 # Señales para crear automáticamente un perfil cuando se crea un usuario
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
     """Crea un perfil automáticamente cuando se crea un usuario."""
-    if created:
-        Profile.objects.get_or_create(user=instance)
+    if created and not raw:
+        instance.profile = Profile.objects.create(user=instance)
+
+
+# Guardados parciales del usuario al hacer login (update_last_login)
+LOGIN_UPDATE_FIELDS = frozenset({'last_login'})
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Guarda el perfil cuando se guarda un usuario."""
-    try:
-        if hasattr(instance, 'profile'):
-            instance.profile.save()
-        else:
-            Profile.objects.get_or_create(user=instance)
-    except Exception:
-        # Si hay algún error, crear el perfil básico
-        Profile.objects.get_or_create(user=instance) 
\ No newline at end of file
+def save_user_profile(sender, instance, created, raw=False, update_fields=None, using=None, **kwargs):
+    """
+    Guarda el perfil cuando se guarda un usuario si ya está cargado en la
+    instancia y tiene cambios; si no está cargado lo crea cuando falta (usuarios
+    anteriores a la señal o cargados desde fixtures). El login (last_login) no
+    consulta ni escribe el perfil.
+    """
+    if raw:
+        # Al confirmar la carga: el fixture puede traer sus propios perfiles
+        transaction.on_commit(
+            lambda: Profile.objects.using(using).get_or_create(user_id=instance.pk), using=using,
+        )
+        return
+    if created:
+        return
+    
+    relation = Profile.user.field.remote_field
+    profile = relation.get_cached_value(instance, None)
+    if profile is not None:
+        profile.save()
+    elif update_fields is None or not set(update_fields) <= LOGIN_UPDATE_FIELDS:
+        profile, _ = Profile.objects.using(using).get_or_create(user=instance)
+        relation.set_cached_value(instance, profile)
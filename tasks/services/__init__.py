@@ -0,0 +1,296 @@
+# Importaciones de servicios de estadísticas
+from .stats_service import (
+    OPEN_STATUSES,
+    get_task_counts,
+    aget_task_counts,
+    get_user_task_counts,
+    aget_user_task_counts,
+    get_list_task_counts,
+    aget_list_task_counts,
+    get_next_due_change,
+    get_user_next_due_change,
+    get_user_overdue_tasks,
+    get_user_upcoming_tasks,
+    get_user_recent_activities,
+)
+
+# Importaciones de servicios de permisos
+from .permission_service import (
+    load_list_permissions,
+    aload_list_permissions,
+    get_list_permissions,
+    aget_list_permissions,
+    invalidate_list_permissions,
+    get_list_permission,
+    has_list_permission,
+    ahas_list_permission,
+)
+
+# Importaciones de servicios de consulta y paginación de tareas
+from .task_query_service import (
+    TASK_BOARD_ORDERING,
+    filter_tasks,
+)
+from .pagination import (
+    InvalidCursor,
+    KeysetPage,
+    KeysetPaginator,
+)
+from .task_card_service import (
+    CARD_ASSIGNED_USERS,
+    TaskCard,
+    annotate_task_cards,
+    build_task_cards,
+    task_card_rows,
+)
+
+# Importaciones de servicios de búsqueda de texto completo
+from .search_service import (
+    SEARCH_INDEXES,
+    get_search_backend,
+    search_queryset,
+    update_search_index,
+    remove_from_search_index,
+    rebuild_search_index,
+)
+
+# Importaciones de servicios del registro de actividad
+from .activity_service import (
+    ACTIVITY_LOG_MODES,
+    activity_event,
+    record_activity,
+    record_activities,
+    flush_activity_log,
+    get_activity_writer,
+)
+
+# Importaciones de servicios de retención del historial de actividad
+from .activity_retention_service import (
+    activity_archive_path,
+    read_activity_archive,
+    compact_activities,
+    get_activity_retention_cutoff,
+)
+
+# Importaciones de servicios de entrega de archivos adjuntos
+from .delivery_service import (
+    ATTACHMENT_DELIVERY_MODES,
+    attachment_etag,
+    attachment_response,
+    preview_response,
+    parse_range,
+)
+
+# Importaciones de servicios de variantes de imágenes y vistas previas
+from .media_service import (
+    MEDIA_PIPELINE_MODES,
+    AVATAR_SIZES,
+    generate_attachment_preview,
+    generate_avatar_variants,
+    enqueue_media_job,
+    process_media_job,
+    pending_media_jobs,
+    get_media_worker,
+)
+
+# Importaciones de servicios de almacenamiento por contenido
+from .blob_service import (
+    blob_references,
+    dedupe_attachments,
+    collect_blob_garbage,
+)
+
+# Importaciones de servicios de subida de adjuntos por partes
+from .upload_service import (
+    UploadError,
+    start_upload,
+    write_chunk,
+    finalize_upload,
+    abort_upload,
+    cleanup_uploads,
+)
+
+# Importaciones de servicios de caché del dashboard
+from .cache_service import (
+    DashboardCache,
+    ListCache,
+    dashboard_cache_enabled,
+    invalidate_dashboard_lists,
+    invalidate_dashboard_users,
+    get_dashboard_cache_metrics,
+    reset_dashboard_cache_metrics,
+)
+
+# Importaciones de servicios de eventos en vivo
+from .push_service import (
+    get_push_broker,
+    push_enabled,
+    publish_events,
+    list_channel,
+    user_channel,
+)
+
+# Importaciones de servicios de operaciones masivas
+from .bulk_service import (
+    BULK_ACTIONS,
+    BulkOperationError,
+    apply_bulk_operations,
+)
+
+# Importaciones de servicios de sesiones
+from .session_service import (
+    SESSION_CLEANUP_MODES,
+    clear_expired_sessions,
+    schedule_session_cleanup,
+)
+
+# Importaciones de servicios de instrumentación de rendimiento
+from .perf_service import (
+    RequestProfile,
+    get_request_profile,
+    sql_shape,
+)
+
+# Importaciones de servicios de métricas
+from .metrics_service import (
+    METRICS,
+    get_metrics_registry,
+    metrics_enabled,
+    metrics_access_allowed,
+    record_request,
+    record_attachment_bytes,
+    render_metrics,
+    reset_metrics,
+)
+
+# Lista de todos los servicios disponibles
+__all__ = [
+    # Servicios de estadísticas
+    'OPEN_STATUSES',
+    'get_task_counts',
+    'aget_task_counts',
+    'get_user_task_counts',
+    'aget_user_task_counts',
+    'get_list_task_counts',
+    'aget_list_task_counts',
+    'get_next_due_change',
+    'get_user_next_due_change',
+    'get_user_overdue_tasks',
+    'get_user_upcoming_tasks',
+    'get_user_recent_activities',
+    
+    # Servicios de permisos
+    'load_list_permissions',
+    'aload_list_permissions',
+    'get_list_permissions',
+    'aget_list_permissions',
+    'invalidate_list_permissions',
+    'get_list_permission',
+    'has_list_permission',
+    'ahas_list_permission',
+    
+    # Servicios de consulta y paginación de tareas
+    'TASK_BOARD_ORDERING',
+    'filter_tasks',
+    'InvalidCursor',
+    'KeysetPage',
+    'KeysetPaginator',
+    'CARD_ASSIGNED_USERS',
+    'TaskCard',
+    'annotate_task_cards',
+    'build_task_cards',
+    'task_card_rows',
+    
+    # Servicios de búsqueda de texto completo
+    'SEARCH_INDEXES',
+    'get_search_backend',
+    'search_queryset',
+    'update_search_index',
+    'remove_from_search_index',
+    'rebuild_search_index',
+    
+    # Servicios del registro de actividad
+    'ACTIVITY_LOG_MODES',
+    'activity_event',
+    'record_activity',
+    'record_activities',
+    'flush_activity_log',
+    'get_activity_writer',
+    
+    # Servicios de retención del historial de actividad
+    'activity_archive_path',
+    'read_activity_archive',
+    'compact_activities',
+    'get_activity_retention_cutoff',
+    
+    # Servicios de entrega de archivos adjuntos
+    'ATTACHMENT_DELIVERY_MODES',
+    'attachment_etag',
+    'attachment_response',
+    'preview_response',
+    'parse_range',
+    
+    # Servicios de variantes de imágenes y vistas previas
+    'MEDIA_PIPELINE_MODES',
+    'AVATAR_SIZES',
+    'generate_attachment_preview',
+    'generate_avatar_variants',
+    'enqueue_media_job',
+    'process_media_job',
+    'pending_media_jobs',
+    'get_media_worker',
+    
+    # Servicios de almacenamiento por contenido
+    'blob_references',
+    'dedupe_attachments',
+    'collect_blob_garbage',
+    
+    # Servicios de subida de adjuntos por partes
+    'UploadError',
+    'start_upload',
+    'write_chunk',
+    'finalize_upload',
+    'abort_upload',
+    'cleanup_uploads',
+    
+    # Servicios de caché del dashboard
+    'DashboardCache',
+    'ListCache',
+    'dashboard_cache_enabled',
+    'invalidate_dashboard_lists',
+    'invalidate_dashboard_users',
+    'get_dashboard_cache_metrics',
+    'reset_dashboard_cache_metrics',
+    
+    # Servicios de eventos en vivo
+    'get_push_broker',
+    'push_enabled',
+    'publish_events',
+    'list_channel',
+    'user_channel',
+    
+    # Servicios de operaciones masivas
+    'BULK_ACTIONS',
+    'BulkOperationError',
+    'apply_bulk_operations',
+    
+    # Servicios de sesiones
+    'SESSION_CLEANUP_MODES',
+    'clear_expired_sessions',
+    'schedule_session_cleanup',
+    
+    # Servicios de instrumentación de rendimiento
+    'RequestProfile',
+    'get_request_profile',
+    'sql_shape',
+    
+    # Servicios de métricas
+    'METRICS',
+    'get_metrics_registry',
+    'metrics_enabled',
+    'metrics_access_allowed',
+    'record_request',
+    'record_attachment_bytes',
+    'render_metrics',
+    'reset_metrics',
+]
@@ -0,0 +1,143 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import TaskActivity, TaskActivitySummary
+
+
+# Directorio de los archivos de actividad, relativo a MEDIA_ROOT
+ACTIVITY_ARCHIVE_DIR = 'activity_archive'
+
+# Campos de cada actividad archivada
+ARCHIVE_FIELDS = ('id', 'task_id', 'user_id', 'action', 'description', 'timestamp')
+
+
+def activity_archive_path(year, month):
+    """Ruta del archivo JSONL comprimido de un mes."""
+    return os.path.join(
+        settings.MEDIA_ROOT, ACTIVITY_ARCHIVE_DIR, f'{year:04d}', f'{year:04d}-{month:02d}.jsonl.gz'
+    )
+
+
+def read_activity_archive(year, month):
+    """
+    Lee las actividades archivadas de un mes (sin duplicados por id).
+    Cada ejecución de la compactación añade un miembro gzip al final del fichero.
+    """
+    path = activity_archive_path(year, month)
+    if not os.path.exists(path):
+        return []
+    activities = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            row = json.loads(line)
+            activities[row['id']] = row
+    return sorted(activities.values(), key=lambda row: (row['timestamp'], row['id']))
+
+
+def _month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value):
+    return _month_start(_month_start(value) + timedelta(days=32))
+
+
+def _archive_rows(rows, month):
+    """Añade las filas al archivo del mes y lo sincroniza a disco antes de borrarlas."""
+    path = activity_archive_path(month.year, month.month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as archive:
+            for row in rows:
+                row = dict(row, timestamp=row['timestamp'].isoformat())
+                archive.write((json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8'))
+        raw.flush()
+        os.fsync(raw.fileno())
+    return path
+
+
+def _merge_summaries(rows):
+    """Suma las filas a los resúmenes diarios (task, fecha, acción). Retorna los creados."""
+    buckets = {}
+    for row in rows:
+        key = (row['task_id'], timezone.localtime(row['timestamp']).date(), row['action'])
+        count, first_at, last_at = buckets.get(key, (0, row['timestamp'], row['timestamp']))
+        buckets[key] = (count + 1, min(first_at, row['timestamp']), max(last_at, row['timestamp']))
+    
+    existing = {
+        (summary.task_id, summary.date, summary.action): summary
+        for summary in TaskActivitySummary.objects.filter(
+            task_id__in={key[0] for key in buckets},
+            date__in={key[1] for key in buckets},
+        )
+    }
+    
+    to_create, to_update = [], []
+    for key, (count, first_at, last_at) in buckets.items():
+        summary = existing.get(key)
+        if summary is None:
+            to_create.append(TaskActivitySummary(
+                task_id=key[0], date=key[1], action=key[2],
+                count=count, first_at=first_at, last_at=last_at,
+            ))
+        else:
+            summary.count += count
+            summary.first_at = min(summary.first_at, first_at)
+            summary.last_at = max(summary.last_at, last_at)
+            to_update.append(summary)
+    
+    TaskActivitySummary.objects.bulk_create(to_create)
+    TaskActivitySummary.objects.bulk_update(to_update, ['count', 'first_at', 'last_at'])
+    return len(to_create)
+
+
+def compact_activities(before, archive=True, batch_size=5000):
+    """
+    Compacta las actividades anteriores a la fecha indicada, mes a mes y por lotes:
+    las archiva (opcional), las suma a los resúmenes diarios y las elimina de la
+    tabla activa. Retorna un diccionario con los totales.
+    """
+    stats = {'compacted': 0, 'summaries': 0, 'archives': set()}
+    oldest = TaskActivity.objects.filter(timestamp__lt=before).order_by('timestamp').values_list('timestamp', flat=True).first()
+    if oldest is None:
+        stats['archives'] = []
+        return stats
+    
+    month = _month_start(timezone.localtime(oldest))
+    while month < before:
+        end = min(_next_month(month), before)
+        last_id = 0
+        while True:
+            rows = list(
+                TaskActivity.objects.filter(timestamp__gte=month, timestamp__lt=end, id__gt=last_id)
+                .order_by('id').values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            
+            # El archivo se escribe antes de borrar; si la transacción falla las
+            # filas se volverán a archivar y read_activity_archive las deduplica
+            if archive:
+                stats['archives'].add(_archive_rows(rows, month))
+            with transaction.atomic():
+                stats['summaries'] += _merge_summaries(rows)
+                TaskActivity.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            stats['compacted'] += len(rows)
+        month = end
+    
+    stats['archives'] = sorted(stats['archives'])
+    return stats
+
+
+def get_activity_retention_cutoff(days=None, now=None):
+    """Fecha a partir de la cual las actividades se conservan en la tabla activa."""
+    if days is None:
+        days = getattr(settings, 'ACTIVITY_RETENTION_DAYS', 90)
+    return (now or timezone.now()) - timedelta(days=days)
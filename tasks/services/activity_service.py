@@ -0,0 +1,308 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.utils import timezone
+
+from ..models import Task, TaskActivity
+from .cache_service import invalidate_dashboard_lists
+
+
+logger = logging.getLogger(__name__)
+
+# Modos del registro de actividad
+ACTIVITY_LOG_MODES = ('sync', 'request', 'background')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def activity_event(task, user, action, description='', mentions=None):
+    """
+    Construye un evento de actividad serializable.
+    mentions es una lista de (plantilla, usuarios): los nombres se resuelven al
+    escribir el lote con una sola consulta y se insertan en {users} de la plantilla.
+    """
+    return {
+        'task_id': getattr(task, 'pk', task),
+        'user_id': getattr(user, 'pk', user),
+        'action': action,
+        'description': description,
+        'mentions': [
+            [template, [getattr(u, 'pk', u) for u in users]]
+            for template, users in (mentions or []) if users
+        ],
+        'timestamp': timezone.now().isoformat(),
+    }
+
+
+def build_activities(events):
+    """Convierte eventos en instancias de TaskActivity resolviendo nombres en bloque."""
+    user_ids = {user_id for event in events for _, ids in event['mentions'] for user_id in ids}
+    users = User.objects.in_bulk(user_ids) if user_ids else {}
+    
+    activities = []
+    for event in events:
+        description = event['description']
+        for template, ids in event['mentions']:
+            names = [
+                users[user_id].get_full_name() or users[user_id].username
+                for user_id in ids if user_id in users
+            ]
+            if names:
+                description += template.format(users=', '.join(names))
+        activities.append(TaskActivity(
+            task_id=event['task_id'],
+            user_id=event['user_id'],
+            action=event['action'],
+            description=description,
+            timestamp=datetime.fromisoformat(event['timestamp']),
+        ))
+    return activities
+
+
+def write_activities(events):
+    """Escribe los eventos con un único bulk_create, omitiendo tareas ya eliminadas."""
+    if not events:
+        return []
+    existing = dict(Task.objects.filter(
+        pk__in={event['task_id'] for event in events}
+    ).values_list('pk', 'task_list_id'))
+    events = [event for event in events if event['task_id'] in existing]
+    activities = TaskActivity.objects.bulk_create(build_activities(events))
+    # bulk_create no envía post_save: invalidar aquí la actividad reciente del dashboard
+    invalidate_dashboard_lists({existing[event['task_id']] for event in events})
+    return activities
+
+
+class ActivitySpool:
+    """
+    Cola local en disco (JSON por líneas) para que los eventos sobrevivan a la
+    caída del proceso. Cada proceso escribe en su propio fichero; al vaciar el
+    buffer el fichero activo se rota a un lote que se borra tras escribirlo en BD.
+    Los ficheros de procesos muertos se reclaman renombrándolos (operación atómica).
+    """
+    
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pid = os.getpid()
+        self.sequence = 0
+        self.fsync = _setting('ACTIVITY_SPOOL_FSYNC', False)
+        self.file = None
+        # Ficheros con nuestro pid de un proceso anterior (pid reutilizado tras reiniciar)
+        self.leftovers = sorted(self.directory.glob(f'{self.pid}.*.jsonl'))
+    
+    @property
+    def active_path(self):
+        return self.directory / f'{self.pid}.active.jsonl'
+    
+    def append(self, events):
+        """Añade eventos al fichero activo."""
+        if self.file is None:
+            self.file = open(self.active_path, 'a', encoding='utf-8')
+        for event in events:
+            self.file.write(json.dumps(event) + '\n')
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+    
+    def rotate(self):
+        """Cierra el fichero activo y lo convierte en lote. Retorna su ruta o None."""
+        if self.file is None:
+            return None
+        self.file.close()
+        self.file = None
+        self.sequence += 1
+        batch_path = self.directory / f'{self.pid}.{self.sequence}.batch.jsonl'
+        os.replace(self.active_path, batch_path)
+        return batch_path
+    
+    def orphans(self):
+        """Reclama los ficheros de procesos que ya no existen. Retorna [(ruta, eventos)]."""
+        claimed = []
+        candidates, self.leftovers = self.leftovers, []
+        for path in sorted(self.directory.glob('*.jsonl')):
+            owner = path.name.split('.', 1)[0]
+            if owner.isdigit() and int(owner) != self.pid and not _pid_alive(int(owner)):
+                candidates.append(path)
+        
+        for path in candidates:
+            target = self.directory / f'{self.pid}.recovered.{path.name}'
+            try:
+                os.replace(path, target)
+            except FileNotFoundError:
+                continue  # Otro proceso lo reclamó antes
+            claimed.append((target, read_spool_file(target)))
+        return claimed
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_spool_file(path):
+    """Lee los eventos de un fichero de la cola ignorando una última línea truncada."""
+    events = []
+    with open(path, encoding='utf-8') as spool_file:
+        for line in spool_file:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                logger.warning('Línea de actividad corrupta descartada en %s', path)
+    return events
+
+
+class ActivityWriter:
+    """
+    Buffer de eventos de actividad del proceso.
+    En modo request se vacía al terminar cada request; en modo background un hilo
+    lo vacía cada ACTIVITY_FLUSH_INTERVAL segundos o al llegar a ACTIVITY_FLUSH_SIZE.
+    """
+    
+    def __init__(self):
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.buffer = []
+        # Lotes pendientes de escribir: (ruta del fichero o None, eventos)
+        self.batches = deque()
+        spool_dir = _setting('ACTIVITY_SPOOL_DIR', None)
+        self.spool = ActivitySpool(spool_dir) if spool_dir else None
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.next_recovery = 0
+    
+    def add(self, events):
+        """Añade eventos al buffer (y a la cola en disco)."""
+        with self.lock:
+            if self.spool:
+                self.spool.append(events)
+            self.buffer.extend(events)
+            pending = len(self.buffer)
+        if _setting('ACTIVITY_LOG_MODE', 'sync') == 'background':
+            self.ensure_thread()
+            if pending >= _setting('ACTIVITY_FLUSH_SIZE', 200):
+                self.wakeup.set()
+    
+    def flush(self):
+        """Escribe en BD el buffer, los lotes pendientes y los ficheros huérfanos."""
+        with self.flush_lock:
+            with self.lock:
+                if self.buffer:
+                    path = self.spool.rotate() if self.spool else None
+                    self.batches.append((path, self.buffer))
+                    self.buffer = []
+            if self.spool and time.monotonic() >= self.next_recovery:
+                self.batches.extend(self.spool.orphans())
+                self.next_recovery = time.monotonic() + _setting('ACTIVITY_RECOVERY_INTERVAL', 60)
+            
+            written = 0
+            while self.batches:
+                path, events = self.batches[0]
+                try:
+                    written += len(write_activities(events))
+                except Exception:
+                    # El lote se conserva (en memoria y en disco) y se reintenta después
+                    logger.exception('No se pudo escribir un lote de %d actividades', len(events))
+                    break
+                self.batches.popleft()
+                if path:
+                    path.unlink(missing_ok=True)
+            return written
+    
+    def ensure_thread(self):
+        """Arranca el hilo de vaciado si no está en marcha."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='activity-writer', daemon=True)
+                self.thread.start()
+    
+    def run(self):
+        while True:
+            self.wakeup.wait(_setting('ACTIVITY_FLUSH_INTERVAL', 2.0))
+            self.wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # El hilo tiene su propia conexión: no dejarla abierta entre vaciados
+                connections.close_all()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_activity_writer():
+    """Retorna el writer del proceso (uno nuevo tras un fork)."""
+    global _writer
+    if _writer is None or _writer.pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer.pid != os.getpid():
+                _writer = ActivityWriter()
+    return _writer
+
+
+def record_activities(events):
+    """
+    Registra eventos de actividad según ACTIVITY_LOG_MODE.
+    En modo sync se escriben en el momento (dentro de la transacción actual);
+    en los modos diferidos se encolan cuando la transacción confirma.
+    """
+    if not events:
+        return
+    mode = _setting('ACTIVITY_LOG_MODE', 'sync')
+    if mode == 'sync':
+        write_activities(events)
+    elif mode in ACTIVITY_LOG_MODES:
+        transaction.on_commit(lambda: get_activity_writer().add(events))
+    else:
+        raise ValueError(f'ACTIVITY_LOG_MODE desconocido: {mode}')
+
+
+def record_activity(task, user, action, description='', mentions=None):
+    """Registra una actividad de tarea (ver activity_event)."""
+    record_activities([activity_event(task, user, action, description, mentions)])
+
+
+def flush_activity_log(**kwargs):
+    """Vacía el buffer del proceso. Receptor de request_finished en modo request."""
+    if _writer is not None and _writer.pid == os.getpid():
+        return _writer.flush()
+    return 0
+
+
+def get_activity_queue_depth():
+    """Eventos del proceso pendientes de escribir: el buffer y los lotes por reintentar."""
+    if _writer is None or _writer.pid != os.getpid():
+        return 0
+    with _writer.lock:
+        pending = len(_writer.buffer)
+    return pending + sum(len(events) for _, events in list(_writer.batches))
+
+
+def flush_on_request_finished(sender, **kwargs):
+    """Receptor de request_finished: vacía el buffer en modo request."""
+    if _setting('ACTIVITY_LOG_MODE', 'sync') == 'request':
+        flush_activity_log()
+
+
+atexit.register(flush_activity_log)
@@ -0,0 +1,131 @@
+import os
+import time
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from ..models import AttachmentBlob, Task, TaskAttachment
+from ..storage import BLOB_PREFIX, blob_digest, blob_name, get_blob_storage, hash_content
+
+
+# Temporales de escritura de blobs que se consideran abandonados (segundos)
+STALE_TEMP_AGE = 3600
+
+
+def blob_references():
+    """(modelo, campo) de los archivos guardados por contenido."""
+    return [(TaskAttachment, 'file'), (Task, 'attachment')]
+
+
+def _is_referenced(name):
+    return any(
+        model._base_manager.filter(**{field: name}).exists()
+        for model, field in blob_references()
+    )
+
+
+def dedupe_attachments(dry_run=False):
+    """
+    Migra los adjuntos guardados con rutas antiguas (task_attachments/...) al
+    almacenamiento por contenido: cada archivo se lee una vez para calcular su
+    SHA-256, la fila pasa a apuntar al blob y el archivo antiguo se borra.
+    Retorna {'files', 'deduplicated', 'bytes_saved', 'missing'}.
+    """
+    storage = get_blob_storage()
+    stats = {'files': 0, 'deduplicated': 0, 'bytes_saved': 0, 'missing': 0}
+    seen = set()
+    
+    for model, field in blob_references():
+        legacy = (
+            model._base_manager
+            .exclude(Q(**{f'{field}__isnull': True}) | Q(**{field: ''}))
+            .exclude(**{f'{field}__startswith': f'{BLOB_PREFIX}/'})
+            .values_list('pk', field)
+        )
+        for pk, name in legacy.iterator():
+            if not storage.exists(name):
+                stats['missing'] += 1
+                continue
+            stats['files'] += 1
+            size = storage.size(name)
+            with storage.open(name) as content:
+                content.sha256 = hash_content(content)
+                new_name = blob_name(content.sha256, name)
+                if new_name in seen or storage.exists(new_name):
+                    stats['deduplicated'] += 1
+                    stats['bytes_saved'] += size
+                seen.add(new_name)
+                if dry_run:
+                    continue
+                
+                new_name = storage.save(name, content)
+                with transaction.atomic():
+                    updated = model._base_manager.filter(pk=pk, **{field: name}).update(**{field: new_name})
+                    if updated:
+                        AttachmentBlob.objects.acquire(new_name, size)
+            if updated and not _is_referenced(name):
+                storage.delete(name)
+    return stats
+
+
+def collect_blob_garbage(dry_run=False):
+    """
+    Recalcula los contadores de referencias a partir de los adjuntos y borra los
+    blobs sin referencias, los archivos de blobs/ sin fila y los temporales de
+    escritura abandonados. Retorna {'recounted', 'blobs', 'files'}.
+    """
+    storage = get_blob_storage()
+    counts = {}
+    for model, field in blob_references():
+        rows = (
+            model._base_manager
+            .filter(**{f'{field}__startswith': f'{BLOB_PREFIX}/'})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+        )
+        for row in rows:
+            counts[row[field]] = counts.get(row[field], 0) + row['total']
+    
+    stats = {'recounted': 0, 'blobs': 0, 'files': 0}
+    known = set()
+    with transaction.atomic():
+        blobs = AttachmentBlob.objects.select_for_update().values_list('pk', 'name', 'ref_count')
+        unreferenced = []
+        for pk, name, ref_count in blobs:
+            expected = counts.pop(name, 0)
+            if expected == 0:
+                unreferenced.append((pk, name))
+                continue
+            known.add(name)
+            if expected != ref_count:
+                stats['recounted'] += 1
+                if not dry_run:
+                    AttachmentBlob.objects.filter(pk=pk).update(ref_count=expected)
+        # Referencias a blobs sin fila (p. ej. copiados a mano)
+        for name, expected in counts.items():
+            known.add(name)
+            stats['recounted'] += 1
+            if not dry_run and storage.exists(name):
+                AttachmentBlob.objects.create(
+                    name=name, sha256=blob_digest(name),
+                    size=storage.size(name), ref_count=expected,
+                )
+        stats['blobs'] = len(unreferenced)
+        if not dry_run:
+            AttachmentBlob.objects.filter(pk__in=[pk for pk, _ in unreferenced]).delete()
+    
+    root = storage.path(BLOB_PREFIX)
+    stale = time.time() - STALE_TEMP_AGE
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            if name in known:
+                continue
+            if filename.endswith('.tmp') and os.path.getmtime(path) >= stale:
+                continue
+            stats['files'] += 1
+            if not dry_run:
+                storage.delete(name)
+    return stats
@@ -0,0 +1,247 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Task, TaskList, SharedList
+from ..models.task_models import apply_counter_deltas
+from .activity_service import activity_event, record_activities
+from .cache_service import invalidate_dashboard_lists
+from .permission_service import has_list_permission
+from .push_service import publish_events, task_events
+
+
+# Acciones de actividad según el nuevo estado (igual que change_task_status)
+STATUS_ACTIVITY_ACTIONS = {
+    'pending': 'reopened',
+    'in_progress': 'in_progress',
+    'completed': 'completed',
+}
+
+# Operaciones masivas disponibles
+BULK_ACTIONS = ('status', 'priority', 'reassign', 'move', 'delete')
+
+# Máximo de tareas por petición
+BULK_MAX_TASKS = 500
+
+
+class BulkOperationError(ValueError):
+    """Error de validación o de permisos de una operación masiva."""
+    
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _task_ids(operation):
+    """Valida y retorna los ids de tareas de una operación."""
+    task_ids = operation.get('task_ids')
+    if not isinstance(task_ids, list) or not task_ids:
+        raise BulkOperationError('task_ids debe ser una lista no vacía')
+    try:
+        return [int(task_id) for task_id in task_ids]
+    except (TypeError, ValueError):
+        raise BulkOperationError('task_ids debe contener enteros')
+
+
+class BulkTaskUpdater:
+    """
+    Aplica una secuencia de operaciones sobre muchas tareas en una sola transacción.
+    Las tareas se cargan con una consulta, los permisos se comprueban una vez por
+    lista y los cambios se escriben con bulk_update, un UPDATE de contadores por
+    lista y un único lote de actividades.
+    """
+    
+    def __init__(self, request, operations):
+        if not isinstance(operations, list) or not operations:
+            raise BulkOperationError('Se requiere al menos una operación')
+        self.request = request
+        self.operations = operations
+        self.tasks = {}
+        self.lists = {}
+        self.changed_fields = set()
+        self.changed_tasks = {}
+        self.deleted_ids = set()
+        self.assignments = {}
+        self.activities = []
+        self.counter_deltas = defaultdict(Counter)
+        # Deltas y lista original de cada tarea, para los eventos push
+        self.task_deltas = defaultdict(lambda: defaultdict(Counter))
+        self.previous_lists = {}
+        self.now = timezone.now()
+    
+    def run(self):
+        """Valida y aplica todas las operaciones. Retorna las tareas resultantes."""
+        self._load_tasks()
+        for operation in self.operations:
+            action = operation.get('action')
+            if action not in BULK_ACTIONS:
+                raise BulkOperationError(f'Acción desconocida: {action}')
+            getattr(self, f'_apply_{action}')(operation)
+        
+        with transaction.atomic():
+            self._save()
+        return [task for pk, task in self.tasks.items() if pk not in self.deleted_ids]
+    
+    def _load_tasks(self):
+        """Carga todas las tareas implicadas y comprueba escritura una vez por lista."""
+        task_ids = set()
+        for operation in self.operations:
+            if not isinstance(operation, dict):
+                raise BulkOperationError('Cada operación debe ser un objeto')
+            task_ids.update(_task_ids(operation))
+        if len(task_ids) > BULK_MAX_TASKS:
+            raise BulkOperationError(f'Máximo {BULK_MAX_TASKS} tareas por petición')
+        
+        self.tasks = Task.objects.select_related('task_list').in_bulk(task_ids)
+        missing = task_ids - self.tasks.keys()
+        if missing:
+            raise BulkOperationError(f'Tareas no encontradas: {sorted(missing)}', status=404)
+        
+        for task in self.tasks.values():
+            self.lists[task.task_list_id] = task.task_list
+        for task_list_id in self.lists:
+            self._check_write(task_list_id)
+    
+    def _check_write(self, task_list_id):
+        if not has_list_permission(self.request, task_list_id, 'write'):
+            raise BulkOperationError('Permission denied', status=403)
+    
+    def _tasks_for(self, operation):
+        return [self.tasks[task_id] for task_id in _task_ids(operation) if task_id not in self.deleted_ids]
+    
+    def _change(self, task, fields, action, description):
+        """Registra el cambio de una tarea: campos, contadores y actividad."""
+        for task_list_id, deltas in task._get_counter_deltas(set(fields)).items():
+            self.counter_deltas[task_list_id].update(deltas)
+            self.task_deltas[task.pk][task_list_id].update(deltas)
+        self.previous_lists.setdefault(task.pk, task._counter_state[0])
+        task._remember_counter_state()
+        task.updated_at = self.now
+        self.changed_fields.update(fields)
+        self.changed_tasks[task.pk] = task
+        self.activities.append(activity_event(task, self.request.user, action, description))
+    
+    def _apply_status(self, operation):
+        new_status = operation.get('value')
+        if new_status not in STATUS_ACTIVITY_ACTIONS:
+            raise BulkOperationError('Invalid status')
+        for task in self._tasks_for(operation):
+            if task.status == new_status:
+                continue
+            old_status = task.status
+            task.status = new_status
+            # completed_at calculado en bloque, igual que Task.save
+            task.completed_at = (task.completed_at or self.now) if new_status == 'completed' else None
+            self._change(
+                task, ['status', 'completed_at'], STATUS_ACTIVITY_ACTIONS[new_status],
+                f'Estado cambiado de {old_status} a {new_status}: {task.title}',
+            )
+    
+    def _apply_priority(self, operation):
+        new_priority = operation.get('value')
+        if new_priority not in dict(Task.PRIORITY_CHOICES):
+            raise BulkOperationError('Invalid priority')
+        for task in self._tasks_for(operation):
+            if task.priority == new_priority:
+                continue
+            old_priority = task.priority
+            task.priority = new_priority
+            task.sync_sort_keys()
+            self._change(
+                task, ['priority', 'priority_rank'], 'updated',
+                f'Prioridad cambiada de {old_priority} a {new_priority}: {task.title}',
+            )
+    
+    def _apply_reassign(self, operation):
+        user_ids = operation.get('value')
+        if not isinstance(user_ids, list):
+            raise BulkOperationError('value debe ser una lista de usuarios')
+        try:
+            user_ids = {int(user_id) for user_id in user_ids}
+        except (TypeError, ValueError):
+            raise BulkOperationError('value debe contener enteros')
+        
+        tasks = self._tasks_for(operation)
+        # Solo se puede asignar al propietario y a los usuarios con los que se comparte
+        list_ids = {task.task_list_id for task in tasks}
+        allowed = defaultdict(set)
+        for task_list_id in list_ids:
+            allowed[task_list_id].add(self.lists[task_list_id].owner_id)
+        for task_list_id, user_id in SharedList.objects.filter(
+            task_list__in=list_ids
+        ).values_list('task_list_id', 'shared_with_id'):
+            allowed[task_list_id].add(user_id)
+        
+        for task in tasks:
+            if not user_ids <= allowed[task.task_list_id]:
+                raise BulkOperationError('Usuario no válido para la lista')
+            self.assignments[task.pk] = user_ids
+            self._change(task, [], 'updated', f'Responsables actualizados: {task.title}')
+    
+    def _apply_move(self, operation):
+        try:
+            target_id = int(operation.get('value'))
+        except (TypeError, ValueError):
+            raise BulkOperationError('value debe ser el id de una lista')
+        if target_id not in self.lists:
+            target = TaskList.objects.filter(pk=target_id).first()
+            if target is None:
+                raise BulkOperationError('Lista no encontrada', status=404)
+            self.lists[target_id] = target
+            self._check_write(target_id)
+        target = self.lists[target_id]
+        
+        for task in self._tasks_for(operation):
+            if task.task_list_id == target_id:
+                continue
+            old_list = task.task_list
+            task.task_list = target
+            self._change(
+                task, ['task_list'], 'updated',
+                f'Tarea movida de {old_list.name} a {target.name}: {task.title}',
+            )
+    
+    def _apply_delete(self, operation):
+        for task in self._tasks_for(operation):
+            self.deleted_ids.add(task.pk)
+            self.assignments.pop(task.pk, None)
+    
+    def _save(self):
+        """Escribe todos los cambios acumulados."""
+        # Incluye las tareas que luego se eliminan: el borrado descuenta su estado final
+        if self.changed_tasks:
+            Task.objects.bulk_update(
+                list(self.changed_tasks.values()),
+                sorted(self.changed_fields | {'updated_at'}),
+            )
+        apply_counter_deltas(self.counter_deltas)
+        # bulk_update no envía post_save: invalidar y notificar los cambios aquí
+        invalidate_dashboard_lists(self.lists)
+        publish_events([
+            event
+            for pk, task in self.changed_tasks.items()
+            for event in task_events(task, 'updated', self.task_deltas[pk], self.previous_lists[pk])
+        ])
+        
+        if self.assignments:
+            Through = Task.assigned_users.through
+            Through.objects.filter(task_id__in=self.assignments).delete()
+            Through.objects.bulk_create([
+                Through(task_id=task_id, user_id=user_id)
+                for task_id, user_ids in self.assignments.items()
+                for user_id in user_ids
+            ])
+        
+        if self.deleted_ids:
+            # Los contadores de las tareas eliminadas se descuentan en bloque
+            Task.objects.filter(pk__in=self.deleted_ids).delete()
+        
+        record_activities([
+            event for event in self.activities if event['task_id'] not in self.deleted_ids
+        ])
+
+
+def apply_bulk_operations(request, operations):
+    """Aplica operaciones masivas sobre tareas. Lanza BulkOperationError si no son válidas."""
+    return BulkTaskUpdater(request, operations).run()
@@ -0,0 +1,343 @@
+import hashlib
+import math
+import threading
+import uuid
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from ..models import Task, TaskList, SharedList, TaskAttachment, TaskActivity
+from .perf_service import record_cache_access
+from .stats_service import get_next_due_change, get_user_next_due_change
+
+
+# Prefijo de todas las claves de la caché del dashboard
+DASHBOARD_CACHE_PREFIX = 'dashboard'
+
+# Segundos que se recuerda la fecha de Last-Modified de cada ETag
+VALIDATOR_TIMEOUT = 24 * 60 * 60
+
+# Centinela para distinguir una entrada ausente de un valor None cacheado
+_MISSING = object()
+
+# Aciertos y fallos por nombre de entrada, por proceso
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+
+def get_dashboard_cache():
+    """Backend de caché configurado para el dashboard (DASHBOARD_CACHE_ALIAS)."""
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def dashboard_cache_enabled():
+    """La caché está desactivada cuando el backend es DummyCache (por defecto en los tests)."""
+    return not isinstance(get_dashboard_cache(), DummyCache)
+
+
+def _list_version_key(list_id):
+    return f'{DASHBOARD_CACHE_PREFIX}:list:{list_id}:version'
+
+
+def _user_version_key(user_id):
+    return f'{DASHBOARD_CACHE_PREFIX}:user:{user_id}:version'
+
+
+def _new_version():
+    # Única en todos los workers: una versión recreada (tras expulsarse la clave)
+    # o escrita por dos workers a la vez no coincide con ninguna anterior
+    return uuid.uuid4().hex
+
+
+def _get_versions(cache, keys):
+    """Lee las versiones indicadas creando las que no existan."""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = _new_version()
+            versions[key] = version if cache.add(key, version, timeout=None) else cache.get(key, version)
+    return versions
+
+
+def _bump_versions(keys):
+    # incr no es atómico en FileBasedCache ni en LocMemCache entre procesos: dos
+    # incrementos simultáneos podrían dejar la misma versión. Una versión nueva
+    # escrita con set cambia siempre, gane quien gane.
+    get_dashboard_cache().set_many({key: _new_version() for key in keys}, timeout=None)
+
+
+def invalidate_dashboard_lists(list_ids):
+    """
+    Incrementa la versión de las listas al confirmar la transacción actual, de modo
+    que una lectura concurrente no pueda cachear datos antiguos con la versión nueva.
+    """
+    keys = {_list_version_key(list_id) for list_id in list_ids if list_id is not None}
+    if keys and dashboard_cache_enabled():
+        transaction.on_commit(lambda: _bump_versions(keys))
+
+
+def invalidate_dashboard_users(user_ids):
+    """Incrementa la versión de los usuarios cuyo conjunto de listas accesibles cambia."""
+    keys = {_user_version_key(user_id) for user_id in user_ids if user_id is not None}
+    if keys and dashboard_cache_enabled():
+        transaction.on_commit(lambda: _bump_versions(keys))
+
+
+def _record(name, hit):
+    with _metrics_lock:
+        _metrics[name, 'hits' if hit else 'misses'] += 1
+    record_cache_access(hit)
+
+
+def get_dashboard_cache_metrics():
+    """Aciertos y fallos del proceso por entrada: {nombre: {'hits', 'misses', 'hit_ratio'}}."""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    metrics = {}
+    for (name, kind), value in snapshot.items():
+        metrics.setdefault(name, {'hits': 0, 'misses': 0})[kind] = value
+    for values in metrics.values():
+        values['hit_ratio'] = values['hits'] / (values['hits'] + values['misses'])
+    return metrics
+
+
+def reset_dashboard_cache_metrics():
+    """Pone a cero las métricas de aciertos y fallos."""
+    with _metrics_lock:
+        _metrics.clear()
+
+
+class VersionedCache:
+    """
+    Entradas cacheadas bajo una versión calculada a partir de contadores de lista.
+    Las entradas caducan a los DASHBOARD_CACHE_TIMEOUT segundos o antes, cuando
+    una tarea abierta vence o entra en la ventana de próximas a vencer.
+    """
+    
+    def __init__(self, now=None):
+        self.now = now or timezone.now()
+        self.cache = get_dashboard_cache()
+        self.enabled = not isinstance(self.cache, DummyCache)
+        self._version = None
+        self._timeout = None
+        self._next_change = _MISSING
+        self._last_modified = {}
+    
+    @property
+    def key_prefix(self):
+        raise NotImplementedError
+    
+    def get_version(self):
+        raise NotImplementedError
+    
+    def get_next_change(self):
+        raise NotImplementedError
+    
+    @property
+    def version(self):
+        if self._version is None:
+            self._version = self.get_version()
+        return self._version
+    
+    @property
+    def next_change(self):
+        """Próximo cambio por tiempo (o None), cacheado junto con la versión."""
+        if self._next_change is _MISSING:
+            key = f'{self.key_prefix}:next-change:{self.version}'
+            change = self.cache.get(key, _MISSING) if self.enabled else _MISSING
+            if change is _MISSING or (change is not None and change <= self.now):
+                change = self.get_next_change()
+                if self.enabled:
+                    self.cache.set(key, change, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+            self._next_change = change
+        return self._next_change
+    
+    @property
+    def timeout(self):
+        if self._timeout is None:
+            timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+            change = self.next_change
+            if change is not None:
+                timeout = max(1, min(timeout, math.ceil((change - self.now).total_seconds())))
+            self._timeout = timeout
+        return self._timeout
+    
+    def get_key(self, name):
+        return f'{self.key_prefix}:{name}:{self.version}'
+    
+    def get_or_set(self, name, compute):
+        """Retorna la entrada cacheada o la calcula y la guarda."""
+        if not self.enabled:
+            return compute()
+        
+        key = self.get_key(name)
+        value = self.cache.get(key, _MISSING)
+        _record(name, value is not _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.cache.set(key, value, self.timeout)
+        return value
+    
+    async def aget_or_set(self, name, compute):
+        """
+        Versión asíncrona de get_or_set; compute retorna una corrutina. La versión
+        y el timeout (que pueden consultar la base de datos) se calculan en un hilo.
+        """
+        if not self.enabled:
+            return await compute()
+        
+        key = await sync_to_async(self.get_key)(name)
+        value = await self.cache.aget(key, _MISSING)
+        _record(name, value is not _MISSING)
+        if value is _MISSING:
+            value = await compute()
+            timeout = await sync_to_async(lambda: self.timeout)()
+            await self.cache.aset(key, value, timeout)
+        return value
+    
+    def get_etag(self, *parts):
+        """
+        ETag fuerte a partir de la versión y del próximo cambio por tiempo, sin
+        consultas mientras ambos estén cacheados. None si la caché está desactivada.
+        """
+        if not self.enabled:
+            return None
+        change = self.next_change.timestamp() if self.next_change else ''
+        token = '|'.join(str(part) for part in (self.key_prefix, self.version, change, *parts))
+        return hashlib.md5(token.encode()).hexdigest()
+    
+    def get_last_modified(self, etag):
+        """Momento en que se vio por primera vez el ETag (Last-Modified)."""
+        if etag is None:
+            return None
+        if etag not in self._last_modified:
+            key = f'{self.key_prefix}:modified:{etag}'
+            if self.cache.add(key, self.now, timeout=VALIDATOR_TIMEOUT):
+                self._last_modified[etag] = self.now
+            else:
+                self._last_modified[etag] = self.cache.get(key, self.now)
+        return self._last_modified[etag]
+
+
+class DashboardCache(VersionedCache):
+    """
+    Caché del dashboard de un usuario. La versión combina la del usuario (cambia
+    al ganar o perder listas) con las de cada lista accesible; los ids de las
+    listas también se cachean, así que un acierto no consulta la base de datos.
+    """
+    
+    def __init__(self, user, now=None):
+        super().__init__(now=now)
+        self.user = user
+    
+    @property
+    def key_prefix(self):
+        return f'{DASHBOARD_CACHE_PREFIX}:user:{self.user.pk}'
+    
+    def get_version(self):
+        user_key = _user_version_key(self.user.pk)
+        user_version = _get_versions(self.cache, [user_key])[user_key]
+        
+        lists_key = f'{self.key_prefix}:lists:{user_version}'
+        list_ids = self.cache.get(lists_key)
+        if list_ids is None:
+            list_ids = sorted(TaskList.objects.accessible_to(self.user).values_list('pk', flat=True))
+            self.cache.set(lists_key, list_ids, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+        
+        keys = [_list_version_key(list_id) for list_id in list_ids]
+        versions = _get_versions(self.cache, keys)
+        token = f'{user_version}|' + ','.join(
+            f'{list_id}.{versions[key]}' for list_id, key in zip(list_ids, keys)
+        )
+        return hashlib.md5(token.encode()).hexdigest()
+    
+    def get_next_change(self):
+        return get_user_next_due_change(self.user, now=self.now)
+
+
+class ListCache(VersionedCache):
+    """Caché de los datos de una lista (instancia o id), compartida por todos sus usuarios."""
+    
+    def __init__(self, task_list, now=None):
+        super().__init__(now=now)
+        self.task_list_id = getattr(task_list, 'pk', task_list)
+    
+    @property
+    def key_prefix(self):
+        return f'{DASHBOARD_CACHE_PREFIX}:list:{self.task_list_id}'
+    
+    def get_version(self):
+        key = _list_version_key(self.task_list_id)
+        return _get_versions(self.cache, [key])[key]
+    
+    def get_next_change(self):
+        return get_next_due_change(Task.objects.filter(task_list_id=self.task_list_id), now=self.now)
+
+
+def _is_cascade(origin, *models_):
+    """Indica si el borrado viene en cascada de alguno de los modelos indicados."""
+    if isinstance(origin, models.QuerySet):
+        return origin.model in models_
+    return isinstance(origin, models_)
+
+
+def _task_list_id_for(instance):
+    """Lista de la tarea de un adjunto o actividad, sin consulta si la tarea está cargada."""
+    task = instance._meta.get_field('task').get_cached_value(instance, None)
+    if task is not None:
+        return task.task_list_id
+    return Task.objects.filter(pk=instance.task_id).values_list('task_list_id', flat=True).first()
+
+
+def task_changed(sender, instance, **kwargs):
+    """Receptor de post_save/post_delete de Task: invalida la lista actual y la anterior."""
+    previous_list_id = (instance._counter_state or (None,))[0]
+    invalidate_dashboard_lists({instance.task_list_id, previous_list_id})
+
+
+def task_list_saved(sender, instance, created, **kwargs):
+    """Receptor de post_save de TaskList."""
+    invalidate_dashboard_lists([instance.pk])
+    if created:
+        invalidate_dashboard_users([instance.owner_id])
+
+
+def task_list_deleted(sender, instance, **kwargs):
+    """Receptor de post_delete de TaskList (las comparticiones invalidan a sus usuarios)."""
+    invalidate_dashboard_lists([instance.pk])
+    invalidate_dashboard_users([instance.owner_id])
+
+
+def shared_list_changed(sender, instance, **kwargs):
+    """Receptor de post_save/post_delete de SharedList."""
+    invalidate_dashboard_lists([instance.task_list_id])
+    invalidate_dashboard_users([instance.shared_with_id])
+
+
+def task_child_changed(sender, instance, origin=None, **kwargs):
+    """Receptor de TaskAttachment y TaskActivity: invalida la lista de su tarea."""
+    # En un borrado en cascada ya invalidan los receptores de la tarea o la lista
+    if not dashboard_cache_enabled() or _is_cascade(origin, Task, TaskList):
+        return
+    invalidate_dashboard_lists([_task_list_id_for(instance)])
+
+
+def connect_dashboard_cache_signals():
+    """Conecta los receptores de invalidación de la caché (desde TasksConfig.ready)."""
+    receivers = [
+        (Task, task_changed, task_changed),
+        (TaskList, task_list_saved, task_list_deleted),
+        (SharedList, shared_list_changed, shared_list_changed),
+        (TaskAttachment, task_child_changed, task_child_changed),
+        (TaskActivity, task_child_changed, task_child_changed),
+    ]
+    for model, on_save, on_delete in receivers:
+        label = model._meta.label_lower
+        post_save.connect(on_save, sender=model, dispatch_uid=f'dashboard_cache_save_{label}')
+        post_delete.connect(on_delete, sender=model, dispatch_uid=f'dashboard_cache_delete_{label}')
@@ -0,0 +1,189 @@
+import hashlib
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+from .metrics_service import record_attachment_bytes
+
+
+# Modos de entrega: Django envía los bytes o el servidor web tras la autorización
+ATTACHMENT_DELIVERY_MODES = ('django', 'x-accel-redirect', 'x-sendfile')
+
+# Extensiones que el navegador muestra en línea (los PDF para poder saltar de página)
+INLINE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.pdf']
+
+# Un único rango de bytes: "bytes=inicio-fin", "bytes=inicio-" o "bytes=-sufijo"
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_delivery_mode():
+    mode = getattr(settings, 'ATTACHMENT_DELIVERY', 'django')
+    if mode not in ATTACHMENT_DELIVERY_MODES:
+        raise ImproperlyConfigured(f'ATTACHMENT_DELIVERY desconocido: {mode}')
+    return mode
+
+
+def attachment_etag(attachment):
+    """ETag a partir de los metadatos guardados, sin leer ni consultar el archivo."""
+    token = f'{attachment.pk}:{attachment.file.name}:{attachment.file_size}:{attachment.uploaded_at.timestamp()}'
+    return quote_etag(hashlib.md5(token.encode()).hexdigest())
+
+
+def parse_range(header, size):
+    """
+    Interpreta la cabecera Range para un archivo de size bytes.
+    Retorna (inicio, fin) inclusivos, None si se debe ignorar (ausente, mal formada
+    o con varios rangos: se responde el archivo completo) o False si no es satisfacible.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Sufijo: los últimos N bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    """If-Range: el rango solo se sirve si el recurso no ha cambiado."""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and since >= last_modified
+
+
+class FileRangeIterator:
+    """Itera length bytes del archivo a partir de start en bloques y lo cierra al terminar."""
+    
+    def __init__(self, file, start, length, chunk_size):
+        self.file = file
+        self.start = start
+        self.remaining = length
+        self.chunk_size = chunk_size
+    
+    def __iter__(self):
+        self.file.seek(self.start)
+        while self.remaining > 0:
+            chunk = self.file.read(min(self.chunk_size, self.remaining))
+            if not chunk:
+                break
+            self.remaining -= len(chunk)
+            yield chunk
+    
+    def close(self):
+        self.file.close()
+
+
+def _offload_response(name, path, mode):
+    """Respuesta vacía con la cabecera que indica al servidor web qué archivo enviar."""
+    response = HttpResponse()
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'ATTACHMENT_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+    else:
+        response['X-Sendfile'] = path
+    # El servidor web pone Content-Length y atiende los rangos
+    return response
+
+
+def _file_response(request, attachment, etag, last_modified):
+    """Respuesta servida por Django: completa (200), parcial (206) o 416."""
+    size = attachment.file_size
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.headers.get('Range'), size)
+    
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    
+    attachment.file.open('rb')
+    if byte_range is None:
+        # Respuesta completa: FileResponse permite a gunicorn usar sendfile()
+        response = FileResponse(attachment.file.file)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            FileRangeIterator(
+                attachment.file.file, start, end - start + 1,
+                getattr(settings, 'ATTACHMENT_CHUNK_SIZE', 64 * 1024),
+            ),
+            status=206,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def attachment_response(request, attachment):
+    """
+    Respuesta de descarga de un adjunto ya autorizado, con ETag/Last-Modified,
+    304 condicional, rangos de bytes y delegación opcional al servidor web.
+    """
+    etag = attachment_etag(attachment)
+    last_modified = int(attachment.uploaded_at.timestamp())
+    
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        mode = get_delivery_mode()
+        if mode == 'django':
+            response = _file_response(request, attachment, etag, last_modified)
+        else:
+            response = _offload_response(attachment.file.name, attachment.file.path, mode)
+        if response.status_code != 416:
+            # Con delegación el servidor web envía el archivo (o el rango pedido)
+            record_attachment_bytes('attachment', int(response.get('Content-Length', attachment.file_size)), mode)
+            content_type, _ = mimetypes.guess_type(attachment.filename)
+            response['Content-Type'] = content_type or 'application/octet-stream'
+            response['Content-Disposition'] = content_disposition_header(
+                attachment.get_file_extension() not in INLINE_EXTENSIONS, attachment.filename
+            )
+    
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Revalidar siempre: el acceso a la lista puede retirarse
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def preview_response(request, attachment):
+    """Respuesta con la vista previa ya generada de un adjunto autorizado (ver media_service)."""
+    # La ruta de la vista previa deriva del contenido: sirve como ETag
+    etag = quote_etag(hashlib.md5(attachment.preview.encode()).hexdigest())
+    
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        mode = get_delivery_mode()
+        if mode == 'django':
+            response = FileResponse(default_storage.open(attachment.preview, 'rb'))
+        else:
+            response = _offload_response(attachment.preview, default_storage.path(attachment.preview), mode)
+        if response.has_header('Content-Length'):
+            record_attachment_bytes('preview', int(response['Content-Length']), mode)
+        response['Content-Type'] = mimetypes.guess_type(attachment.preview)[0] or 'image/webp'
+    
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
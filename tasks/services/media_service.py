@@ -0,0 +1,285 @@
+import hashlib
+import logging
+import os
+import queue
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save
+
+from ..models import Profile, TaskAttachment
+from ..models.attachment_models import PREVIEW_EXTENSIONS
+from ..storage import blob_digest
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    import fitz  # PyMuPDF, opcional: primera página de los PDF
+    PDF_PREVIEW_AVAILABLE = True
+except ImportError:
+    PDF_PREVIEW_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Modos del pipeline: en la request (tests), hilo del proceso o worker externo (process_media)
+MEDIA_PIPELINE_MODES = ('sync', 'background', 'external')
+
+# Lado en píxeles de cada variante del avatar (recortadas en cuadrado)
+AVATAR_SIZES = {
+    'small': 48,
+    'medium': 128,
+    'large': 300,
+}
+
+# Lado máximo de las miniaturas y vistas previas de adjuntos (el doble del
+# tamaño con el que se muestran, para pantallas de alta densidad)
+PREVIEW_SIZE = 128
+
+VARIANT_FORMAT = 'webp'
+VARIANT_QUALITY = 80
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def variant_name(digest, variant):
+    """
+    Ruta de una variante derivada del SHA-256 del original: el mismo contenido
+    (aunque sea de otro adjunto o usuario) reutiliza las variantes ya generadas.
+    """
+    return f'variants/{digest[:2]}/{digest[2:4]}/{digest}/{variant}.{VARIANT_FORMAT}'
+
+
+def _file_digest(field_file):
+    digest = blob_digest(field_file.name)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    with field_file.open('rb') as f:
+        for chunk in f.chunks(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _encode(image):
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.mode in ('LA', 'P', 'PA') else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, VARIANT_FORMAT.upper(), quality=VARIANT_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def _open_image(field_file, size):
+    with field_file.open('rb') as f:
+        image = Image.open(f)
+        # Los JPEG se decodifican ya reducidos (mucho más rápido que a tamaño completo)
+        image.draft('RGB', (size * 2, size * 2))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image
+
+
+def _open_pdf_page(field_file, size):
+    with field_file.open('rb') as f:
+        document = fitz.open(stream=f.read(), filetype='pdf')
+    with document:
+        page = document[0]
+        zoom = size / max(page.rect.width, page.rect.height)
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def can_preview(filename):
+    """Indica si el pipeline puede generar vista previa para el archivo."""
+    ext = os.path.splitext(filename)[1].lower()
+    if not PIL_AVAILABLE or ext not in PREVIEW_EXTENSIONS:
+        return False
+    return ext != '.pdf' or PDF_PREVIEW_AVAILABLE
+
+
+def generate_attachment_preview(attachment):
+    """
+    Genera la miniatura (imágenes) o la primera página (PDF) del adjunto si no
+    existe ya para su contenido y la guarda en el adjunto. Retorna el estado.
+    """
+    if not can_preview(attachment.filename):
+        status, preview = 'unsupported', ''
+    else:
+        try:
+            preview = variant_name(_file_digest(attachment.file), f'preview-{PREVIEW_SIZE}')
+            if not default_storage.exists(preview):
+                if attachment.get_file_extension() == '.pdf':
+                    image = _open_pdf_page(attachment.file, PREVIEW_SIZE)
+                else:
+                    image = _open_image(attachment.file, PREVIEW_SIZE)
+                image.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE))
+                preview = default_storage.save(preview, _encode(image))
+            status = 'ready'
+        except Exception:
+            logger.warning('No se pudo generar la vista previa del adjunto %s', attachment.pk, exc_info=True)
+            status, preview = 'failed', ''
+    
+    # Solo si el archivo no cambió mientras tanto
+    TaskAttachment.objects.filter(pk=attachment.pk, file=attachment.file.name).update(
+        preview=preview, preview_status=status,
+    )
+    attachment.preview, attachment.preview_status = preview, status
+    return status
+
+
+def generate_avatar_variants(profile):
+    """
+    Genera las variantes del avatar (AVATAR_SIZES) que falten para su contenido y
+    las guarda en el perfil. El original se conserva sin modificar.
+    """
+    if not profile.avatar:
+        return {}
+    variants = {}
+    try:
+        digest = _file_digest(profile.avatar)
+        image = None
+        for size_name, size in AVATAR_SIZES.items():
+            name = variant_name(digest, f'avatar-{size}')
+            if not default_storage.exists(name):
+                if image is None:
+                    image = _open_image(profile.avatar, max(AVATAR_SIZES.values()))
+                name = default_storage.save(name, _encode(ImageOps.fit(image, (size, size))))
+            variants[size_name] = name
+    except Exception:
+        logger.warning('No se pudieron generar las variantes del avatar del perfil %s', profile.pk, exc_info=True)
+        variants = {'failed': True}
+    
+    Profile.objects.filter(pk=profile.pk, avatar=profile.avatar.name).update(avatar_variants=variants)
+    profile.avatar_variants = variants
+    return variants
+
+
+def process_media_job(kind, pk):
+    """Ejecuta un trabajo ('attachment' o 'avatar', pk); ignora objetos ya eliminados."""
+    if kind == 'attachment':
+        attachment = TaskAttachment.objects.filter(pk=pk).first()
+        if attachment is not None and attachment.preview_status == 'pending':
+            generate_attachment_preview(attachment)
+    elif kind == 'avatar':
+        profile = Profile.objects.filter(pk=pk).first()
+        if profile is not None and profile.avatar and not profile.avatar_variants:
+            generate_avatar_variants(profile)
+    else:
+        raise ValueError(f'Trabajo de medios desconocido: {kind}')
+
+
+def pending_media_jobs(limit=None):
+    """Trabajos pendientes según la base de datos (recuperación y worker externo)."""
+    attachments = TaskAttachment.objects.filter(preview_status='pending').order_by('pk').values_list('pk', flat=True)
+    profiles = (
+        Profile.objects.exclude(avatar='').exclude(avatar__isnull=True)
+        .filter(avatar_variants={}).order_by('pk').values_list('pk', flat=True)
+    )
+    if limit is not None:
+        attachments, profiles = attachments[:limit], profiles[:limit]
+    return [('attachment', pk) for pk in attachments] + [('avatar', pk) for pk in profiles]
+
+
+class MediaWorker:
+    """Hilo del proceso que genera las variantes fuera del ciclo de la request."""
+    
+    def __init__(self):
+        self.pid = os.getpid()
+        self.jobs = queue.Queue()
+        self.queued = set()
+        self.lock = threading.Lock()
+        self.thread = None
+    
+    def add(self, job):
+        with self.lock:
+            if job in self.queued:
+                return
+            self.queued.add(job)
+        self.jobs.put(job)
+        self.ensure_thread()
+    
+    def ensure_thread(self):
+        """Arranca el hilo si no está en marcha."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='media-worker', daemon=True)
+                self.thread.start()
+    
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            with self.lock:
+                self.queued.discard(job)
+            try:
+                close_old_connections()
+                process_media_job(*job)
+            except Exception:
+                logger.exception('Error procesando el trabajo de medios %s', job)
+            finally:
+                if self.jobs.empty():
+                    # El hilo tiene su propia conexión: no dejarla abierta mientras espera
+                    close_old_connections()
+                self.jobs.task_done()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_media_worker():
+    """Retorna el worker del proceso (uno nuevo tras un fork)."""
+    global _worker
+    if _worker is None or _worker.pid != os.getpid():
+        with _worker_lock:
+            if _worker is None or _worker.pid != os.getpid():
+                _worker = MediaWorker()
+    return _worker
+
+
+def enqueue_media_job(kind, instance):
+    """Encola un trabajo de medios ('attachment' o 'avatar') según MEDIA_PIPELINE_MODE."""
+    mode = _setting('MEDIA_PIPELINE_MODE', 'background')
+    if mode == 'sync':
+        # Sobre la propia instancia, para que un save posterior no pise el resultado
+        if kind == 'attachment':
+            generate_attachment_preview(instance)
+        else:
+            generate_avatar_variants(instance)
+    elif mode == 'background':
+        job = (kind, instance.pk)
+        transaction.on_commit(lambda: get_media_worker().add(job))
+    elif mode != 'external':
+        raise ValueError(f'MEDIA_PIPELINE_MODE desconocido: {mode}')
+
+
+def attachment_saved(sender, instance, raw=False, **kwargs):
+    if not raw and instance.preview_status == 'pending':
+        enqueue_media_job('attachment', instance)
+
+
+def profile_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Profile.save solo incluye avatar en update_fields si el archivo cambió
+    if update_fields is not None and 'avatar' not in update_fields:
+        return
+    if not raw and instance.avatar and not instance.avatar_variants:
+        enqueue_media_job('avatar', instance)
+
+
+def connect_media_signals():
+    """Conecta los receptores que encolan las variantes (desde TasksConfig.ready)."""
+    post_save.connect(attachment_saved, sender=TaskAttachment, dispatch_uid='media_attachment_saved')
+    post_save.connect(profile_saved, sender=Profile, dispatch_uid='media_profile_saved')
@@ -0,0 +1,271 @@
+import atexit
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+from .activity_service import _pid_alive, get_activity_queue_depth
+
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (segundos) de los buckets de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Límites superiores de los buckets de consultas por request
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# Métricas expuestas: nombre -> (tipo, ayuda, buckets de los histogramas)
+METRICS = {
+    'tasks_http_request_duration_seconds': ('histogram', 'Latencia de las requests por vista.', LATENCY_BUCKETS),
+    'tasks_http_responses_total': ('counter', 'Respuestas por vista y código de estado.', None),
+    'tasks_db_queries_per_request': ('histogram', 'Consultas SQL por request y vista.', QUERY_BUCKETS),
+    'tasks_db_query_seconds_total': ('counter', 'Tiempo en consultas SQL por vista.', None),
+    'tasks_cache_requests_total': ('counter', 'Lecturas de la caché del dashboard por resultado (hit/miss).', None),
+    'tasks_attachment_bytes_served_total': ('counter', 'Bytes de adjuntos y vistas previas servidos.', None),
+    'tasks_activity_queue_depth': ('gauge', 'Eventos de actividad pendientes de escribir por worker.', None),
+}
+
+# Métodos que se etiquetan por nombre; el resto cuenta como OTHER
+HTTP_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_metrics_dir():
+    return Path(_setting('METRICS_DIR', Path(settings.BASE_DIR) / 'var' / 'metrics'))
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """
+    Métricas del proceso en memoria: el camino caliente solo suma en un dict
+    bajo un lock. Un hilo las vuelca cada METRICS_FLUSH_INTERVAL segundos a un
+    fichero por pid en METRICS_DIR, y /metrics suma los ficheros de todos los
+    workers de gunicorn.
+    """
+    
+    def __init__(self):
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.thread = None
+    
+    def inc(self, name, labels, value=1):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, _labels_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                # Cuentas por bucket (no acumuladas; la última es +Inf) y suma
+                histogram = self.histograms[key] = [[0] * (len(buckets) + 1), 0]
+            histogram[0][bisect_left(buckets, value)] += 1
+            histogram[1] += value
+    
+    def snapshot(self):
+        """Estado serializable del proceso, con los gauges leídos en el momento."""
+        with self.lock:
+            counters = [[name, labels, value] for (name, labels), value in self.counters.items()]
+            histograms = [
+                [name, labels, list(counts), total]
+                for (name, labels), (counts, total) in self.histograms.items()
+            ]
+        return {
+            'pid': self.pid,
+            'counters': counters,
+            'histograms': histograms,
+            'gauges': [[name, [], value] for name, value in collect_gauges().items()],
+        }
+    
+    def flush(self):
+        """Escribe el estado del proceso en su fichero (reemplazo atómico)."""
+        directory = get_metrics_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'metrics-{self.pid}.json'
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.snapshot()), encoding='utf-8')
+        os.replace(tmp, path)
+    
+    def ensure_thread(self):
+        """Arranca el hilo de volcado si no está en marcha."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='metrics-flush', daemon=True)
+                self.thread.start()
+    
+    def run(self):
+        while True:
+            time.sleep(_setting('METRICS_FLUSH_INTERVAL', 5))
+            try:
+                self.flush()
+            except OSError:
+                logger.exception('No se pudieron volcar las métricas del proceso')
+    
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+def get_metrics_registry():
+    """Retorna el registro del proceso (uno nuevo tras un fork)."""
+    global _registry
+    if _registry is None or _registry.pid != os.getpid():
+        with _registry_lock:
+            if _registry is None or _registry.pid != os.getpid():
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def metrics_enabled():
+    return _setting('METRICS_ENABLED', True)
+
+
+def record_request(view, method, status, duration, profile=None):
+    """Registra una request: latencia, código de estado y, con el perfil de rendimiento, SQL y caché."""
+    registry = get_metrics_registry()
+    registry.ensure_thread()
+    method = method if method in HTTP_METHODS else 'OTHER'
+    registry.observe('tasks_http_request_duration_seconds', {'view': view, 'method': method}, duration)
+    registry.inc('tasks_http_responses_total', {'view': view, 'status': str(status)})
+    if profile is not None:
+        registry.observe('tasks_db_queries_per_request', {'view': view}, profile.queries)
+        registry.inc('tasks_db_query_seconds_total', {'view': view}, profile.sql_ms / 1000)
+        if profile.cache_hits:
+            registry.inc('tasks_cache_requests_total', {'cache': 'dashboard', 'result': 'hit'}, profile.cache_hits)
+        if profile.cache_misses:
+            registry.inc('tasks_cache_requests_total', {'cache': 'dashboard', 'result': 'miss'}, profile.cache_misses)
+
+
+def record_attachment_bytes(kind, nbytes, mode):
+    """Suma los bytes servidos de un adjunto o vista previa ('attachment' o 'preview')."""
+    if metrics_enabled() and nbytes:
+        get_metrics_registry().inc('tasks_attachment_bytes_served_total', {'kind': kind, 'delivery': mode}, nbytes)
+
+
+def collect_gauges():
+    """Valores instantáneos del proceso que se vuelcan con cada snapshot."""
+    return {'tasks_activity_queue_depth': get_activity_queue_depth()}
+
+
+def collect_metrics():
+    """
+    Suma los ficheros de todos los workers (más el estado actual de este proceso).
+    Los contadores e histogramas de workers ya terminados se conservan; sus
+    gauges se descartan.
+    """
+    registry = get_metrics_registry()
+    snapshots = {registry.pid: registry.snapshot()}
+    for path in sorted(get_metrics_dir().glob('metrics-*.json')):
+        try:
+            snapshot = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        snapshots.setdefault(snapshot['pid'], snapshot)
+    
+    counters, histograms, gauges = {}, {}, {}
+    for pid, snapshot in snapshots.items():
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, counts, total in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(counts), 0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+        if pid == registry.pid or _pid_alive(pid):
+            for name, labels, value in snapshot['gauges']:
+                key = (name, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+    return counters, histograms, gauges
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics():
+    """Métricas de todos los workers en el formato de texto de Prometheus (0.0.4)."""
+    counters, histograms, gauges = collect_metrics()
+    values = {'counter': counters, 'gauge': gauges}
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            for (metric, labels), (counts, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*buckets, '+Inf'), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        else:
+            for (metric, labels), value in sorted(values[kind].items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_access_allowed(request):
+    """/metrics solo para usuarios staff o direcciones de METRICS_ALLOWED_NETWORKS."""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    networks = _setting('METRICS_ALLOWED_NETWORKS', ('127.0.0.1/32', '::1/128'))
+    return any(address in ipaddress.ip_network(network) for network in networks)
+
+
+def reset_metrics():
+    """Pone a cero las métricas de este proceso (no toca los ficheros de otros workers)."""
+    get_metrics_registry().reset()
+
+
+def _flush_at_exit():
+    registry = _registry
+    if registry is not None and registry.pid == os.getpid():
+        try:
+            registry.flush()
+        except OSError:
+            pass
+
+
+atexit.register(_flush_at_exit)
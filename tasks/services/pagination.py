@@ -0,0 +1,124 @@
+import operator
+from datetime import date, datetime
+from functools import reduce
+
+from django.core import signing
+from django.db.models import Q
+
+
+# Salt de firma de los cursores, para que no se puedan fabricar ni reutilizar en otros contextos
+CURSOR_SALT = 'tasks.pagination.cursor'
+
+
+class InvalidCursor(ValueError):
+    """Cursor de paginación inválido o manipulado."""
+
+
+def encode_cursor(values, direction='next'):
+    """Codifica los valores de la clave de ordenación en un token opaco y firmado."""
+    serialized = [
+        value.isoformat() if isinstance(value, (date, datetime)) else value
+        for value in values
+    ]
+    return signing.dumps([direction, serialized], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token, size):
+    """Decodifica un token retornando (dirección, valores)."""
+    try:
+        direction, values = signing.loads(token, salt=CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise InvalidCursor('Cursor inválido')
+    if direction not in ('next', 'previous') or not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Cursor inválido')
+    return direction, values
+
+
+class KeysetPage:
+    """Página obtenida por cursor: objetos y cursores hacia delante y hacia atrás."""
+    
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def __getitem__(self, index):
+        return self.object_list[index]
+    
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    def has_previous(self):
+        return self.previous_cursor is not None
+    
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginación por cursor (keyset) sobre una ordenación total del queryset.
+    Cada página es una consulta con WHERE sobre la clave de ordenación y LIMIT,
+    sin COUNT ni OFFSET, por lo que el coste no crece con la profundidad.
+    La ordenación debe terminar en un campo único (por ejemplo el id).
+    """
+    
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+    
+    def get_page(self, cursor=None):
+        """Retorna la página indicada por el cursor, o la primera si no hay cursor."""
+        direction, values = 'next', None
+        if cursor:
+            direction, values = decode_cursor(cursor, len(self.fields))
+        backwards = direction == 'previous'
+        
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._after(values, backwards))
+        ordering = self._reversed_ordering() if backwards else self.ordering
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(self._key(rows[-1]), 'next')
+        if rows and has_previous:
+            previous_cursor = encode_cursor(self._key(rows[0]), 'previous')
+        return KeysetPage(rows, next_cursor, previous_cursor)
+    
+    def _after(self, values, backwards=False):
+        """Condición de filas posteriores (o anteriores) a la clave dada."""
+        conditions = []
+        for position, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending != backwards else 'gt'
+            term = Q(**{f'{name}__{lookup}': values[position]})
+            for previous, (previous_name, _) in enumerate(self.fields[:position]):
+                term &= Q(**{previous_name: values[previous]})
+            conditions.append(term)
+        return reduce(operator.or_, conditions)
+    
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+    
+    def _key(self, row):
+        """Valores de la clave de ordenación de una fila (instancia o diccionario)."""
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.fields]
+        return [getattr(row, name) for name, _ in self.fields]
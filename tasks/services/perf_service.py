@@ -0,0 +1,235 @@
+import functools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# Listas IN (%s, %s, ...) de longitud variable y literales que no distinguen la forma de una consulta
+_IN_LIST_RE = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES_RE = re.compile(r'\s+')
+
+# Perfil de la request en curso; asgiref lo copia a los hilos de sync_to_async
+_current_profile = ContextVar('request_profile', default=None)
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def sql_shape(sql):
+    """
+    Forma de una sentencia SQL: sin literales y con las listas IN de cualquier
+    longitud reducidas a una, para agrupar las consultas que solo cambian de
+    parámetros (el patrón N+1).
+    """
+    shape = _LITERAL_RE.sub('?', sql)
+    shape = _IN_LIST_RE.sub('(...)', shape)
+    return _SPACES_RE.sub(' ', shape).strip()
+
+
+class RequestProfile:
+    """
+    Métricas de una request: consultas SQL (número, tiempo y repeticiones por
+    forma), aciertos y fallos de caché y tiempo de renderizado de plantillas.
+    Se usa como execute_wrapper de las conexiones mientras dura la request.
+    """
+    
+    def __init__(self, threshold=None):
+        self.threshold = _setting('PERF_NPLUSONE_THRESHOLD', 5) if threshold is None else threshold
+        self.started = time.perf_counter()
+        self.duration_ms = None
+        self.view_name = None
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.shapes = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_ms = 0.0
+        self.template_depth = 0
+    
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+    
+    def record_cache(self, hit):
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+    
+    def instrument(self):
+        """Contexto que registra las consultas de todas las conexiones en este perfil."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+    
+    def n_plus_one(self):
+        """Formas de consulta repetidas más de PERF_NPLUSONE_THRESHOLD veces: [(forma, veces)]."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > self.threshold]
+    
+    def finish(self, view_name=None):
+        self.view_name = view_name
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+    
+    def server_timing(self):
+        """Valor de la cabecera Server-Timing."""
+        metrics = [
+            f'sql;dur={self.sql_ms:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits/{self.cache_misses} misses"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'app;dur={self.duration_ms:.1f}',
+        ]
+        if self.view_name:
+            metrics.append(f'view;desc="{self.view_name}"')
+        repeated = self.n_plus_one()
+        if repeated:
+            metrics.append(f'nplusone;desc="{len(repeated)} repeated queries"')
+        return ', '.join(metrics)
+    
+    def as_record(self, request, response):
+        """Registro serializable de la request para el log de rendimiento."""
+        return {
+            'time': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'view': self.view_name,
+            'status': response.status_code,
+            'duration_ms': round(self.duration_ms, 2),
+            'sql_queries': self.queries,
+            'sql_ms': round(self.sql_ms, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'template_ms': round(self.template_ms, 2),
+            'n_plus_one': [{'sql': shape, 'count': count} for shape, count in self.n_plus_one()],
+        }
+
+
+def get_request_profile():
+    """Perfil de la request en curso o None fuera del middleware de rendimiento."""
+    return _current_profile.get()
+
+
+def start_request_profile():
+    """Crea el perfil de la request en curso. Retorna (perfil, token para reset_request_profile)."""
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+
+def reset_request_profile(token):
+    _current_profile.reset(token)
+
+
+def record_cache_access(hit):
+    """Anota un acierto o fallo de caché en el perfil de la request en curso."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record_cache(hit)
+
+
+def _timed_render(render):
+    @functools.wraps(render)
+    def wrapper(self, context):
+        profile = _current_profile.get()
+        if profile is None:
+            return render(self, context)
+        # Las plantillas incluidas se cuentan dentro de la que las incluye
+        profile.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_ms += (time.perf_counter() - start) * 1000
+    
+    wrapper.perf_timed = True
+    return wrapper
+
+
+def install_template_timing():
+    """Mide el renderizado de plantillas de Django en el perfil de la request (desde TasksConfig.ready)."""
+    if not getattr(Template.render, 'perf_timed', False):
+        Template.render = _timed_render(Template.render)
+
+
+def get_perf_log():
+    """Logger del log de rendimiento con rotación (PERF_LOG_FILE), creado al primer uso."""
+    global _log
+    path = os.path.abspath(_setting('PERF_LOG_FILE', os.path.join(settings.BASE_DIR, 'var', 'log', 'perf.jsonl')))
+    with _log_lock:
+        if _log is None or _log.handlers[0].baseFilename != path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=_setting('PERF_LOG_MAX_BYTES', 10 * 1024 * 1024),
+                backupCount=_setting('PERF_LOG_BACKUP_COUNT', 5),
+                encoding='utf-8',
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            log = logging.getLogger('tasks.perf.requests')
+            log.propagate = False
+            log.setLevel(logging.INFO)
+            for old in log.handlers[:]:
+                log.removeHandler(old)
+                old.close()
+            log.addHandler(handler)
+            _log = log
+    return _log
+
+
+def should_log(profile):
+    """Se registran las requests lentas, las que tienen N+1 y una muestra del resto."""
+    if profile.n_plus_one():
+        return True
+    if profile.duration_ms >= _setting('PERF_SLOW_REQUEST_MS', 500):
+        return True
+    return random.random() < _setting('PERF_LOG_SAMPLE_RATE', 0.0)
+
+
+def finish_request_profile(request, response, profile):
+    """
+    Cierra el perfil de la request: lo deja en request.perf, añade la cabecera
+    Server-Timing (PERF_SERVER_TIMING), avisa de los N+1 y escribe el registro
+    si le toca.
+    """
+    match = getattr(request, 'resolver_match', None)
+    profile.finish(match.view_name if match else None)
+    request.perf = profile
+    if _setting('PERF_SERVER_TIMING', False):
+        response.headers['Server-Timing'] = profile.server_timing()
+    
+    repeated = profile.n_plus_one()
+    if repeated:
+        shape, count = repeated[0]
+        logger.warning('Posible N+1 en %s: %d consultas con la forma %s', profile.view_name or request.path, count, shape)
+    if should_log(profile):
+        try:
+            get_perf_log().info(json.dumps(profile.as_record(request, response)))
+        except OSError:
+            logger.exception('No se pudo escribir el log de rendimiento')
+    return response
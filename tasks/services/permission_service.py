@@ -0,0 +1,98 @@
+from django.db.models import OuterRef, Subquery
+
+from ..models import TaskList, SharedList
+from ..models.list_models import PERMISSION_LEVELS
+
+
+# Atributo de la request donde se cachean los permisos del usuario
+REQUEST_CACHE_ATTR = '_list_permissions'
+
+
+def _permission_rows(user):
+    """Filas (list_id, owner_id, permiso compartido) de las listas accesibles."""
+    shared_permission = SharedList.objects.filter(
+        task_list=OuterRef('pk'),
+        shared_with=user
+    ).values('permission')[:1]
+    return TaskList.objects.accessible_to(user).annotate(
+        shared_permission=Subquery(shared_permission)
+    ).order_by().values_list('pk', 'owner_id', 'shared_permission')
+
+
+def load_list_permissions(user):
+    """
+    Carga en una sola consulta los permisos del usuario sobre todas sus listas.
+    Retorna un diccionario {list_id: 'owner' | 'write' | 'read'}.
+    """
+    if not user.is_authenticated:
+        return {}
+    
+    return {
+        list_id: 'owner' if owner_id == user.pk else permission
+        for list_id, owner_id, permission in _permission_rows(user)
+    }
+
+
+async def aload_list_permissions(user):
+    """Versión asíncrona de load_list_permissions (ORM asíncrono)."""
+    if not user.is_authenticated:
+        return {}
+    
+    return {
+        list_id: 'owner' if owner_id == user.pk else permission
+        async for list_id, owner_id, permission in _permission_rows(user)
+    }
+
+
+def get_list_permissions(request):
+    """Permisos del usuario de la request, cargados una sola vez por request."""
+    permissions = getattr(request, REQUEST_CACHE_ATTR, None)
+    if permissions is None:
+        permissions = load_list_permissions(request.user)
+        setattr(request, REQUEST_CACHE_ATTR, permissions)
+    return permissions
+
+
+async def aget_list_permissions(request):
+    """Versión asíncrona de get_list_permissions (comparte la caché de la request)."""
+    permissions = getattr(request, REQUEST_CACHE_ATTR, None)
+    if permissions is None:
+        permissions = await aload_list_permissions(await request.auser())
+        setattr(request, REQUEST_CACHE_ATTR, permissions)
+    return permissions
+
+
+def invalidate_list_permissions(request):
+    """Descarta la caché de permisos tras cambiar propietarios o comparticiones."""
+    if hasattr(request, REQUEST_CACHE_ATTR):
+        delattr(request, REQUEST_CACHE_ATTR)
+
+
+def get_list_permission(request, task_list):
+    """Permiso del usuario sobre la lista (instancia o id), o None si no tiene acceso."""
+    list_id = getattr(task_list, 'pk', task_list)
+    return get_list_permissions(request).get(list_id)
+
+
+def _check_permission_level(min_permission):
+    if min_permission not in PERMISSION_LEVELS:
+        raise ValueError(f'Permiso desconocido: {min_permission}')
+
+
+def _permission_allows(permission, min_permission):
+    if permission is None:
+        return False
+    return PERMISSION_LEVELS[permission] >= PERMISSION_LEVELS[min_permission]
+
+
+def has_list_permission(request, task_list, min_permission='read'):
+    """Verifica si el usuario tiene al menos el permiso indicado sobre la lista."""
+    _check_permission_level(min_permission)
+    return _permission_allows(get_list_permission(request, task_list), min_permission)
+
+
+async def ahas_list_permission(request, task_list, min_permission='read'):
+    """Versión asíncrona de has_list_permission."""
+    _check_permission_level(min_permission)
+    permissions = await aget_list_permissions(request)
+    return _permission_allows(permissions.get(getattr(task_list, 'pk', task_list)), min_permission)
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from ..models import Task, TaskList, SharedList
+from ..models.list_models import task_counter_fields
+
+
+logger = logging.getLogger(__name__)
+
+# Evento que pide al cliente recargar el estado completo (cola desbordada)
+RESYNC_EVENT = {'type': 'resync'}
+
+# Eventos tras los que se cierra el stream para que el cliente se vuelva a suscribir
+RESUBSCRIBE_EVENTS = ('access', 'resync')
+
+
+def list_channel(task_list_id):
+    """Canal de eventos de una lista."""
+    return f'list:{task_list_id}'
+
+
+def user_channel(user_id):
+    """Canal de eventos de acceso de un usuario (listas compartidas o retiradas)."""
+    return f'user:{user_id}'
+
+
+class Subscription:
+    """
+    Cola de eventos de un cliente suscrito a varios canales. Los eventos se
+    publican desde cualquier hilo y se entregan en el bucle del cliente; si la
+    cola se llena el cliente recibe un evento resync en lugar de los perdidos.
+    """
+    
+    def __init__(self, broker, channels, maxsize):
+        self.broker = broker
+        self.channels = set(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+    
+    def deliver(self, event):
+        """Entrega un evento desde cualquier hilo."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # El bucle del cliente ya se cerró
+    
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+    
+    async def get(self, timeout):
+        """Siguiente evento, o None si no llega ninguno en timeout segundos."""
+        if self.overflowed:
+            self.overflowed = False
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return RESYNC_EVENT
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Pub/sub en memoria: reparte los eventos a los clientes de este proceso."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+    
+    def publish(self, channel, event):
+        self.deliver(channel, event)
+    
+    def deliver(self, channel, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+    
+    def subscribe(self, channels):
+        """Suscribe al cliente actual (en su bucle de eventos) a los canales."""
+        subscription = Subscription(self, channels, getattr(settings, 'PUSH_QUEUE_SIZE', 100))
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscriptions[channel].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscriptions[channel]
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Pub/sub entre procesos sobre Redis (o un servidor compatible). Los eventos se
+    publican en Redis y un hilo por proceso los reparte a sus clientes locales.
+    """
+    
+    def __init__(self, url, prefix='tasks:push:'):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('PUSH_BROKER=redis requiere el paquete redis')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.listener = None
+    
+    def publish(self, channel, event):
+        self.client.publish(self.prefix + channel, json.dumps(event))
+    
+    def subscribe(self, channels):
+        self.ensure_listener()
+        return super().subscribe(channels)
+    
+    def ensure_listener(self):
+        if self.listener is not None and self.listener.is_alive():
+            return
+        with self.lock:
+            if self.listener is None or not self.listener.is_alive():
+                self.listener = threading.Thread(target=self.listen, name='push-redis-listener', daemon=True)
+                self.listener.start()
+    
+    def listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + '*')
+        for message in pubsub.listen():
+            try:
+                channel = message['channel'].decode()[len(self.prefix):]
+                self.deliver(channel, json.loads(message['data']))
+            except Exception:
+                logger.exception('Evento push descartado')
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_push_broker():
+    """Broker del proceso según PUSH_BROKER ('memory' o 'redis')."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'PUSH_BROKER', 'memory')
+                if backend == 'memory':
+                    _broker = InProcessBroker()
+                elif backend == 'redis':
+                    _broker = RedisBroker(getattr(settings, 'PUSH_REDIS_URL', 'redis://127.0.0.1:6379/0'))
+                else:
+                    raise ImproperlyConfigured(f'PUSH_BROKER desconocido: {backend}')
+    return _broker
+
+
+def push_enabled():
+    return getattr(settings, 'PUSH_ENABLED', True)
+
+
+def publish_events(events):
+    """Publica [(canal, evento)] cuando la transacción actual confirme."""
+    if not events or not push_enabled():
+        return
+    
+    def publish():
+        broker = get_push_broker()
+        for channel, event in events:
+            try:
+                broker.publish(channel, event)
+            except Exception:
+                logger.exception('No se pudo publicar el evento push en %s', channel)
+    
+    transaction.on_commit(publish)
+
+
+def serialize_task(task):
+    """Campos de la tarea necesarios para actualizar una tarjeta del kanban."""
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'status': task.status,
+        'status_display': task.get_status_display(),
+        'priority': task.priority,
+        'priority_display': task.get_priority_display(),
+        'due_date': task.due_date.isoformat() if task.due_date else None,
+        'completed_at': task.completed_at.isoformat() if task.completed_at else None,
+    }
+
+
+def task_events(task, op, counter_deltas, previous_list_id=None):
+    """
+    Eventos de un cambio de tarea: el delta de contadores de cada lista afectada
+    (no las estadísticas completas) y los datos de la tarjeta.
+    """
+    counters = {
+        str(task_list_id): {field: delta for field, delta in deltas.items() if delta}
+        for task_list_id, deltas in counter_deltas.items()
+    }
+    event = {
+        'type': 'task',
+        'op': op,
+        'list_id': task.task_list_id,
+        'task': serialize_task(task),
+        'counters': {list_id: deltas for list_id, deltas in counters.items() if deltas},
+    }
+    list_ids = {task.task_list_id, previous_list_id} - {None}
+    return [(list_channel(task_list_id), event) for task_list_id in list_ids]
+
+
+def _deltas_for(task_list_id, status, sign):
+    return {task_list_id: {field: sign for field in task_counter_fields(status)}}
+
+
+def task_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Receptor de post_save de Task (el estado anterior sigue en _counter_state)."""
+    if not push_enabled():
+        return
+    if created:
+        deltas = _deltas_for(instance.task_list_id, instance.status, 1)
+        previous_list_id = None
+    else:
+        deltas = instance._get_counter_deltas(update_fields)
+        previous_list_id = (instance._counter_state or (None,))[0]
+    publish_events(task_events(instance, 'created' if created else 'updated', deltas, previous_list_id))
+
+
+def task_deleted(sender, instance, origin=None, **kwargs):
+    """Receptor de post_delete de Task."""
+    if not push_enabled():
+        return
+    # Al eliminar la lista basta con su propio evento
+    if isinstance(origin, TaskList) or getattr(origin, 'model', None) is TaskList:
+        return
+    task_list_id, status = instance._counter_state or (instance.task_list_id, instance.status)
+    publish_events(task_events(instance, 'deleted', _deltas_for(task_list_id, status, -1)))
+
+
+def task_list_changed(sender, instance, created=False, **kwargs):
+    """Receptor de post_save/post_delete de TaskList."""
+    if not push_enabled():
+        return
+    op = 'deleted' if kwargs.get('signal') is post_delete else ('created' if created else 'updated')
+    event = {'type': 'list', 'op': op, 'list_id': instance.pk, 'name': instance.name}
+    events = [(list_channel(instance.pk), event)]
+    if op != 'updated':
+        events.append((user_channel(instance.owner_id), dict(event, type='access')))
+    publish_events(events)
+
+
+def shared_list_changed(sender, instance, **kwargs):
+    """Receptor de SharedList: el destinatario gana o pierde acceso a la lista."""
+    if not push_enabled():
+        return
+    op = 'revoked' if kwargs.get('signal') is post_delete else 'granted'
+    publish_events([(
+        user_channel(instance.shared_with_id),
+        {'type': 'access', 'op': op, 'list_id': instance.task_list_id},
+    )])
+
+
+def connect_push_signals():
+    """Conecta los receptores que publican los cambios (desde TasksConfig.ready)."""
+    post_save.connect(task_saved, sender=Task, dispatch_uid='push_task_saved')
+    post_delete.connect(task_deleted, sender=Task, dispatch_uid='push_task_deleted')
+    post_save.connect(task_list_changed, sender=TaskList, dispatch_uid='push_list_saved')
+    post_delete.connect(task_list_changed, sender=TaskList, dispatch_uid='push_list_deleted')
+    post_save.connect(shared_list_changed, sender=SharedList, dispatch_uid='push_share_saved')
+    post_delete.connect(shared_list_changed, sender=SharedList, dispatch_uid='push_share_deleted')
@@ -0,0 +1,309 @@
+import re
+
+from django.apps import apps
+from django.db import connections, router
+from django.db.models import Expression, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+
+class SearchIndex:
+    """Describe el índice de búsqueda de un modelo: tabla auxiliar y campos indexados."""
+    
+    def __init__(self, label, source_table, table, fields):
+        self.label = label
+        self.source_table = source_table
+        self.table = table
+        # Campos en orden de relevancia: el primero pesa más en el ranking
+        self.fields = fields
+
+
+# Índices de búsqueda por modelo (app_label.model_name)
+SEARCH_INDEXES = {
+    index.label: index for index in (
+        SearchIndex('tasks.task', 'tasks_task', 'tasks_task_search', ('title', 'description')),
+        SearchIndex('tasks.tasklist', 'tasks_tasklist', 'tasks_tasklist_search', ('name', 'description')),
+        SearchIndex('auth.user', 'auth_user', 'tasks_user_search', ('username', 'first_name', 'last_name')),
+    )
+}
+
+# Palabras de la consulta: letras y dígitos (el resto actúa como separador)
+TERM_RE = re.compile(r'[^\W_]+')
+
+
+def parse_terms(query):
+    """Retorna las palabras de la consulta en minúsculas."""
+    return [term.lower() for term in TERM_RE.findall(query or '')]
+
+
+class SearchRankExpression(Expression):
+    """Subconsulta correlacionada que calcula la relevancia de cada fila del queryset."""
+    output_field = FloatField()
+    
+    def __init__(self, sql, params):
+        super().__init__()
+        self.sql = sql
+        self.params = params
+        self.pk = F('pk')
+    
+    def get_source_expressions(self):
+        return [self.pk]
+    
+    def set_source_expressions(self, exprs):
+        self.pk, = exprs
+    
+    def as_sql(self, compiler, connection):
+        pk_sql, pk_params = compiler.compile(self.pk)
+        return self.sql.format(pk=pk_sql), [*self.params, *pk_params]
+
+
+class BaseSearchBackend:
+    """
+    Interfaz común de los motores de búsqueda.
+    Cada índice vive en una tabla auxiliar cuya clave es el id del objeto indexado,
+    que se mantiene al guardar/eliminar y se puede reconstruir desde la tabla origen.
+    """
+    
+    def __init__(self, using):
+        self.using = using
+    
+    @property
+    def connection(self):
+        # Las conexiones son por hilo: se resuelven en cada uso
+        return connections[self.using]
+    
+    def install(self):
+        """Crea las tablas auxiliares de los índices."""
+        with self.connection.cursor() as cursor:
+            for index in SEARCH_INDEXES.values():
+                for sql in self.create_sql(index):
+                    cursor.execute(sql)
+    
+    def uninstall(self):
+        """Elimina las tablas auxiliares de los índices."""
+        with self.connection.cursor() as cursor:
+            for index in SEARCH_INDEXES.values():
+                cursor.execute(f'DROP TABLE IF EXISTS {index.table}')
+    
+    def rebuild(self, index):
+        """Regenera el índice completo a partir de la tabla origen. Retorna las filas indexadas."""
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {index.table}')
+            cursor.execute(self.rebuild_sql(index))
+            cursor.execute(f'SELECT COUNT(*) FROM {index.table}')
+            return cursor.fetchone()[0]
+    
+    def update(self, index, pk, values):
+        """Indexa (o reindexa) un objeto con los valores de sus campos."""
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {index.table} WHERE {self.key_column} = %s', [pk])
+            cursor.execute(self.insert_sql(index), [pk, *(value or '' for value in values)])
+    
+    def remove(self, index, pk):
+        """Elimina un objeto del índice."""
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {index.table} WHERE {self.key_column} = %s', [pk])
+    
+    def filter(self, queryset, index, terms, prefix=False, ranked=False):
+        """Filtra el queryset por las palabras indicadas; con ranked anota search_rank."""
+        match_sql, params = self.match_sql(index, terms, prefix)
+        queryset = queryset.filter(pk__in=RawSQL(match_sql, params))
+        if ranked:
+            rank_sql, params = self.rank_sql(index, terms, prefix)
+            queryset = queryset.annotate(search_rank=SearchRankExpression(rank_sql, params))
+        return queryset
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """Búsqueda con tablas virtuales FTS5 de SQLite (desarrollo y despliegues pequeños)."""
+    key_column = 'rowid'
+    
+    def create_sql(self, index):
+        columns = ', '.join(index.fields)
+        yield (
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {index.table} '
+            f"USING fts5({columns}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    
+    def rebuild_sql(self, index):
+        columns = ', '.join(index.fields)
+        values = ', '.join(f"COALESCE({field}, '')" for field in index.fields)
+        return f'INSERT INTO {index.table} (rowid, {columns}) SELECT id, {values} FROM {index.source_table}'
+    
+    def insert_sql(self, index):
+        columns = ', '.join(index.fields)
+        placeholders = ', '.join(['%s'] * len(index.fields))
+        return f'INSERT INTO {index.table} (rowid, {columns}) VALUES (%s, {placeholders})'
+    
+    def match_expression(self, terms, prefix):
+        suffix = '*' if prefix else ''
+        return ' '.join(f'"{term}"{suffix}' for term in terms)
+    
+    def match_sql(self, index, terms, prefix):
+        return (
+            f'SELECT rowid FROM {index.table} WHERE {index.table} MATCH %s',
+            [self.match_expression(terms, prefix)],
+        )
+    
+    def rank_sql(self, index, terms, prefix):
+        # bm25 es menor cuanto más relevante; el primer campo pesa más
+        weights = ', '.join(str(float(len(index.fields) - i)) for i in range(len(index.fields)))
+        return (
+            f'(SELECT bm25({index.table}, {weights}) FROM {index.table} '
+            f'WHERE {index.table} MATCH %s AND rowid = {{pk}})',
+            [self.match_expression(terms, prefix)],
+        )
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """Búsqueda con columnas tsvector e índice GIN de PostgreSQL (producción)."""
+    key_column = 'id'
+    config = 'simple'
+    weights = 'ABCD'
+    
+    def create_sql(self, index):
+        yield f'CREATE TABLE IF NOT EXISTS {index.table} (id bigint PRIMARY KEY, document tsvector NOT NULL)'
+        yield f'CREATE INDEX IF NOT EXISTS {index.table}_gin ON {index.table} USING GIN (document)'
+    
+    def document_sql(self, index, values):
+        return ' || '.join(
+            f"setweight(to_tsvector('{self.config}', {value}), '{self.weights[min(i, 3)]}')"
+            for i, value in enumerate(values)
+        )
+    
+    def rebuild_sql(self, index):
+        document = self.document_sql(index, [f"COALESCE({field}, '')" for field in index.fields])
+        return f'INSERT INTO {index.table} (id, document) SELECT id, {document} FROM {index.source_table}'
+    
+    def insert_sql(self, index):
+        document = self.document_sql(index, ['%s'] * len(index.fields))
+        return f'INSERT INTO {index.table} (id, document) VALUES (%s, {document})'
+    
+    def tsquery(self, terms, prefix):
+        suffix = ':*' if prefix else ''
+        return ' & '.join(f'{term}{suffix}' for term in terms)
+    
+    def match_sql(self, index, terms, prefix):
+        return (
+            f"SELECT id FROM {index.table} WHERE document @@ to_tsquery('{self.config}', %s)",
+            [self.tsquery(terms, prefix)],
+        )
+    
+    def rank_sql(self, index, terms, prefix):
+        # ts_rank es mayor cuanto más relevante; se niega para ordenar igual que bm25
+        return (
+            f"(SELECT -ts_rank(document, to_tsquery('{self.config}', %s)) FROM {index.table} WHERE id = {{pk}})",
+            [self.tsquery(terms, prefix)],
+        )
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """Búsqueda por icontains para motores sin soporte de texto completo."""
+    
+    def install(self):
+        pass
+    
+    def uninstall(self):
+        pass
+    
+    def rebuild(self, index):
+        return 0
+    
+    def update(self, index, pk, values):
+        pass
+    
+    def remove(self, index, pk):
+        pass
+    
+    def filter(self, queryset, index, terms, prefix=False, ranked=False):
+        for term in terms:
+            condition = Q()
+            for field in index.fields:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        if ranked:
+            queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return queryset
+
+
+# Motores ya resueltos por alias de conexión
+_backends = {}
+
+
+def _sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def get_search_backend(using='default'):
+    """Retorna el motor de búsqueda adecuado para la base de datos indicada."""
+    backend = _backends.get(using)
+    if backend is None:
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            backend = PostgreSQLSearchBackend(using)
+        elif connection.vendor == 'sqlite' and _sqlite_has_fts5(connection):
+            backend = SQLiteSearchBackend(using)
+        else:
+            backend = FallbackSearchBackend(using)
+        _backends[using] = backend
+    return backend
+
+
+def search_queryset(queryset, query, prefix=False, ranked=False):
+    """
+    Filtra un queryset de un modelo indexado por las palabras de la consulta.
+    Con prefix la última parte de cada palabra puede faltar (autocompletado);
+    con ranked anota search_rank, donde un valor menor indica más relevancia.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return queryset.none()
+    index = SEARCH_INDEXES[queryset.model._meta.label_lower]
+    return get_search_backend(queryset.db).filter(queryset, index, terms, prefix=prefix, ranked=ranked)
+
+
+def update_search_index(instance):
+    """Indexa el objeto en la tabla de búsqueda de su modelo."""
+    index = SEARCH_INDEXES[instance._meta.label_lower]
+    values = [getattr(instance, field) for field in index.fields]
+    get_search_backend(instance._state.db or router.db_for_write(type(instance))).update(index, instance.pk, values)
+
+
+def remove_from_search_index(instance):
+    """Elimina el objeto de la tabla de búsqueda de su modelo."""
+    index = SEARCH_INDEXES[instance._meta.label_lower]
+    get_search_backend(instance._state.db or router.db_for_write(type(instance))).remove(index, instance.pk)
+
+
+def rebuild_search_index(labels=None, using='default'):
+    """Reconstruye los índices indicados (todos por defecto). Retorna {label: filas}."""
+    backend = get_search_backend(using)
+    return {
+        label: backend.rebuild(SEARCH_INDEXES[label])
+        for label in (labels or SEARCH_INDEXES)
+    }
+
+
+def sync_search_index(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Receptor post_save: reindexa solo si cambió algún campo indexado."""
+    if raw:
+        return
+    index = SEARCH_INDEXES[sender._meta.label_lower]
+    if update_fields is not None and not set(update_fields) & set(index.fields):
+        return
+    update_search_index(instance)
+
+
+def purge_search_index(sender, instance, **kwargs):
+    """Receptor post_delete: elimina el objeto del índice."""
+    remove_from_search_index(instance)
+
+
+def connect_search_signals():
+    """Conecta los receptores de mantenimiento del índice (desde TasksConfig.ready)."""
+    for label in SEARCH_INDEXES:
+        model = apps.get_model(label)
+        post_save.connect(sync_search_index, sender=model, dispatch_uid=f'search_sync_{label}')
+        post_delete.connect(purge_search_index, sender=model, dispatch_uid=f'search_purge_{label}')
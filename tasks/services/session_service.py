@@ -0,0 +1,84 @@
+import logging
+import threading
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import request_finished
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+# Modos de limpieza de sesiones caducadas: hilo lanzado desde las requests o
+# externo (cron con `manage.py clearsessions`)
+SESSION_CLEANUP_MODES = ('background', 'external')
+
+CLEANUP_LOCK_KEY = 'sessions:cleanup'
+
+_last_cleanup = 0.0
+_cleanup_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def clear_expired_sessions():
+    """Borra las sesiones caducadas del motor configurado. Retorna False si no lo soporta."""
+    engine = import_module(settings.SESSION_ENGINE)
+    try:
+        engine.SessionStore.clear_expired()
+    except NotImplementedError:
+        return False
+    return True
+
+
+def _run_cleanup():
+    try:
+        close_old_connections()
+        clear_expired_sessions()
+    except Exception:
+        logger.exception('Error borrando las sesiones caducadas')
+    finally:
+        # El hilo tiene su propia conexión
+        close_old_connections()
+
+
+def schedule_session_cleanup(now=None):
+    """
+    Lanza la limpieza de sesiones caducadas en un hilo si han pasado
+    SESSION_CLEANUP_INTERVAL segundos desde la última del proceso. Con una
+    caché de sesiones compartida solo un proceso la lanza por intervalo.
+    Retorna True si la lanzó.
+    """
+    global _last_cleanup
+    mode = _setting('SESSION_CLEANUP_MODE', 'background')
+    if mode == 'external':
+        return False
+    if mode != 'background':
+        raise ValueError(f'SESSION_CLEANUP_MODE desconocido: {mode}')
+    
+    interval = _setting('SESSION_CLEANUP_INTERVAL', 3600)
+    now = time.time() if now is None else now
+    with _cleanup_lock:
+        if now - _last_cleanup < interval:
+            return False
+        _last_cleanup = now
+    
+    cache = caches[_setting('SESSION_CACHE_ALIAS', 'default')]
+    if not cache.add(CLEANUP_LOCK_KEY, now, interval):
+        return False
+    threading.Thread(target=_run_cleanup, name='session-cleanup', daemon=True).start()
+    return True
+
+
+def cleanup_on_request_finished(sender, **kwargs):
+    """Receptor de request_finished: programa la limpieza periódica de sesiones."""
+    schedule_session_cleanup()
+
+
+def connect_session_signals():
+    """Conecta la limpieza de sesiones al final de las requests (desde TasksConfig.ready)."""
+    request_finished.connect(cleanup_on_request_finished, dispatch_uid='session_cleanup')
@@ -0,0 +1,115 @@
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from ..models import TaskList, Task, TaskActivity
+
+
+# Estados que se consideran abiertos (no completados)
+OPEN_STATUSES = ['pending', 'in_progress']
+
+
+def _accessible_list_ids(user):
+    """Subconsulta con los ids de las listas propias o compartidas con el usuario."""
+    return TaskList.objects.accessible_to(user).values('pk')
+
+
+def _user_tasks(user):
+    """Tareas de las listas accesibles, sin distinct() sobre el OR-join."""
+    return Task.objects.filter(task_list__in=_accessible_list_ids(user))
+
+
+def get_task_counts(tasks, now=None):
+    """
+    Calcula todos los contadores de un queryset de tareas en una sola consulta.
+    Retorna un diccionario con total, pending, in_progress, completed,
+    overdue y high_priority.
+    """
+    counts = tasks.order_by().aggregate(**_count_aggregates(now))
+    return counts
+
+
+async def aget_task_counts(tasks, now=None):
+    """Versión asíncrona de get_task_counts."""
+    return await tasks.order_by().aaggregate(**_count_aggregates(now))
+
+
+def _count_aggregates(now=None):
+    now = now or timezone.now()
+    open_tasks = Q(status__in=OPEN_STATUSES)
+    return {
+        'total': Count('pk'),
+        'pending': Count('pk', filter=Q(status='pending')),
+        'in_progress': Count('pk', filter=Q(status='in_progress')),
+        'completed': Count('pk', filter=Q(status='completed')),
+        'overdue': Count('pk', filter=open_tasks & Q(due_date__lt=now)),
+        'high_priority': Count('pk', filter=open_tasks & Q(priority='high')),
+    }
+
+
+def get_user_task_counts(user, now=None):
+    """Contadores de todas las tareas accesibles para el usuario."""
+    return get_task_counts(_user_tasks(user), now=now)
+
+
+async def aget_user_task_counts(user, now=None):
+    """Versión asíncrona de get_user_task_counts."""
+    return await aget_task_counts(_user_tasks(user), now=now)
+
+
+def get_list_task_counts(task_list, now=None):
+    """Contadores de las tareas de una lista concreta."""
+    return get_task_counts(task_list.tasks.all(), now=now)
+
+
+async def aget_list_task_counts(task_list, now=None):
+    """Versión asíncrona de get_list_task_counts."""
+    return await aget_task_counts(task_list.tasks.all(), now=now)
+
+
+def get_next_due_change(tasks, days=7, now=None):
+    """
+    Próximo instante en que cambian los datos que dependen de la hora: una tarea
+    abierta que pasa a vencida o que entra en la ventana de próximas a vencer.
+    Retorna None si no hay ninguno.
+    """
+    now = now or timezone.now()
+    window = timezone.timedelta(days=days)
+    boundaries = tasks.filter(status__in=OPEN_STATUSES).order_by().aggregate(
+        next_overdue=Min('due_date', filter=Q(due_date__gte=now)),
+        next_upcoming=Min('due_date', filter=Q(due_date__gt=now + window)),
+    )
+    changes = [boundaries['next_overdue']]
+    if boundaries['next_upcoming']:
+        changes.append(boundaries['next_upcoming'] - window)
+    return min((change for change in changes if change), default=None)
+
+
+def get_user_next_due_change(user, days=7, now=None):
+    """Próximo cambio por tiempo en las tareas accesibles para el usuario."""
+    return get_next_due_change(_user_tasks(user), days=days, now=now)
+
+
+def get_user_overdue_tasks(user, limit=5, now=None):
+    """Tareas abiertas vencidas del usuario, las más antiguas primero."""
+    now = now or timezone.now()
+    return _user_tasks(user).filter(
+        status__in=OPEN_STATUSES,
+        due_date__lt=now
+    ).select_related('task_list').order_by('due_date')[:limit]
+
+
+def get_user_upcoming_tasks(user, days=7, limit=5, now=None):
+    """Tareas abiertas que vencen en los próximos días."""
+    now = now or timezone.now()
+    return _user_tasks(user).filter(
+        status__in=OPEN_STATUSES,
+        due_date__gte=now,
+        due_date__lte=now + timezone.timedelta(days=days)
+    ).select_related('task_list').order_by('due_date')[:limit]
+
+
+def get_user_recent_activities(user, limit=5):
+    """Últimas actividades sobre tareas de las listas accesibles."""
+    return TaskActivity.objects.filter(
+        task__task_list__in=_accessible_list_ids(user)
+    ).select_related('task', 'user', 'task__task_list').order_by('-timestamp')[:limit]
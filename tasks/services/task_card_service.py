@@ -0,0 +1,161 @@
+from collections import defaultdict
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Substr
+from django.utils import timezone
+
+from ..models import Task, TaskAttachment
+from ..models.task_models import PRIORITY_COLORS, STATUS_ICONS
+from ..models.user_models import avatar_variant_url
+
+
+# Usuarios asignados que se muestran con avatar en cada tarjeta; el resto se resume en "+N"
+CARD_ASSIGNED_USERS = 3
+
+# Caracteres de la descripción que se leen para la tarjeta (muestra 20 palabras)
+CARD_DESCRIPTION_CHARS = 300
+
+# Columnas de Task que usan las tarjetas y la paginación del tablero (TASK_BOARD_ORDERING)
+CARD_FIELDS = (
+    'id', 'title', 'status', 'priority', 'due_date', 'completed_at',
+    'priority_rank', 'effective_due_date', 'created_at',
+)
+
+PRIORITY_LABELS = dict(Task.PRIORITY_CHOICES)
+STATUS_LABELS = dict(Task.STATUS_CHOICES)
+
+
+def _count_per_task(queryset):
+    """Subconsulta con el número de filas de queryset por tarea (0 si no hay ninguna)."""
+    counts = (
+        queryset.filter(task=OuterRef('pk'))
+        .order_by()
+        .values('task')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def annotate_task_cards(tasks):
+    """
+    Añade a un queryset de tareas los contadores de adjuntos y usuarios asignados
+    que usan las tarjetas. Son subconsultas y no Count sobre joins para no
+    multiplicar las filas de la página.
+    """
+    return tasks.annotate(
+        attachments_count=_count_per_task(TaskAttachment.objects.all()),
+        assigned_users_count=_count_per_task(Task.assigned_users.through.objects.all()),
+    )
+
+
+def task_card_rows(tasks):
+    """
+    Proyección de un queryset de tareas con solo las columnas de las tarjetas:
+    filas dict (values()) en lugar de instancias de Task, sin el texto completo
+    de la descripción ni los campos de archivo.
+    """
+    return annotate_task_cards(tasks).values(
+        *CARD_FIELDS,
+        'attachments_count',
+        'assigned_users_count',
+        description_excerpt=Substr('description', 1, CARD_DESCRIPTION_CHARS),
+    )
+
+
+class AssignedUser:
+    """Usuario asignado tal como se muestra en la tarjeta."""
+    
+    __slots__ = ('name', 'initial', 'avatar_url')
+    
+    def __init__(self, name, avatar_url=None):
+        self.name = name
+        self.initial = name[:1].upper()
+        self.avatar_url = avatar_url
+
+
+class TaskCard:
+    """
+    Datos de una tarjeta del tablero (tasks/task_card.html). Se construye desde
+    una fila de task_card_rows con los textos, el color, el icono y el estado
+    de vencimiento ya calculados: la plantilla solo lee atributos y nunca
+    consulta las relaciones de la tarea.
+    """
+    
+    __slots__ = (
+        'id', 'title', 'description', 'status', 'priority', 'due_date', 'completed_at',
+        'priority_display', 'priority_color', 'status_display', 'status_icon', 'is_overdue',
+        'attachments', 'attachments_count',
+        'assigned_users', 'assigned_users_count', 'hidden_assigned_count', 'hidden_assigned_names',
+    )
+    
+    def __init__(self, row, attachments=(), assigned_users=(), now=None):
+        self.id = row['id']
+        self.title = row['title']
+        self.description = row['description_excerpt']
+        self.status = status = row['status']
+        self.priority = priority = row['priority']
+        self.due_date = due_date = row['due_date']
+        self.completed_at = row['completed_at']
+        
+        self.priority_display = PRIORITY_LABELS.get(priority, priority)
+        self.priority_color = PRIORITY_COLORS.get(priority, '#6c757d')
+        self.status_display = STATUS_LABELS.get(status, status)
+        self.status_icon = STATUS_ICONS.get(status, 'fas fa-question')
+        self.is_overdue = bool(due_date and status != 'completed' and (now or timezone.now()) > due_date)
+        
+        self.attachments = list(attachments)
+        self.attachments_count = row.get('attachments_count', len(self.attachments))
+        
+        users = list(assigned_users)
+        self.assigned_users = users[:CARD_ASSIGNED_USERS]
+        self.assigned_users_count = row.get('assigned_users_count', len(users))
+        self.hidden_assigned_count = max(0, self.assigned_users_count - CARD_ASSIGNED_USERS)
+        self.hidden_assigned_names = ', '.join(user.name for user in users[CARD_ASSIGNED_USERS:])
+
+
+def build_task_cards(rows):
+    """
+    Construye las tarjetas de una página de filas de task_card_rows.
+    Los adjuntos y los asignados (con el avatar de su perfil) se leen con una
+    consulta por relación para toda la página, y solo para las tareas cuyo
+    contador no es cero, así que el número de consultas no depende del tamaño
+    de la página.
+    """
+    rows = list(rows)
+    
+    attachments = defaultdict(list)
+    task_ids = [row['id'] for row in rows if row['attachments_count']]
+    if task_ids:
+        attachment_rows = (
+            TaskAttachment.objects
+            .filter(task_id__in=task_ids)
+            .values('pk', 'task_id', 'filename', 'preview_status')
+        )
+        for attachment in attachment_rows:
+            attachments[attachment['task_id']].append(attachment)
+    
+    assigned_users = defaultdict(list)
+    task_ids = [row['id'] for row in rows if row['assigned_users_count']]
+    if task_ids:
+        assignment_rows = (
+            Task.assigned_users.through.objects
+            .filter(task_id__in=task_ids)
+            .order_by('pk')
+            .values_list(
+                'task_id', 'user__username', 'user__first_name', 'user__last_name',
+                'user__profile__avatar', 'user__profile__avatar_variants',
+            )
+        )
+        for task_id, username, first_name, last_name, avatar, variants in assignment_rows:
+            # Mismo texto que User.get_full_name() o el nombre de usuario
+            name = f'{first_name} {last_name}'.strip() or username
+            assigned_users[task_id].append(
+                AssignedUser(name, avatar_variant_url(avatar, variants, 'small'))
+            )
+    
+    now = timezone.now()
+    return [
+        TaskCard(row, attachments[row['id']], assigned_users[row['id']], now=now)
+        for row in rows
+    ]
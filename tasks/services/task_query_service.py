@@ -0,0 +1,30 @@
+from django.utils import timezone
+
+from .search_service import search_queryset
+from .stats_service import OPEN_STATUSES
+
+
+# Orden del tablero: prioridad, fecha límite (sin fecha al final), más recientes primero.
+# Usa las claves almacenadas de Task y termina en el id para que sea un orden total.
+TASK_BOARD_ORDERING = ['priority_rank', 'effective_due_date', '-created_at', '-id']
+
+
+def filter_tasks(tasks, filters):
+    """Aplica los filtros de TaskFilterForm (cleaned_data) a un queryset de tareas."""
+    if filters.get('search'):
+        # Por prefijo, como el icontains anterior: "compr" encuentra "comprar"
+        tasks = search_queryset(tasks, filters['search'], prefix=True)
+    if filters.get('priority'):
+        tasks = tasks.filter(priority=filters['priority'])
+    status = filters.get('status')
+    if status in ('pending', 'in_progress', 'completed'):
+        tasks = tasks.filter(status=status)
+    elif status == 'overdue':
+        tasks = tasks.filter(status__in=OPEN_STATUSES, due_date__lt=timezone.now())
+    if filters.get('assigned_to'):
+        tasks = tasks.filter(assigned_users=filters['assigned_to'])
+    if filters.get('due_date_from'):
+        tasks = tasks.filter(due_date__gte=filters['due_date_from'])
+    if filters.get('due_date_to'):
+        tasks = tasks.filter(due_date__lte=filters['due_date_to'])
+    return tasks
@@ -0,0 +1,281 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import AttachmentUpload, TaskAttachment
+
+
+# Content-Range de una parte: "bytes inicio-fin/total"
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+# SHA-256 en hexadecimal
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+# Bytes leídos de la request o del disco en cada paso
+READ_BLOCK_SIZE = 64 * 1024
+
+# Subidas en curso con hash acumulado en este proceso (las abandonadas salen por antigüedad)
+RUNNING_DIGESTS_MAX = 64
+
+# upload_id -> (bytes cubiertos, hashlib.sha256 del archivo hasta ahí). El estado
+# de hashlib no se puede guardar en la base, así que vive en el proceso que
+# aceptó las partes; finalizar solo lee del disco lo que este hash no cubre.
+_running_digests = OrderedDict()
+_running_digests_lock = threading.Lock()
+
+
+class UploadError(ValueError):
+    """Error de una subida por partes; offset indica al cliente dónde continuar."""
+    
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class PartFile(File):
+    """
+    Archivo temporal ya ensamblado. Con temporary_file_path FileSystemStorage lo
+    mueve a MEDIA_ROOT en lugar de copiarlo (igual que TemporaryUploadedFile).
+    """
+    
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def get_upload_dir():
+    return getattr(settings, 'ATTACHMENT_UPLOAD_TEMP_DIR', os.path.join(settings.BASE_DIR, 'var', 'uploads'))
+
+
+def upload_part_path(upload_id):
+    """Archivo temporal donde se acumulan las partes de la subida."""
+    return os.path.join(get_upload_dir(), f'{upload_id}.part')
+
+
+def _get_running_digest(upload_id, offset):
+    """Copia del hash acumulado si cubre exactamente los primeros offset bytes."""
+    with _running_digests_lock:
+        entry = _running_digests.get(upload_id)
+    if entry is not None and entry[0] == offset:
+        return entry[1].copy()
+    return hashlib.sha256() if offset == 0 else None
+
+
+def _store_running_digest(upload_id, offset, digest):
+    with _running_digests_lock:
+        _running_digests[upload_id] = (offset, digest)
+        _running_digests.move_to_end(upload_id)
+        while len(_running_digests) > RUNNING_DIGESTS_MAX:
+            _running_digests.popitem(last=False)
+
+
+def _pop_running_digest(upload_id):
+    """Retorna (bytes cubiertos, hash) y lo olvida; (0, hash vacío) si no hay."""
+    with _running_digests_lock:
+        entry = _running_digests.pop(upload_id, None)
+    return entry or (0, hashlib.sha256())
+
+
+def _remove_part(upload_id):
+    _pop_running_digest(upload_id)
+    try:
+        os.remove(upload_part_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def _validate_sha256(value, name):
+    value = (value or '').strip().lower()
+    if value and not SHA256_RE.match(value):
+        raise UploadError(f'{name} debe ser un SHA-256 en hexadecimal')
+    return value
+
+
+def start_upload(task, user, filename, size, sha256=''):
+    """
+    Inicia una subida por partes validando nombre, extensión y tamaño.
+    sha256 (opcional) es el hash del archivo completo, comprobado al finalizar.
+    """
+    filename = os.path.basename(str(filename or '')).strip()
+    if not filename:
+        raise UploadError('filename es obligatorio')
+    try:
+        TaskAttachment._meta.get_field('file').run_validators(File(None, name=filename))
+    except ValidationError as e:
+        raise UploadError(' '.join(e.messages))
+    
+    max_size = getattr(settings, 'ATTACHMENT_UPLOAD_MAX_SIZE', 1024 ** 3)
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        raise UploadError('size debe ser un entero positivo')
+    if size > max_size:
+        raise UploadError(f'El archivo no puede ser mayor de {max_size} bytes', status=413)
+    
+    upload = AttachmentUpload.objects.create(
+        task=task,
+        uploaded_by=user,
+        filename=filename,
+        size=size,
+        sha256=_validate_sha256(sha256, 'sha256'),
+    )
+    os.makedirs(get_upload_dir(), exist_ok=True)
+    open(upload_part_path(upload.pk), 'wb').close()
+    return upload
+
+
+def write_chunk(upload, content_range, stream, chunk_sha256=''):
+    """
+    Añade una parte leída de stream en bloques, sin cargarla en memoria. La parte
+    debe empezar en el offset actual; si llega incompleta o su SHA-256 no coincide
+    se descarta y el cliente la reenvía. Los mismos bloques alimentan el hash del
+    archivo completo que usa finalize_upload. Retorna la subida actualizada.
+    """
+    match = CONTENT_RANGE_RE.match((content_range or '').strip())
+    if match is None:
+        raise UploadError('Content-Range debe tener la forma "bytes inicio-fin/total"')
+    start, end, total = map(int, match.groups())
+    if total != upload.size or end < start or end >= total:
+        raise UploadError('Content-Range no corresponde a la subida')
+    length = end - start + 1
+    max_chunk_size = getattr(settings, 'ATTACHMENT_UPLOAD_MAX_CHUNK_SIZE', 16 * 1024 * 1024)
+    if length > max_chunk_size:
+        raise UploadError(f'Las partes no pueden ser mayores de {max_chunk_size} bytes', status=413)
+    chunk_sha256 = _validate_sha256(chunk_sha256, 'El SHA-256 de la parte')
+    
+    with transaction.atomic():
+        # Serializa las partes concurrentes de una misma subida
+        upload = AttachmentUpload.objects.select_for_update().get(pk=upload.pk)
+        if start != upload.offset:
+            raise UploadError('La parte no empieza en el offset actual', status=409, offset=upload.offset)
+        
+        digest = hashlib.sha256()
+        # Solo se puede continuar el hash si este proceso vio todas las partes anteriores
+        running = _get_running_digest(upload.pk, start)
+        try:
+            part = open(upload_part_path(upload.pk), 'r+b')
+        except FileNotFoundError:
+            raise UploadError('La subida ha caducado', status=410)
+        with part:
+            part.seek(start)
+            remaining = length
+            while remaining:
+                block = stream.read(min(READ_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                part.write(block)
+                digest.update(block)
+                if running is not None:
+                    running.update(block)
+                remaining -= len(block)
+            if remaining or (chunk_sha256 and digest.hexdigest() != chunk_sha256):
+                part.truncate(start)
+                message = 'La parte llegó incompleta' if remaining else 'El SHA-256 de la parte no coincide'
+                raise UploadError(message, offset=start)
+            # Descartar restos de un intento anterior interrumpido
+            part.truncate()
+        
+        upload.offset = end + 1
+        upload.save(update_fields=['offset', 'updated_at'])
+        if running is not None:
+            # Si la transacción se deshace el cliente reenvía la parte y el hash no debe contarla
+            upload_id, offset = upload.pk, upload.offset
+            transaction.on_commit(lambda: _store_running_digest(upload_id, offset, running))
+    return upload
+
+
+def finalize_upload(upload):
+    """
+    Comprueba que estén todas las partes y el SHA-256 declarado y crea el
+    TaskAttachment moviendo el archivo temporal al almacenamiento. El hash viene
+    acumulado de write_chunk: solo se leen del disco los bytes de partes que
+    aceptó otro proceso. El mismo hash da nombre al blob.
+    """
+    upload_id = upload.pk
+    path = upload_part_path(upload_id)
+    with transaction.atomic():
+        # Bloquear la subida: una segunda llamada concurrente ya no la encuentra
+        upload = AttachmentUpload.objects.select_for_update().filter(pk=upload_id).first()
+        if upload is None:
+            raise UploadError('La subida no existe o ya se finalizó', status=404)
+        if upload.offset != upload.size:
+            raise UploadError('Faltan partes por subir', status=409, offset=upload.offset)
+        
+        hashed, digest = _pop_running_digest(upload_id)
+        try:
+            part = open(path, 'rb')
+        except FileNotFoundError:
+            raise UploadError('La subida ha caducado', status=410)
+        with part:
+            part.seek(hashed)
+            for block in iter(lambda: part.read(READ_BLOCK_SIZE), b''):
+                digest.update(block)
+        
+        corrupted = bool(upload.sha256) and digest.hexdigest() != upload.sha256
+        if not corrupted:
+            with PartFile(open(path, 'rb'), name=upload.filename) as content:
+                # El almacenamiento por contenido reutiliza el hash ya calculado
+                content.sha256 = digest.hexdigest()
+                attachment = TaskAttachment(
+                    task=upload.task,
+                    uploaded_by=upload.uploaded_by,
+                    filename=upload.filename,
+                    file=content,
+                )
+                attachment.save()
+            upload.delete()
+    
+    if corrupted:
+        abort_upload(upload)
+        raise UploadError('El SHA-256 del archivo no coincide; vuelve a subirlo', status=422)
+    # Con otro almacenamiento (o en otro sistema de archivos) el temporal se copió
+    _remove_part(upload_id)
+    return attachment
+
+
+def abort_upload(upload):
+    """Cancela la subida y borra sus partes."""
+    upload_id = upload.pk
+    upload.delete()
+    _remove_part(upload_id)
+
+
+def cleanup_uploads(max_age=None, now=None, dry_run=False):
+    """
+    Borra las subidas sin partes nuevas desde hace max_age (por defecto
+    ATTACHMENT_UPLOAD_EXPIRY_HOURS) y los temporales huérfanos igual de antiguos.
+    Retorna {'uploads': subidas borradas, 'files': temporales borrados}.
+    """
+    if max_age is None:
+        max_age = timezone.timedelta(hours=getattr(settings, 'ATTACHMENT_UPLOAD_EXPIRY_HOURS', 24))
+    cutoff = (now or timezone.now()) - max_age
+    
+    expired = list(AttachmentUpload.objects.filter(updated_at__lt=cutoff).values_list('pk', flat=True))
+    active = {str(pk) for pk in AttachmentUpload.objects.filter(updated_at__gte=cutoff).values_list('pk', flat=True)}
+    
+    # Temporales de las subidas caducadas y huérfanos (subida borrada con su tarea)
+    files = {path for path in map(upload_part_path, expired) if os.path.exists(path)}
+    upload_dir = get_upload_dir()
+    if os.path.isdir(upload_dir):
+        with os.scandir(upload_dir) as entries:
+            for entry in entries:
+                upload_id, ext = os.path.splitext(entry.name)
+                if (ext == '.part' and upload_id not in active
+                        and entry.stat().st_mtime < cutoff.timestamp()):
+                    files.add(entry.path)
+    
+    if not dry_run:
+        AttachmentUpload.objects.filter(pk__in=expired).delete()
+        for path in files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    return {'uploads': len(expired), 'files': len(files)}
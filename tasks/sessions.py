@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+
+# Clave de la sesión con el momento (epoch) en que se guardó por última vez
+REFRESHED_KEY = '_session_refreshed_at'
+
+
+class SessionStore(CachedDBStore):
+    """
+    Sesiones cached_db (lectura desde SESSION_CACHE_ALIAS, escritura también en
+    la base de datos) que recuerdan cuándo se guardaron. SlidingSessionMiddleware
+    solo las vuelve a guardar, renovando su caducidad, cuando ya ha pasado
+    SESSION_REFRESH_FRACTION de su vida, y no en cada petición.
+    """
+    
+    def save(self, must_create=False):
+        self._get_session(no_load=must_create)[REFRESHED_KEY] = int(time.time())
+        super().save(must_create=must_create)
+    
+    def needs_refresh(self):
+        """Indica si la sesión debe guardarse para renovar su caducidad."""
+        refreshed = self.get(REFRESHED_KEY)
+        if refreshed is None:
+            return True
+        fraction = getattr(settings, 'SESSION_REFRESH_FRACTION', 0.5)
+        return time.time() - refreshed >= self.get_expiry_age() * fraction
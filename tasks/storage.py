@@ -0,0 +1,85 @@
+import hashlib
+import os
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+# Directorio de MEDIA_ROOT donde se guardan los blobs por contenido
+BLOB_PREFIX = 'blobs'
+
+# Bytes leídos en cada paso al calcular el hash de un archivo ya subido
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def hash_content(content):
+    """
+    SHA-256 del contenido. Usa el calculado durante la subida (atributo sha256
+    de los manejadores de subida o de upload_service) y si no lo lee en bloques.
+    """
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        sha256.update(chunk if isinstance(chunk, bytes) else chunk.encode())
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return sha256.hexdigest()
+
+
+def blob_name(digest, filename=''):
+    """Ruta del blob: blobs/ab/cd/<sha256><extensión>."""
+    ext = os.path.splitext(filename)[1].lower()
+    return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+def blob_digest(name):
+    """SHA-256 de una ruta de blob (None si la ruta no es de un blob)."""
+    parts = name.split('/')
+    if len(parts) != 4 or parts[0] != BLOB_PREFIX:
+        return None
+    return os.path.splitext(parts[3])[0]
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Almacenamiento direccionado por contenido: cada archivo se guarda una sola vez
+    con su SHA-256 como nombre. De la ruta propuesta por upload_to solo se conserva
+    la extensión, así que el mismo PDF adjunto a 50 tareas ocupa un único blob.
+    Las referencias las cuenta AttachmentBlob; esta clase nunca sobrescribe ni
+    renombra un blob existente.
+    """
+    
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = blob_name(hash_content(content), name)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+    
+    def get_available_name(self, name, max_length=None):
+        # El mismo nombre implica el mismo contenido
+        return name
+    
+    def _save(self, name, content):
+        # Escribir con un nombre temporal y publicar con un rename atómico: si dos
+        # procesos guardan a la vez el mismo blob ambos escriben bytes idénticos
+        # y un lector nunca ve el archivo a medias.
+        temp_name = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+        os.replace(self.path(temp_name), self.path(name))
+        return name
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def get_blob_storage():
+    """Almacenamiento de los adjuntos (callable para los campos y las migraciones)."""
+    return blob_storage
@@ -12,4 +12,5 @@ from .test_forms import *
 from .test_auth import *
 from .test_views import *
 from .test_api import *
-from .test_permissions import * 
\ No newline at end of file
+from .test_permissions import *
+from .test_services import *
\ No newline at end of file
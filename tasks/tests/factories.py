@@ -9,6 +9,7 @@ import tempfile
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from ..models import TaskList, Task, SharedList, TaskAttachment, TaskActivity, Profile
+from ..services import rebuild_search_index
 
 
 # ========== USER FACTORIES ==========
@@ -210,6 +211,72 @@ def create_task_attachment(task=None, uploaded_by=None, filename="test_attachmen
 
 # ========== BULK FACTORIES ==========
 
+def create_bulk_tasks(task_lists, count, created_by=None, batch_size=5000, now=None, rebuild_index=True):
+    """
+    Crea muchas tareas con bulk_create repartidas entre las listas indicadas.
+    Varía estado, prioridad y fecha límite de forma determinista y recalcula
+    después los contadores de las listas y el índice de búsqueda
+    (bulk_create no pasa por Task.save ni emite señales).
+    Pensado para benchmarks con cientos de miles de tareas; con varias llamadas
+    seguidas basta con reconstruir el índice en la última (rebuild_index).
+    """
+    now = now or timezone.now()
+    statuses = ['pending', 'in_progress', 'completed']
+    priorities = ['high', 'medium', 'low']
+    created = 0
+    
+    while created < count:
+        batch = []
+        for i in range(created, min(created + batch_size, count)):
+            task_list = task_lists[i % len(task_lists)]
+            status = statuses[i % 3]
+            due_date = None
+            if i % 5:
+                due_date = now + timedelta(days=(i % 60) - 30, hours=i % 24)
+            task = Task(
+                title=f"Tarea {i + 1}",
+                description="",
+                task_list=task_list,
+                created_by=created_by or task_list.owner,
+                priority=priorities[(i // 3) % 3],
+                status=status,
+                due_date=due_date,
+                completed_at=now if status == 'completed' else None,
+            )
+            task.sync_sort_keys()
+            batch.append(task)
+        Task.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+    
+    TaskList.objects.filter(pk__in=[task_list.pk for task_list in task_lists]).refresh_task_counters()
+    if rebuild_index:
+        rebuild_search_index(['tasks.task'])
+    return created
+
+
+def create_bulk_activities(task_ids, user, per_task=1, batch_size=5000):
+    """Crea actividades con bulk_create para las tareas indicadas."""
+    actions = ['created', 'in_progress', 'completed', 'reopened', 'updated']
+    batch = []
+    created = 0
+    for task_id in task_ids:
+        for i in range(per_task):
+            batch.append(TaskActivity(
+                task_id=task_id,
+                user=user,
+                action=actions[i % len(actions)],
+                description=f'Actividad de prueba: {actions[i % len(actions)]}',
+            ))
+        if len(batch) >= batch_size:
+            TaskActivity.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        TaskActivity.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
 def create_sample_data(user_count=2, list_count=3, task_count=10):
     """
     Crea un conjunto completo de datos de prueba.
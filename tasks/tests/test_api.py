@@ -3,16 +3,23 @@ Tests para las APIs y endpoints AJAX de la aplicación tasks.
 Prueba endpoints JSON, toggle de tareas, quick add, stats, búsqueda y filtros.
 """
 import json
-from django.test import TestCase, Client
+import os
+import tempfile
+from asgiref.sync import sync_to_async
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.http import JsonResponse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from .factories import (
     create_user, create_task_list, create_task, create_completed_task,
-    create_overdue_task, create_sample_data
+    create_overdue_task, create_sample_data, create_shared_list
 )
-from ..models import Task, TaskActivity
+from ..models import Task, TaskActivity, AttachmentUpload
+from ..services.cache_service import get_dashboard_cache
+from ..services import get_push_broker, list_channel
 
 
 class ToggleTaskCompleteAPITest(TestCase):
@@ -348,6 +355,320 @@ class TaskStatsAPITest(TestCase):
         self.assertEqual(response.status_code, 403)
 
 
+class TaskFeedAPITest(TestCase):
+    """Tests para task_feed_api."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.client = Client()
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        for i in range(7):
+            create_task(task_list=self.task_list, created_by=self.user, title=f"Tarea {i}")
+        self.url = reverse('task_feed_api', kwargs={'pk': self.task_list.pk})
+    
+    def test_task_feed_requires_authentication(self):
+        """Test: El feed de tareas requiere autenticación."""
+        # Act
+        response = self.client.get(self.url)
+        
+        # Assert
+        self.assertEqual(response.status_code, 302)
+    
+    def test_task_feed_paginates_with_cursor(self):
+        """Test: El feed devuelve páginas enlazadas por cursor."""
+        # Arrange
+        self.client.login(username=self.user.username, password='testpass123')
+        
+        # Act
+        first = json.loads(self.client.get(self.url, {'limit': 5}).content)
+        second = json.loads(self.client.get(self.url, {'limit': 5, 'cursor': first['next_cursor']}).content)
+        
+        # Assert
+        self.assertEqual(len(first['tasks']), 5)
+        self.assertEqual(len(second['tasks']), 2)
+        self.assertIsNone(second['next_cursor'])
+        ids = [t['id'] for t in first['tasks'] + second['tasks']]
+        self.assertEqual(len(set(ids)), 7)
+    
+    def test_task_feed_applies_filters(self):
+        """Test: El feed aplica los filtros del formulario."""
+        # Arrange
+        self.client.login(username=self.user.username, password='testpass123')
+        create_task(task_list=self.task_list, created_by=self.user, title="Especial", priority='high')
+        
+        # Act
+        response = self.client.get(self.url, {'priority': 'high'})
+        
+        # Assert
+        data = json.loads(response.content)
+        self.assertEqual([t['title'] for t in data['tasks']], ["Especial"])
+    
+    def test_task_feed_invalid_cursor(self):
+        """Test: Un cursor inválido devuelve 400."""
+        # Arrange
+        self.client.login(username=self.user.username, password='testpass123')
+        
+        # Act
+        response = self.client.get(self.url, {'cursor': 'no-es-un-cursor'})
+        
+        # Assert
+        self.assertEqual(response.status_code, 400)
+    
+    def test_task_feed_permission_denied(self):
+        """Test: El feed se deniega a usuarios sin acceso a la lista."""
+        # Arrange
+        other_user = create_user(username="other_user", email="other@example.com")
+        self.client.login(username=other_user.username, password='testpass123')
+        
+        # Act
+        response = self.client.get(self.url)
+        
+        # Assert
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'dashboard': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'conditional-tests'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+})
+class ConditionalGetAPITest(TestCase):
+    """Tests para ETag / Last-Modified de las APIs de estadísticas y del feed."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        get_dashboard_cache().clear()
+        self.client = Client()
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        create_task(task_list=self.task_list, created_by=self.user)
+        self.client.login(username=self.user.username, password='testpass123')
+        self.stats_url = reverse('task_stats_api', kwargs={'pk': 'dashboard'})
+        self.list_stats_url = reverse('task_stats_api', kwargs={'pk': self.task_list.pk})
+        self.feed_url = reverse('task_feed_api', kwargs={'pk': self.task_list.pk})
+    
+    def test_stats_api_sends_validators(self):
+        """Test: La API de estadísticas envía ETag fuerte, Last-Modified y Cache-Control."""
+        # Act
+        response = self.client.get(self.stats_url)
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+    
+    def test_unchanged_stats_return_304_without_task_queries(self):
+        """Test: Sin cambios se responde 304 sin consultar las tareas."""
+        # Arrange
+        etag = self.client.get(self.stats_url)['ETag']
+        
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.stats_url, HTTP_IF_NONE_MATCH=etag)
+        
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual([q['sql'] for q in ctx.captured_queries if 'tasks_' in q['sql']], [])
+    
+    def test_if_modified_since_returns_304(self):
+        """Test: If-Modified-Since con la fecha recibida responde 304."""
+        # Arrange
+        last_modified = self.client.get(self.stats_url)['Last-Modified']
+        
+        # Act
+        response = self.client.get(self.stats_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        
+        # Assert
+        self.assertEqual(response.status_code, 304)
+    
+    def test_task_change_changes_etag(self):
+        """Test: Un cambio en la lista genera un ETag nuevo y la respuesta completa."""
+        # Arrange
+        etag = self.client.get(self.stats_url)['ETag']
+        list_etag = self.client.get(self.list_stats_url)['ETag']
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            create_task(task_list=self.task_list, created_by=self.user, title="Nueva")
+        response = self.client.get(self.stats_url, HTTP_IF_NONE_MATCH=etag)
+        list_response = self.client.get(self.list_stats_url, HTTP_IF_NONE_MATCH=list_etag)
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['total_tasks'], 2)
+        self.assertEqual(list_response.status_code, 200)
+        self.assertEqual(json.loads(list_response.content)['total_tasks'], 2)
+    
+    def test_feed_etag_depends_on_parameters(self):
+        """Test: El ETag del feed distingue filtros y cursor."""
+        # Arrange
+        etag = self.client.get(self.feed_url)['ETag']
+        
+        # Act
+        unchanged = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=etag)
+        filtered = self.client.get(self.feed_url, {'status': 'completed'}, HTTP_IF_NONE_MATCH=etag)
+        
+        # Assert
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(filtered.status_code, 200)
+    
+    def test_no_validators_without_permission(self):
+        """Test: Sin permiso de lectura no se envían validadores."""
+        # Arrange
+        other_list = create_task_list(owner=create_user(username="otheruser"))
+        
+        # Act
+        response = self.client.get(reverse('task_stats_api', kwargs={'pk': other_list.pk}))
+        
+        # Assert
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('ETag', response)
+
+
+class BulkTaskOperationsAPITest(TestCase):
+    """Tests para bulk_task_operations_api."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.client = Client()
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.tasks = [
+            create_task(task_list=self.task_list, created_by=self.user, title=f"Tarea {i}")
+            for i in range(3)
+        ]
+        self.task_ids = [task.pk for task in self.tasks]
+        self.url = reverse('bulk_task_operations')
+        self.client.login(username=self.user.username, password='testpass123')
+    
+    def post(self, *operations):
+        return self.client.post(
+            self.url, json.dumps({'operations': list(operations)}), content_type='application/json'
+        )
+    
+    def test_bulk_status_change(self):
+        """Test: Cambiar el estado de varias tareas en una petición."""
+        # Act
+        response = self.post({'action': 'status', 'task_ids': self.task_ids, 'value': 'completed'})
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.filter(status='completed', completed_at__isnull=False).count(), 3)
+        self.assertEqual(TaskActivity.objects.filter(action='completed').count(), 3)
+        self.task_list.refresh_from_db()
+        self.assertEqual(self.task_list.completed_tasks_count, 3)
+        self.assertEqual(self.task_list.pending_tasks_count, 0)
+    
+    def test_bulk_query_count_does_not_grow_with_tasks(self):
+        """Test: El número de consultas no depende del número de tareas."""
+        # Arrange
+        more_ids = [
+            create_task(task_list=self.task_list, created_by=self.user).pk for _ in range(10)
+        ]
+        self.post({'action': 'priority', 'task_ids': self.task_ids, 'value': 'low'})
+        
+        # Act / Assert
+        with CaptureQueriesContext(connection) as small:
+            self.post({'action': 'status', 'task_ids': self.task_ids, 'value': 'in_progress'})
+        with CaptureQueriesContext(connection) as large:
+            self.post({'action': 'status', 'task_ids': self.task_ids + more_ids, 'value': 'completed'})
+        self.assertEqual(len(small), len(large))
+    
+    def test_bulk_priority_updates_sort_keys(self):
+        """Test: Cambiar la prioridad actualiza la clave de ordenación."""
+        # Act
+        self.post({'action': 'priority', 'task_ids': self.task_ids[:2], 'value': 'high'})
+        
+        # Assert
+        self.assertEqual(
+            list(Task.objects.filter(priority='high').values_list('priority_rank', flat=True)), [1, 1]
+        )
+    
+    def test_bulk_move_updates_counters(self):
+        """Test: Mover tareas entre listas actualiza los contadores de ambas."""
+        # Arrange
+        target = create_task_list(owner=self.user, name="Destino")
+        
+        # Act
+        response = self.post({'action': 'move', 'task_ids': self.task_ids[:2], 'value': target.pk})
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.task_list.refresh_from_db()
+        target.refresh_from_db()
+        self.assertEqual(self.task_list.tasks_count, 1)
+        self.assertEqual(target.tasks_count, 2)
+        self.assertEqual(target.pending_tasks_count, 2)
+    
+    def test_bulk_delete_after_status_change(self):
+        """Test: Cambiar y eliminar en el mismo lote deja los contadores correctos."""
+        # Act
+        response = self.post(
+            {'action': 'status', 'task_ids': self.task_ids, 'value': 'completed'},
+            {'action': 'delete', 'task_ids': self.task_ids[:2]},
+        )
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)['tasks']), 1)
+        self.task_list.refresh_from_db()
+        self.assertEqual(self.task_list.tasks_count, 1)
+        self.assertEqual(self.task_list.completed_tasks_count, 1)
+        self.assertEqual(self.task_list.pending_tasks_count, 0)
+    
+    def test_bulk_reassign(self):
+        """Test: Reasignar tareas a un usuario con acceso a la lista."""
+        # Arrange
+        collaborator = create_user(username="collab", email="collab@example.com")
+        create_shared_list(task_list=self.task_list, shared_with=collaborator, permission='write')
+        outsider = create_user(username="outsider", email="outsider@example.com")
+        
+        # Act
+        ok = self.post({'action': 'reassign', 'task_ids': self.task_ids, 'value': [collaborator.pk]})
+        rejected = self.post({'action': 'reassign', 'task_ids': self.task_ids, 'value': [outsider.pk]})
+        
+        # Assert
+        self.assertEqual(ok.status_code, 200)
+        self.assertEqual(rejected.status_code, 400)
+        for task in self.tasks:
+            self.assertEqual(list(task.assigned_users.all()), [collaborator])
+    
+    def test_bulk_permission_denied_is_all_or_nothing(self):
+        """Test: Sin permiso de escritura en una lista no se aplica ningún cambio."""
+        # Arrange
+        other_user = create_user(username="other_user", email="other@example.com")
+        read_only = create_task_list(owner=other_user, name="Solo lectura")
+        create_shared_list(task_list=read_only, shared_with=self.user, permission='read')
+        foreign_task = create_task(task_list=read_only)
+        
+        # Act
+        response = self.post({
+            'action': 'status', 'task_ids': self.task_ids + [foreign_task.pk], 'value': 'completed'
+        })
+        
+        # Assert
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Task.objects.filter(status='completed').exists())
+    
+    def test_bulk_invalid_requests(self):
+        """Test: Peticiones inválidas devuelven errores JSON."""
+        # Act
+        invalid_json = self.client.post(self.url, 'no-json', content_type='application/json')
+        unknown_action = self.post({'action': 'archive', 'task_ids': self.task_ids})
+        missing_task = self.post({'action': 'delete', 'task_ids': [999999]})
+        
+        # Assert
+        self.assertEqual(invalid_json.status_code, 400)
+        self.assertEqual(unknown_action.status_code, 400)
+        self.assertEqual(missing_task.status_code, 404)
+        self.assertEqual(Task.objects.count(), 3)
+
+
 class TaskSearchAPITest(TestCase):
     """Tests para búsqueda de tareas."""
     
@@ -531,4 +852,272 @@ class TaskFilterAPITest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertNotContains(response, 'Tarea Pendiente')
         self.assertNotContains(response, 'Tarea Completada')
-        self.assertNotContains(response, 'Tarea En Progreso') 
\ No newline at end of file
+        self.assertNotContains(response, 'Tarea En Progreso') 
+
+class AsyncAPIViewsTest(TestCase):
+    """Tests de las vistas asíncronas de la API servidas con AsyncClient (ASGI)."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.task = create_task(task_list=self.task_list, created_by=self.user)
+        self.async_client.force_login(self.user)
+    
+    async def test_toggle_task_complete(self):
+        """Test: El toggle asíncrono guarda el estado y registra la actividad."""
+        # Act
+        response = await self.async_client.post(
+            reverse('toggle_task_complete', kwargs={'pk': self.task.pk})
+        )
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'in_progress')
+        await self.task.arefresh_from_db()
+        self.assertEqual(self.task.status, 'in_progress')
+        self.assertTrue(await TaskActivity.objects.filter(task=self.task, action='in_progress').aexists())
+    
+    async def test_change_task_status(self):
+        """Test: El cambio de estado asíncrono completa la tarea."""
+        # Act
+        response = await self.async_client.post(
+            reverse('change_task_status', kwargs={'pk': self.task.pk}), {'status': 'completed'}
+        )
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()['completed_at'])
+        await self.task.arefresh_from_db()
+        self.assertEqual(self.task.status, 'completed')
+    
+    async def test_write_views_check_permission(self):
+        """Test: Las vistas asíncronas de escritura rechazan a usuarios sin permiso."""
+        # Arrange
+        other = await User.objects.acreate(username="otheruser")
+        await self.async_client.aforce_login(other)
+        
+        # Act
+        responses = [
+            await self.async_client.post(reverse('toggle_task_complete', kwargs={'pk': self.task.pk})),
+            await self.async_client.post(
+                reverse('quick_add_task', kwargs={'list_pk': self.task_list.pk}), {'title': 'X'}
+            ),
+        ]
+        
+        # Assert
+        self.assertEqual([response.status_code for response in responses], [403, 403])
+    
+    async def test_quick_add_task(self):
+        """Test: La creación rápida asíncrona guarda la tarea en la lista."""
+        # Act
+        response = await self.async_client.post(
+            reverse('quick_add_task', kwargs={'list_pk': self.task_list.pk}),
+            {'title': 'Tarea asíncrona', 'priority': 'high'},
+        )
+        
+        # Assert
+        data = response.json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['task']['attachments_count'], 0)
+        task = await Task.objects.aget(pk=data['task']['id'])
+        self.assertEqual((task.task_list_id, task.created_by_id), (self.task_list.pk, self.user.pk))
+    
+    async def test_search_users(self):
+        """Test: La búsqueda asíncrona de usuarios excluye al usuario actual."""
+        # Arrange
+        await sync_to_async(create_user)(username="testmate", email="mate@example.com")
+        
+        # Act
+        response = await self.async_client.get(reverse('search_users_api'), {'q': 'test'})
+        
+        # Assert
+        self.assertEqual([user['username'] for user in response.json()['users']], ['testmate'])
+    
+    async def test_dashboard_stats(self):
+        """Test: Las estadísticas del dashboard se calculan con consultas concurrentes."""
+        # Arrange
+        await sync_to_async(create_overdue_task)(task_list=self.task_list, created_by=self.user)
+        
+        # Act
+        response = await self.async_client.get(reverse('task_stats_api', kwargs={'pk': 'dashboard'}))
+        
+        # Assert
+        data = response.json()
+        self.assertEqual(data['total_tasks'], 2)
+        self.assertEqual(data['overdue_count'], 1)
+        self.assertEqual(len(data['overdue_tasks']), 1)
+    
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'dashboard': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'async-api'},
+        'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+    })
+    async def test_list_stats_not_modified(self):
+        """Test: Los validadores de la vista asíncrona permiten responder 304."""
+        # Arrange
+        await sync_to_async(get_dashboard_cache().clear)()
+        url = reverse('task_stats_api', kwargs={'pk': self.task_list.pk})
+        first = await self.async_client.get(url)
+        
+        # Act
+        response = await self.async_client.get(url, headers={'If-None-Match': first['ETag']})
+        
+        # Assert
+        self.assertEqual(first.json()['total_tasks'], 1)
+        self.assertEqual(response.status_code, 304)
+
+
+class LiveEventsAPITest(TestCase):
+    """Tests para los streams de eventos en vivo (Server-Sent Events)."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.url = reverse('task_list_events', kwargs={'pk': self.task_list.pk})
+    
+    async def test_stream_delivers_published_events(self):
+        """Test: El stream de la lista entrega los eventos publicados en su canal."""
+        # Arrange
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+        stream = aiter(response.streaming_content)
+        
+        # Act
+        first = await anext(stream)
+        get_push_broker().publish(list_channel(self.task_list.pk), {'type': 'task', 'op': 'updated'})
+        event = await anext(stream)
+        await stream.aclose()
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(first.startswith(b'retry:'))
+        self.assertEqual(event, b'event: task\ndata: {"type": "task", "op": "updated"}\n\n')
+    
+    @override_settings(PUSH_HEARTBEAT=0.01)
+    async def test_stream_sends_keep_alive(self):
+        """Test: Sin eventos el stream envía comentarios keep-alive."""
+        # Arrange
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('dashboard_events'))
+        stream = aiter(response.streaming_content)
+        
+        # Act
+        await anext(stream)
+        chunk = await anext(stream)
+        await stream.aclose()
+        
+        # Assert
+        self.assertEqual(chunk, b': keep-alive\n\n')
+    
+    async def test_stream_requires_read_permission(self):
+        """Test: No se puede suscribir a una lista sin permiso de lectura."""
+        # Arrange
+        other = await User.objects.acreate(username="otheruser")
+        await self.async_client.aforce_login(other)
+        
+        # Act
+        response = await self.async_client.get(self.url)
+        
+        # Assert
+        self.assertEqual(response.status_code, 403)
+    
+    def test_wsgi_falls_back_to_polling(self):
+        """Test: Bajo WSGI se responde 204 para que el cliente siga sondeando."""
+        # Arrange
+        self.client.login(username=self.user.username, password='testpass123')
+        
+        # Act
+        response = self.client.get(self.url)
+        
+        # Assert
+        self.assertEqual(response.status_code, 204)
+
+
+class ChunkedUploadAPITest(TestCase):
+    """Tests para la API de subidas por partes."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(media_dir.name, 'media'),
+            ATTACHMENT_UPLOAD_TEMP_DIR=os.path.join(media_dir.name, 'uploads'),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.task = create_task(task_list=self.task_list, created_by=self.user)
+        self.content = b'x' * 300
+        self.client.login(username=self.user.username, password='testpass123')
+    
+    def start(self):
+        return self.client.post(
+            reverse('start_upload', kwargs={'task_pk': self.task.pk}),
+            data=json.dumps({'filename': 'notas.txt', 'size': len(self.content)}),
+            content_type='application/json',
+        )
+    
+    def put(self, url, start, end):
+        return self.client.put(
+            url,
+            data=self.content[start:end],
+            content_type='application/octet-stream',
+            headers={'Content-Range': f'bytes {start}-{end - 1}/{len(self.content)}'},
+        )
+    
+    def test_resumable_upload(self):
+        """Test: Subir por partes, consultar el offset para reanudar y finalizar."""
+        # Arrange
+        state = self.start().json()
+        
+        # Act
+        first = self.put(state['url'], 0, 100)
+        resumed = self.client.get(state['url'])
+        conflict = self.put(state['url'], 200, 300)
+        self.put(state['url'], 100, 300)
+        response = self.client.post(state['finalize_url'])
+        
+        # Assert
+        self.assertEqual(first.json()['offset'], 100)
+        self.assertEqual(resumed.json()['offset'], 100)
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(conflict.json()['offset'], 100)
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['attachment']['file_size'], 300)
+        self.assertEqual(data['redirect'], reverse('tasklist_detail', kwargs={'pk': self.task_list.pk}))
+        self.assertTrue(TaskActivity.objects.filter(task=self.task, action='file_added').exists())
+    
+    def test_cancel_upload(self):
+        """Test: DELETE cancela la subida."""
+        # Arrange
+        state = self.start().json()
+        
+        # Act
+        response = self.client.delete(state['url'])
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(AttachmentUpload.objects.exists())
+    
+    def test_upload_requires_write_permission(self):
+        """Test: Solo con permiso de escritura se inicia o continúa una subida."""
+        # Arrange
+        state = self.start().json()
+        other = create_user(username='reader', email='reader@example.com')
+        create_shared_list(task_list=self.task_list, shared_with=other, shared_by=self.user, permission='read')
+        self.client.login(username='reader', password='testpass123')
+        
+        # Act
+        start = self.start()
+        foreign = self.client.get(state['url'])
+        
+        # Assert
+        self.assertEqual(start.status_code, 403)
+        self.assertEqual(foreign.status_code, 404)
@@ -2,9 +2,22 @@
 Tests para los modelos de la aplicación tasks.
 Prueba funcionalidad básica, métodos personalizados, validaciones y relaciones.
 """
-from django.test import TestCase
+import hashlib
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 
@@ -13,7 +26,8 @@ from .factories import (
     create_task_attachment, create_task_activity, create_profile,
     create_completed_task, create_overdue_task
 )
-from ..models import TaskList, Task, SharedList, TaskAttachment, TaskActivity, Profile
+from ..models import TaskList, Task, SharedList, TaskAttachment, TaskActivity, Profile, AttachmentBlob
+from ..storage import blob_storage
 
 
 class TaskListModelTest(TestCase):
@@ -525,4 +539,394 @@ class ProfileModelTest(TestCase):
         
         # Assert
         self.assertTrue(hasattr(new_user, 'profile'))
-        self.assertIsNotNone(new_user.profile) 
\ No newline at end of file
+        self.assertIsNotNone(new_user.profile)
+    
+    def test_save_without_changes_skips_query(self):
+        """Test: Guardar un perfil sin cambios no consulta la base de datos."""
+        # Arrange
+        profile = Profile.objects.get(pk=self.profile.pk)
+        
+        # Act & Assert
+        with self.assertNumQueries(0):
+            profile.save()
+        self.assertEqual(profile.get_dirty_fields(), set())
+    
+    def test_save_updates_only_dirty_fields(self):
+        """Test: Solo se escriben los campos modificados."""
+        # Arrange
+        profile = Profile.objects.get(pk=self.profile.pk)
+        profile.bio = "Nueva bio"
+        
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            profile.save()
+        
+        # Assert
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"bio"', updates[0])
+        self.assertNotIn('"phone"', updates[0])
+        self.assertNotIn('"avatar"', updates[0])
+        self.assertEqual(Profile.objects.get(pk=profile.pk).bio, "Nueva bio")
+        self.assertEqual(profile.get_dirty_fields(), set())
+    
+    def test_user_save_does_not_touch_profile(self):
+        """Test: Guardar el usuario (p. ej. last_login) no lee ni escribe el perfil."""
+        # Arrange
+        user = User.objects.get(pk=self.user.pk)
+        user.last_login = timezone.now()
+        
+        # Act & Assert
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
+    
+    def test_user_save_creates_missing_profile(self):
+        """Test: Guardar un usuario sin perfil (anterior a la señal) se lo crea."""
+        # Arrange
+        Profile.objects.filter(user=self.user).delete()
+        user = User.objects.get(pk=self.user.pk)
+        
+        # Act
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+        created_on_login = Profile.objects.filter(user=user).exists()
+        user.first_name = "Nuevo"
+        user.save()
+        
+        # Assert
+        self.assertFalse(created_on_login)
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+        self.assertEqual(user.profile.user_id, user.pk)
+    
+    def test_fixture_users_get_profile(self):
+        """Test: Los usuarios cargados desde un fixture reciben su perfil al confirmar la carga."""
+        # Arrange
+        fixture = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        self.addCleanup(os.unlink, fixture.name)
+        json.dump([{'model': 'auth.user', 'pk': 9999, 'fields': {'username': 'fixture', 'password': '!'}}], fixture)
+        fixture.close()
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('loaddata', fixture.name, verbosity=0)
+        
+        # Assert
+        self.assertTrue(Profile.objects.filter(user_id=9999).exists())
+    
+    def test_user_save_saves_loaded_dirty_profile(self):
+        """Test: Los cambios del perfil cargado se guardan junto con el usuario."""
+        # Arrange
+        user = User.objects.select_related('profile').get(pk=self.user.pk)
+        user.profile.phone = "+34000000000"
+        
+        # Act
+        user.save()
+        
+        # Assert
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).phone, "+34000000000")
+    
+    @override_settings(MEDIA_PIPELINE_MODE='external')
+    def test_avatar_variants_reset_only_when_avatar_changes(self):
+        """Test: Las variantes del avatar solo se descartan al cambiar el avatar."""
+        # Arrange
+        Profile.objects.filter(pk=self.profile.pk).update(
+            avatar='profile_avatars/a.png', avatar_variants={'small': 'variants/a.webp'}
+        )
+        profile = Profile.objects.get(pk=self.profile.pk)
+        
+        # Act
+        profile.bio = "Otra bio"
+        profile.save()
+        unchanged = Profile.objects.get(pk=profile.pk).avatar_variants
+        profile.avatar = 'profile_avatars/b.png'
+        profile.save()
+        
+        # Assert
+        self.assertEqual(unchanged, {'small': 'variants/a.webp'})
+        self.assertEqual(Profile.objects.get(pk=profile.pk).avatar_variants, {})
+
+class TaskListCountersTest(TestCase):
+    """Tests para los contadores desnormalizados de TaskList."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.other_list = create_task_list(owner=self.user, name="Otra Lista")
+    
+    def assertCounters(self, task_list, total, pending, in_progress, completed):
+        """Verifica los contadores leyendo la lista desde la base de datos."""
+        task_list = TaskList.objects.get(pk=task_list.pk)
+        self.assertEqual(
+            (task_list.tasks_count, task_list.pending_tasks_count,
+             task_list.in_progress_tasks_count, task_list.completed_tasks_count),
+            (total, pending, in_progress, completed)
+        )
+    
+    def test_counters_on_create(self):
+        """Test: Crear tareas incrementa los contadores."""
+        # Act
+        create_task(task_list=self.task_list)
+        create_completed_task(task_list=self.task_list)
+        
+        # Assert
+        self.assertCounters(self.task_list, 2, 1, 0, 1)
+    
+    def test_counters_on_status_change(self):
+        """Test: Cambiar el estado mueve la tarea entre contadores."""
+        # Arrange
+        task = create_task(task_list=self.task_list)
+        task = Task.objects.get(pk=task.pk)
+        
+        # Act
+        task.status = 'in_progress'
+        task.save()
+        
+        # Assert
+        self.assertCounters(self.task_list, 1, 0, 1, 0)
+    
+    def test_counters_on_list_move(self):
+        """Test: Mover una tarea de lista actualiza ambas listas."""
+        # Arrange
+        task = create_completed_task(task_list=self.task_list)
+        
+        # Act
+        task.task_list = self.other_list
+        task.save()
+        
+        # Assert
+        self.assertCounters(self.task_list, 0, 0, 0, 0)
+        self.assertCounters(self.other_list, 1, 0, 0, 1)
+    
+    def test_counters_on_delete(self):
+        """Test: Eliminar tareas (individualmente o en bloque) decrementa los contadores."""
+        # Arrange
+        task = create_task(task_list=self.task_list)
+        create_task(task_list=self.task_list, status='in_progress')
+        create_completed_task(task_list=self.task_list)
+        
+        # Act
+        task.delete()
+        Task.objects.filter(status='completed').delete()
+        
+        # Assert
+        self.assertCounters(self.task_list, 1, 0, 1, 0)
+    
+    def test_delete_with_drifted_counters(self):
+        """Test: Eliminar con un contador desviado a 0 lo deja en 0 en lugar de fallar."""
+        # Arrange
+        task = create_task(task_list=self.task_list)
+        create_completed_task(task_list=self.task_list)
+        TaskList.objects.filter(pk=self.task_list.pk).update(tasks_count=0, pending_tasks_count=0)
+        
+        # Act
+        Task.objects.filter(status='completed').delete()
+        task.delete()
+        
+        # Assert
+        self.assertCounters(self.task_list, 0, 0, 0, 0)
+    
+    def test_counters_ignore_unsaved_fields(self):
+        """Test: Con update_fields solo cuentan los campos persistidos."""
+        # Arrange
+        task = create_task(task_list=self.task_list)
+        
+        # Act
+        task.status = 'completed'
+        task.save(update_fields=['title'])
+        
+        # Assert
+        self.assertCounters(self.task_list, 1, 1, 0, 0)
+    
+    def test_list_save_keeps_concurrent_counter_updates(self):
+        """Test: Guardar una lista cargada antes de un cambio de tareas no pisa los contadores."""
+        # Arrange
+        task_list = TaskList.objects.get(pk=self.task_list.pk)
+        create_task(task_list=self.task_list)
+        
+        # Act
+        task_list.name = "Lista renombrada"
+        task_list.save()
+        
+        # Assert
+        self.assertCounters(self.task_list, 1, 1, 0, 0)
+        self.assertEqual(TaskList.objects.get(pk=self.task_list.pk).name, "Lista renombrada")
+    
+    def test_counters_with_deferred_status(self):
+        """Test: Una tarea cargada sin lista ni estado (.only/.defer) actualiza bien los contadores."""
+        # Arrange
+        changed = create_task(task_list=self.task_list)
+        renamed = create_task(task_list=self.task_list, status='in_progress')
+        deleted = create_completed_task(task_list=self.task_list)
+        
+        # Act
+        task = Task.objects.only('title').get(pk=changed.pk)
+        task.status = 'completed'
+        task.save()
+        task = Task.objects.defer('status').get(pk=renamed.pk)
+        task.title = "Renombrada"
+        task.save()
+        Task.objects.only('title').get(pk=deleted.pk).delete()
+        
+        # Assert
+        self.assertCounters(self.task_list, 2, 0, 1, 1)
+    
+    def test_get_counts_do_not_query(self):
+        """Test: Los métodos de conteo no consultan la base de datos."""
+        # Arrange
+        create_task(task_list=self.task_list)
+        task_list = TaskList.objects.get(pk=self.task_list.pk)
+        
+        # Act / Assert
+        with self.assertNumQueries(0):
+            self.assertEqual(task_list.get_tasks_count(), 1)
+            self.assertEqual(task_list.get_pending_tasks_count(), 1)
+            self.assertEqual(task_list.get_in_progress_tasks_count(), 0)
+            self.assertEqual(task_list.get_completed_tasks_count(), 0)
+    
+    def test_rebuild_task_counters_command(self):
+        """Test: El comando de reconstrucción corrige contadores desviados."""
+        # Arrange
+        create_task(task_list=self.task_list)
+        create_completed_task(task_list=self.task_list)
+        TaskList.objects.filter(pk=self.task_list.pk).update(tasks_count=10, completed_tasks_count=0)
+        
+        # Act
+        out = StringIO()
+        call_command('rebuild_task_counters', stdout=out)
+        
+        # Assert
+        self.assertCounters(self.task_list, 2, 1, 0, 1)
+        self.assertCounters(self.other_list, 0, 0, 0, 0)
+        self.assertIn('1 con desviaciones', out.getvalue())
+
+
+class ContentAddressedStorageTest(TestCase):
+    """Tests para el almacenamiento de adjuntos por contenido con contador de referencias."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        override = override_settings(MEDIA_ROOT=media_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.task = create_task(task_list=self.task_list, created_by=self.user)
+        self.content = b'%PDF-1.4 mismo contenido'
+        self.digest = hashlib.sha256(self.content).hexdigest()
+    
+    def attach(self, task=None, filename='informe.pdf', content=None):
+        return TaskAttachment.objects.create(
+            task=task or self.task,
+            uploaded_by=self.user,
+            filename=filename,
+            file=ContentFile(content or self.content, name=filename),
+        )
+    
+    def test_same_content_is_stored_once(self):
+        """Test: El mismo archivo en varias tareas se guarda en un único blob."""
+        # Act
+        first = self.attach()
+        second = self.attach(task=create_task(task_list=self.task_list, created_by=self.user), filename='copia.pdf')
+        
+        # Assert
+        self.assertEqual(first.file.name, f'blobs/{self.digest[:2]}/{self.digest[2:4]}/{self.digest}.pdf')
+        self.assertEqual(second.file.name, first.file.name)
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.sha256, self.digest)
+        self.assertEqual(blob.size, len(self.content))
+        self.assertEqual(second.filename, 'copia.pdf')
+        with second.file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+    
+    def test_unreferenced_blob_is_deleted(self):
+        """Test: El blob se borra al eliminar el último adjunto que lo usa."""
+        # Arrange
+        first = self.attach()
+        second = self.attach()
+        name = first.file.name
+        
+        # Act / Assert
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 1)
+        self.assertTrue(blob_storage.exists(name))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            second.task.delete()
+        self.assertFalse(AttachmentBlob.objects.exists())
+        self.assertFalse(blob_storage.exists(name))
+    
+    def test_replacing_file_releases_previous_blob(self):
+        """Test: Al reemplazar el archivo se suelta la referencia del anterior."""
+        # Arrange
+        attachment = self.attach()
+        old_name = attachment.file.name
+        
+        # Act
+        attachment.file = ContentFile(b'otro contenido', name='nuevo.txt')
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment.save()
+        
+        # Assert
+        self.assertEqual(attachment.file_size, len(b'otro contenido'))
+        self.assertEqual(list(AttachmentBlob.objects.values_list('name', flat=True)), [attachment.file.name])
+        self.assertFalse(blob_storage.exists(old_name))
+    
+    def test_resave_does_not_read_file_size(self):
+        """Test: Guardar sin archivo nuevo no consulta el tamaño en el almacenamiento."""
+        # Arrange
+        attachment = self.attach()
+        attachment = TaskAttachment.objects.get(pk=attachment.pk)
+        
+        # Act
+        with mock.patch.object(blob_storage, 'size') as size:
+            attachment.filename = 'renombrado.pdf'
+            attachment.save()
+        
+        # Assert
+        size.assert_not_called()
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 1)
+    
+    def test_upload_is_hashed_while_streaming(self):
+        """Test: Los manejadores de subida calculan el SHA-256 y el almacenamiento no relee el archivo."""
+        # Arrange
+        self.client.login(username=self.user.username, password='testpass123')
+        upload = SimpleUploadedFile('informe.pdf', self.content)
+        
+        # Act
+        with mock.patch('tasks.storage.hashlib') as storage_hashlib:
+            response = self.client.post(
+                reverse('add_attachment', kwargs={'task_pk': self.task.pk}),
+                {'file': upload},
+            )
+        
+        # Assert
+        self.assertEqual(response.status_code, 302)
+        storage_hashlib.sha256.assert_not_called()
+        self.assertEqual(TaskAttachment.objects.get().file.name.split('/')[-1], f'{self.digest}.pdf')
+    
+    def test_dedupe_command_migrates_legacy_files(self):
+        """Test: dedupe_attachments mueve los archivos antiguos a un blob compartido."""
+        # Arrange
+        legacy = FileSystemStorage()
+        for i in range(2):
+            attachment = self.attach(content=f'versión {i}'.encode())
+            path = legacy.save(f'task_attachments/{self.task.pk}/informe{i}.pdf', ContentFile(self.content))
+            TaskAttachment.objects.filter(pk=attachment.pk).update(file=path)
+        out = StringIO()
+        
+        # Act
+        call_command('dedupe_attachments', stdout=out)
+        
+        # Assert
+        names = set(TaskAttachment.objects.values_list('file', flat=True))
+        self.assertEqual(names, {f'blobs/{self.digest[:2]}/{self.digest[2:4]}/{self.digest}.pdf'})
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 2)
+        self.assertFalse(os.listdir(legacy.path(f'task_attachments/{self.task.pk}')))
+        self.assertIn('1 duplicados', out.getvalue())
+        self.assertIn('2 blobs sin referencias', out.getvalue())
@@ -2,8 +2,10 @@
 Tests para permisos y autorización de la aplicación tasks.
 Prueba políticas de acceso, permisos de compartir, y controles de autorización.
 """
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.db import connection
 from django.urls import reverse
 from django.core.exceptions import PermissionDenied
 
@@ -12,6 +14,7 @@ from .factories import (
     create_task_attachment
 )
 from ..models import TaskList, Task, SharedList, TaskAttachment
+from ..services import load_list_permissions, has_list_permission
 
 
 class TaskListPermissionsTest(TestCase):
@@ -590,4 +593,84 @@ class APIPermissionsTest(TestCase):
                     response = self.client.get(url)
                 
                 # Assert
-                self.assertEqual(response.status_code, 403)  # Forbidden 
\ No newline at end of file
+                self.assertEqual(response.status_code, 403)  # Forbidden 
+
+class PermissionResolverTest(TestCase):
+    """Tests para el resolvedor de permisos y TaskList.objects.accessible_to."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.owner = create_user(username="owner")
+        self.reader = create_user(username="reader")
+        self.writer = create_user(username="writer")
+        self.stranger = create_user(username="stranger")
+        
+        self.task_list = create_task_list(owner=self.owner, name="Lista Principal")
+        self.reader_list = create_task_list(owner=self.reader, name="Lista del Lector")
+        create_shared_list(task_list=self.task_list, shared_with=self.reader, permission='read')
+        create_shared_list(task_list=self.task_list, shared_with=self.writer, permission='write')
+    
+    def _request_for(self, user):
+        """Crea una request con el usuario autenticado."""
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+    
+    def test_accessible_to_read(self):
+        """Test: accessible_to incluye listas propias y compartidas sin duplicados."""
+        # Act
+        lists = TaskList.objects.accessible_to(self.reader)
+        
+        # Assert
+        self.assertCountEqual(lists, [self.task_list, self.reader_list])
+        self.assertNotIn('DISTINCT', str(lists.query))
+    
+    def test_accessible_to_write(self):
+        """Test: accessible_to con 'write' excluye comparticiones de solo lectura."""
+        self.assertCountEqual(TaskList.objects.accessible_to(self.reader, 'write'), [self.reader_list])
+        self.assertCountEqual(TaskList.objects.accessible_to(self.writer, 'write'), [self.task_list])
+        self.assertCountEqual(TaskList.objects.accessible_to(self.owner, 'owner'), [self.task_list])
+        self.assertFalse(TaskList.objects.accessible_to(self.stranger).exists())
+    
+    def test_accessible_to_unknown_permission(self):
+        """Test: Un permiso desconocido lanza ValueError."""
+        with self.assertRaises(ValueError):
+            TaskList.objects.accessible_to(self.owner, 'admin')
+    
+    def test_load_list_permissions(self):
+        """Test: Los permisos del usuario se cargan en una sola consulta."""
+        with self.assertNumQueries(1):
+            permissions = load_list_permissions(self.reader)
+        
+        self.assertEqual(permissions, {
+            self.task_list.pk: 'read',
+            self.reader_list.pk: 'owner',
+        })
+    
+    def test_has_list_permission_cached_per_request(self):
+        """Test: Las comprobaciones reutilizan la caché de la request."""
+        # Arrange
+        request = self._request_for(self.writer)
+        
+        # Act / Assert
+        with self.assertNumQueries(1):
+            self.assertTrue(has_list_permission(request, self.task_list, 'read'))
+            self.assertTrue(has_list_permission(request, self.task_list.pk, 'write'))
+            self.assertFalse(has_list_permission(request, self.task_list, 'owner'))
+            self.assertFalse(has_list_permission(request, self.reader_list, 'read'))
+    
+    def test_task_update_view_checks_permission_once(self):
+        """Test: La edición de tareas resuelve los permisos una sola vez."""
+        # Arrange
+        task = create_task(task_list=self.task_list)
+        client = Client()
+        client.force_login(self.writer)
+        
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('task_edit', kwargs={'pk': task.pk}))
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        shared_queries = [q for q in queries if 'tasks_sharedlist' in q['sql'] and 'permission' in q['sql']]
+        self.assertEqual(len(shared_queries), 1)
@@ -0,0 +1,1533 @@
+"""
+Tests para la capa de servicios de la aplicación tasks.
+Prueba las estadísticas agregadas y fija el número de consultas de los endpoints.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from io import BytesIO, StringIO
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from unittest import mock, skipUnless
+from django.core.management import call_command
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from .factories import (
+    create_user, create_task_list, create_task, create_completed_task,
+    create_overdue_task, create_high_priority_task, create_shared_list
+)
+from ..models import Task, TaskList, TaskActivity, TaskActivitySummary
+from ..services import activity_service
+from ..services import (
+    get_user_task_counts, get_list_task_counts,
+    TASK_BOARD_ORDERING, InvalidCursor, KeysetPaginator,
+    search_queryset, rebuild_search_index,
+    activity_event, record_activity,
+    compact_activities, read_activity_archive,
+    DashboardCache, get_dashboard_cache_metrics, reset_dashboard_cache_metrics,
+)
+from ..services.cache_service import get_dashboard_cache, invalidate_dashboard_lists
+from ..services import push_service, apply_bulk_operations, parse_range
+from ..services import UploadError, start_upload, write_chunk, finalize_upload, cleanup_uploads
+from ..services.upload_service import upload_part_path
+from ..services import pending_media_jobs
+from ..services import media_service, generate_attachment_preview
+from ..services import TaskCard, build_task_cards, task_card_rows
+from ..services import session_service
+from ..sessions import REFRESHED_KEY
+from ..services import RequestProfile, get_request_profile, sql_shape
+from ..services.perf_service import start_request_profile, reset_request_profile
+from ..services import get_metrics_registry, record_request, render_metrics, reset_metrics
+from ..models import AttachmentUpload, TaskAttachment
+
+
+class TaskStatsServiceTest(TestCase):
+    """Tests para el servicio de estadísticas agregadas."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.other_user = create_user(username="otheruser", email="other@example.com")
+        self.own_list = create_task_list(owner=self.user)
+        self.shared_list = create_task_list(owner=self.other_user, name="Compartida")
+        self.foreign_list = create_task_list(owner=self.other_user, name="Ajena")
+        create_shared_list(task_list=self.shared_list, shared_with=self.user)
+        
+        create_task(task_list=self.own_list)
+        create_task(task_list=self.own_list, status='in_progress')
+        create_completed_task(task_list=self.own_list)
+        create_overdue_task(task_list=self.shared_list)
+        create_high_priority_task(task_list=self.shared_list)
+        create_high_priority_task(task_list=self.shared_list, status='completed')
+        create_task(task_list=self.foreign_list)
+    
+    def test_user_task_counts(self):
+        """Test: Los contadores incluyen listas propias y compartidas, sin duplicados."""
+        # Act
+        counts = get_user_task_counts(self.user)
+        
+        # Assert
+        self.assertEqual(counts, {
+            'total': 6,
+            'pending': 3,
+            'in_progress': 1,
+            'completed': 2,
+            'overdue': 1,
+            'high_priority': 1,
+        })
+    
+    def test_user_task_counts_single_query(self):
+        """Test: Los contadores del usuario se calculan en una sola consulta."""
+        with self.assertNumQueries(1):
+            get_user_task_counts(self.user)
+    
+    def test_list_task_counts(self):
+        """Test: Contadores de una lista concreta."""
+        # Act
+        with self.assertNumQueries(1):
+            counts = get_list_task_counts(self.shared_list)
+        
+        # Assert
+        self.assertEqual(counts['total'], 3)
+        self.assertEqual(counts['overdue'], 1)
+        self.assertEqual(counts['high_priority'], 1)
+    
+    def test_counts_for_user_without_lists(self):
+        """Test: Usuario sin listas obtiene contadores a cero."""
+        # Arrange
+        lonely_user = create_user(username="lonely", email="lonely@example.com")
+        
+        # Act
+        counts = get_user_task_counts(lonely_user)
+        
+        # Assert
+        self.assertEqual(counts['total'], 0)
+        self.assertEqual(counts['overdue'], 0)
+
+
+class DashboardStatsQueryCountTest(TestCase):
+    """Tests de regresión del número de consultas del dashboard."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.client = Client()
+        self.user = create_user()
+        for i in range(3):
+            task_list = create_task_list(owner=self.user, name=f"Lista {i}")
+            create_task(task_list=task_list, due_date=timezone.now() + timedelta(days=2))
+            create_overdue_task(task_list=task_list)
+            create_completed_task(task_list=task_list)
+        self.client.login(username=self.user.username, password='testpass123')
+        self.url = reverse('task_stats_api', kwargs={'pk': 'dashboard'})
+    
+    def test_dashboard_stats_api_query_count(self):
+        """Test: La API de estadísticas usa un número fijo de consultas."""
+        # Usuario + contadores + vencidas + próximas + actividad: la sesión se
+        # lee de la caché y el sondeo no la vuelve a guardar
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['total_tasks'], 9)
+        self.assertEqual(data['completed_tasks'], 3)
+        self.assertEqual(data['overdue_count'], 3)
+        self.assertEqual(len(data['upcoming_tasks']), 3)
+    
+    def test_dashboard_stats_api_query_count_is_constant(self):
+        """Test: El número de consultas no crece con el número de listas."""
+        # Arrange
+        for i in range(5):
+            task_list = create_task_list(owner=self.user, name=f"Extra {i}")
+            create_task(task_list=task_list)
+        
+        # Act / Assert
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+
+
+class KeysetPaginatorTest(TestCase):
+    """Tests para la paginación por cursor del tablero de tareas."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        priorities = ['low', 'medium', 'high']
+        now = timezone.now()
+        for i in range(23):
+            create_task(
+                task_list=self.task_list,
+                title=f"Tarea {i}",
+                priority=priorities[i % 3],
+                due_date=now + timedelta(days=i % 3) if i % 5 else None,
+            )
+        self.tasks = self.task_list.tasks.all()
+        self.expected = list(self.tasks.order_by(*TASK_BOARD_ORDERING).values_list('pk', flat=True))
+    
+    def test_sort_keys_follow_priority_and_due_date(self):
+        """Test: Las claves de ordenación se sincronizan al guardar."""
+        # Arrange
+        task = create_task(task_list=self.task_list, priority='high')
+        
+        # Act
+        task.priority = 'low'
+        task.due_date = timezone.now()
+        task.save(update_fields=['priority', 'due_date'])
+        task.refresh_from_db()
+        
+        # Assert
+        self.assertEqual(task.priority_rank, 3)
+        self.assertEqual(task.effective_due_date, task.due_date)
+    
+    def test_forward_traversal_has_no_gaps_or_duplicates(self):
+        """Test: Recorrer las páginas hacia delante devuelve todas las tareas en orden."""
+        # Arrange
+        paginator = KeysetPaginator(self.tasks, TASK_BOARD_ORDERING, 5)
+        seen = []
+        
+        # Act
+        page = paginator.get_page()
+        seen.extend(task.pk for task in page)
+        while page.has_next():
+            page = paginator.get_page(page.next_cursor)
+            seen.extend(task.pk for task in page)
+        
+        # Assert
+        self.assertEqual(seen, self.expected)
+        self.assertFalse(page.has_next())
+    
+    def test_backward_traversal_returns_previous_pages(self):
+        """Test: El cursor anterior devuelve la página previa en el mismo orden."""
+        # Arrange
+        paginator = KeysetPaginator(self.tasks, TASK_BOARD_ORDERING, 5)
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        
+        # Act
+        previous = paginator.get_page(second.previous_cursor)
+        
+        # Assert
+        self.assertEqual([t.pk for t in previous], [t.pk for t in first])
+        self.assertFalse(previous.has_previous())
+        self.assertTrue(second.has_previous())
+    
+    def test_tampered_cursor_is_rejected(self):
+        """Test: Un cursor manipulado lanza InvalidCursor."""
+        # Arrange
+        paginator = KeysetPaginator(self.tasks, TASK_BOARD_ORDERING, 5)
+        cursor = paginator.get_page().next_cursor
+        
+        # Act / Assert
+        with self.assertRaises(InvalidCursor):
+            paginator.get_page(cursor[:-2] + 'xx')
+    
+    def test_page_query_count_is_constant(self):
+        """Test: Cada página se obtiene con una sola consulta."""
+        # Arrange
+        paginator = KeysetPaginator(self.tasks, TASK_BOARD_ORDERING, 5)
+        cursor = paginator.get_page().next_cursor
+        
+        # Act / Assert
+        with self.assertNumQueries(1):
+            list(paginator.get_page(cursor))
+
+
+class SearchServiceTest(TestCase):
+    """Tests para la búsqueda de texto completo de tareas, listas y usuarios."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user, name="Compras", description="Cosas del supermercado")
+        self.milk = create_task(task_list=self.task_list, title="Comprar leche", description="En el supermercado")
+        self.python = create_task(task_list=self.task_list, title="Estudiar Python", description="Repasar Django")
+        self.doctor = create_task(task_list=self.task_list, title="Llamar al médico", description="Pedir cita")
+        self.tasks = Task.objects.all()
+    
+    def test_search_matches_title_and_description(self):
+        """Test: La búsqueda encuentra palabras del título y de la descripción."""
+        # Act / Assert
+        self.assertEqual(list(search_queryset(self.tasks, "python")), [self.python])
+        self.assertEqual(list(search_queryset(self.tasks, "supermercado")), [self.milk])
+    
+    def test_search_ignores_case_and_accents(self):
+        """Test: La búsqueda no distingue mayúsculas ni tildes."""
+        # Act / Assert
+        self.assertEqual(list(search_queryset(self.tasks, "MEDICO")), [self.doctor])
+    
+    def test_search_requires_all_terms(self):
+        """Test: Todas las palabras de la consulta deben aparecer."""
+        # Act / Assert
+        self.assertEqual(list(search_queryset(self.tasks, "comprar leche")), [self.milk])
+        self.assertFalse(search_queryset(self.tasks, "comprar python").exists())
+    
+    def test_search_without_terms_returns_nothing(self):
+        """Test: Una consulta sin palabras no devuelve resultados."""
+        # Act / Assert
+        self.assertFalse(search_queryset(self.tasks, "  ¿?  ").exists())
+    
+    def test_index_follows_save_and_delete(self):
+        """Test: El índice se actualiza al guardar y eliminar."""
+        # Act
+        self.python.title = "Estudiar Rust"
+        self.python.save()
+        self.milk.delete()
+        
+        # Assert
+        self.assertFalse(search_queryset(self.tasks, "python").exists())
+        self.assertEqual(list(search_queryset(self.tasks, "rust")), [self.python])
+        self.assertFalse(search_queryset(self.tasks, "leche").exists())
+    
+    def test_ranked_search_prefers_title_matches(self):
+        """Test: Las coincidencias en el título se ordenan antes que en la descripción."""
+        # Arrange
+        create_task(task_list=self.task_list, title="Django avanzado", description="Señales")
+        
+        # Act
+        results = search_queryset(self.tasks, "django", ranked=True).order_by('search_rank')
+        
+        # Assert
+        self.assertEqual([task.title for task in results], ["Django avanzado", "Estudiar Python"])
+    
+    def test_search_task_lists(self):
+        """Test: Las listas se buscan por nombre y descripción."""
+        # Arrange
+        create_task_list(owner=self.user, name="Trabajo")
+        
+        # Act / Assert
+        self.assertEqual(list(search_queryset(TaskList.objects.all(), "supermercado")), [self.task_list])
+    
+    def test_prefix_search_for_users(self):
+        """Test: El autocompletado de usuarios busca por prefijo."""
+        # Arrange
+        create_user(username="maria", email="maria@example.com", first_name="María", last_name="López")
+        
+        # Act
+        exact = search_queryset(User.objects.all(), "lop")
+        prefix = search_queryset(User.objects.all(), "lop", prefix=True)
+        
+        # Assert
+        self.assertFalse(exact.exists())
+        self.assertEqual([user.username for user in prefix], ["maria"])
+    
+    def test_rebuild_restores_bulk_created_rows(self):
+        """Test: La reconstrucción indexa filas creadas sin señales."""
+        # Arrange
+        Task.objects.bulk_create([Task(title="Importada", task_list=self.task_list, created_by=self.user)])
+        self.assertFalse(search_queryset(self.tasks, "importada").exists())
+        
+        # Act
+        indexed = rebuild_search_index(['tasks.task'])
+        
+        # Assert
+        self.assertEqual(indexed, {'tasks.task': 4})
+        self.assertTrue(search_queryset(self.tasks, "importada").exists())
+    
+    def test_rebuild_search_index_command(self):
+        """Test: El comando reconstruye todos los índices."""
+        # Arrange
+        out = StringIO()
+        
+        # Act
+        call_command('rebuild_search_index', stdout=out)
+        
+        # Assert
+        self.assertIn('tasks.task: 3 filas indexadas', out.getvalue())
+    
+    def test_list_view_and_user_api_use_search(self):
+        """Test: La vista de listas y la API de usuarios usan el buscador."""
+        # Arrange
+        client = Client()
+        client.login(username=self.user.username, password='testpass123')
+        create_task_list(owner=self.user, name="Trabajo")
+        create_user(username="carlos", email="carlos@example.com", first_name="Carlos")
+        
+        # Act
+        lists_response = client.get(reverse('tasklist_list'), {'search': 'supermercado'})
+        users_response = client.get(reverse('search_users_api'), {'q': 'carl'})
+        
+        # Assert
+        self.assertEqual(list(lists_response.context['task_lists']), [self.task_list])
+        data = json.loads(users_response.content)
+        self.assertEqual([user['username'] for user in data['users']], ["carlos"])
+
+    
+    def test_views_match_partial_words(self):
+        """Test: Las búsquedas de listas y tareas encuentran palabras incompletas."""
+        # Arrange
+        client = Client()
+        client.login(username=self.user.username, password='testpass123')
+        detail_url = reverse('tasklist_detail', kwargs={'pk': self.task_list.pk})
+        
+        # Act
+        lists_response = client.get(reverse('tasklist_list'), {'search': 'supermer'})
+        tasks_response = client.get(detail_url, {'search': 'compr'})
+        
+        # Assert
+        self.assertEqual(list(lists_response.context['task_lists']), [self.task_list])
+        self.assertContains(tasks_response, 'Comprar leche')
+        self.assertNotContains(tasks_response, 'Estudiar Python')
+
+class ActivityLogWriterTest(TestCase):
+    """Tests para el registro de actividad diferido con cola en disco."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user(first_name="Ana", last_name="Pérez")
+        self.task = create_task(task_list=create_task_list(owner=self.user), title="Revisar informe")
+        self.spool_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool_dir.cleanup)
+        override = override_settings(ACTIVITY_LOG_MODE='request', ACTIVITY_SPOOL_DIR=self.spool_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        activity_service._writer = None
+        self.addCleanup(setattr, activity_service, '_writer', None)
+    
+    def test_sync_mode_writes_immediately(self):
+        """Test: En modo sync la actividad se escribe en el momento."""
+        # Act
+        with override_settings(ACTIVITY_LOG_MODE='sync'):
+            record_activity(self.task, self.user, 'updated', 'Cambio')
+        
+        # Assert
+        self.assertEqual(TaskActivity.objects.filter(task=self.task, action='updated').count(), 1)
+    
+    def test_events_are_buffered_until_flush(self):
+        """Test: En modo diferido los eventos se escriben juntos al vaciar el buffer."""
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            record_activity(self.task, self.user, 'updated', 'Primero')
+            record_activity(self.task, self.user, 'completed', 'Segundo')
+        buffered = TaskActivity.objects.filter(task=self.task).count()
+        
+        with self.assertNumQueries(2):  # tareas existentes + bulk_create
+            written = activity_service.flush_activity_log()
+        
+        # Assert
+        self.assertEqual(buffered, 0)
+        self.assertEqual(written, 2)
+        self.assertEqual(os.listdir(self.spool_dir.name), [])
+    
+    def test_events_are_discarded_if_transaction_rolls_back(self):
+        """Test: Los eventos de una transacción revertida no se encolan."""
+        # Act
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            record_activity(self.task, self.user, 'updated', 'Revertido')
+        
+        # Assert
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(activity_service.flush_activity_log(), 0)
+    
+    def test_mentions_are_resolved_in_bulk(self):
+        """Test: Los nombres de usuarios mencionados se resuelven al escribir."""
+        # Arrange
+        event = activity_event(
+            self.task, self.user, 'created', 'Tarea creada: Revisar informe',
+            mentions=[(' (Asignada a: {users})', [self.user])],
+        )
+        
+        # Act
+        activities = activity_service.write_activities([event])
+        
+        # Assert
+        self.assertEqual(activities[0].description, 'Tarea creada: Revisar informe (Asignada a: Ana Pérez)')
+    
+    def test_spool_of_dead_process_is_recovered(self):
+        """Test: Los eventos en disco de un proceso caído se escriben al reclamarlos."""
+        # Arrange: un proceso escribe en su cola y muere sin vaciarla
+        crashed = activity_service.ActivityWriter()
+        crashed.add([activity_event(self.task, self.user, 'updated', 'Antes de la caída')])
+        crashed.spool.file.close()
+        os.replace(crashed.spool.active_path, os.path.join(self.spool_dir.name, '999999999.active.jsonl'))
+        
+        # Act
+        written = activity_service.ActivityWriter().flush()
+        
+        # Assert
+        self.assertEqual(written, 1)
+        self.assertTrue(TaskActivity.objects.filter(description='Antes de la caída').exists())
+        self.assertEqual(os.listdir(self.spool_dir.name), [])
+    
+    def test_failed_batch_is_kept_for_retry(self):
+        """Test: Un lote que falla se conserva en disco y se reintenta."""
+        # Arrange
+        writer = activity_service.get_activity_writer()
+        writer.add([activity_event(self.task, self.user, 'updated', 'Reintento')])
+        
+        # Act
+        with mock.patch.object(activity_service, 'write_activities', side_effect=RuntimeError):
+            with self.assertLogs(activity_service.logger, 'ERROR'):
+                writer.flush()
+        pending_files = os.listdir(self.spool_dir.name)
+        written = writer.flush()
+        
+        # Assert
+        self.assertEqual(len(pending_files), 1)
+        self.assertEqual(written, 1)
+        self.assertEqual(os.listdir(self.spool_dir.name), [])
+    
+    def test_events_for_deleted_tasks_are_skipped(self):
+        """Test: Los eventos de tareas eliminadas antes de escribirse se descartan."""
+        # Arrange
+        event = activity_event(self.task, self.user, 'updated', 'Tarea borrada')
+        self.task.delete()
+        
+        # Act / Assert
+        self.assertEqual(activity_service.write_activities([event]), [])
+
+
+class ActivityRetentionTest(TestCase):
+    """Tests para la compactación y el archivo del historial de actividad."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task = create_task(task_list=create_task_list(owner=self.user))
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_dir.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.now = timezone.now().replace(year=2026, month=6, day=15, hour=12)
+        self.old = [
+            TaskActivity.objects.create(task=self.task, user=self.user, action='completed', timestamp=timestamp)
+            for timestamp in (
+                self.now.replace(month=3, day=2, hour=9),
+                self.now.replace(month=3, day=2, hour=18),
+                self.now.replace(month=4, day=10),
+            )
+        ]
+        self.recent = TaskActivity.objects.create(task=self.task, user=self.user, action='updated', timestamp=self.now)
+    
+    def test_old_activity_is_compacted_into_daily_summaries(self):
+        """Test: Las actividades antiguas pasan a resúmenes diarios y salen de la tabla activa."""
+        # Act
+        stats = compact_activities(self.now - timedelta(days=30), batch_size=2)
+        
+        # Assert
+        self.assertEqual(stats['compacted'], 3)
+        self.assertEqual(list(TaskActivity.objects.values_list('pk', flat=True)), [self.recent.pk])
+        summaries = {summary.date.isoformat(): summary for summary in TaskActivitySummary.objects.all()}
+        self.assertEqual(set(summaries), {'2026-03-02', '2026-04-10'})
+        self.assertEqual(summaries['2026-03-02'].count, 2)
+        self.assertEqual(summaries['2026-03-02'].first_at, self.old[0].timestamp)
+        self.assertEqual(summaries['2026-03-02'].last_at, self.old[1].timestamp)
+    
+    def test_old_activity_is_archived_by_month(self):
+        """Test: Las actividades compactadas se archivan en ficheros mensuales comprimidos."""
+        # Act
+        stats = compact_activities(self.now - timedelta(days=30))
+        
+        # Assert
+        self.assertEqual(len(stats['archives']), 2)
+        march = read_activity_archive(2026, 3)
+        self.assertEqual([row['id'] for row in march], [self.old[0].pk, self.old[1].pk])
+        self.assertEqual(march[0]['action'], 'completed')
+        self.assertEqual(len(read_activity_archive(2026, 4)), 1)
+    
+    def test_repeated_compaction_accumulates_summaries(self):
+        """Test: Compactar de nuevo el mismo día suma a los resúmenes existentes."""
+        # Arrange
+        compact_activities(self.now - timedelta(days=30))
+        TaskActivity.objects.create(
+            task=self.task, user=self.user, action='completed', timestamp=self.now.replace(month=3, day=2, hour=20)
+        )
+        
+        # Act
+        compact_activities(self.now - timedelta(days=30))
+        
+        # Assert
+        summary = TaskActivitySummary.objects.get(date='2026-03-02')
+        self.assertEqual(summary.count, 3)
+        self.assertEqual(len(read_activity_archive(2026, 3)), 3)
+    
+    def test_compact_activity_command(self):
+        """Test: El comando respeta --dry-run y --no-archive."""
+        # Arrange
+        out = StringIO()
+        
+        # Act
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            call_command('compact_activity', '--days', '30', '--dry-run', stdout=out)
+            pending = TaskActivity.objects.count()
+            call_command('compact_activity', '--days', '30', '--no-archive', stdout=out)
+        
+        # Assert
+        self.assertEqual(pending, 4)
+        self.assertIn('3 actividades anteriores', out.getvalue())
+        self.assertEqual(TaskActivity.objects.count(), 1)
+        self.assertEqual(read_activity_archive(2026, 3), [])
+
+
+def _task_queries(captured):
+    """Consultas capturadas sobre las tablas de la aplicación tasks."""
+    return [query['sql'] for query in captured if 'tasks_' in query['sql']]
+
+
+class DashboardCacheTestMixin:
+    """Tests de la caché del dashboard, comunes a todos los backends."""
+    
+    cache_backend = None
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'dashboard': self.get_cache_settings(),
+            'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+        get_dashboard_cache().clear()
+        reset_dashboard_cache_metrics()
+        
+        self.client = Client()
+        self.user = create_user()
+        self.other_user = create_user(username="otheruser", email="other@example.com")
+        self.task_list = create_task_list(owner=self.user, name="Lista cacheada")
+        create_task(task_list=self.task_list, created_by=self.user)
+        self.client.login(username=self.user.username, password='testpass123')
+        self.stats_url = reverse('task_stats_api', kwargs={'pk': 'dashboard'})
+    
+    def get_stats(self):
+        return json.loads(self.client.get(self.stats_url).content)
+    
+    def test_stats_api_hit_does_not_query_tasks(self):
+        """Test: Un acierto de caché no consulta las tablas de tareas."""
+        # Arrange
+        first = self.get_stats()
+        
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.get_stats()
+        
+        # Assert
+        self.assertEqual(first, second)
+        self.assertEqual(_task_queries(ctx.captured_queries), [])
+        self.assertEqual(get_dashboard_cache_metrics()['stats'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+    
+    def test_dashboard_fragments_are_cached(self):
+        """Test: El dashboard cacheado se sirve sin consultas sobre las tareas."""
+        # Arrange
+        self.client.get(reverse('dashboard'))
+        
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('dashboard'))
+        
+        # Assert
+        self.assertContains(response, 'Lista cacheada')
+        self.assertEqual(_task_queries(ctx.captured_queries), [])
+        self.assertEqual(get_dashboard_cache_metrics()['lists']['hits'], 1)
+    
+    def test_task_change_invalidates_dashboard(self):
+        """Test: Crear o eliminar una tarea invalida las estadísticas."""
+        # Arrange
+        self.assertEqual(self.get_stats()['total_tasks'], 1)
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            task = create_task(task_list=self.task_list, created_by=self.user, title="Nueva")
+        created = self.get_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        deleted = self.get_stats()
+        
+        # Assert
+        self.assertEqual(created['total_tasks'], 2)
+        self.assertEqual(deleted['total_tasks'], 1)
+    
+    def test_unrelated_change_keeps_cache(self):
+        """Test: Los cambios en listas ajenas no invalidan la caché del usuario."""
+        # Arrange
+        self.get_stats()
+        other_list = create_task_list(owner=self.other_user, name="Ajena")
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            create_task(task_list=other_list, created_by=self.other_user)
+        self.get_stats()
+        
+        # Assert
+        self.assertEqual(get_dashboard_cache_metrics()['stats']['hits'], 1)
+    
+    def test_sharing_invalidates_dashboard(self):
+        """Test: Compartir una lista invalida el dashboard del usuario destinatario."""
+        # Arrange
+        other_list = create_task_list(owner=self.other_user, name="Ajena")
+        create_task(task_list=other_list, created_by=self.other_user)
+        self.get_stats()
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            create_shared_list(task_list=other_list, shared_with=self.user, shared_by=self.other_user)
+        stats = self.get_stats()
+        
+        # Assert
+        self.assertEqual(stats['total_tasks'], 2)
+    
+    def test_bulk_activity_invalidates_dashboard(self):
+        """Test: Las actividades escritas con bulk_create invalidan la actividad reciente."""
+        # Arrange
+        task = Task.objects.get(task_list=self.task_list)
+        self.assertEqual(self.get_stats()['recent_activities'], [])
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            record_activity(task, self.user, 'completed', 'Completada')
+        stats = self.get_stats()
+        
+        # Assert
+        self.assertEqual(len(stats['recent_activities']), 1)
+    
+    def test_invalidation_writes_new_version_without_incr(self):
+        """Test: Cada invalidación escribe una versión nueva sin incr (no atómico en FileBasedCache)."""
+        # Arrange
+        cache = get_dashboard_cache()
+        etags = [DashboardCache(self.user).get_etag()]
+        
+        # Act
+        with mock.patch.object(type(cache), 'incr', side_effect=AssertionError('incr no es atómico')):
+            for _ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    invalidate_dashboard_lists([self.task_list.pk])
+                etags.append(DashboardCache(self.user).get_etag())
+        
+        # Assert
+        self.assertEqual(len(set(etags)), 3)
+    
+    def test_timeout_is_bounded_by_next_due_date(self):
+        """Test: Las entradas caducan cuando una tarea abierta pasa a estar vencida."""
+        # Arrange
+        now = timezone.now()
+        create_task(task_list=self.task_list, created_by=self.user, due_date=now + timedelta(seconds=30))
+        
+        # Act
+        timeout = DashboardCache(self.user, now=now).timeout
+        
+        # Assert
+        self.assertEqual(timeout, 30)
+
+
+class LocMemDashboardCacheTest(DashboardCacheTestMixin, TestCase):
+    """Caché del dashboard sobre LocMemCache."""
+    
+    def get_cache_settings(self):
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'dashboard-tests',
+        }
+
+
+class FileDashboardCacheTest(DashboardCacheTestMixin, TestCase):
+    """Caché del dashboard sobre FileBasedCache."""
+    
+    def get_cache_settings(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': cache_dir.name,
+        }
+
+
+def _redis_available():
+    try:
+        import redis  # noqa: F401
+    except ImportError:
+        return False
+    return bool(os.environ.get('REDIS_URL'))
+
+
+@skipUnless(_redis_available(), 'Requiere el paquete redis y REDIS_URL (p. ej. un redis-server local)')
+class RedisDashboardCacheTest(DashboardCacheTestMixin, TestCase):
+    """Caché del dashboard sobre RedisCache."""
+    
+    def get_cache_settings(self):
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+            'KEY_PREFIX': 'tasks-tests',
+        }
+
+
+class PushBrokerTest(TestCase):
+    """Tests para el broker de eventos en vivo en memoria."""
+    
+    async def test_broker_delivers_only_to_subscribed_channels(self):
+        """Test: Cada cliente recibe solo los eventos de sus canales."""
+        # Arrange
+        broker = push_service.InProcessBroker()
+        subscription = broker.subscribe(['list:1', 'user:1'])
+        other = broker.subscribe(['list:2'])
+        
+        # Act
+        broker.publish('list:1', {'type': 'task', 'op': 'updated'})
+        
+        # Assert
+        self.assertEqual(await subscription.get(1), {'type': 'task', 'op': 'updated'})
+        self.assertIsNone(await other.get(0.01))
+        subscription.close()
+        other.close()
+        self.assertEqual(dict(broker.subscriptions), {})
+    
+    async def test_publish_from_another_thread(self):
+        """Test: Los eventos publicados desde otro hilo llegan al bucle del cliente."""
+        # Arrange
+        broker = push_service.InProcessBroker()
+        subscription = broker.subscribe(['list:1'])
+        
+        # Act
+        thread = threading.Thread(target=broker.publish, args=('list:1', {'type': 'list'}))
+        thread.start()
+        thread.join()
+        
+        # Assert
+        self.assertEqual(await subscription.get(1), {'type': 'list'})
+        subscription.close()
+    
+    @override_settings(PUSH_QUEUE_SIZE=2)
+    async def test_overflow_requests_resync(self):
+        """Test: Si la cola del cliente se desborda recibe un evento resync."""
+        # Arrange
+        broker = push_service.InProcessBroker()
+        subscription = broker.subscribe(['list:1'])
+        
+        # Act
+        for i in range(3):
+            broker.publish('list:1', {'type': 'task', 'n': i})
+        await subscription.get(0.01)  # Procesar las entregas pendientes del bucle
+        
+        # Assert
+        self.assertEqual(await subscription.get(1), push_service.RESYNC_EVENT)
+        self.assertIsNone(await subscription.get(0.01))
+        subscription.close()
+
+
+class PushEventsTest(TestCase):
+    """Tests para los eventos publicados al cambiar tareas y listas."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.broker = mock.Mock()
+        patcher = mock.patch.object(push_service, 'get_push_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def published(self):
+        return [call.args for call in self.broker.publish.call_args_list]
+    
+    def test_created_task_publishes_counter_deltas(self):
+        """Test: Crear una tarea publica la tarjeta y los deltas de contadores."""
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            task = create_task(task_list=self.task_list, created_by=self.user)
+        
+        # Assert
+        [(channel, event)] = self.published()
+        self.assertEqual(channel, f'list:{self.task_list.pk}')
+        self.assertEqual(event['op'], 'created')
+        self.assertEqual(event['task']['id'], task.pk)
+        self.assertEqual(
+            event['counters'],
+            {str(self.task_list.pk): {'tasks_count': 1, 'pending_tasks_count': 1}},
+        )
+    
+    def test_status_change_publishes_only_the_delta(self):
+        """Test: Un cambio de estado publica solo el delta de los contadores."""
+        # Arrange
+        task = create_task(task_list=self.task_list, created_by=self.user)
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = 'completed'
+            task.save()
+        
+        # Assert
+        [(_, event)] = self.published()
+        self.assertEqual(
+            event['counters'],
+            {str(self.task_list.pk): {'pending_tasks_count': -1, 'completed_tasks_count': 1}},
+        )
+        self.assertEqual(event['task']['status'], 'completed')
+    
+    def test_moved_task_notifies_both_lists(self):
+        """Test: Mover una tarea notifica a la lista de origen y a la de destino."""
+        # Arrange
+        task = create_task(task_list=self.task_list, created_by=self.user)
+        target = create_task_list(owner=self.user, name="Destino")
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            task.task_list = target
+            task.save()
+        
+        # Assert
+        channels = {channel for channel, _ in self.published()}
+        self.assertEqual(channels, {f'list:{self.task_list.pk}', f'list:{target.pk}'})
+    
+    def test_bulk_operations_publish_events(self):
+        """Test: Las operaciones masivas (sin señales) también publican eventos."""
+        # Arrange
+        tasks = [create_task(task_list=self.task_list, created_by=self.user) for _ in range(2)]
+        request = mock.Mock(user=self.user)
+        
+        # Act
+        with mock.patch('tasks.services.bulk_service.has_list_permission', return_value=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                apply_bulk_operations(request, [
+                    {'action': 'status', 'task_ids': [task.pk for task in tasks], 'value': 'completed'},
+                ])
+        
+        # Assert
+        events = [event for _, event in self.published()]
+        self.assertEqual(sorted(event['task']['id'] for event in events), sorted(task.pk for task in tasks))
+        self.assertTrue(all(event['task']['status'] == 'completed' for event in events))
+    
+    def test_sharing_publishes_access_event(self):
+        """Test: Compartir una lista avisa al destinatario para que se vuelva a suscribir."""
+        # Arrange
+        other_user = create_user(username="otheruser", email="other@example.com")
+        
+        # Act
+        with self.captureOnCommitCallbacks(execute=True):
+            create_shared_list(task_list=self.task_list, shared_with=other_user, shared_by=self.user)
+        
+        # Assert
+        self.assertIn(
+            (f'user:{other_user.pk}', {'type': 'access', 'op': 'granted', 'list_id': self.task_list.pk}),
+            self.published(),
+        )
+
+
+class AttachmentRangeTest(TestCase):
+    """Tests para la interpretación de la cabecera Range."""
+    
+    def test_parse_range(self):
+        """Test: Rangos simples, sufijos, rangos ignorados y no satisfacibles."""
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=10-': (10, 99),
+            'bytes=90-200': (90, 99),
+            'bytes=-10': (90, 99),
+            'bytes=-500': (0, 99),
+            None: None,
+            'bytes=0-1,5-6': None,
+            'items=0-1': None,
+            'bytes=100-': False,
+            'bytes=5-2': False,
+            'bytes=-0': False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 100), expected)
+
+
+class ChunkedUploadServiceTest(TestCase):
+    """Tests para las subidas de adjuntos por partes reanudables."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(media_dir.name, 'media'),
+            ATTACHMENT_UPLOAD_TEMP_DIR=os.path.join(media_dir.name, 'uploads'),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.user = create_user()
+        self.task = create_task(created_by=self.user, task_list=create_task_list(owner=self.user))
+        self.content = os.urandom(1000)
+    
+    def send(self, upload, start, end, chunk_sha256=''):
+        """Envía los bytes [start, end) del contenido como una parte."""
+        return write_chunk(
+            upload,
+            f'bytes {start}-{end - 1}/{len(self.content)}',
+            BytesIO(self.content[start:end]),
+            chunk_sha256,
+        )
+    
+    def test_upload_in_chunks(self):
+        """Test: Las partes en orden se acumulan y finalizar crea el adjunto."""
+        # Arrange
+        upload = start_upload(
+            self.task, self.user, 'informe.pdf', len(self.content),
+            hashlib.sha256(self.content).hexdigest(),
+        )
+        
+        # Act
+        upload = self.send(upload, 0, 400, hashlib.sha256(self.content[:400]).hexdigest())
+        upload = self.send(upload, 400, 1000)
+        attachment = finalize_upload(upload)
+        
+        # Assert
+        self.assertEqual(upload.offset, 1000)
+        self.assertEqual(attachment.filename, 'informe.pdf')
+        self.assertEqual(attachment.file_size, 1000)
+        with attachment.file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertFalse(AttachmentUpload.objects.exists())
+        self.assertFalse(os.path.exists(upload_part_path(upload.pk)))
+    
+    def test_finalize_reuses_running_digest(self):
+        """Test: Finalizar no vuelve a leer del disco los bytes ya hasheados al aceptar las partes."""
+        # Arrange
+        upload = start_upload(
+            self.task, self.user, 'informe.pdf', len(self.content),
+            hashlib.sha256(self.content).hexdigest(),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            upload = self.send(upload, 0, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            upload = self.send(upload, 400, 1000)
+        # Si se releyera el archivo el hash dejaría de coincidir
+        with open(upload_part_path(upload.pk), 'r+b') as f:
+            f.write(bytes(len(self.content)))
+        
+        # Act
+        attachment = finalize_upload(upload)
+        
+        # Assert
+        self.assertEqual(attachment.file_size, 1000)
+        self.assertFalse(AttachmentUpload.objects.exists())
+    
+    def test_start_validates_extension_and_size(self):
+        """Test: Extensiones no permitidas y tamaños inválidos se rechazan."""
+        with self.assertRaises(UploadError):
+            start_upload(self.task, self.user, 'script.exe', 10)
+        with self.assertRaises(UploadError):
+            start_upload(self.task, self.user, 'notas.txt', 0)
+        with override_settings(ATTACHMENT_UPLOAD_MAX_SIZE=100):
+            with self.assertRaises(UploadError) as cm:
+                start_upload(self.task, self.user, 'notas.txt', 101)
+        self.assertEqual(cm.exception.status, 413)
+        self.assertFalse(AttachmentUpload.objects.exists())
+    
+    def test_wrong_offset_returns_current_offset(self):
+        """Test: Una parte que no empieza en el offset da 409 con el offset actual."""
+        # Arrange
+        upload = self.send(start_upload(self.task, self.user, 'notas.txt', 1000), 0, 400)
+        
+        # Act
+        with self.assertRaises(UploadError) as cm:
+            self.send(upload, 600, 1000)
+        
+        # Assert
+        self.assertEqual(cm.exception.status, 409)
+        self.assertEqual(cm.exception.offset, 400)
+    
+    def test_resend_after_bad_checksum(self):
+        """Test: Una parte con SHA-256 incorrecto se descarta y se puede reenviar."""
+        # Arrange
+        upload = start_upload(self.task, self.user, 'notas.txt', 1000)
+        
+        # Act
+        with self.assertRaises(UploadError) as cm:
+            self.send(upload, 0, 400, '0' * 64)
+        upload = self.send(upload, 0, 1000)
+        
+        # Assert
+        self.assertEqual(cm.exception.offset, 0)
+        self.assertEqual(upload.offset, 1000)
+        with open(upload_part_path(upload.pk), 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+    
+    def test_incomplete_chunk_is_discarded(self):
+        """Test: Si la conexión se corta a mitad de parte el offset no avanza."""
+        # Arrange
+        upload = start_upload(self.task, self.user, 'notas.txt', 1000)
+        
+        # Act
+        with self.assertRaises(UploadError):
+            write_chunk(upload, 'bytes 0-499/1000', BytesIO(self.content[:100]))
+        upload.refresh_from_db()
+        
+        # Assert
+        self.assertEqual(upload.offset, 0)
+        self.assertEqual(os.path.getsize(upload_part_path(upload.pk)), 0)
+    
+    def test_finalize_rejects_incomplete_and_corrupted(self):
+        """Test: No se finaliza con partes pendientes ni con el SHA-256 del archivo incorrecto."""
+        # Arrange
+        upload = start_upload(self.task, self.user, 'notas.txt', 1000, 'a' * 64)
+        upload = self.send(upload, 0, 400)
+        
+        # Act / Assert
+        with self.assertRaises(UploadError) as cm:
+            finalize_upload(upload)
+        self.assertEqual(cm.exception.status, 409)
+        
+        upload = self.send(upload, 400, 1000)
+        with self.assertRaises(UploadError) as cm:
+            finalize_upload(upload)
+        self.assertEqual(cm.exception.status, 422)
+        self.assertFalse(AttachmentUpload.objects.exists())
+        self.assertFalse(TaskAttachment.objects.exists())
+        self.assertFalse(os.path.exists(upload_part_path(upload.pk)))
+    
+    def test_cleanup_uploads(self):
+        """Test: Se borran las subidas caducadas y los temporales huérfanos."""
+        # Arrange
+        active = start_upload(self.task, self.user, 'activo.txt', 1000)
+        expired = start_upload(self.task, self.user, 'caducado.txt', 1000)
+        AttachmentUpload.objects.filter(pk=expired.pk).update(updated_at=timezone.now() - timedelta(days=2))
+        orphan = upload_part_path('huerfano')
+        open(orphan, 'wb').close()
+        old = (timezone.now() - timedelta(days=2)).timestamp()
+        os.utime(orphan, (old, old))
+        
+        # Act
+        stats = cleanup_uploads(max_age=timedelta(hours=1))
+        
+        # Assert
+        self.assertEqual(stats, {'uploads': 1, 'files': 2})
+        self.assertEqual(list(AttachmentUpload.objects.values_list('pk', flat=True)), [active.pk])
+        self.assertTrue(os.path.exists(upload_part_path(active.pk)))
+        self.assertFalse(os.path.exists(upload_part_path(expired.pk)))
+        self.assertFalse(os.path.exists(orphan))
+
+
+def make_image(size=(800, 600), fmt='PNG', color=(200, 30, 30)):
+    """Imagen real codificada en memoria."""
+    from PIL import Image
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class MediaPipelineTest(TestCase):
+    """Tests para la generación de variantes de avatares y vistas previas de adjuntos."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        override = override_settings(MEDIA_ROOT=media_dir.name, MEDIA_PIPELINE_MODE='sync')
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.task = create_task(task_list=self.task_list, created_by=self.user)
+    
+    def attach(self, filename='foto.png', content=None):
+        return TaskAttachment.objects.create(
+            task=self.task,
+            uploaded_by=self.user,
+            filename=filename,
+            file=ContentFile(content if content is not None else make_image(), name=filename),
+        )
+    
+    def test_image_attachment_preview(self):
+        """Test: Las imágenes adjuntas obtienen una miniatura pequeña."""
+        from PIL import Image
+        
+        # Act
+        attachment = self.attach()
+        
+        # Assert
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.preview_status, 'ready')
+        with default_storage.open(attachment.preview) as f:
+            image = Image.open(f)
+            self.assertEqual(image.format, 'WEBP')
+            self.assertLessEqual(max(image.size), media_service.PREVIEW_SIZE)
+    
+    def test_preview_is_reused_for_same_content(self):
+        """Test: El mismo contenido no se vuelve a procesar."""
+        # Arrange
+        first = self.attach()
+        
+        # Act
+        with mock.patch.object(media_service, '_open_image') as open_image:
+            second = self.attach(filename='copia.png')
+        
+        # Assert
+        open_image.assert_not_called()
+        second.refresh_from_db()
+        self.assertEqual(second.preview, TaskAttachment.objects.get(pk=first.pk).preview)
+    
+    def test_unsupported_and_failed_previews(self):
+        """Test: Los tipos sin vista previa y las imágenes corruptas no quedan pendientes."""
+        # Act
+        text = self.attach(filename='notas.txt', content=b'texto')
+        broken = self.attach(filename='rota.jpg', content=b'no es una imagen')
+        
+        # Assert
+        text.refresh_from_db()
+        broken.refresh_from_db()
+        self.assertEqual(text.preview_status, 'unsupported')
+        self.assertEqual(broken.preview_status, 'failed')
+        self.assertEqual(pending_media_jobs(), [])
+    
+    def test_avatar_variants(self):
+        """Test: Un avatar nuevo genera sus variantes; guardar el perfil sin cambiarlo no."""
+        # Arrange
+        profile = self.user.profile
+        
+        # Act
+        profile.avatar = ContentFile(make_image((1200, 900), 'JPEG'), name='avatar.jpg')
+        profile.save()
+        with mock.patch.object(media_service, 'generate_avatar_variants') as generate:
+            profile.bio = 'Otra biografía'
+            profile.save()
+        
+        # Assert
+        generate.assert_not_called()
+        profile.refresh_from_db()
+        self.assertEqual(set(profile.avatar_variants), set(media_service.AVATAR_SIZES))
+        self.assertEqual(profile.small_avatar_url, default_storage.url(profile.avatar_variants['small']))
+        self.assertEqual(profile.get_avatar_url('large'), default_storage.url(profile.avatar_variants['large']))
+    
+    @override_settings(MEDIA_PIPELINE_MODE='external')
+    def test_external_worker_processes_pending_jobs(self):
+        """Test: En modo external la request no procesa nada y process_media completa los pendientes."""
+        # Arrange
+        attachment = self.attach()
+        self.assertEqual(pending_media_jobs(), [('attachment', attachment.pk)])
+        
+        # Act
+        call_command('process_media', stdout=StringIO())
+        
+        # Assert
+        attachment.refresh_from_db()
+        self.assertEqual(attachment.preview_status, 'ready')
+        self.assertEqual(pending_media_jobs(), [])
+    
+    def test_background_worker(self):
+        """Test: En modo background el trabajo se encola al confirmar y lo procesa el hilo."""
+        # Arrange
+        worker = media_service.MediaWorker()
+        
+        # Act
+        with override_settings(MEDIA_PIPELINE_MODE='background'), \
+                mock.patch.object(media_service, 'get_media_worker', return_value=worker), \
+                mock.patch.object(media_service, 'process_media_job') as process:
+            with self.captureOnCommitCallbacks(execute=True):
+                attachment = self.attach()
+                self.assertEqual(worker.jobs.qsize(), 0)
+            worker.jobs.join()
+        
+        # Assert
+        process.assert_called_once_with('attachment', attachment.pk)
+    
+    def test_preview_view(self):
+        """Test: La vista previa se sirve con permisos y validadores."""
+        # Arrange
+        attachment = self.attach()
+        url = reverse('attachment_preview', kwargs={'task_pk': self.task.pk, 'pk': attachment.pk})
+        self.client.login(username=self.user.username, password='testpass123')
+        
+        # Act
+        response = self.client.get(url)
+        cached = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        board = self.client.get(reverse('tasklist_detail', kwargs={'pk': self.task_list.pk}))
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        response.close()
+        self.assertEqual(cached.status_code, 304)
+        self.assertContains(board, url)
+
+
+class TaskCardServiceTest(TestCase):
+    """Tests para la proyección de tarjetas del tablero."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+    
+    def build(self):
+        rows = task_card_rows(self.task_list.tasks.all()).order_by(*TASK_BOARD_ORDERING)
+        return build_task_cards(rows)
+    
+    def test_card_precomputes_display_values(self):
+        """Test: La tarjeta trae textos, icono, color y vencimiento calculados."""
+        # Arrange
+        task = create_overdue_task(task_list=self.task_list, created_by=self.user, priority='high')
+        
+        # Act
+        card, = self.build()
+        
+        # Assert
+        self.assertEqual(card.id, task.pk)
+        self.assertEqual(card.priority_display, task.get_priority_display())
+        self.assertEqual(card.priority_color, task.get_priority_color())
+        self.assertEqual(card.status_display, task.get_status_display())
+        self.assertEqual(card.status_icon, task.get_status_icon())
+        self.assertTrue(card.is_overdue)
+        self.assertEqual((card.attachments_count, card.assigned_users_count), (0, 0))
+    
+    def test_card_uses_slots_and_description_excerpt(self):
+        """Test: Las tarjetas no tienen __dict__ y leen solo el inicio de la descripción."""
+        # Arrange
+        create_task(task_list=self.task_list, created_by=self.user, description='palabra ' * 500)
+        
+        # Act
+        card, = self.build()
+        
+        # Assert
+        self.assertIsInstance(card, TaskCard)
+        self.assertFalse(hasattr(card, '__dict__'))
+        self.assertLessEqual(len(card.description), 300)
+        self.assertTrue(card.description.startswith('palabra palabra'))
+    
+    def test_assigned_users_names(self):
+        """Test: Los asignados usan el nombre completo o el de usuario."""
+        # Arrange
+        task = create_task(task_list=self.task_list, created_by=self.user)
+        named = create_user(username='ana', email='ana@example.com', first_name='Ana', last_name='López')
+        plain = create_user(username='beto', email='beto@example.com', first_name='', last_name='')
+        task.assigned_users.add(named, plain)
+        
+        # Act
+        card, = self.build()
+        
+        # Assert
+        self.assertEqual(sorted(user.name for user in card.assigned_users), ['Ana López', 'beto'])
+        self.assertIsNone(card.assigned_users[0].avatar_url)
+
+
+class SlidingSessionTest(TestCase):
+    """Tests para las sesiones cached_db con caducidad deslizante."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.client = Client()
+        self.user = create_user()
+        self.client.login(username=self.user.username, password='testpass123')
+        self.url = reverse('task_stats_api', kwargs={'pk': 'dashboard'})
+    
+    def stored_session(self):
+        """Datos de la sesión guardados en la base de datos."""
+        return Session.objects.get(session_key=self.client.session.session_key).get_decoded()
+    
+    def test_polling_does_not_write_session(self):
+        """Test: Las peticiones dentro de la primera mitad de la vida no escriben la sesión."""
+        # Arrange
+        before = Session.objects.get(session_key=self.client.session.session_key)
+        
+        # Act
+        for _ in range(3):
+            response = self.client.get(self.url)
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        after = Session.objects.get(session_key=before.session_key)
+        self.assertEqual((after.session_data, after.expire_date), (before.session_data, before.expire_date))
+    
+    def test_session_refreshed_after_half_lifetime(self):
+        """Test: Pasada la mitad de la vida la sesión se guarda y se renueva la cookie."""
+        # Arrange
+        later = time.time() + settings.SESSION_COOKIE_AGE * 0.6
+        
+        # Act
+        with mock.patch('tasks.sessions.time.time', return_value=later):
+            response = self.client.get(self.url)
+            again = self.client.get(self.url)
+        
+        # Assert
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, again.cookies)
+        self.assertEqual(self.stored_session()[REFRESHED_KEY], int(later))
+    
+    @override_settings(SESSION_CLEANUP_MODE='background', SESSION_CLEANUP_INTERVAL=3600)
+    def test_cleanup_runs_once_per_interval(self):
+        """Test: La limpieza se lanza en un hilo como mucho una vez por intervalo."""
+        # Arrange
+        caches[settings.SESSION_CACHE_ALIAS].delete(session_service.CLEANUP_LOCK_KEY)
+        
+        # Act
+        with mock.patch.object(session_service, '_last_cleanup', 0.0), \
+                mock.patch.object(session_service.threading, 'Thread') as thread:
+            first = session_service.schedule_session_cleanup(now=10000.0)
+            second = session_service.schedule_session_cleanup(now=10060.0)
+        
+        # Assert
+        self.assertTrue(first)
+        self.assertFalse(second)
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once_with()
+    
+    def test_cleanup_deletes_expired_sessions(self):
+        """Test: La limpieza borra solo las sesiones caducadas."""
+        # Arrange
+        Session.objects.create(
+            session_key='caducada', session_data='', expire_date=timezone.now() - timedelta(days=1)
+        )
+        
+        # Act
+        session_service._run_cleanup()
+        
+        # Assert
+        self.assertFalse(Session.objects.filter(session_key='caducada').exists())
+        self.assertTrue(Session.objects.filter(session_key=self.client.session.session_key).exists())
+
+
+class PerformanceProfileTest(TestCase):
+    """Tests para el perfil de rendimiento de las requests."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.tasks = [create_task(task_list=self.task_list, created_by=self.user) for _ in range(5)]
+    
+    def test_sql_shape_ignores_parameters(self):
+        """Test: La forma de una consulta no depende de los literales ni del tamaño de los IN."""
+        # Arrange
+        one = 'SELECT "id" FROM "tasks_task" WHERE "id" IN (%s) AND "priority_rank" > 2 LIMIT 21'
+        many = 'SELECT "id" FROM "tasks_task"  WHERE "id" IN (%s, %s, %s) AND "priority_rank" > 3 LIMIT 21'
+        
+        # Act & Assert
+        self.assertEqual(sql_shape(one), sql_shape(many))
+        self.assertEqual(sql_shape("SELECT 'a'"), sql_shape("SELECT 'it''s'"))
+        self.assertNotEqual(sql_shape(one), sql_shape('SELECT "id" FROM "tasks_tasklist"'))
+    
+    def test_repeated_queries_flagged_as_n_plus_one(self):
+        """Test: Una misma forma repetida más veces que el umbral es un N+1."""
+        # Arrange
+        profile = RequestProfile(threshold=3)
+        
+        # Act
+        with profile.instrument():
+            for task in self.tasks:
+                Task.objects.filter(pk=task.pk).first()
+            TaskList.objects.count()
+        
+        # Assert
+        self.assertEqual(profile.queries, 6)
+        repeated = profile.n_plus_one()
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0][1], 5)
+        self.assertIn('"tasks_task"', repeated[0][0])
+    
+    def test_template_and_cache_timing(self):
+        """Test: El perfil de la request cuenta el renderizado y los accesos a la caché."""
+        # Arrange
+        cache_settings = {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'dashboard': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'perf-test'},
+            'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+        }
+        profile, token = start_request_profile()
+        self.addCleanup(reset_request_profile, token)
+        
+        # Act
+        with override_settings(CACHES=cache_settings):
+            cache = DashboardCache(self.user)
+            cache.get_or_set('counts', lambda: 1)
+            cache.get_or_set('counts', lambda: 1)
+        render_to_string('tasks/task_card.html', {'card': build_task_cards(
+            task_card_rows(Task.objects.filter(pk=self.tasks[0].pk))
+        )[0]})
+        
+        # Assert
+        self.assertEqual(get_request_profile(), profile)
+        self.assertEqual((profile.cache_hits, profile.cache_misses), (1, 1))
+        self.assertGreater(profile.template_ms, 0)
+        self.assertEqual(profile.template_depth, 0)
+
+
+class MetricsServiceTest(TestCase):
+    """Tests para las métricas por worker y su agregación."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        self.metrics_dir = metrics_dir.name
+        override = override_settings(METRICS_DIR=self.metrics_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+    
+    def write_worker_file(self, pid, responses, queue_depth):
+        """Simula el fichero volcado por otro worker."""
+        snapshot = {
+            'pid': pid,
+            'counters': [['tasks_http_responses_total', [['status', '200'], ['view', 'dashboard']], responses]],
+            'histograms': [],
+            'gauges': [['tasks_activity_queue_depth', [], queue_depth]],
+        }
+        with open(os.path.join(self.metrics_dir, f'metrics-{pid}.json'), 'w') as f:
+            json.dump(snapshot, f)
+    
+    def test_request_histograms_in_text_format(self):
+        """Test: Las latencias se acumulan por bucket en el formato de Prometheus."""
+        # Arrange
+        profile = RequestProfile()
+        profile.queries, profile.cache_hits, profile.cache_misses = 3, 2, 1
+        
+        # Act
+        record_request('dashboard', 'GET', 200, 0.03, profile)
+        record_request('dashboard', 'BREW', 200, 0.2)
+        text = render_metrics()
+        
+        # Assert
+        self.assertIn('tasks_http_request_duration_seconds_bucket{method="GET",view="dashboard",le="0.025"} 0', text)
+        self.assertIn('tasks_http_request_duration_seconds_bucket{method="GET",view="dashboard",le="0.05"} 1', text)
+        self.assertIn('tasks_http_request_duration_seconds_bucket{method="GET",view="dashboard",le="+Inf"} 1', text)
+        self.assertIn('tasks_http_request_duration_seconds_count{method="OTHER",view="dashboard"} 1', text)
+        self.assertIn('tasks_http_responses_total{status="200",view="dashboard"} 2', text)
+        self.assertIn('tasks_db_queries_per_request_bucket{view="dashboard",le="5"} 1', text)
+        self.assertIn('tasks_db_queries_per_request_sum{view="dashboard"} 3', text)
+        self.assertIn('tasks_cache_requests_total{cache="dashboard",result="hit"} 2', text)
+        self.assertIn('tasks_cache_requests_total{cache="dashboard",result="miss"} 1', text)
+    
+    def test_metrics_aggregated_across_workers(self):
+        """Test: Se suman los ficheros de los workers; los gauges de los terminados se descartan."""
+        # Arrange
+        finished = subprocess.Popen(['true'])
+        finished.wait()
+        record_request('dashboard', 'GET', 200, 0.01)
+        self.write_worker_file(os.getppid(), responses=2, queue_depth=3)
+        self.write_worker_file(finished.pid, responses=4, queue_depth=5)
+        
+        # Act
+        text = render_metrics()
+        
+        # Assert
+        self.assertIn('tasks_http_responses_total{status="200",view="dashboard"} 7', text)
+        self.assertIn('tasks_activity_queue_depth 3', text)
+    
+    def test_flush_writes_worker_file(self):
+        """Test: Cada worker vuelca su estado a un fichero propio."""
+        # Arrange
+        record_request('tasklist_detail', 'GET', 200, 0.5)
+        
+        # Act
+        get_metrics_registry().flush()
+        
+        # Assert
+        with open(os.path.join(self.metrics_dir, f'metrics-{os.getpid()}.json')) as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot['pid'], os.getpid())
+        self.assertEqual(len(snapshot['histograms']), 1)
+        self.assertEqual(os.listdir(self.metrics_dir), [f'metrics-{os.getpid()}.json'])
@@ -2,10 +2,17 @@
 Tests para las vistas principales de la aplicación tasks.
 Prueba dashboard, CRUD de listas y tareas, compartir, y archivos adjuntos.
 """
-from django.test import TestCase, Client
+import json
+import re
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
+from django.db import connection
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
 
@@ -14,7 +21,8 @@ from .factories import (
     create_task_attachment, create_completed_task, create_overdue_task,
     create_sample_data
 )
-from ..models import TaskList, Task, SharedList, TaskAttachment
+from ..models import TaskList, Task, SharedList, TaskAttachment, Profile
+from ..services import get_metrics_registry, reset_metrics
 
 
 class DashboardViewTest(TestCase):
@@ -121,6 +129,21 @@ class DashboardViewTest(TestCase):
         self.assertEqual(len(recent_tasks), 2)
         self.assertIn(task1, recent_tasks)
         self.assertIn(task2, recent_tasks)
+    
+    def test_dashboard_sidebar_uses_absolute_dates(self):
+        """Test: La barra lateral (fragmento cacheado) no muestra tiempos relativos."""
+        # Arrange
+        self.client.login(username=self.user.username, password='testpass123')
+        task_list = create_task_list(owner=self.user)
+        overdue = create_overdue_task(task_list=task_list, created_by=self.user)
+        
+        # Act
+        response = self.client.get(self.dashboard_url)
+        
+        # Assert
+        due_date = timezone.localtime(overdue.due_date).strftime('%d/%m/%Y %H:%M')
+        self.assertContains(response, f'Vencida el {due_date}')
+        self.assertNotContains(response, 'atrás')
 
 
 class TaskListViewsTest(TestCase):
@@ -280,6 +303,309 @@ class TaskListViewsTest(TestCase):
                 self.assertEqual(response.status_code, 403)  # Forbidden
 
 
+class TaskCardQueriesTest(TestCase):
+    """Tests para las tarjetas del tablero (TaskListDetailView)."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        override = override_settings(MEDIA_ROOT=media_dir.name, MEDIA_PIPELINE_MODE='external')
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.client = Client()
+        self.user = create_user()
+        self.task_list = create_task_list(owner=self.user)
+        self.assignees = [
+            create_user(username=f"asignado{i}", email=f"asignado{i}@example.com", first_name=f"Nombre{i}")
+            for i in range(5)
+        ]
+        self.url = reverse('tasklist_detail', kwargs={'pk': self.task_list.pk})
+        self.client.login(username=self.user.username, password='testpass123')
+    
+    def create_tasks(self, count):
+        """Crea tareas con un adjunto y cinco usuarios asignados cada una."""
+        for i in range(count):
+            task = create_task(task_list=self.task_list, created_by=self.user, title=f"Tarea {i}")
+            task.assigned_users.set(self.assignees)
+            create_task_attachment(task=task, filename=f"adjunto{i}.txt")
+    
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+    
+    def test_query_count_does_not_depend_on_page_size(self):
+        """Test: El tablero hace las mismas consultas con 2 que con 20 tarjetas."""
+        # Arrange
+        self.create_tasks(2)
+        small_page, _ = self.count_queries()
+        self.create_tasks(18)
+        
+        # Act
+        full_page, response = self.count_queries()
+        
+        # Assert
+        self.assertEqual(len(response.context['task_cards']), 20)
+        self.assertEqual(full_page, small_page)
+    
+    def test_card_renders_precomputed_data(self):
+        """Test: La tarjeta muestra adjuntos, tres avatares y el resto resumido."""
+        # Arrange
+        self.create_tasks(1)
+        
+        # Act
+        _, response = self.count_queries()
+        
+        # Assert
+        card = response.context['task_cards'][0]
+        self.assertEqual(card.attachments_count, 1)
+        self.assertEqual(card.assigned_users_count, 5)
+        self.assertEqual(len(card.assigned_users), 3)
+        self.assertContains(response, 'adjunto0.txt')
+        self.assertContains(response, '+2')
+        self.assertContains(response, card.hidden_assigned_names)
+    
+    def test_tasks_without_relations_skip_queries(self):
+        """Test: Sin adjuntos ni asignados no se consultan esas tablas."""
+        # Arrange
+        create_task(task_list=self.task_list, created_by=self.user)
+        
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        
+        # Assert
+        sql = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertFalse([q for q in sql if q.startswith('SELECT "tasks_taskattachment"')])
+        self.assertFalse([q for q in sql if q.startswith('SELECT "tasks_task_assigned_users"')])
+
+
+class ListOverviewQueriesTest(TestCase):
+    """Tests para las páginas de resumen de listas (listado y dashboard)."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.client = Client()
+        self.user = create_user()
+        self.task_lists = [create_task_list(owner=self.user, name=f"Lista {i}") for i in range(3)]
+        for task_list in self.task_lists:
+            create_task(task_list=task_list, created_by=self.user)
+            create_completed_task(task_list=task_list, created_by=self.user)
+        self.client.login(username=self.user.username, password='testpass123')
+    
+    def assertTasksNotLoaded(self, url):
+        """Verifica que la página no carga las tareas de las listas."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # Forma de prefetch_related('tasks'): las filas de tasks_task de las listas de la página
+        prefetches = [
+            q['sql'] for q in queries.captured_queries
+            if re.search(r'FROM "tasks_task" WHERE "tasks_task"\."task_list_id" IN \(\d', q['sql'])
+        ]
+        self.assertEqual(prefetches, [])
+        return response, len(queries)
+    
+    def test_tasklist_list_reads_stored_counters(self):
+        """Test: El listado muestra los contadores sin cargar las tareas."""
+        # Arrange
+        url = reverse('tasklist_list')
+        
+        # Act
+        response, query_count = self.assertTasksNotLoaded(url)
+        for task_list in self.task_lists:
+            create_task(task_list=task_list, created_by=self.user)
+        _, more_tasks_query_count = self.assertTasksNotLoaded(url)
+        
+        # Assert
+        self.assertContains(response, '1/2')
+        self.assertEqual(more_tasks_query_count, query_count)
+    
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'dashboard': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+    })
+    def test_dashboard_lists_read_stored_counters(self):
+        """Test: Las listas del dashboard no cargan sus tareas."""
+        # Act
+        response, _ = self.assertTasksNotLoaded(reverse('dashboard'))
+        
+        # Assert
+        self.assertContains(response, '2 tareas')
+
+
+class PerformanceMiddlewareTest(TestCase):
+    """Tests para PerformanceMiddleware (Server-Timing, N+1 y log de rendimiento)."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.client = Client()
+        self.user = create_user()
+        task_list = create_task_list(owner=self.user)
+        create_task(task_list=task_list, created_by=self.user)
+        self.client.login(username=self.user.username, password='testpass123')
+        self.log_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.log_dir.cleanup)
+        self.log_file = f'{self.log_dir.name}/perf.jsonl'
+    
+    def server_timing(self, response):
+        """Métricas de la cabecera Server-Timing: {nombre: {parámetro: valor}}."""
+        metrics = {}
+        for metric in response.headers['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+    
+    def read_log(self):
+        with open(self.log_file, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    
+    @override_settings(PERF_SERVER_TIMING=True)
+    def test_server_timing_reports_request_queries(self):
+        """Test: Server-Timing cuenta las consultas de la request y nombra la vista."""
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'))
+        
+        # Assert
+        metrics = self.server_timing(response)
+        self.assertEqual(metrics['sql']['desc'], f'"{len(queries)} queries"')
+        self.assertEqual(metrics['view']['desc'], '"dashboard"')
+        self.assertGreater(float(metrics['tpl']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['app']['dur']), float(metrics['sql']['dur']))
+        self.assertNotIn('nplusone', metrics)
+    
+    @override_settings(PERF_SERVER_TIMING=True)
+    def test_async_view_is_instrumented(self):
+        """Test: Las consultas de las vistas asíncronas también se cuentan."""
+        # Act
+        response = self.client.get(reverse('task_stats_api', kwargs={'pk': 'dashboard'}))
+        
+        # Assert
+        metrics = self.server_timing(response)
+        self.assertEqual(metrics['view']['desc'], '"task_stats_api"')
+        self.assertNotEqual(metrics['sql']['desc'], '"0 queries"')
+    
+    @override_settings(PERF_SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        """Test: Sin PERF_SERVER_TIMING no se envía la cabecera."""
+        # Act
+        response = self.client.get(reverse('dashboard'))
+        
+        # Assert
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertTrue(hasattr(response.wsgi_request, 'perf'))
+    
+    def test_sampled_requests_are_logged(self):
+        """Test: Las requests muestreadas se escriben en el log de rendimiento."""
+        # Act
+        with override_settings(PERF_LOG_FILE=self.log_file, PERF_LOG_SAMPLE_RATE=1.0):
+            self.client.get(reverse('tasklist_list'))
+        with override_settings(PERF_LOG_FILE=self.log_file, PERF_LOG_SAMPLE_RATE=0.0):
+            self.client.get(reverse('tasklist_list'))
+        
+        # Assert
+        records = self.read_log()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['view'], 'tasklist_list')
+        self.assertEqual(records[0]['status'], 200)
+        self.assertGreater(records[0]['sql_queries'], 0)
+    
+    @override_settings(PERF_SERVER_TIMING=True, PERF_NPLUSONE_THRESHOLD=0, PERF_LOG_SAMPLE_RATE=0.0)
+    def test_n_plus_one_is_flagged_and_logged(self):
+        """Test: Las consultas repetidas por encima del umbral se señalan y se registran siempre."""
+        # Act
+        with override_settings(PERF_LOG_FILE=self.log_file):
+            with self.assertLogs('tasks.services.perf_service', 'WARNING'):
+                response = self.client.get(reverse('dashboard'))
+        
+        # Assert
+        self.assertIn('nplusone', self.server_timing(response))
+        record = self.read_log()[0]
+        self.assertTrue(record['n_plus_one'])
+        self.assertNotIn('%s, %s', record['n_plus_one'][0]['sql'])
+
+
+class MetricsEndpointTest(TestCase):
+    """Tests para el endpoint /metrics y MetricsMiddleware."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        override = override_settings(METRICS_DIR=metrics_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+        
+        self.client = Client()
+        self.user = create_user()
+        self.staff = create_user(username='staff', email='staff@example.com', is_staff=True)
+        self.url = reverse('metrics')
+    
+    def test_metrics_from_internal_address(self):
+        """Test: Desde una dirección interna se sirven las métricas de las vistas."""
+        # Arrange
+        self.client.login(username=self.user.username, password='testpass123')
+        self.client.get(reverse('dashboard'))
+        self.client.get(reverse('task_stats_api', kwargs={'pk': 'dashboard'}))
+        self.client.logout()
+        
+        # Act
+        response = self.client.get(self.url)
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE tasks_http_request_duration_seconds histogram', body)
+        self.assertIn('tasks_http_request_duration_seconds_count{method="GET",view="dashboard"} 1', body)
+        self.assertIn('tasks_http_responses_total{status="200",view="task_stats_api"} 1', body)
+        self.assertIn('tasks_db_queries_per_request_count{view="dashboard"} 1', body)
+        self.assertIn('tasks_activity_queue_depth 0', body)
+    
+    def test_metrics_restricted_to_staff_or_internal_networks(self):
+        """Test: Desde fuera de las redes internas solo el staff puede ver las métricas."""
+        # Arrange
+        external = {'REMOTE_ADDR': '203.0.113.7'}
+        
+        # Act
+        anonymous = self.client.get(self.url, **external)
+        self.client.login(username=self.user.username, password='testpass123')
+        regular = self.client.get(self.url, **external)
+        self.client.login(username=self.staff.username, password='testpass123')
+        staff = self.client.get(self.url, **external)
+        
+        # Assert
+        self.assertEqual(anonymous.status_code, 403)
+        self.assertEqual(regular.status_code, 403)
+        self.assertEqual(staff.status_code, 200)
+    
+    @override_settings(METRICS_ALLOWED_NETWORKS=['10.0.0.0/8'])
+    def test_allowed_networks_setting(self):
+        """Test: METRICS_ALLOWED_NETWORKS define las redes internas."""
+        # Act & Assert
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='10.1.2.3').status_code, 200)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+    
+    @override_settings(METRICS_ALLOWED_NETWORKS=[])
+    def test_no_allowed_networks_means_staff_only(self):
+        """Test: Sin redes internas /metrics queda solo para el staff."""
+        # Act
+        anonymous = self.client.get(self.url)
+        self.client.login(username=self.staff.username, password='testpass123')
+        staff = self.client.get(self.url)
+        
+        # Assert
+        self.assertEqual(anonymous.status_code, 403)
+        self.assertEqual(staff.status_code, 200)
+
+
 class TaskViewsTest(TestCase):
     """Tests para las vistas CRUD de Task."""
     
@@ -380,6 +706,69 @@ class TaskViewsTest(TestCase):
         self.assertFalse(Task.objects.filter(pk=task_id).exists())
 
 
+class AuthViewsTest(TestCase):
+    """Tests para el registro y el login."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        self.client = Client()
+        self.register_data = {
+            'username': 'nuevo',
+            'email': 'nuevo@example.com',
+            'first_name': 'Nuevo',
+            'last_name': 'Usuario',
+            'password1': 'Clave-Segura-2024',
+            'password2': 'Clave-Segura-2024',
+        }
+    
+    def test_register_creates_user_profile_and_list(self):
+        """Test: El registro crea usuario, perfil y lista por defecto sin consultas redundantes."""
+        # Arrange
+        url = reverse('register')
+        
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, self.register_data)
+        
+        # Assert
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        user = User.objects.get(username='nuevo')
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+        self.assertTrue(TaskList.objects.filter(owner=user, name='Mi Lista Personal').exists())
+        profile_queries = [q['sql'] for q in queries.captured_queries if 'tasks_profile' in q['sql']]
+        self.assertEqual(len(profile_queries), 1)
+        self.assertTrue(profile_queries[0].startswith('INSERT'))
+    
+    def test_register_is_atomic(self):
+        """Test: Si falla la lista por defecto no queda el usuario a medias."""
+        # Arrange
+        url = reverse('register')
+        
+        # Act
+        with mock.patch.object(TaskList.objects, 'create', side_effect=RuntimeError('fallo')):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url, self.register_data)
+        
+        # Assert
+        self.assertFalse(User.objects.filter(username='nuevo').exists())
+        self.assertFalse(Profile.objects.exists())
+    
+    def test_login_does_not_touch_profile(self):
+        """Test: El login no lee ni escribe el perfil."""
+        # Arrange
+        create_user(username='existente')
+        
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login'), {
+                'username': 'existente', 'password': 'testpass123',
+            })
+        
+        # Assert
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse([q for q in queries.captured_queries if 'tasks_profile' in q['sql']])
+
+
 class SharingViewsTest(TestCase):
     """Tests para las vistas de compartir."""
     
@@ -522,6 +911,147 @@ class AttachmentViewsTest(TestCase):
         self.assertFalse(TaskAttachment.objects.filter(pk=attachment.pk).exists())
 
 
+class AttachmentDeliveryTest(TestCase):
+    """Tests para la entrega de archivos adjuntos (rangos, validadores y delegación)."""
+    
+    def setUp(self):
+        """Configurar datos de prueba."""
+        media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(media_dir.cleanup)
+        override = override_settings(MEDIA_ROOT=media_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.user = create_user()
+        self.task = create_task(created_by=self.user, task_list=create_task_list(owner=self.user))
+        self.content = b'0123456789abcdef'
+        self.attachment = create_task_attachment(
+            task=self.task,
+            filename='notas.txt',
+            file=SimpleUploadedFile('notas.txt', self.content),
+            file_size=len(self.content),
+        )
+        self.url = reverse('view_attachment', kwargs={'task_pk': self.task.pk, 'pk': self.attachment.pk})
+        self.client.login(username=self.user.username, password='testpass123')
+    
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        self.addCleanup(response.close)
+        return response
+    
+    def test_served_bytes_counted_in_metrics(self):
+        """Test: Las métricas suman los bytes enviados, sin contar las respuestas 304."""
+        # Arrange
+        key = ('tasks_attachment_bytes_served_total', (('delivery', 'django'), ('kind', 'attachment')))
+        before = get_metrics_registry().counters.get(key, 0)
+        
+        # Act
+        etag = self.get()['ETag']
+        self.get(Range='bytes=0-3')
+        not_modified = self.get(If_None_Match=etag)
+        
+        # Assert
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(get_metrics_registry().counters[key] - before, len(self.content) + 4)
+    
+    def test_full_download(self):
+        """Test: Sin Range se envía el archivo completo con sus validadores."""
+        # Act
+        response = self.get()
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertTrue(response['Content-Disposition'].startswith('attachment;'))
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+    
+    def test_byte_range(self):
+        """Test: Un rango de bytes responde 206 con solo esa parte."""
+        # Act
+        response = self.get(Range='bytes=2-5')
+        
+        # Assert
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/16')
+        self.assertEqual(response['Content-Length'], '4')
+    
+    def test_suffix_range(self):
+        """Test: bytes=-N retorna los últimos N bytes."""
+        # Act
+        response = self.get(Range='bytes=-4')
+        
+        # Assert
+        self.assertEqual(b''.join(response.streaming_content), b'cdef')
+        self.assertEqual(response['Content-Range'], 'bytes 12-15/16')
+    
+    def test_unsatisfiable_range(self):
+        """Test: Un rango fuera del archivo responde 416."""
+        # Act
+        response = self.get(Range='bytes=20-')
+        
+        # Assert
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */16')
+    
+    def test_stale_if_range_sends_full_file(self):
+        """Test: Si If-Range no coincide se envía el archivo completo."""
+        # Act
+        response = self.get(Range='bytes=2-5', **{'If-Range': '"otro"'})
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+    
+    def test_not_modified(self):
+        """Test: Con el ETag vigente se responde 304 sin abrir el archivo."""
+        # Arrange
+        etag = self.get()['ETag']
+        
+        # Act
+        response = self.get(**{'If-None-Match': etag})
+        
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+    
+    @override_settings(ATTACHMENT_DELIVERY='x-accel-redirect', ATTACHMENT_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_accel_redirect_offload(self):
+        """Test: Con X-Accel-Redirect Django solo autoriza y nginx envía los bytes."""
+        # Act
+        response = self.get()
+        
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.attachment.file.name}')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], 'text/plain')
+    
+    @override_settings(ATTACHMENT_DELIVERY='x-sendfile')
+    def test_sendfile_offload(self):
+        """Test: Con X-Sendfile se indica la ruta absoluta del archivo."""
+        # Act
+        response = self.get()
+        
+        # Assert
+        self.assertEqual(response['X-Sendfile'], self.attachment.file.path)
+    
+    def test_requires_read_permission(self):
+        """Test: Un usuario sin acceso a la lista no puede descargar el adjunto."""
+        # Arrange
+        other = create_user(username="otheruser", email="other@example.com")
+        self.client.force_login(other)
+        
+        # Act
+        response = self.get()
+        
+        # Assert
+        self.assertEqual(response.status_code, 403)
+
+
 class PermissionsTest(TestCase):
     """Tests para permisos y acceso a las vistas."""
     
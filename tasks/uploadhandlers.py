@@ -0,0 +1,37 @@
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class HashingUploadHandlerMixin:
+    """
+    Calcula el SHA-256 del archivo mientras se recibe y lo deja en el atributo
+    sha256 del archivo subido, que ContentAddressedStorage usa como nombre del
+    blob sin volver a leerlo.
+    """
+    
+    def new_file(self, *args, **kwargs):
+        # Antes de super(): MemoryFileUploadHandler lanza StopFutureHandlers
+        self._sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+    
+    def receive_data_chunk(self, raw_data, start):
+        remaining = super().receive_data_chunk(raw_data, start)
+        # Solo el manejador que se queda con los datos (retorna None) los incluye en el hash
+        if remaining is None:
+            self._sha256.update(raw_data)
+        return remaining
+    
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self._sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadHandlerMixin, MemoryFileUploadHandler):
+    """Subidas pequeñas en memoria, con su SHA-256."""
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadHandlerMixin, TemporaryFileUploadHandler):
+    """Subidas grandes en un archivo temporal, con su SHA-256."""
@@ -29,12 +29,25 @@ urlpatterns = [
     # Attachments
     path('tasks/<int:task_pk>/add-attachment/', views.add_attachment_view, name='add_attachment'),
     path('tasks/task/<int:task_pk>/attachment/<int:pk>/', views.view_attachment, name='view_attachment'),
+    path('tasks/task/<int:task_pk>/attachment/<int:pk>/preview/', views.attachment_preview, name='attachment_preview'),
     path('attachments/<int:pk>/delete/', views.delete_attachment_view, name='delete_attachment'),
+    path('api/tasks/<int:task_pk>/uploads/', views.start_upload_api, name='start_upload'),
+    path('api/uploads/<uuid:pk>/', views.upload_api, name='upload'),
+    path('api/uploads/<uuid:pk>/finalize/', views.finalize_upload_api, name='finalize_upload'),
     
     # AJAX API endpoints
     path('api/tasks/<int:pk>/toggle-complete/', views.toggle_task_complete, name='toggle_task_complete'),
     path('api/tasks/<int:pk>/change-status/', views.change_task_status, name='change_task_status'),
+    path('api/tasks/bulk/', views.bulk_task_operations_api, name='bulk_task_operations'),
     path('api/lists/<int:list_pk>/quick-add-task/', views.quick_add_task, name='quick_add_task'),
     path('api/lists/<str:pk>/stats/', views.task_stats_api, name='task_stats_api'),
+    path('api/lists/<int:pk>/tasks/', views.task_feed_api, name='task_feed_api'),
     path('api/search-users/', views.search_users_api, name='search_users_api'),
+    
+    # Eventos en vivo (Server-Sent Events, requieren ASGI)
+    path('api/events/dashboard/', views.dashboard_events, name='dashboard_events'),
+    path('api/lists/<int:pk>/events/', views.task_list_events, name='task_list_events'),
+    
+    # Métricas en formato Prometheus (staff o redes internas)
+    path('metrics', views.metrics_view, name='metrics'),
 ] 
\ No newline at end of file
@@ -37,6 +37,14 @@ from .attachment_views import (
     add_attachment_view,
     delete_attachment_view,
     view_attachment,
+    attachment_preview,
+)
+
+# Importaciones de vistas de subida por partes
+from .upload_views import (
+    start_upload_api,
+    upload_api,
+    finalize_upload_api,
 )
 
 # Importaciones de vistas API
@@ -44,10 +52,23 @@ from .api_views import (
     toggle_task_complete,
     quick_add_task,
     task_stats_api,
+    task_feed_api,
+    bulk_task_operations_api,
     search_users_api,
     change_task_status,
 )
 
+# Importaciones de vistas de eventos en vivo
+from .push_views import (
+    dashboard_events,
+    task_list_events,
+)
+
+# Importaciones de vistas de métricas
+from .metrics_views import (
+    metrics_view,
+)
+
 # Lista de todas las vistas disponibles
 __all__ = [
     # Vistas de autenticación
@@ -78,11 +99,26 @@ __all__ = [
     'add_attachment_view',
     'delete_attachment_view',
     'view_attachment',
+    'attachment_preview',
+    
+    # Vistas de subida por partes
+    'start_upload_api',
+    'upload_api',
+    'finalize_upload_api',
     
     # Vistas API
     'toggle_task_complete',
     'quick_add_task',
     'task_stats_api',
+    'task_feed_api',
+    'bulk_task_operations_api',
     'search_users_api',
     'change_task_status',
+    
+    # Vistas de eventos en vivo
+    'dashboard_events',
+    'task_list_events',
+    
+    # Vistas de métricas
+    'metrics_view',
 ] 
\ No newline at end of file
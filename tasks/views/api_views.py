@@ -1,22 +1,53 @@
-from django.shortcuts import get_object_or_404
+import asyncio
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db.models import Q
 from django.utils import timezone
 from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+
+from ..models import TaskList, Task
+from ..forms import TaskQuickForm, TaskFilterForm
+from ..services import (
+    TASK_BOARD_ORDERING,
+    BulkOperationError,
+    DashboardCache,
+    InvalidCursor,
+    KeysetPaginator,
+    ListCache,
+    aget_list_task_counts,
+    aget_user_task_counts,
+    ahas_list_permission,
+    apply_bulk_operations,
+    filter_tasks,
+    get_user_overdue_tasks,
+    get_user_upcoming_tasks,
+    get_user_recent_activities,
+    has_list_permission,
+    record_activity,
+    search_queryset,
+)
+
 
-from ..models import TaskList, Task, TaskActivity
-from ..forms import TaskQuickForm
+# Atributo de la request donde se guarda la caché versionada de la respuesta
+REQUEST_VERSIONED_CACHE_ATTR = '_versioned_cache'
+
+# Tamaño de página por defecto y máximo del feed JSON de tareas
+TASK_FEED_PAGE_SIZE = 50
+TASK_FEED_MAX_PAGE_SIZE = 100
 
 
 @login_required
 @require_http_methods(["POST"])
-def toggle_task_complete(request, pk):
+async def toggle_task_complete(request, pk):
     """API para cambiar estado de una tarea entre pending, in_progress y completed."""
-    task = get_object_or_404(Task, pk=pk)
-    if not (task.task_list.owner == request.user or 
-            task.task_list.shared_with.filter(shared_with=request.user, permission='write').exists()):
+    task = await aget_object_or_404(Task, pk=pk)
+    if not await ahas_list_permission(request, task.task_list_id, 'write'):
         return JsonResponse({'error': 'Permission denied'}, status=403)
     
     # Ciclo de estados: pending -> in_progress -> completed -> pending
@@ -33,15 +64,10 @@ def toggle_task_complete(request, pk):
         action = 'reopened'
         message = 'Tarea reabierta'
     
-    task.save()
+    await task.asave()
     
-    # Crear actividad
-    TaskActivity.objects.create(
-        task=task,
-        user=request.user,
-        action=action,
-        description=f'Tarea {action}: {task.title}'
-    )
+    # Registrar actividad
+    await sync_to_async(record_activity)(task, await request.auser(), action, f'Tarea {action}: {task.title}')
     
     return JsonResponse({
         'status': task.status,
@@ -53,27 +79,22 @@ def toggle_task_complete(request, pk):
 
 @login_required
 @require_http_methods(["POST"])
-def quick_add_task(request, list_pk):
+async def quick_add_task(request, list_pk):
     """API para añadir tareas rápidamente."""
-    task_list = get_object_or_404(TaskList, pk=list_pk)
-    if not (task_list.owner == request.user or 
-            task_list.shared_with.filter(shared_with=request.user, permission='write').exists()):
+    task_list = await aget_object_or_404(TaskList, pk=list_pk)
+    if not await ahas_list_permission(request, task_list, 'write'):
         return JsonResponse({'error': 'Permission denied'}, status=403)
     
+    user = await request.auser()
     form = TaskQuickForm(request.POST)
     if form.is_valid():
         task = form.save(commit=False)
         task.task_list = task_list
-        task.created_by = request.user
-        task.save()
+        task.created_by = user
+        await task.asave()
         
-        # Crear actividad
-        TaskActivity.objects.create(
-            task=task,
-            user=request.user,
-            action='created',
-            description=f'Tarea creada: {task.title}'
-        )
+        # Registrar actividad
+        await sync_to_async(record_activity)(task, user, 'created', f'Tarea creada: {task.title}')
         
         return JsonResponse({
             'success': True,
@@ -89,7 +110,7 @@ def quick_add_task(request, list_pk):
                 'created_at': task.created_at.strftime('%d/%m/%Y %H:%M'),
                 'due_date': task.due_date.strftime('%d/%m/%Y %H:%M') if task.due_date else None,
                 'is_overdue': bool(getattr(task, 'is_overdue', False)),
-                'attachments_count': task.attachments.count()
+                'attachments_count': await task.attachments.acount()
             },
             'message': 'Tarea añadida exitosamente'
         })
@@ -100,129 +121,269 @@ def quick_add_task(request, list_pk):
     })
 
 
+async def _dashboard_stats(user, now):
+    """Estadísticas del dashboard del usuario."""
+    # Consultas independientes lanzadas a la vez (contadores en una sola consulta agregada)
+    counts, overdue_tasks, upcoming_tasks, recent_activities = await asyncio.gather(
+        aget_user_task_counts(user, now=now),
+        _fetch(get_user_overdue_tasks(user, now=now)),
+        _fetch(get_user_upcoming_tasks(user, now=now)),
+        _fetch(get_user_recent_activities(user)),
+    )
+    
+    stats = {
+        'total_tasks': counts['total'],
+        'completed_tasks': counts['completed'],
+        'pending_tasks': counts['pending'],
+        'in_progress_tasks': counts['in_progress'],
+        'overdue_count': counts['overdue'],
+        'high_priority_tasks': counts['high_priority'],
+    }
+    
+    # Tareas vencidas
+    stats['overdue_tasks'] = [{
+        'id': task.id,
+        'title': task.title,
+        'task_list_id': task.task_list.id,
+        'task_list_name': task.task_list.name,
+        'priority_class': task.get_priority_display_class(),
+        'priority_display': task.get_priority_display(),
+        'overdue_time': task.due_date.strftime('%d/%m/%Y %H:%M') if task.due_date else ''
+    } for task in overdue_tasks]
+    
+    # Tareas próximas a vencer
+    stats['upcoming_tasks'] = [{
+        'id': task.id,
+        'title': task.title,
+        'task_list_id': task.task_list.id,
+        'task_list_name': task.task_list.name,
+        'priority_class': task.get_priority_display_class(),
+        'priority_display': task.get_priority_display(),
+        'due_date_display': task.due_date.strftime('%d/%m %H:%M') if task.due_date else ''
+    } for task in upcoming_tasks]
+    
+    # Actividad reciente
+    stats['recent_activities'] = [{
+        'id': activity.id,
+        'action': activity.action,
+        'action_display': activity.get_action_display(),
+        'task_title': activity.task.title,
+        'task_list_id': activity.task.task_list.id,
+        'user_name': activity.user.get_full_name() or activity.user.username,
+        'time_ago': activity.timestamp.strftime('%d/%m/%Y %H:%M')
+    } for activity in recent_activities]
+    
+    return stats
+
+
+async def _fetch(queryset):
+    """Evalúa un queryset con el ORM asíncrono."""
+    return [obj async for obj in queryset]
+
+
+async def _list_stats(task_list, now):
+    """Estadísticas de una lista específica."""
+    counts = await aget_list_task_counts(task_list, now=now)
+    return {
+        'total_tasks': counts['total'],
+        'completed_tasks': counts['completed'],
+        'pending_tasks': counts['pending'],
+        'in_progress_tasks': counts['in_progress'],
+        'overdue_tasks': counts['overdue'],
+        'high_priority_tasks': counts['high_priority'],
+    }
+
+
+def _versioned_cache(request, pk):
+    """
+    Caché versionada del dashboard o de la lista, creada una vez por request.
+    None si la lista no existe o el usuario no puede leerla.
+    """
+    if not hasattr(request, REQUEST_VERSIONED_CACHE_ATTR):
+        versioned_cache = None
+        if pk == 'dashboard':
+            versioned_cache = DashboardCache(request.user)
+        elif str(pk).isdigit() and has_list_permission(request, int(pk), 'read'):
+            versioned_cache = ListCache(int(pk))
+        setattr(request, REQUEST_VERSIONED_CACHE_ATTR, versioned_cache)
+    return getattr(request, REQUEST_VERSIONED_CACHE_ATTR)
+
+
+def _stats_etag(request, pk):
+    versioned_cache = _versioned_cache(request, pk)
+    return versioned_cache.get_etag('stats') if versioned_cache else None
+
+
+def _stats_last_modified(request, pk):
+    versioned_cache = _versioned_cache(request, pk)
+    return versioned_cache.get_last_modified(_stats_etag(request, pk)) if versioned_cache else None
+
+
+def _feed_etag(request, pk):
+    # El feed depende también de los filtros, el cursor y el límite
+    versioned_cache = _versioned_cache(request, pk)
+    return versioned_cache.get_etag('feed', sorted(request.GET.lists())) if versioned_cache else None
+
+
+def _feed_last_modified(request, pk):
+    versioned_cache = _versioned_cache(request, pk)
+    return versioned_cache.get_last_modified(_feed_etag(request, pk)) if versioned_cache else None
+
+
+def prepare_validators(last_modified_func):
+    """
+    @condition llama a las funciones de validación de forma síncrona también en
+    las vistas asíncronas: se calculan antes en un hilo y quedan memorizadas en
+    la caché versionada de la request (debe ir encima de @condition).
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def inner(request, *args, **kwargs):
+            # Reutilizar el usuario ya cargado por login_required
+            request.user = await request.auser()
+            await sync_to_async(last_modified_func)(request, *args, **kwargs)
+            return await view_func(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
 @login_required
 @require_http_methods(["GET"])
-def task_stats_api(request, pk):
-    """API para obtener estadísticas de una lista o del dashboard."""
+@cache_control(private=True, no_cache=True)
+@prepare_validators(_stats_last_modified)
+@condition(etag_func=_stats_etag, last_modified_func=_stats_last_modified)
+async def task_stats_api(request, pk):
+    """
+    API para obtener estadísticas de una lista o del dashboard.
+    Responde 304 a If-None-Match / If-Modified-Since antes de consultar las tareas.
+    """
     if pk == "dashboard":
-        # Estadísticas del dashboard
-        user_tasks = Task.objects.filter(
-            Q(task_list__owner=request.user) | Q(task_list__shared_with__shared_with=request.user)
-        ).distinct()
-        
-        # Estadísticas generales
-        stats = {
-            'total_tasks': user_tasks.count(),
-            'completed_tasks': user_tasks.filter(status='completed').count(),
-            'pending_tasks': user_tasks.filter(status='pending').count(),
-            'in_progress_tasks': user_tasks.filter(status='in_progress').count(),
-        }
-        
-        # Tareas vencidas
-        overdue_tasks = user_tasks.filter(
-            status__in=['pending', 'in_progress'],
-            due_date__lt=timezone.now()
-        ).select_related('task_list').order_by('due_date')[:5]
+        # Cacheadas por usuario hasta que cambie alguna de sus listas
+        dashboard_cache = _versioned_cache(request, pk)
+        stats = await dashboard_cache.aget_or_set(
+            'stats', lambda: _dashboard_stats(request.user, dashboard_cache.now)
+        )
+        return JsonResponse(stats)
+    else:
+        task_list = await aget_object_or_404(TaskList, pk=pk)
+        if not await ahas_list_permission(request, task_list, 'read'):
+            return JsonResponse({'error': 'Permission denied'}, status=403)
         
-        stats['overdue_tasks'] = [{
+        # Compartidas por todos los usuarios de la lista
+        list_cache = _versioned_cache(request, pk)
+        stats = await list_cache.aget_or_set('stats', lambda: _list_stats(task_list, list_cache.now))
+        return JsonResponse(stats)
+
+
+@login_required
+@require_http_methods(["GET"])
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_feed_etag, last_modified_func=_feed_last_modified)
+def task_feed_api(request, pk):
+    """API para obtener las tareas de una lista paginadas por cursor."""
+    task_list = get_object_or_404(TaskList, pk=pk)
+    if not has_list_permission(request, task_list, 'read'):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', TASK_FEED_PAGE_SIZE)), 1), TASK_FEED_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    tasks = task_list.tasks.all()
+    filter_form = TaskFilterForm(request.GET, task_list=task_list)
+    if filter_form.is_valid():
+        tasks = filter_tasks(tasks, filter_form.cleaned_data)
+    
+    paginator = KeysetPaginator(tasks, TASK_BOARD_ORDERING, limit)
+    try:
+        page = paginator.get_page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    return JsonResponse({
+        'tasks': [{
             'id': task.id,
             'title': task.title,
-            'task_list_id': task.task_list.id,
-            'task_list_name': task.task_list.name,
-            'priority_class': task.get_priority_display_class(),
+            'priority': task.priority,
             'priority_display': task.get_priority_display(),
-            'overdue_time': task.due_date.strftime('%d/%m/%Y %H:%M') if task.due_date else ''
-        } for task in overdue_tasks]
-        
-        # Tareas próximas a vencer
-        upcoming_tasks = user_tasks.filter(
-            status__in=['pending', 'in_progress'],
-            due_date__isnull=False,
-            due_date__gte=timezone.now(),
-            due_date__lte=timezone.now() + timezone.timedelta(days=7)
-        ).select_related('task_list').order_by('due_date')[:5]
-        
-        stats['upcoming_tasks'] = [{
+            'status': task.status,
+            'status_display': task.get_status_display(),
+            'due_date': task.due_date.isoformat() if task.due_date else None,
+            'is_overdue': task.is_overdue(),
+            'created_at': task.created_at.isoformat(),
+        } for task in page],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def bulk_task_operations_api(request):
+    """
+    API para aplicar operaciones masivas sobre tareas en una sola petición.
+    Cuerpo JSON: {"operations": [{"action": ..., "task_ids": [...], "value": ...}]}
+    con action en status, priority, reassign, move o delete.
+    """
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    
+    try:
+        tasks = apply_bulk_operations(request, payload.get('operations'))
+    except BulkOperationError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+    
+    return JsonResponse({
+        'success': True,
+        'tasks': [{
             'id': task.id,
-            'title': task.title,
-            'task_list_id': task.task_list.id,
-            'task_list_name': task.task_list.name,
-            'priority_class': task.get_priority_display_class(),
+            'task_list': task.task_list_id,
+            'status': task.status,
+            'status_display': task.get_status_display(),
+            'priority': task.priority,
             'priority_display': task.get_priority_display(),
-            'due_date_display': task.due_date.strftime('%d/%m %H:%M') if task.due_date else ''
-        } for task in upcoming_tasks]
-        
-        # Actividad reciente
-        recent_activities = TaskActivity.objects.filter(
-            Q(task__task_list__owner=request.user) | Q(task__task_list__shared_with__shared_with=request.user)
-        ).distinct().select_related('task', 'user', 'task__task_list').order_by('-timestamp')[:5]
-        
-        stats['recent_activities'] = [{
-            'id': activity.id,
-            'action': activity.action,
-            'action_display': activity.get_action_display(),
-            'task_title': activity.task.title,
-            'task_list_id': activity.task.task_list.id,
-            'user_name': activity.user.get_full_name() or activity.user.username,
-            'time_ago': activity.timestamp.strftime('%d/%m/%Y %H:%M')
-        } for activity in recent_activities]
-        
-        return JsonResponse(stats)
-    else:
-        # Estadísticas de una lista específica
-        task_list = get_object_or_404(TaskList, pk=pk)
-        if not (task_list.owner == request.user or 
-                task_list.shared_with.filter(shared_with=request.user).exists()):
-            return JsonResponse({'error': 'Permission denied'}, status=403)
-        
-        stats = {
-            'total_tasks': task_list.get_tasks_count(),
-            'completed_tasks': task_list.get_completed_tasks_count(),
-            'pending_tasks': task_list.get_pending_tasks_count(),
-            'overdue_tasks': task_list.tasks.filter(
-                status__in=['pending', 'in_progress'],
-                due_date__lt=timezone.now()
-            ).count(),
-            'high_priority_tasks': task_list.tasks.filter(
-                priority='high',
-                status__in=['pending', 'in_progress']
-            ).count(),
-        }
-        
-        return JsonResponse(stats)
+            'completed_at': task.completed_at.isoformat() if task.completed_at else None,
+        } for task in tasks],
+        'message': f'{len(tasks)} tareas actualizadas',
+    })
 
 
 @login_required
 @require_http_methods(["GET"])
-def search_users_api(request):
+async def search_users_api(request):
     """API para buscar usuarios para compartir listas."""
     query = request.GET.get('q', '')
     if len(query) < 2:
         return JsonResponse({'users': []})
     
-    users = User.objects.filter(
-        Q(username__icontains=query) | 
-        Q(first_name__icontains=query) | 
-        Q(last_name__icontains=query)
-    ).exclude(id=request.user.id)[:10]
+    # Autocompletado: coincidencia por prefijo, ordenada por relevancia. Elegir
+    # el motor de búsqueda puede consultar la base de datos la primera vez.
+    current_user = await request.auser()
+    users = await sync_to_async(search_queryset)(
+        User.objects.exclude(id=current_user.id), query, prefix=True, ranked=True
+    )
     
     users_data = [{
         'id': user.id,
         'username': user.username,
         'full_name': user.get_full_name(),
         'email': user.email,
-    } for user in users]
+    } async for user in users.order_by('search_rank', 'username')[:10]]
     
     return JsonResponse({'users': users_data})
 
 
 @login_required
 @require_http_methods(["POST"])
-def change_task_status(request, pk):
+async def change_task_status(request, pk):
     """API para cambiar el estado de una tarea a uno específico."""
-    task = get_object_or_404(Task, pk=pk)
-    if not (task.task_list.owner == request.user or 
-            task.task_list.shared_with.filter(shared_with=request.user, permission='write').exists()):
+    task = await aget_object_or_404(Task, pk=pk)
+    if not await ahas_list_permission(request, task.task_list_id, 'write'):
         return JsonResponse({'error': 'Permission denied'}, status=403)
     
     new_status = request.POST.get('status')
@@ -232,7 +393,7 @@ def change_task_status(request, pk):
     if task.status != new_status:
         old_status = task.status
         task.status = new_status
-        task.save()
+        await task.asave()
         
         # Crear actividad
         action_map = {
@@ -241,11 +402,9 @@ def change_task_status(request, pk):
             'completed': 'completed'
         }
         
-        TaskActivity.objects.create(
-            task=task,
-            user=request.user,
-            action=action_map[new_status],
-            description=f'Estado cambiado de {old_status} a {new_status}: {task.title}'
+        await sync_to_async(record_activity)(
+            task, await request.auser(), action_map[new_status],
+            f'Estado cambiado de {old_status} a {new_status}: {task.title}'
         )
         
         message_map = {
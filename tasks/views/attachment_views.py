@@ -1,35 +1,31 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
-from django.http import FileResponse, Http404
-from django.conf import settings
-import os
+from django.http import Http404
+from django.views.decorators.http import require_safe
 
-from ..models import Task, TaskAttachment, TaskActivity
+from ..models import Task, TaskAttachment
 from ..forms import TaskAttachmentForm
+from ..services import attachment_response, has_list_permission, preview_response, record_activity
 
 
 @login_required
+@require_safe
 def view_attachment(request, task_pk, pk):
-    """Vista para ver/descargar archivos adjuntos."""
-    task = get_object_or_404(Task, pk=task_pk)
-    attachment = get_object_or_404(TaskAttachment, pk=pk, task=task)
+    """
+    Vista para ver/descargar archivos adjuntos. Tras comprobar los permisos la
+    entrega (rangos, 304, X-Accel-Redirect/X-Sendfile) la hace attachment_response.
+    """
+    attachment = get_object_or_404(TaskAttachment.objects.select_related('task'), pk=pk, task_id=task_pk)
     
     # Verificar permisos
-    if not (task.task_list.owner == request.user or 
-            task.task_list.shared_with.filter(shared_with=request.user).exists()):
+    if not has_list_permission(request, attachment.task.task_list_id, 'read'):
         raise PermissionDenied
     
     try:
-        file_path = os.path.join(settings.MEDIA_ROOT, str(attachment.file))
-        response = FileResponse(open(file_path, 'rb'))
-        # Si es una imagen, mostrarla en el navegador
-        if attachment.is_image():
-            return response
-        # Si no es una imagen, forzar descarga
-        response['Content-Disposition'] = f'attachment; filename="{attachment.filename}"'
-        return response
+        return attachment_response(request, attachment)
     except FileNotFoundError:
         raise Http404("El archivo no existe")
 
@@ -38,8 +34,7 @@ def view_attachment(request, task_pk, pk):
 def add_attachment_view(request, task_pk):
     """Vista para añadir archivos adjuntos."""
     task = get_object_or_404(Task, pk=task_pk)
-    if not (task.task_list.owner == request.user or 
-            task.task_list.shared_with.filter(shared_with=request.user, permission='write').exists()):
+    if not has_list_permission(request, task.task_list_id, 'write'):
         raise PermissionDenied
     
     if request.method == 'POST':
@@ -50,13 +45,8 @@ def add_attachment_view(request, task_pk):
             attachment.uploaded_by = request.user
             attachment.save()
             
-            # Crear actividad
-            TaskActivity.objects.create(
-                task=task,
-                user=request.user,
-                action='file_added',
-                description=f'Archivo añadido: {attachment.filename}'
-            )
+            # Registrar actividad
+            record_activity(task, request.user, 'file_added', f'Archivo añadido: {attachment.filename}')
             
             messages.success(request, 'Archivo añadido exitosamente.')
             return redirect('tasklist_detail', pk=task.task_list.pk)
@@ -66,28 +56,39 @@ def add_attachment_view(request, task_pk):
     return render(request, 'tasks/add_attachment.html', {
         'form': form,
         'task': task,
+        'max_upload_size': getattr(settings, 'ATTACHMENT_UPLOAD_MAX_SIZE', 1024 ** 3),
     })
 
 
+@login_required
+@require_safe
+def attachment_preview(request, task_pk, pk):
+    """Vista de la miniatura o vista previa de la primera página de un adjunto."""
+    attachment = get_object_or_404(
+        TaskAttachment.objects.select_related('task'), pk=pk, task_id=task_pk, preview_status='ready',
+    )
+    if not has_list_permission(request, attachment.task.task_list_id, 'read'):
+        raise PermissionDenied
+    
+    try:
+        return preview_response(request, attachment)
+    except FileNotFoundError:
+        raise Http404("La vista previa no existe")
+
+
 @login_required
 def delete_attachment_view(request, pk):
     """Vista para eliminar archivos adjuntos."""
-    attachment = get_object_or_404(TaskAttachment, pk=pk)
-    if not (attachment.task.task_list.owner == request.user or 
-            attachment.task.task_list.shared_with.filter(shared_with=request.user, permission='write').exists()):
+    attachment = get_object_or_404(TaskAttachment.objects.select_related('task'), pk=pk)
+    if not has_list_permission(request, attachment.task.task_list_id, 'write'):
         raise PermissionDenied
     
     task = attachment.task
     filename = attachment.filename
     attachment.delete()
     
-    # Crear actividad
-    TaskActivity.objects.create(
-        task=task,
-        user=request.user,
-        action='file_removed',
-        description=f'Archivo eliminado: {filename}'
-    )
+    # Registrar actividad
+    record_activity(task, request.user, 'file_removed', f'Archivo eliminado: {filename}')
     
     messages.success(request, 'Archivo eliminado exitosamente.')
     return redirect('tasklist_detail', pk=task.task_list.pk) 
\ No newline at end of file
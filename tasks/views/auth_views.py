@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib import messages
+from django.db import transaction
 from django.urls import reverse_lazy
 
 from ..models import TaskList
@@ -26,13 +27,14 @@ def register_view(request):
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
-            user = form.save()
-            # Crear lista por defecto
-            TaskList.objects.create(
-                name='Mi Lista Personal',
-                description='Lista de tareas personal',
-                owner=user
-            )
+            # Usuario, perfil (señal post_save) y lista por defecto en una transacción
+            with transaction.atomic():
+                user = form.save()
+                TaskList.objects.create(
+                    name='Mi Lista Personal',
+                    description='Lista de tareas personal',
+                    owner=user
+                )
             messages.success(request, 'Cuenta creada exitosamente. ¡Bienvenido!')
             return redirect('login')
     else:
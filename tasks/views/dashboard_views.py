@@ -1,69 +1,56 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.template.loader import render_to_string
 from django.utils import timezone
 
-from ..models import TaskList, Task, TaskActivity
+from ..models import TaskList
+from ..services import (
+    DashboardCache,
+    get_user_task_counts,
+    get_user_overdue_tasks,
+    get_user_upcoming_tasks,
+    get_user_recent_activities,
+)
 
 
 @login_required
 def dashboard_view(request):
     """Dashboard principal con resumen de tareas."""
-    user_lists = TaskList.objects.filter(
-        Q(owner=request.user) | Q(shared_with__shared_with=request.user)
-    ).distinct().select_related('owner').prefetch_related('tasks')
-    
-    # Estadísticas generales
-    total_tasks = Task.objects.filter(
-        Q(task_list__owner=request.user) | Q(task_list__shared_with__shared_with=request.user)
-    ).distinct().count()
-    
-    completed_tasks = Task.objects.filter(
-        Q(task_list__owner=request.user) | Q(task_list__shared_with__shared_with=request.user),
-        status='completed'
-    ).distinct().count()
-    
-    in_progress_tasks = Task.objects.filter(
-        Q(task_list__owner=request.user) | Q(task_list__shared_with__shared_with=request.user),
-        status='in_progress'
-    ).distinct().count()
-    
-    pending_tasks = Task.objects.filter(
-        Q(task_list__owner=request.user) | Q(task_list__shared_with__shared_with=request.user),
-        status='pending'
-    ).distinct().count()
-    
-    # Tareas próximas a vencer
-    upcoming_tasks = Task.objects.filter(
-        Q(task_list__owner=request.user) | Q(task_list__shared_with__shared_with=request.user),
-        status__in=['pending', 'in_progress'],
-        due_date__isnull=False,
-        due_date__gte=timezone.now(),
-        due_date__lte=timezone.now() + timezone.timedelta(days=7)
-    ).distinct().select_related('task_list').order_by('due_date')[:5]
-    
-    # Tareas vencidas
-    overdue_tasks = Task.objects.filter(
-        Q(task_list__owner=request.user) | Q(task_list__shared_with__shared_with=request.user),
-        status__in=['pending', 'in_progress'],
-        due_date__isnull=False,
-        due_date__lt=timezone.now()
-    ).distinct().select_related('task_list').order_by('due_date')[:5]
-    
-    # Actividad reciente
-    recent_activities = TaskActivity.objects.filter(
-        Q(task__task_list__owner=request.user) | Q(task__task_list__shared_with__shared_with=request.user)
-    ).distinct().select_related('task', 'user').order_by('-timestamp')[:5]
+    user = request.user
+    now = timezone.now()
+    dashboard_cache = DashboardCache(user, now=now)
+    
+    # Estadísticas generales en una sola consulta (cacheadas por versión de lista)
+    counts = dashboard_cache.get_or_set('counts', lambda: get_user_task_counts(user, now=now))
+    
+    # Fragmentos renderizados una vez por versión; un acierto no consulta la BD
+    lists_fragment = dashboard_cache.get_or_set('lists', lambda: render_to_string(
+        'tasks/components/dashboard_lists.html',
+        {
+            'user': user,
+            # Los contadores son columnas de TaskList: sin cargar las tareas
+            'user_lists': TaskList.objects.accessible_to(user).select_related('owner'),
+        },
+    ))
+    sidebar_fragment = dashboard_cache.get_or_set('sidebar', lambda: render_to_string(
+        'tasks/components/dashboard_sidebar.html',
+        {
+            'user': user,
+            'upcoming_tasks': get_user_upcoming_tasks(user, now=now),
+            'overdue_tasks': get_user_overdue_tasks(user, now=now),
+            'recent_activities': get_user_recent_activities(user),
+        },
+    ))
     
     context = {
-        'user_lists': user_lists,
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'in_progress_tasks': in_progress_tasks,
-        'pending_tasks': pending_tasks,
-        'upcoming_tasks': upcoming_tasks,
-        'overdue_tasks': overdue_tasks,
-        'recent_activities': recent_activities,
+        'total_tasks': counts['total'],
+        'completed_tasks': counts['completed'],
+        'in_progress_tasks': counts['in_progress'],
+        'pending_tasks': counts['pending'],
+        'overdue_count': counts['overdue'],
+        'high_priority_tasks': counts['high_priority'],
+        'lists_fragment': lists_fragment,
+        'sidebar_fragment': sidebar_fragment,
     }
     
-    return render(request, 'tasks/dashboard.html', context) 
\ No newline at end of file
+    return render(request, 'tasks/dashboard.html', context)
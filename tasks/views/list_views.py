@@ -2,8 +2,6 @@ from django.shortcuts import get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Case, When, Value, IntegerField, DateTimeField
-from django.utils import timezone
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy, reverse
 from django.http import Http404
@@ -11,6 +9,16 @@ from django.core.exceptions import PermissionDenied
 
 from ..models import TaskList, Task
 from ..forms import TaskListForm, TaskFilterForm, TaskQuickForm
+from ..services import (
+    TASK_BOARD_ORDERING,
+    InvalidCursor,
+    KeysetPaginator,
+    build_task_cards,
+    filter_tasks,
+    has_list_permission,
+    search_queryset,
+    task_card_rows,
+)
 
 
 class TaskListListView(LoginRequiredMixin, ListView):
@@ -23,32 +31,31 @@ class TaskListListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         queryset = TaskList.objects.all()
         
-        # Filtro por búsqueda
+        # Filtro por búsqueda de texto completo (palabras incompletas por prefijo)
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset = search_queryset(queryset, search, prefix=True, ranked=True)
         
         # Filtro por tipo de lista
         filter_type = self.request.GET.get('filter', 'all')
         if filter_type == 'own':
-            queryset = queryset.filter(owner=self.request.user)
+            queryset = queryset.accessible_to(self.request.user, 'owner')
         elif filter_type == 'shared':
-            queryset = queryset.filter(shared_with__shared_with=self.request.user)
+            queryset = queryset.shared_with_user(self.request.user)
         else:  # 'all'
-            queryset = queryset.filter(
-                Q(owner=self.request.user) | 
-                Q(shared_with__shared_with=self.request.user)
-            )
+            queryset = queryset.accessible_to(self.request.user)
         
-        # Ordenamiento
-        order = self.request.GET.get('order', '-created_at')
+        # Ordenamiento (por relevancia si se busca sin un orden explícito)
+        order = self.request.GET.get('order')
         if order in ['name', '-name', 'created_at', '-created_at']:
             queryset = queryset.order_by(order)
+        elif search:
+            queryset = queryset.order_by('search_rank', '-created_at')
+        else:
+            queryset = queryset.order_by('-created_at')
             
-        return queryset.distinct().select_related('owner').prefetch_related('tasks')
+        # Los contadores de las tarjetas son columnas de TaskList: sin cargar las tareas
+        return queryset.select_related('owner')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -66,79 +73,48 @@ class TaskListDetailView(LoginRequiredMixin, DetailView):
     model = TaskList
     template_name = 'tasks/tasklist_detail.html'
     context_object_name = 'task_list'
+    tasks_per_page = 20
     
     def get_object(self):
-        obj = get_object_or_404(TaskList, pk=self.kwargs['pk'])
-        if not (obj.owner == self.request.user or 
-                obj.shared_with.filter(shared_with=self.request.user).exists()):
+        obj = get_object_or_404(TaskList.objects.select_related('owner'), pk=self.kwargs['pk'])
+        if not has_list_permission(self.request, obj, 'read'):
             raise Http404
         return obj
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        task_list = self.get_object()
+        task_list = self.object
         
         # Filtros
         filter_form = TaskFilterForm(self.request.GET, task_list=task_list)
         tasks = task_list.tasks.all()
-        
         if filter_form.is_valid():
-            if filter_form.cleaned_data['search']:
-                tasks = tasks.filter(
-                    Q(title__icontains=filter_form.cleaned_data['search']) |
-                    Q(description__icontains=filter_form.cleaned_data['search'])
-                )
-            if filter_form.cleaned_data['priority']:
-                tasks = tasks.filter(priority=filter_form.cleaned_data['priority'])
-            if filter_form.cleaned_data['status']:
-                status = filter_form.cleaned_data['status']
-                if status == 'pending':
-                    tasks = tasks.filter(status='pending')
-                elif status == 'in_progress':
-                    tasks = tasks.filter(status='in_progress')
-                elif status == 'completed':
-                    tasks = tasks.filter(status='completed')
-                elif status == 'overdue':
-                    tasks = tasks.filter(status__in=['pending', 'in_progress'], due_date__lt=timezone.now())
-            if filter_form.cleaned_data['assigned_to']:
-                tasks = tasks.filter(assigned_users=filter_form.cleaned_data['assigned_to'])
-            if filter_form.cleaned_data['due_date_from']:
-                tasks = tasks.filter(due_date__gte=filter_form.cleaned_data['due_date_from'])
-            if filter_form.cleaned_data['due_date_to']:
-                tasks = tasks.filter(due_date__lte=filter_form.cleaned_data['due_date_to'])
-        
-        # Ordenamiento personalizado por prioridad y fecha de vencimiento
-        tasks = tasks.annotate(
-            priority_order=Case(
-                When(priority='high', then=Value(1)),
-                When(priority='medium', then=Value(2)),
-                When(priority='low', then=Value(3)),
-                default=Value(4),
-                output_field=IntegerField(),
-            )
-        ).order_by(
-            'priority_order',  # Primero por prioridad (high -> medium -> low)
-            Case(  # Luego por fecha de vencimiento, pero las tareas sin fecha van al final
-                When(due_date__isnull=True, then=timezone.now() + timezone.timedelta(days=36500)),
-                default='due_date',
-                output_field=DateTimeField(),
-            ),
-            '-created_at'  # Finalmente por fecha de creación (más recientes primero)
-        )
+            tasks = filter_tasks(tasks, filter_form.cleaned_data)
         
-        tasks = tasks.select_related('created_by').prefetch_related('attachments', 'assigned_users')
+        # Solo las columnas y contadores de las tarjetas, como filas dict
+        tasks = task_card_rows(tasks)
         
-        # Paginación
-        paginator = Paginator(tasks, 20)
+        # Paginación: por número de página (compatibilidad) o por cursor
         page = self.request.GET.get('page')
-        tasks = paginator.get_page(page)
+        if page:
+            pagination_mode = 'page'
+            paginator = Paginator(tasks.order_by(*TASK_BOARD_ORDERING), self.tasks_per_page)
+            tasks = paginator.get_page(page)
+        else:
+            pagination_mode = 'cursor'
+            paginator = KeysetPaginator(tasks, TASK_BOARD_ORDERING, self.tasks_per_page)
+            try:
+                tasks = paginator.get_page(self.request.GET.get('cursor'))
+            except InvalidCursor:
+                tasks = paginator.get_page()
         
         context.update({
             'tasks': tasks,
+            'task_cards': build_task_cards(tasks),
+            'pagination_mode': pagination_mode,
             'filter_form': filter_form,
             'quick_form': TaskQuickForm(),
-            'can_edit': (task_list.owner == self.request.user or 
-                        task_list.shared_with.filter(shared_with=self.request.user, permission='write').exists()),
+            'can_edit': has_list_permission(self.request, task_list, 'write'),
             'shared_users': task_list.shared_with.all().select_related('shared_with'),
         })
         
@@ -168,7 +144,7 @@ class TaskListUpdateView(LoginRequiredMixin, UpdateView):
     
     def get_object(self):
         obj = get_object_or_404(TaskList, pk=self.kwargs['pk'])
-        if obj.owner != self.request.user:
+        if not has_list_permission(self.request, obj, 'owner'):
             raise PermissionDenied
         return obj
     
@@ -188,7 +164,7 @@ class TaskListDeleteView(LoginRequiredMixin, DeleteView):
     
     def get_object(self):
         obj = get_object_or_404(TaskList, pk=self.kwargs['pk'])
-        if obj.owner != self.request.user:
+        if not has_list_permission(self.request, obj, 'owner'):
             raise PermissionDenied
         return obj
     
@@ -0,0 +1,18 @@
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.utils.cache import add_never_cache_headers
+from django.views.decorators.http import require_GET
+
+from ..services import metrics_access_allowed, metrics_enabled, render_metrics
+
+
+@require_GET
+def metrics_view(request):
+    """Métricas de todos los workers en formato de texto de Prometheus (staff o redes internas)."""
+    if not metrics_enabled():
+        raise Http404
+    if not metrics_access_allowed(request):
+        raise PermissionDenied
+    response = HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    add_never_cache_headers(response)
+    return response
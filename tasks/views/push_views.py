@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from ..services import (
+    get_push_broker,
+    push_enabled,
+    list_channel,
+    user_channel,
+    aload_list_permissions,
+)
+from ..services.push_service import RESUBSCRIBE_EVENTS
+
+
+def _format_event(event):
+    """Serializa un evento en formato Server-Sent Events."""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _event_stream(channels):
+    """Stream de eventos de los canales, con keep-alive y duración máxima."""
+    loop = asyncio.get_running_loop()
+    subscription = get_push_broker().subscribe(channels)
+    deadline = loop.time() + getattr(settings, 'PUSH_STREAM_TIMEOUT', 300)
+    heartbeat = getattr(settings, 'PUSH_HEARTBEAT', 15)
+    try:
+        yield f"retry: {getattr(settings, 'PUSH_RETRY_MS', 3000)}\n\n"
+        while loop.time() < deadline:
+            event = await subscription.get(min(heartbeat, max(deadline - loop.time(), 0)))
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            yield _format_event(event)
+            # Tras un cambio de acceso o una pérdida de eventos el cliente reconecta
+            if event['type'] in RESUBSCRIBE_EVENTS:
+                break
+    finally:
+        subscription.close()
+
+
+def _stream_response(channels):
+    response = StreamingHttpResponse(_event_stream(channels), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Evitar que nginx acumule el stream
+    return response
+
+
+def _push_unavailable(request):
+    """
+    Bajo WSGI un stream sin fin bloquearía un worker. Un 204 hace que EventSource
+    deje de reconectar y el cliente siga con el sondeo periódico.
+    """
+    return not push_enabled() or not isinstance(request, ASGIRequest)
+
+
+@login_required
+@require_GET
+async def dashboard_events(request):
+    """Eventos en vivo de todas las listas accesibles para el usuario."""
+    if _push_unavailable(request):
+        return HttpResponse(status=204)
+    
+    user = await request.auser()
+    permissions = await aload_list_permissions(user)
+    channels = [list_channel(task_list_id) for task_list_id in permissions]
+    return _stream_response(channels + [user_channel(user.pk)])
+
+
+@login_required
+@require_GET
+async def task_list_events(request, pk):
+    """Eventos en vivo de una lista para el tablero kanban."""
+    if _push_unavailable(request):
+        return HttpResponse(status=204)
+    
+    user = await request.auser()
+    permissions = await aload_list_permissions(user)
+    if pk not in permissions:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    return _stream_response([list_channel(pk), user_channel(user.pk)])
@@ -5,13 +5,14 @@ from django.core.exceptions import PermissionDenied
 
 from ..models import TaskList, SharedList
 from ..forms import SharedListForm
+from ..services import has_list_permission
 
 
 @login_required
 def share_list_view(request, pk):
     """Vista para compartir listas."""
     task_list = get_object_or_404(TaskList, pk=pk)
-    if task_list.owner != request.user:
+    if not has_list_permission(request, task_list, 'owner'):
         raise PermissionDenied
     
     if request.method == 'POST':
@@ -40,7 +41,7 @@ def share_list_view(request, pk):
 def unshare_list_view(request, pk, shared_pk):
     """Vista para dejar de compartir listas."""
     task_list = get_object_or_404(TaskList, pk=pk)
-    if task_list.owner != request.user:
+    if not has_list_permission(request, task_list, 'owner'):
         raise PermissionDenied
     
     shared_list = get_object_or_404(SharedList, pk=shared_pk, task_list=task_list)
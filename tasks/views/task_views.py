@@ -6,8 +6,9 @@ from django.urls import reverse
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 
-from ..models import TaskList, Task, TaskActivity
+from ..models import TaskList, Task
 from ..forms import TaskForm
+from ..services import has_list_permission, record_activity
 
 
 class TaskCreateView(LoginRequiredMixin, CreateView):
@@ -18,8 +19,7 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
     
     def dispatch(self, request, *args, **kwargs):
         self.task_list = get_object_or_404(TaskList, pk=self.kwargs['list_pk'])
-        if not (self.task_list.owner == request.user or 
-                self.task_list.shared_with.filter(shared_with=request.user, permission='write').exists()):
+        if not has_list_permission(request, self.task_list, 'write'):
             raise PermissionDenied
         return super().dispatch(request, *args, **kwargs)
     
@@ -35,17 +35,13 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
         with transaction.atomic():
             self.object = form.save()
             
-            # Crear actividad
-            activity_description = f'Tarea creada: {self.object.title}'
-            if form.cleaned_data.get('assigned_users'):
-                assigned_users = form.cleaned_data['assigned_users']
-                activity_description += f' (Asignada a: {", ".join([user.get_full_name() or user.username for user in assigned_users])})'
-            
-            TaskActivity.objects.create(
-                task=self.object,
-                user=self.request.user,
-                action='created',
-                description=activity_description
+            # Registrar actividad (los nombres de los asignados se resuelven al escribirla)
+            record_activity(
+                self.object,
+                self.request.user,
+                'created',
+                f'Tarea creada: {self.object.title}',
+                mentions=[(' (Asignada a: {users})', form.cleaned_data.get('assigned_users'))],
             )
         
         messages.success(self.request, 'Tarea creada exitosamente.')
@@ -67,44 +63,39 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'tasks/task_form.html'
     
     def get_object(self):
-        obj = get_object_or_404(Task, pk=self.kwargs['pk'])
-        if not (obj.task_list.owner == self.request.user or 
-                obj.task_list.shared_with.filter(shared_with=self.request.user, permission='write').exists()):
+        obj = get_object_or_404(Task.objects.select_related('task_list'), pk=self.kwargs['pk'])
+        if not has_list_permission(self.request, obj.task_list_id, 'write'):
             raise PermissionDenied
         return obj
     
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs['task_list'] = self.get_object().task_list
+        kwargs['task_list'] = self.object.task_list
         return kwargs
     
     def form_valid(self, form):
         with transaction.atomic():
-            # Obtener usuarios asignados anteriormente
-            previous_assigned_users = set(self.object.assigned_users.all())
+            # Obtener ids de usuarios asignados anteriormente
+            previous_assigned_ids = set(self.object.assigned_users.values_list('pk', flat=True))
             
             # Guardar el formulario
             self.object = form.save()
             
-            # Obtener nuevos usuarios asignados
-            new_assigned_users = set(form.cleaned_data.get('assigned_users', []))
-            
             # Detectar cambios en asignaciones
-            added_users = new_assigned_users - previous_assigned_users
-            removed_users = previous_assigned_users - new_assigned_users
-            
-            # Crear actividad con detalles de cambios en asignaciones
-            activity_description = f'Tarea actualizada: {self.object.title}'
-            if added_users:
-                activity_description += f'\nUsuarios asignados: {", ".join([user.get_full_name() or user.username for user in added_users])}'
-            if removed_users:
-                activity_description += f'\nUsuarios desasignados: {", ".join([user.get_full_name() or user.username for user in removed_users])}'
+            new_assigned_ids = {user.pk for user in form.cleaned_data.get('assigned_users', [])}
+            added_ids = new_assigned_ids - previous_assigned_ids
+            removed_ids = previous_assigned_ids - new_assigned_ids
             
-            TaskActivity.objects.create(
-                task=self.object,
-                user=self.request.user,
-                action='updated',
-                description=activity_description
+            # Registrar actividad con detalles de cambios en asignaciones
+            record_activity(
+                self.object,
+                self.request.user,
+                'updated',
+                f'Tarea actualizada: {self.object.title}',
+                mentions=[
+                    ('\nUsuarios asignados: {users}', sorted(added_ids)),
+                    ('\nUsuarios desasignados: {users}', sorted(removed_ids)),
+                ],
             )
         
         messages.success(self.request, 'Tarea actualizada exitosamente.')
@@ -112,7 +103,7 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['task_list'] = self.get_object().task_list
+        context['task_list'] = self.object.task_list
         return context
     
     def get_success_url(self):
@@ -125,9 +116,8 @@ class TaskDeleteView(LoginRequiredMixin, DeleteView):
     template_name = 'tasks/task_confirm_delete.html'
     
     def get_object(self):
-        obj = get_object_or_404(Task, pk=self.kwargs['pk'])
-        if not (obj.task_list.owner == self.request.user or 
-                obj.task_list.shared_with.filter(shared_with=self.request.user, permission='write').exists()):
+        obj = get_object_or_404(Task.objects.select_related('task_list'), pk=self.kwargs['pk'])
+        if not has_list_permission(self.request, obj.task_list_id, 'write'):
             raise PermissionDenied
         return obj
     
@@ -0,0 +1,128 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+
+from ..models import Task, AttachmentUpload
+from ..services import (
+    UploadError,
+    abort_upload,
+    finalize_upload,
+    has_list_permission,
+    record_activity,
+    start_upload,
+    write_chunk,
+)
+
+
+def _upload_state(upload):
+    return {
+        'id': str(upload.pk),
+        'filename': upload.filename,
+        'size': upload.size,
+        'offset': upload.offset,
+        'chunk_size': getattr(settings, 'ATTACHMENT_UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024),
+        'url': reverse('upload', kwargs={'pk': upload.pk}),
+        'finalize_url': reverse('finalize_upload', kwargs={'pk': upload.pk}),
+    }
+
+
+def _error_response(error):
+    data = {'error': str(error)}
+    if error.offset is not None:
+        data['offset'] = error.offset
+    return JsonResponse(data, status=error.status)
+
+
+def _get_upload(request, pk):
+    """Subida del usuario sobre cuya lista sigue teniendo permiso de escritura (o None)."""
+    upload = get_object_or_404(AttachmentUpload.objects.select_related('task'), pk=pk, uploaded_by=request.user)
+    if not has_list_permission(request, upload.task.task_list_id, 'write'):
+        return None
+    return upload
+
+
+@login_required
+@require_http_methods(["POST"])
+def start_upload_api(request, task_pk):
+    """
+    API para iniciar una subida por partes de un adjunto.
+    Cuerpo JSON: {"filename": ..., "size": bytes, "sha256": hash opcional del archivo}.
+    """
+    task = get_object_or_404(Task, pk=task_pk)
+    if not has_list_permission(request, task.task_list_id, 'write'):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    
+    try:
+        upload = start_upload(task, request.user, payload.get('filename'), payload.get('size'), payload.get('sha256'))
+    except UploadError as e:
+        return _error_response(e)
+    return JsonResponse(_upload_state(upload), status=201)
+
+
+@login_required
+@require_http_methods(["GET", "PUT", "DELETE"])
+def upload_api(request, pk):
+    """
+    API de una subida en curso: GET retorna el offset para reanudarla, PUT añade
+    una parte (Content-Range y X-Chunk-SHA256 opcional) y DELETE la cancela.
+    """
+    upload = _get_upload(request, pk)
+    if upload is None:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    if request.method == 'DELETE':
+        abort_upload(upload)
+        return JsonResponse({'success': True})
+    
+    if request.method == 'PUT':
+        try:
+            upload = write_chunk(
+                upload,
+                request.headers.get('Content-Range'),
+                request,
+                request.headers.get('X-Chunk-SHA256'),
+            )
+        except UploadError as e:
+            return _error_response(e)
+    return JsonResponse(_upload_state(upload))
+
+
+@login_required
+@require_http_methods(["POST"])
+def finalize_upload_api(request, pk):
+    """API para ensamblar una subida completa y crear el archivo adjunto."""
+    upload = _get_upload(request, pk)
+    if upload is None:
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+    
+    try:
+        attachment = finalize_upload(upload)
+    except UploadError as e:
+        return _error_response(e)
+    
+    # Registrar actividad
+    record_activity(attachment.task, request.user, 'file_added', f'Archivo añadido: {attachment.filename}')
+    
+    return JsonResponse({
+        'success': True,
+        'attachment': {
+            'id': attachment.pk,
+            'filename': attachment.filename,
+            'file_size': attachment.file_size,
+            'file_size_display': attachment.get_file_size_display(),
+            'url': reverse('view_attachment', kwargs={'task_pk': attachment.task_id, 'pk': attachment.pk}),
+        },
+        'redirect': reverse('tasklist_detail', kwargs={'pk': attachment.task.task_list_id}),
+    }, status=201)